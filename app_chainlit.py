@@ -3,32 +3,70 @@
 
 import sys
 import os
+import logging
 import chainlit as cl
-from langchain_core.messages import HumanMessage, AIMessage
 
 # Ensure src is importable
 sys.path.append(os.getcwd())
 
-from src.agent.graph import graph_app
+from src.config import Config
+from src.agent.graph import get_graph_app
+from src.agent.memory import create_session_memory
+from src.agent.checkpoint import thread_config, turn_input, restore_session_memory, new_thread_id
+from src.agent.tools import warm_table_engine
+from src.telemetry.metrics import registry, setup_exporters, COUNT_BUCKETS
+
+logger = logging.getLogger(__name__)
+setup_exporters()
+
+def _session_thread_id() -> str:
+    """
+    Stable conversation key shared by all workers (Chainlit thread id when available).
+    """
+    thread_id = cl.user_session.get("thread_id")
+    if not thread_id:
+        thread_id = getattr(cl.context.session, "thread_id", None) or new_thread_id()
+        cl.user_session.set("thread_id", thread_id)
+    return thread_id
 
 @cl.on_chat_start
 async def start():
     """
     Initializes the chat session.
     """
-    cl.user_session.set("chat_history", [])
+    _session_thread_id()
+    # Table SQL engine is built (or checked for new tables) in the background, off the first question's path
+    warm_table_engine()
+    # Bounded rolling memory (recent turns verbatim + background summary of older turns)
+    cl.user_session.set("memory", create_session_memory())
     await cl.Message(
         content="**Project Antigravity Agent**\n\n안녕하세요! 무엇을 도와드릴까요? (Ollama & Neo4j Connected)"
     ).send()
 
+@cl.on_chat_resume
+async def resume(thread):
+    """
+    Resumes a conversation on any worker from the shared checkpoint store.
+    """
+    thread_id = thread.get("id") if isinstance(thread, dict) else None
+    if thread_id:
+        cl.user_session.set("thread_id", thread_id)
+    thread_id = _session_thread_id()
+    memory = await cl.make_async(restore_session_memory)(get_graph_app(), thread_id)
+    cl.user_session.set("memory", memory)
+
 @cl.on_message
 async def main(message: cl.Message):
     """
     Main chat handler. 
     Receives user message, invokes LangGraph agent, and sends response.
     """
-    # 1. Retrieve Chat History
-    history = cl.user_session.get("chat_history")
+    # 1. Retrieve Chat History (restored from the checkpoint if this worker hasn't seen the session)
+    thread_id = _session_thread_id()
+    memory = cl.user_session.get("memory")
+    if memory is None:
+        memory = await cl.make_async(restore_session_memory)(get_graph_app(), thread_id)
+        cl.user_session.set("memory", memory)
     
     # 2. UI Feedback: "Thinking..."
     feedback_msg = cl.Message(content="🤔 생각 중... (지식 그래프 탐색 및 추론)")
@@ -37,14 +75,12 @@ async def main(message: cl.Message):
     # 3. Methodical Async Execution
     # LangGraph's .invoke is often synchronous (unless compiled with async nodes).
     # We use cl.make_async to run it in a thread/executor to avoid blocking the UI main loop.
-    inputs = {
-        "input": message.content,
-        "chat_history": history
-    }
+    inputs = turn_input(message.content, memory)
     
     # Define a helper to run the graph
+    # durability="exit" batches the checkpoint writes of one turn into a single write at the end
     def run_graph(inp):
-        return graph_app.invoke(inp)
+        return get_graph_app().invoke(inp, config=thread_config(thread_id), durability=Config.CHECKPOINT_DURABILITY)
 
     # Convert to async
     run_graph_async = cl.make_async(run_graph)
@@ -57,14 +93,11 @@ async def main(message: cl.Message):
         final_answer = result_state.get("answer", "죄송합니다. 답변을 생성하지 못했습니다.")
         contexts = result_state.get("context", [])
         
-        # Update History in Session (Append new turn)
-        # Note: LangGraph state might return full history, or we append manually.
-        # Let's append manually to be safe if specific logic isn't in graph to persist across calls cleanly purely by state return.
-        # Actually graph logic adds messages to state["chat_history"] usually? 
-        # Checking src/agent/graph.py logic is prudent, but appending here is safe fallback.
-        history.append(HumanMessage(content=message.content))
-        history.append(AIMessage(content=final_answer))
-        cl.user_session.set("chat_history", history)
+        # Update History in Session (older turns are summarized off the request path)
+        memory.add_turn(message.content, final_answer)
+        stats = memory.stats()
+        registry.observe("session_memory_tokens", stats["total_tokens"], buckets=COUNT_BUCKETS)
+        logger.debug(f"Session memory stats: {stats}")
         
         # 5. Send Final Response
         # We replace the "Thinking..." message with the final answer
@@ -0,0 +1,124 @@
+# Excel parsing: pandas DataFrame path vs streaming read-only path (sequential and per-sheet parallel)
+# on a generated multi-sheet workbook.
+#
+#   python -m benchmarks.excel_ingest                         # 8 sheets x 20000 rows x 12 columns
+#   python -m benchmarks.excel_ingest --sheets 50 --rows 40000 --output data/excel_bench.json
+#   python -m benchmarks.excel_ingest --sheets 4 --rows 5000 --memory   # + peak allocations per path
+import os
+import sys
+import time
+import argparse
+import resource
+import zipfile
+import tempfile
+import tracemalloc
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from benchmarks.harness import summarize_latencies, save_results, print_table
+
+def write_workbook(path: str, sheets: int, rows: int, columns: int) -> int:
+    """
+    Finance-style workbook written in openpyxl write-only mode (constant memory). Returns bytes.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    wb = Workbook(write_only=True)
+    header = ["Account", "Region", "Year"] + [f"Q{c % 4 + 1} {2020 + c // 4}" for c in range(columns - 3)]
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Entity {s}")
+        ws.append(header)
+        for r in range(rows):
+            ws.append([f"ACC-{s:02d}-{r:06d}", f"Region {r % 7}", 2020 + r % 5]
+                      + [round((r * 31 + c * 17 + s) % 100003 / 7.0, 2) for c in range(columns - 3)])
+    wb.save(path)
+    _add_dimensions(path, f"A1:{get_column_letter(columns)}{rows + 1}")
+    return os.path.getsize(path)
+
+def _add_dimensions(path: str, ref: str):
+    """
+    Write-only workbooks have no <dimension> element, unlike files saved by Excel;
+    openpyxl then parses each whole sheet once just to size it. Add it so the
+    benchmark measures what real workbooks cost.
+    """
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename.startswith("xl/worksheets/sheet"):
+                # Schema order: sheetPr, dimension, sheetViews
+                data = data.replace(b"<sheetViews>", f'<dimension ref="{ref}" /><sheetViews>'.encode(), 1)
+            dst.writestr(item, data)
+    os.replace(tmp_path, path)
+
+def run_case(name: str, fn, units: int, trace_memory: bool = False):
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    docs = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    rows = sum(len(d.table_data.rows) for d in docs)
+    assert rows == units, f"{name}: {rows} rows parsed, expected {units}"
+    result = {**summarize_latencies([elapsed], units=units), "sheets": len(docs)}
+    if peak is not None:
+        result["peak_mb"] = round(peak / 1024 ** 2, 1)
+    return result
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--sheets", type=int, default=8)
+    arg_parser.add_argument("--rows", type=int, default=20000, help="Rows per sheet")
+    arg_parser.add_argument("--columns", type=int, default=12)
+    arg_parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                            help="Worker processes for the parallel case (skipped below 2)")
+    arg_parser.add_argument("--skip_pandas", action="store_true", help="Only run the streaming cases")
+    arg_parser.add_argument("--memory", action="store_true",
+                            help="Also record peak Python allocations (tracemalloc; several times slower)")
+    arg_parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    from src.config import Config
+    from src.features.converters.table_converter import TableConverter
+    converter = TableConverter()
+    units = args.sheets * args.rows
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "finance.xlsx")
+        size = write_workbook(path, args.sheets, args.rows, args.columns)
+        print(f"📊 Workbook: {args.sheets} sheets x {args.rows} rows x {args.columns} columns ({size / 1024 ** 2:.1f} MB)")
+
+        results = {}
+        if not args.skip_pandas:
+            results["excel_pandas"] = run_case(
+                "pandas", lambda: converter.convert_excel(path, {}, streaming=False), units, args.memory)
+        results["excel_streaming"] = run_case(
+            "streaming", lambda: converter._convert_excel_streaming(path, {}, workers=1), units, args.memory)
+        if args.workers > 1:
+            Config.EXCEL_PARALLEL_MIN_MB = 0
+            results["excel_streaming_parallel"] = run_case(
+                "parallel", lambda: converter._convert_excel_streaming(path, {}, workers=args.workers), units)
+            # Worker processes are not visible to tracemalloc: report their peak RSS instead
+            if sys.platform.startswith("linux"):
+                results["excel_streaming_parallel"]["worker_rss_mb"] = round(
+                    resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+        else:
+            print(f"⚠️ {os.cpu_count()} CPU(s): parallel case skipped (use --workers to force)")
+
+    print_table(results)
+    base = results.get("excel_pandas")
+    if base:
+        for name in [n for n in ("excel_streaming", "excel_streaming_parallel") if n in results]:
+            print(f"   - {name}: {base['p50_ms'] / results[name]['p50_ms']:.1f}x faster than pandas"
+                  + (f", peak {results[name]['peak_mb']} MB vs {base['peak_mb']} MB" if "peak_mb" in results[name] else ""))
+    if args.output:
+        save_results(results, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
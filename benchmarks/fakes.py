@@ -0,0 +1,337 @@
+"""
+Local stand-ins so benchmarks run with no network:
+- FakeOllamaServer: HTTP server speaking the Ollama /api/chat protocol with configurable latency
+- FakeEmbeddings:   deterministic hash-based embedder (LangChain Embeddings interface)
+- InMemoryNeo4jDriver: records GraphConnector writes in dictionaries instead of a Neo4j server
+- write_report_pdf:    text + ruled-table report PDF written with raw PDF operators (no PDF library)
+"""
+import json
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Callable, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+def default_responder(prompt: str) -> str:
+    """
+    Returns canned JSON for the prompts used by the agent and the extractor.
+    """
+    if "Search Planner" in prompt:
+        question = prompt.split('The user asked: "', 1)[-1].split('"', 1)[0]
+        return json.dumps({"action": "search", "query": question})
+    if "Extract key business concepts" in prompt:
+        return json.dumps({"concepts": ["Samsung Electronics", "Revenue", "2024"]})
+    if "Helpful Assistant" in prompt:
+        return json.dumps({"action": "answer", "response": "Samsung Electronics revenue grew 15% in 2024."})
+    return json.dumps({"response": "ok"})
+
+class FakeOllamaServer:
+    """
+    Minimal Ollama-compatible server (GET /, GET /api/tags, POST /api/chat).
+
+    latency_s:         fixed delay before the first token (model load / prefill)
+    tokens_per_second: generation speed; 0 disables the per-token delay
+    parallel:          requests generated at once, like OLLAMA_NUM_PARALLEL (0 = unlimited);
+                       the others wait, and their waits are recorded in queue_waits_s
+    """
+    def __init__(self,
+                 latency_s: float = 0.0,
+                 tokens_per_second: float = 0.0,
+                 responder: Callable[[str], str] = default_responder,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 parallel: int = 0):
+        self.latency_s = latency_s
+        self.tokens_per_second = tokens_per_second
+        self.responder = responder
+        self.requests = 0
+        self.models: List[str] = []  # Model named by each /api/chat request
+        self.queue_waits_s: List[float] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(parallel) if parallel else None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body are separate writes; avoid 40ms delayed-ACK stalls
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload: Dict[str, Any], status: int = 200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self._send_json({"models": [{"name": "llama3.1:latest"}]})
+                    return
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+
+                if not self.path.startswith("/api/chat"):
+                    self._send_json({"error": f"unsupported path {self.path}"}, status=404)
+                    return
+
+                prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+                with server._lock:
+                    server.models.append(request.get("model", ""))
+                arrived = time.perf_counter()
+                if server._slots is not None:
+                    server._slots.acquire()
+                try:
+                    started = time.perf_counter()
+                    with server._lock:
+                        server.queue_waits_s.append(started - arrived)
+                    if server.latency_s:
+                        time.sleep(server.latency_s)
+                    content = server.responder(prompt)
+                    prompt_tokens = max(1, len(prompt.encode("utf-8")) // 4)
+                    eval_tokens = max(1, len(content.encode("utf-8")) // 4)
+                    if server.tokens_per_second:
+                        time.sleep(eval_tokens / server.tokens_per_second)
+                    elapsed_ns = int((time.perf_counter() - started) * 1e9)
+                finally:
+                    if server._slots is not None:
+                        server._slots.release()
+
+                final = {
+                    "model": request.get("model", "llama3.1"),
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "done_reason": "stop",
+                    "total_duration": elapsed_ns,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(server.latency_s * 1e9),
+                    "eval_count": eval_tokens,
+                    "eval_duration": max(0, elapsed_ns - int(server.latency_s * 1e9)),
+                }
+                if not request.get("stream", True):
+                    self._send_json(final)
+                    return
+
+                # Stream: one content chunk followed by the final "done" record (NDJSON)
+                chunk = {**final, "done": False}
+                for key in ["done_reason", "total_duration", "prompt_eval_count",
+                            "prompt_eval_duration", "eval_count", "eval_duration"]:
+                    chunk.pop(key)
+                final["message"] = {"role": "assistant", "content": ""}
+                body = (json.dumps(chunk) + "\n" + json.dumps(final) + "\n").encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic embedder: bag of hashed word features, L2-normalized.
+    Texts sharing words get similar vectors, so search results are meaningful.
+    """
+    def __init__(self, dim: int = 1024, latency_s: float = 0.0):
+        self.dim = dim
+        self.latency_s = latency_s
+
+    def _embed(self, text: str) -> List[float]:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in (text or "").lower().split():
+            h = int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:8], "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) == 0 else -1.0
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            vec[0] = 1.0
+            norm = 1.0
+        return (vec / norm).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class _InMemorySession:
+    def __init__(self, driver: "InMemoryNeo4jDriver"):
+        self.driver = driver
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **params):
+        self.driver.record(query, {**(parameters or {}), **params})
+        return []
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)  # The session doubles as the transaction
+
+    execute_read = execute_write
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class InMemoryNeo4jDriver:
+    """
+    Stand-in for neo4j.Driver. Applies the node/edge effects of GraphConnector's
+    MERGE statements to dictionaries (keyed by id), without parsing Cypher.
+    """
+    def __init__(self, write_latency_s: float = 0.0):
+        self.write_latency_s = write_latency_s
+        self.nodes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.edges = set()
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def session(self, **kwargs) -> _InMemorySession:
+        return _InMemorySession(self)
+
+    def close(self):
+        pass
+
+    def _merge(self, label: str, key: str, props: Dict[str, Any]):
+        self.nodes.setdefault(label, {}).setdefault(key, {}).update(props)
+
+    def record(self, query: str, params: Dict[str, Any]):
+        if self.write_latency_s:
+            time.sleep(self.write_latency_s)
+        with self._lock:
+            self.queries += 1
+            if "source" in params:
+                self._merge("Document", params["source"], {})
+            if "chunk_id" in params:
+                self._merge("Chunk", params["chunk_id"], {"text": params.get("text")})
+                self.edges.add(("CONTAINS", params.get("doc_source"), params["chunk_id"]))
+            if "table_id" in params and "markdown" in params:
+                self._merge("Table", params["table_id"], {"caption": params.get("caption")})
+                self.edges.add(("CONTAINS", params.get("doc_source"), params["table_id"]))
+            for row in params.get("rows", []):
+                self._merge("Row", row["id"], {"serialized_text": row.get("serialized_text")})
+                self.edges.add(("HAS_ROW", params.get("table_id"), row["id"]))
+            owner = params.get("chunk_id") or params.get("row_id") or params.get("table_id")
+            for name in params.get("concepts", []):
+                self._merge("Concept", name, {})
+                self.edges.add(("MENTIONS", owner, name))
+
+    def count(self, label: str) -> int:
+        return len(self.nodes.get(label, {}))
+
+# Report PDF fixture (benchmarks.pdf_tables, parser tests)
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _text(x: float, y: float, text: str, size: int = 10) -> str:
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET"
+
+def _page_stream(page: int, tables: int, rows: int, columns: int, paragraph_lines: int) -> str:
+    """
+    Content stream of one report page: paragraphs, then a ruled table (drawn grid lines,
+    so pdfplumber's lattice detection finds it) after each paragraph block.
+    """
+    ops, y = [], PAGE_HEIGHT - 50
+    row_h, left, width = 14, 50, PAGE_WIDTH - 100
+    col_w = width / columns
+    for t in range(tables):
+        for line in range(paragraph_lines):
+            ops.append(_text(left, y, f"Section {page}.{t}: revenue in region {line % 7} grew by "
+                                      f"{(page * 7 + line) % 23}% against plan, driven by segment {line % 5}."))
+            y -= 14
+        y -= 8
+        top = y + row_h - 3
+        cells = [["Account"] + [f"Q{c % 4 + 1} {2020 + c // 4}" for c in range(columns - 1)]]
+        cells += [[f"ACC-{page:03d}-{t}-{r:03d}"] + [f"{(page * 31 + r * 17 + c) % 9973 / 7:.2f}" for c in range(columns - 1)]
+                  for r in range(rows)]
+        for cells_row in cells:
+            for c, value in enumerate(cells_row):
+                ops.append(_text(left + c * col_w + 3, y, value, size=8))
+            y -= row_h
+        bottom = y + row_h - 3
+        for r in range(len(cells) + 1):
+            line_y = top - r * row_h
+            ops.append(f"{left} {line_y:.1f} m {left + width} {line_y:.1f} l S")
+        for c in range(columns + 1):
+            ops.append(f"{left + c * col_w:.1f} {top:.1f} m {left + c * col_w:.1f} {bottom - row_h:.1f} l S")
+        y -= row_h + 12
+    for line in range(paragraph_lines):
+        ops.append(_text(left, y, f"Note {page}.{line}: figures are unaudited and reported in KRW millions."))
+        y -= 14
+    return "\n".join(ops)
+
+def write_report_pdf(path: str, pages: int = 20, tables_per_page: int = 1, rows: int = 20,
+                     columns: int = 6, paragraph_lines: int = 6) -> int:
+    """
+    Writes a text + ruled-table PDF with raw PDF operators (no PDF library needed). Returns bytes.
+    """
+    streams = [_page_stream(p, tables_per_page, rows, columns, paragraph_lines) for p in range(pages)]
+    first_page = 4
+    kids = " ".join(f"{first_page + 2 * p} 0 R" for p in range(pages))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for p, stream in enumerate(streams):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {first_page + 2 * p + 1} 0 R >>")
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+    return len(out)
@@ -0,0 +1,72 @@
+import json
+import time
+from typing import Callable, Dict, Any, List
+import numpy as np
+
+def summarize_latencies(latencies_s: List[float], units: int = 1) -> Dict[str, float]:
+    """
+    p50/p95/p99/mean in milliseconds plus throughput (units per second).
+    'units' is the work per call (e.g. chunks written per ingest call).
+    """
+    arr = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    total_s = float(np.sum(latencies_s)) or 1e-9
+    return {
+        "n": int(arr.size),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+        "throughput_per_s": round(arr.size * units / total_s, 2),
+    }
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 2, units: int = 1) -> Dict[str, float]:
+    """
+    Calls fn(i) 'iterations' times after 'warmup' untimed calls.
+    """
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - started)
+    return summarize_latencies(latencies, units=units)
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]],
+                        baseline: Dict[str, Dict[str, float]],
+                        tolerance: float = 0.5,
+                        metrics: List[str] = ("p50_ms", "p95_ms"),
+                        min_delta_ms: float = 0.5) -> List[str]:
+    """
+    Returns a list of regressions: metrics more than 'tolerance' (fraction) slower than baseline.
+    Slowdowns smaller than min_delta_ms are timer noise on sub-millisecond benchmarks and ignored.
+    Benchmarks missing from the baseline are ignored (new benchmarks).
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in metrics:
+            if metric not in stats or metric not in base or base[metric] <= 0:
+                continue
+            limit = base[metric] * (1.0 + tolerance)
+            if stats[metric] > limit and stats[metric] - base[metric] >= min_delta_ms:
+                regressions.append(
+                    f"{name}.{metric}: {stats[metric]:.3f} > {limit:.3f} (baseline {base[metric]:.3f})"
+                )
+    return regressions
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_results(results: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    print(f"{'benchmark':<34}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'per s':>12}")
+    for name, s in results.items():
+        print(f"{name:<34}{s['n']:>6}{s['p50_ms']:>11.3f}{s['p95_ms']:>11.3f}{s['p99_ms']:>11.3f}{s['throughput_per_s']:>12.1f}")
@@ -0,0 +1,288 @@
+# Concurrent chat load test: N simulated sessions against graph_app, with think times and a
+# question mix, a fake Ollama with token-rate latency and a local SQLite retrieval backend.
+#
+#   python -m benchmarks.load_test --sessions 1,4,16 --turns 5
+#   python -m benchmarks.load_test --mode chainlit --sessions 32 --ollama_parallel 4 --think_s 2
+#   python -m benchmarks.load_test --sessions 8 --compare      # fail (exit 1) on regressions vs load_baseline.json
+#
+# Modes:
+#   graph:    each session is a thread calling graph_app.invoke (what one chat worker does per turn)
+#   chainlit: sessions are asyncio tasks and each turn goes through a bounded thread pool, like the
+#             Chainlit handler's cl.make_async (anyio's default limit is 40 threads), so handler
+#             queueing is measured too. The Chainlit server itself is not started.
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from benchmarks.fakes import FakeOllamaServer, default_responder
+from benchmarks.harness import summarize_latencies, compare_to_baseline, load_baseline, save_results, print_table
+
+DEFAULT_BASELINE = os.path.join(current_dir, "load_baseline.json")
+
+# Question templates per kind; {a}/{b} are filled with regions, {y} with a year
+QUESTIONS = {
+    "fact": ["What was the revenue of Region {a} in {y}?", "Who manages Region {a}?",
+             "How did Region {a} perform in {y}?"],
+    "compare": ["Compare Region {a} and Region {b} revenue in {y}", "Region {a} vs Region {b} in {y}"],
+    "follow_up": ["And the year before?", "Why did that change?"],
+}
+
+def load_test_responder(prompt: str) -> str:
+    """
+    default_responder, plus planner sub-queries for comparison questions.
+    """
+    if "Search Planner" in prompt:
+        question = prompt.split('The user asked: "', 1)[-1].split('"', 1)[0]
+        if " vs " in question or question.startswith("Compare"):
+            parts = question.replace("Compare ", "").replace(" vs ", " and ").split(" and ")
+            return json.dumps({"action": "search", "query": question, "queries": [p.strip() for p in parts]})
+    return default_responder(prompt)
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    "fact=0.6,compare=0.3,follow_up=0.1" -> normalized weights.
+    """
+    weights = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in QUESTIONS:
+            raise ValueError(f"Unknown question kind: {kind} (use {', '.join(QUESTIONS)})")
+        weights[kind.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    return {k: w / total for k, w in weights.items()}
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Peak, not current (non-Linux)
+
+class _RssSampler:
+    """
+    Peak resident memory while the sessions run (sampled every 'interval_s').
+    """
+    def __init__(self, interval_s: float = 0.05):
+        self.interval_s = interval_s
+        self.peak = _rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.peak = max(self.peak, _rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_mb())
+
+class SimulatedSession:
+    """
+    One chat user: own thread id and ConversationMemory, 'turns' questions drawn from
+    the mix, exponential think time (mean think_s) before each turn after the first.
+    """
+    def __init__(self, index: int, turns: int, mix: Dict[str, float], think_s: float, seed: int = 0):
+        from src.agent.memory import create_session_memory
+        from src.agent.checkpoint import new_thread_id
+        self.index = index
+        self.turns = turns
+        self.think_s = think_s
+        self.rng = np.random.default_rng(seed + index)
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.memory = create_session_memory()
+        self.thread_id = new_thread_id()
+        self.records: List[Dict[str, Any]] = []
+
+    def next_question(self, turn: int) -> str:
+        kind = self.rng.choice(self.kinds, p=self.weights)
+        if kind == "follow_up" and turn == 0:
+            kind = "fact"  # Nothing to follow up on yet
+        template = QUESTIONS[kind][int(self.rng.integers(len(QUESTIONS[kind])))]
+        a, b = self.rng.choice(7, size=2, replace=False)
+        return template.format(a=a, b=b, y=2020 + int(self.rng.integers(5)))
+
+    def think_time(self, turn: int) -> float:
+        return float(self.rng.exponential(self.think_s)) if turn and self.think_s else 0.0
+
+    def run_turn(self, question: str, submitted: float) -> Dict[str, Any]:
+        """
+        The work of app_chainlit.main for one message (graph turn + memory update).
+        """
+        from src.config import Config
+        from src.agent.graph import get_graph_app
+        from src.agent.checkpoint import thread_config, turn_input
+        started = time.perf_counter()
+        error = None
+        try:
+            result = get_graph_app().invoke(turn_input(question, self.memory), config=thread_config(self.thread_id),
+                                      durability=Config.CHECKPOINT_DURABILITY)
+            self.memory.add_turn(question, result.get("answer", ""))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+        return {"session": self.index, "question": question, "queue_s": started - submitted,
+                "latency_s": finished - submitted, "error": error}
+
+    def run(self, ramp_delay_s: float = 0.0):
+        time.sleep(ramp_delay_s)
+        for turn in range(self.turns):
+            time.sleep(self.think_time(turn))
+            question = self.next_question(turn)
+            self.records.append(self.run_turn(question, time.perf_counter()))
+
+    async def run_async(self, pool: ThreadPoolExecutor, ramp_delay_s: float = 0.0):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(ramp_delay_s)
+        for turn in range(self.turns):
+            await asyncio.sleep(self.think_time(turn))
+            question = self.next_question(turn)
+            submitted = time.perf_counter()
+            self.records.append(await loop.run_in_executor(pool, self.run_turn, question, submitted))
+
+def run_level(sessions: int, args, ollama: FakeOllamaServer) -> Dict[str, Any]:
+    """
+    Runs 'sessions' concurrent users to completion and summarizes the turns.
+    """
+    from src.config import Config
+    mix = parse_mix(args.mix)
+    ollama_waits_before = len(ollama.queue_waits_s)
+    requests_before = ollama.requests
+    checkpoint_before = os.path.getsize(Config.CHECKPOINT_DB_PATH) if os.path.exists(Config.CHECKPOINT_DB_PATH) else 0
+
+    rss_before = _rss_mb()
+    users = [SimulatedSession(i, args.turns, mix, args.think_s, seed=args.seed) for i in range(sessions)]
+    ramp = [args.ramp_s * i / sessions for i in range(sessions)]
+    started = time.perf_counter()
+    with _RssSampler() as sampler:
+        if args.mode == "chainlit":
+            async def drive():
+                with ThreadPoolExecutor(max_workers=args.handler_threads, thread_name_prefix="handler") as pool:
+                    await asyncio.gather(*(u.run_async(pool, r) for u, r in zip(users, ramp)))
+            asyncio.run(drive())
+        else:
+            with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+                list(pool.map(lambda ur: ur[0].run(ur[1]), zip(users, ramp)))
+    duration = time.perf_counter() - started
+
+    records = [r for u in users for r in u.records]
+    ok = [r for r in records if r["error"] is None]
+    llm_waits = np.asarray(ollama.queue_waits_s[ollama_waits_before:] or [0.0]) * 1000.0
+    queue_ms = np.asarray([r["queue_s"] for r in records] or [0.0]) * 1000.0
+    checkpoint_after = os.path.getsize(Config.CHECKPOINT_DB_PATH) if os.path.exists(Config.CHECKPOINT_DB_PATH) else 0
+    return {
+        "mode": args.mode,
+        "sessions": sessions,
+        "turns": len(records),
+        "errors": len(records) - len(ok),
+        "duration_s": round(duration, 2),
+        "turns_per_s": round(len(ok) / duration, 2) if duration else 0.0,
+        "latency": summarize_latencies([r["latency_s"] for r in ok] or [0.0]),
+        "handler_queue_p95_ms": round(float(np.percentile(queue_ms, 95)), 2),
+        "llm_requests": ollama.requests - requests_before,
+        "llm_queue_p50_ms": round(float(np.percentile(llm_waits, 50)), 2),
+        "llm_queue_p95_ms": round(float(np.percentile(llm_waits, 95)), 2),
+        "rss_mb_per_session": round(max(0.0, sampler.peak - rss_before) / sessions, 3),
+        "checkpoint_kb_per_session": round((checkpoint_after - checkpoint_before) / 1024 / sessions, 2),
+        "memory_tokens_per_session": round(float(np.mean([u.memory.stats()["total_tokens"] for u in users])), 1),
+        "first_error": next((r["error"] for r in records if r["error"]), None),
+    }
+
+def print_levels(levels: List[Dict[str, Any]]):
+    print(f"{'sessions':>9}{'turns/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'handler q95':>12}"
+          f"{'llm q50':>9}{'llm q95':>9}{'MB/sess':>9}{'errors':>8}")
+    for l in levels:
+        lat = l["latency"]
+        print(f"{l['sessions']:>9}{l['turns_per_s']:>9.2f}{lat['p50_ms']:>10.1f}{lat['p95_ms']:>10.1f}{lat['p99_ms']:>10.1f}"
+              f"{l['handler_queue_p95_ms']:>12.1f}{l['llm_queue_p50_ms']:>9.1f}{l['llm_queue_p95_ms']:>9.1f}"
+              f"{l['rss_mb_per_session']:>9.2f}{l['errors']:>8}")
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--mode", choices=["graph", "chainlit"], default="graph")
+    arg_parser.add_argument("--sessions", type=str, default="1,4,16", help="Concurrent sessions per level")
+    arg_parser.add_argument("--turns", type=int, default=5, help="Turns per session")
+    arg_parser.add_argument("--think_s", type=float, default=0.5, help="Mean think time between turns (exponential)")
+    arg_parser.add_argument("--ramp_s", type=float, default=0.0, help="Spread session starts over this many seconds")
+    arg_parser.add_argument("--mix", type=str, default="fact=0.6,compare=0.3,follow_up=0.1")
+    arg_parser.add_argument("--ttft_ms", type=float, default=150.0, help="Fake Ollama delay before the first token")
+    arg_parser.add_argument("--tokens_per_s", type=float, default=40.0, help="Fake Ollama generation speed")
+    arg_parser.add_argument("--ollama_parallel", type=int, default=1, help="Requests Ollama generates at once (OLLAMA_NUM_PARALLEL)")
+    arg_parser.add_argument("--embed_latency_ms", type=float, default=20.0, help="Query embedding cost")
+    arg_parser.add_argument("--corpus_size", type=int, default=2000)
+    arg_parser.add_argument("--handler_threads", type=int, default=40, help="chainlit mode: make_async thread limit")
+    arg_parser.add_argument("--checkpoint", choices=["sqlite", "memory"], default="sqlite")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    arg_parser.add_argument("--compare", action="store_true", help="Exit 1 if latency regresses beyond --tolerance")
+    arg_parser.add_argument("--tolerance", type=float, default=0.5)
+    arg_parser.add_argument("--update-baseline", action="store_true")
+    arg_parser.add_argument("--output", type=str, default=None, help="Write all level reports as JSON")
+    args = arg_parser.parse_args(argv)
+
+    with FakeOllamaServer(latency_s=args.ttft_ms / 1000.0, tokens_per_second=args.tokens_per_s,
+                          responder=load_test_responder, parallel=args.ollama_parallel) as ollama, \
+            tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before src.config is imported
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+        os.environ["CHECKPOINT_BACKEND"] = args.checkpoint
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(tmp_dir, "checkpoints.sqlite")
+        os.environ.setdefault("METRICS_EXPORT", "")
+
+        from benchmarks.run import install_local_store
+        install_local_store(args.corpus_size, embed_latency_s=args.embed_latency_ms / 1000.0)
+        import src.agent.graph  # noqa: F401  (compile the graph before timing, not in the first turn)
+
+        levels = []
+        for sessions in [int(n) for n in args.sessions.split(",")]:
+            print(f"🚦 {args.mode}: {sessions} sessions x {args.turns} turns (think {args.think_s}s)...")
+            levels.append(run_level(sessions, args, ollama))
+            if levels[-1]["first_error"]:
+                print(f"   ⚠️ {levels[-1]['errors']} failed turns, e.g. {levels[-1]['first_error']}")
+
+    print_levels(levels)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(levels, f, indent=2)
+
+    results = {f"load_{l['mode']}_{l['sessions']}": l["latency"] for l in levels}
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ No baseline at {args.baseline}. Run with --update-baseline first.")
+            return 1
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), tolerance=args.tolerance)
+        regressions += [f"load_{l['mode']}_{l['sessions']}: {l['errors']} failed turns" for l in levels if l["errors"]]
+        if regressions:
+            print("❌ Concurrency regressions:")
+            for r in regressions:
+                print(f"   - {r}")
+            return 1
+        print("✅ No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# PDF text pass: tokens indexed with and without excluding detected table regions.
+# Table cells are stored as TABLE/Row docs; the page text used to repeat them.
+#
+#   python -m benchmarks.pdf_tables                              # generated 20-page report
+#   python -m benchmarks.pdf_tables --pages 50 --tables_per_page 2 --rows 25
+#   python -m benchmarks.pdf_tables --input data/raw --output data/pdf_tables.json   # your own PDFs
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from benchmarks.harness import save_results
+from benchmarks.fakes import write_report_pdf
+
+def measure(paths, exclude: bool):
+    from src.config import Config
+    from src.agent.context import estimate_tokens
+    from src.features.converters.pdf_converter import PdfConverter
+    from src.features.schemas import ContentType
+    Config.PDF_EXCLUDE_TABLE_TEXT = exclude
+    converter = PdfConverter()
+    started = time.perf_counter()
+    text_tokens = table_tokens = tables = 0
+    for path in paths:
+        for doc in converter.convert(path, {"source": os.path.basename(path)}):
+            if doc.content_type == ContentType.TABLE:
+                tables += 1
+                table_tokens += estimate_tokens(doc.content)
+            else:
+                text_tokens += estimate_tokens(doc.content)
+    return {
+        "text_tokens": text_tokens,
+        "table_tokens": table_tokens,
+        "total_tokens": text_tokens + table_tokens,
+        "tables": tables,
+        "parse_s": round(time.perf_counter() - started, 2),
+    }
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--input", type=str, default=None, help="PDF file or directory (default: generated report)")
+    arg_parser.add_argument("--pages", type=int, default=20)
+    arg_parser.add_argument("--tables_per_page", type=int, default=1)
+    arg_parser.add_argument("--rows", type=int, default=20, help="Rows per generated table")
+    arg_parser.add_argument("--columns", type=int, default=6)
+    arg_parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    from src.config import Config
+    configured = Config.PDF_EXCLUDE_TABLE_TEXT
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.input:
+            if os.path.isdir(args.input):
+                paths = sorted(os.path.join(args.input, f) for f in os.listdir(args.input) if f.lower().endswith(".pdf"))
+            else:
+                paths = [args.input]
+            print(f"📄 {len(paths)} PDF(s) from {args.input}")
+        else:
+            path = os.path.join(tmp_dir, "report.pdf")
+            size = write_report_pdf(path, args.pages, args.tables_per_page, args.rows, args.columns)
+            paths = [path]
+            print(f"📄 Generated report: {args.pages} pages x {args.tables_per_page} table(s) x {args.rows} rows "
+                  f"({size / 1024:.0f} KB)")
+        try:
+            results = {"pdf_full_text": measure(paths, exclude=False),
+                       "pdf_exclude_tables": measure(paths, exclude=True)}
+        finally:
+            Config.PDF_EXCLUDE_TABLE_TEXT = configured
+
+    print(f"{'case':<24}{'text tok':>10}{'table tok':>11}{'total tok':>11}{'tables':>8}{'parse s':>9}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['text_tokens']:>10}{r['table_tokens']:>11}{r['total_tokens']:>11}{r['tables']:>8}{r['parse_s']:>9.2f}")
+    before, after = results["pdf_full_text"], results["pdf_exclude_tables"]
+    if before["total_tokens"]:
+        saved = before["total_tokens"] - after["total_tokens"]
+        print(f"   - Indexed tokens: {before['total_tokens']} -> {after['total_tokens']} "
+              f"(-{saved}, {100 * saved / before['total_tokens']:.1f}%); "
+              f"text chunks -{100 * (before['text_tokens'] - after['text_tokens']) / max(before['text_tokens'], 1):.1f}%")
+    if args.output:
+        save_results(results, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
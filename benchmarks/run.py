@@ -0,0 +1,199 @@
+# Offline micro-benchmarks for parsing, graph writes, retrieval and full agent turns.
+#
+#   python -m benchmarks.run                          # run and print p50/p95/p99
+#   python -m benchmarks.run --compare                # fail (exit 1) on regressions vs benchmarks/baseline.json
+#   python -m benchmarks.run --update-baseline        # store the current results as the new baseline
+import os
+import sys
+import argparse
+import tempfile
+from unittest.mock import patch
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from benchmarks.fakes import FakeOllamaServer, FakeEmbeddings, InMemoryNeo4jDriver
+from benchmarks.harness import measure, compare_to_baseline, load_baseline, save_results, print_table
+
+DEFAULT_BASELINE = os.path.join(current_dir, "baseline.json")
+
+def _write_sample_files(tmp_dir: str, rows: int):
+    import pandas as pd
+    df = pd.DataFrame({
+        "Region": [f"Region {i % 7}" for i in range(rows)],
+        "Year": [2020 + i % 5 for i in range(rows)],
+        "Revenue": [float(i * 13 % 997) for i in range(rows)],
+        "Manager": [f"Manager {i % 31}" for i in range(rows)],
+    })
+    csv_path = os.path.join(tmp_dir, "sample.csv")
+    xlsx_path = os.path.join(tmp_dir, "sample.xlsx")
+    df.to_csv(csv_path, index=False)
+    with pd.ExcelWriter(xlsx_path) as writer:
+        df.to_excel(writer, sheet_name="Sales", index=False)
+        df.head(rows // 2).to_excel(writer, sheet_name="Summary", index=False)
+    return csv_path, xlsx_path
+
+def bench_parse(tmp_dir: str, iterations: int, rows: int):
+    from src.features.universal_parser import UniversalParser
+    from src.features.parse_cache import ParseCache
+    parser = UniversalParser(cache=ParseCache(os.path.join(tmp_dir, "parse_cache")))
+    cache = parser.cache
+    parser.cache = None  # Cold parses
+    csv_path, xlsx_path = _write_sample_files(tmp_dir, rows)
+    results = {
+        "parse_csv": measure(lambda i: parser.parse(csv_path), iterations, units=rows),
+        "parse_excel": measure(lambda i: parser.parse(xlsx_path), max(1, iterations // 2), units=rows + rows // 2),
+    }
+    parser.cache = cache  # Warm: served from the parse cache after the first (warmup) call
+    results["parse_excel_cached"] = measure(lambda i: parser.parse(xlsx_path), iterations, units=rows + rows // 2)
+    return results
+
+def _sample_docs(n: int):
+    from src.features.schemas import IngestedDoc, ContentType, Table, Row
+    docs = []
+    for i in range(n):
+        if i % 5 == 4:
+            rows = [Row(index=r, data={"Region": f"R{r}", "Revenue": r * 10},
+                        serialized_text=f"Region: R{r}, Revenue: {r * 10}.") for r in range(20)]
+            docs.append(IngestedDoc(content=f"Table {i}", content_type=ContentType.TABLE,
+                                    metadata={"source": f"doc_{i % 10}.xlsx"},
+                                    table_data=Table(caption=f"Table {i}", markdown="| Region | Revenue |", rows=rows)))
+        else:
+            docs.append(IngestedDoc(content=f"Samsung Electronics revenue report paragraph {i}.",
+                                    content_type=ContentType.TEXT,
+                                    metadata={"source": f"doc_{i % 10}.pdf", "page": i % 30 + 1}))
+    return docs
+
+def bench_graph_writes(iterations: int):
+    from src.features.graph.connector import GraphConnector
+    from src.features.graph.neo4j_store import Neo4jGraphStore
+    from src.features.graph.sqlite_store import SqliteGraphStore
+
+    driver = InMemoryNeo4jDriver()
+    with patch("neo4j.GraphDatabase.driver", return_value=driver):
+        neo4j_connector = GraphConnector(Neo4jGraphStore())
+    sqlite_connector = GraphConnector(SqliteGraphStore(":memory:"))
+
+    docs = _sample_docs(iterations + 2)
+    concepts = ["Samsung Electronics", "Revenue", "2024"]
+    results = {}
+    for name, connector in [("neo4j", neo4j_connector), ("sqlite", sqlite_connector)]:
+        results[f"graph_write_document_{name}"] = measure(
+            lambda i: connector.ingest_document(docs[i % len(docs)], concepts), iterations)
+        results[f"graph_write_row_concepts_{name}"] = measure(
+            lambda i: connector.ingest_row_concepts(f"row-{i}", concepts), iterations)
+        connector.close()
+    return results
+
+def bench_gazetteer(iterations: int, concepts: int = 20000):
+    """
+    Known-concept tagging of a 1000-character chunk against 'concepts' names.
+    """
+    from src.features.graph.gazetteer import Gazetteer
+    gazetteer = Gazetteer()
+    gazetteer.add([f"Company {i} Holdings" for i in range(concepts // 2)] + [f"PRD-{i:05d}" for i in range(concepts // 2)])
+    gazetteer.match("")  # Build the automaton outside the timed loop
+    text = ("Revenue of Company 1234 Holdings rose while PRD-00042 shipped to Seoul and Busan. " * 13)[:1000]
+    return {"gazetteer_scan_1k_chars": measure(lambda i: gazetteer.scan(text), iterations)}
+
+def install_local_store(corpus_size: int, embed_latency_s: float = 0.0):
+    """
+    In-memory SQLite store with 'corpus_size' embedded chunks, installed as the agent's
+    search backend (with the matching fake embedder).
+    """
+    from src.agent import tools
+    from src.features.schemas import IngestedDoc, ContentType
+    from src.features.graph.sqlite_store import SqliteGraphStore
+
+    embedder = FakeEmbeddings(dim=256)
+    store = SqliteGraphStore(":memory:")
+    docs = [
+        IngestedDoc(content=f"Chunk {i}: Region {i % 7} revenue for {2020 + i % 5} was {i * 13 % 997} million.",
+                    content_type=ContentType.TEXT, metadata={"source": f"doc_{i % 20}.pdf"})
+        for i in range(corpus_size)
+    ]
+    for doc in docs:
+        store.ingest_document(doc, [])
+    vectors = embedder.embed_documents([d.content for d in docs])
+    store.set_chunk_embeddings([(d.id, v) for d, v in zip(docs, vectors)])
+    embedder.latency_s = embed_latency_s
+    tools.set_graph_store(store, embeddings=embedder)
+    return store
+
+def bench_retrieval(iterations: int, corpus_size: int):
+    from src.agent import tools
+    install_local_store(corpus_size)
+
+    queries = [f"Region {i % 7} revenue {2020 + i % 5}" for i in range(iterations)]
+    return {
+        "retrieval_tool": measure(lambda i: tools.retrieval_tool.invoke({"query": queries[i % len(queries)]}), iterations),
+        # Planner fan-out: 5 sub-queries, one batched embedding call, parallel searches
+        "retrieval_multi_query_5": measure(lambda i: tools.search_many(queries[i % len(queries):][:5]), iterations),
+        # Scoped to one of the 20 documents: filter pushed down before the vector scan
+        "retrieval_filtered_doc": measure(
+            lambda i: tools.search_passages(queries[i % len(queries)], filters={"source": [f"doc_{i % 20}.pdf"]}), iterations),
+    }
+
+def bench_agent_turns(iterations: int):
+    from src.agent.graph import get_graph_app
+    from src.agent.memory import ConversationMemory
+    from src.agent.checkpoint import thread_config, turn_input, new_thread_id
+
+    def run_turn(i):
+        state = turn_input(f"What was the revenue of Region {i % 7}?", ConversationMemory())
+        get_graph_app().invoke(state, config=thread_config(new_thread_id(), recursion_limit=10))
+
+    return {"graph_app_turn": measure(run_turn, iterations)}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--iterations", type=int, default=50)
+    arg_parser.add_argument("--rows", type=int, default=500, help="Rows in the generated CSV/Excel files")
+    arg_parser.add_argument("--corpus_size", type=int, default=2000, help="Chunks in the local vector store")
+    arg_parser.add_argument("--llm_latency_ms", type=float, default=5.0, help="Fake Ollama latency per call")
+    arg_parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    arg_parser.add_argument("--compare", action="store_true", help="Exit 1 if slower than baseline by more than --tolerance")
+    arg_parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown fraction (0.5 = +50%%)")
+    arg_parser.add_argument("--update-baseline", action="store_true")
+    arg_parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    with FakeOllamaServer(latency_s=args.llm_latency_ms / 1000.0) as ollama, tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before src.config is imported
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+        os.environ["CHECKPOINT_BACKEND"] = "memory"
+
+        results = {}
+        results.update(bench_parse(tmp_dir, args.iterations, args.rows))
+        results.update(bench_graph_writes(args.iterations * 10))
+        results.update(bench_gazetteer(args.iterations * 4))
+        # Also installs the local SQLite store used by the agent turns below
+        results.update(bench_retrieval(args.iterations * 4, args.corpus_size))
+        results.update(bench_agent_turns(args.iterations))
+
+    print_table(results)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ No baseline at {args.baseline}. Run with --update-baseline first.")
+            return 1
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print("❌ Performance regressions:")
+            for r in regressions:
+                print(f"   - {r}")
+            return 1
+        print("✅ No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
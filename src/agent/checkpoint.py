@@ -0,0 +1,86 @@
+import os
+import uuid
+import sqlite3
+from typing import Dict, Any, Optional
+from src.config import Config
+from src.agent.memory import ConversationMemory, create_session_memory
+
+def create_checkpointer(backend: str = None, path: str = None):
+    """
+    Builds the LangGraph checkpointer used by the agent graph (get_graph_app).
+    - "sqlite": file-backed, shared by every worker process on the host (WAL mode)
+    - "memory": in-process only (tests, single worker)
+    - "none":   no persistence
+    """
+    backend = (backend or Config.CHECKPOINT_BACKEND).lower()
+    if backend == "none":
+        return None
+
+    if backend == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+
+    if backend == "sqlite":
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        path = path or Config.CHECKPOINT_DB_PATH
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # One connection per process; SqliteSaver serializes access with its own lock.
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL lets several Chainlit workers read while one writes; NORMAL sync is safe with WAL
+        # and avoids an fsync per checkpoint.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        saver = SqliteSaver(conn)
+        saver.setup()
+        return saver
+
+    raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+
+def new_thread_id() -> str:
+    return str(uuid.uuid4())
+
+def thread_config(thread_id: str, **config) -> Dict[str, Any]:
+    """
+    RunnableConfig for one conversation thread. Any worker holding the same
+    thread_id resumes the same checkpointed state.
+    """
+    configurable = {**config.pop("configurable", {}), "thread_id": thread_id}
+    return {**config, "configurable": configurable}
+
+def turn_input(question: str, memory: ConversationMemory) -> Dict[str, Any]:
+    """
+    Graph input for a new chat turn on a checkpointed thread.
+    Per-turn keys are reset so the previous turn's context is not reused by the router.
+    """
+    return {
+        "input": question,
+        "chat_history": memory.as_messages(),
+        "memory": memory.to_dict(),
+        "context": [],
+        "passages": [],
+        "answer": "",
+        "current_decision": None,
+    }
+
+def restore_session_memory(app, thread_id: str) -> ConversationMemory:
+    """
+    Rebuilds a session's ConversationMemory from the latest checkpoint of its thread.
+    The checkpoint holds the memory as it was before the last turn plus that turn's
+    input/answer, so the last turn is replayed on top.
+    """
+    memory = create_session_memory()
+    if getattr(app, "checkpointer", None) is None:
+        return memory
+
+    snapshot = app.get_state(thread_config(thread_id))
+    values = snapshot.values if snapshot else {}
+    if not values:
+        return memory
+
+    memory = ConversationMemory.from_dict(values.get("memory"), summarizer=memory.summarizer)
+    if values.get("input") and values.get("answer"):
+        memory.add_turn(values["input"], values["answer"])
+    return memory
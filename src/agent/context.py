@@ -0,0 +1,146 @@
+import re
+import hashlib
+from typing import List, Dict, Any, Optional
+from src.config import Config
+
+# Matches the "Source i:" headers written by retrieval_tool
+_SOURCE_HEADER = re.compile(r"^Source \d+:\s*$", re.MULTILINE)
+# Sentence boundaries for English and Korean text (period/question/exclamation or line breaks)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+_WORD = re.compile(r"[0-9A-Za-z가-힣]+")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate without loading a tokenizer.
+    ~4 UTF-8 bytes per token holds reasonably for English and Korean with Llama 3 vocabularies.
+    """
+    if not text:
+        return 0
+    return max(1, len(text.encode("utf-8")) // 4)
+
+def split_context_blocks(context_list: List[str]) -> List[Dict[str, Any]]:
+    """
+    Recovers individual passages from formatted retrieval_tool output.
+    Used when only the joined context strings are available (no scores).
+    """
+    passages = []
+    for block in context_list:
+        parts = [p.strip() for p in _SOURCE_HEADER.split(block) if p.strip()]
+        for part in parts:
+            passages.append({"text": part, "score": None})
+    return passages
+
+class ContextAssembler:
+    """
+    Builds the Context section of the answer prompt.
+    - Deduplicates passages (normalized text hash)
+    - Orders by retrieval score
+    - Optionally keeps only query-relevant sentences (extractive compression)
+    - Enforces a token budget derived from the model's context window
+    """
+    def __init__(self,
+                 context_window: int = None,
+                 reserved_tokens: int = None,
+                 compress: bool = None,
+                 min_sentence_overlap: int = 1):
+        self.context_window = context_window or Config.LLM_CONTEXT_WINDOW
+        self.reserved_tokens = reserved_tokens if reserved_tokens is not None else Config.ANSWER_TOKEN_RESERVE
+        self.compress = Config.CONTEXT_COMPRESSION if compress is None else compress
+        self.min_sentence_overlap = min_sentence_overlap
+
+    def budget_for(self, prompt_overhead: str = "") -> int:
+        """
+        Tokens available for context after the prompt template and the answer reserve.
+        """
+        return max(0, self.context_window - self.reserved_tokens - estimate_tokens(prompt_overhead))
+
+    def assemble(self, passages: List[Dict[str, Any]], query: str, budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns {"text", "tokens", "passages_in", "passages_used", "dropped"}.
+        """
+        if budget is None:
+            budget = self.budget_for()
+
+        unique = self._deduplicate(passages)
+        # Stable sort: passages without a score keep their original (retrieval) order
+        ordered = sorted(
+            enumerate(unique),
+            key=lambda pair: (pair[1].get("score") is None, -(pair[1].get("score") or 0.0), pair[0])
+        )
+
+        query_terms = self._terms(query)
+        blocks = []
+        used_tokens = 0
+        for _, passage in ordered:
+            text = passage["text"]
+            if self.compress and query_terms:
+                text = self._extract_relevant(text, query_terms)
+                if not text:
+                    continue
+
+            block = f"Source {len(blocks) + 1}:\n{text}"
+            block_tokens = estimate_tokens(block)
+            if used_tokens + block_tokens > budget:
+                # Try to fit a truncated tail of the budget instead of dropping everything after
+                remaining = budget - used_tokens
+                if remaining < 32:
+                    break
+                block = self._truncate(block, remaining)
+                block_tokens = estimate_tokens(block)
+            blocks.append(block)
+            used_tokens += block_tokens
+
+        return {
+            "text": "\n\n".join(blocks),
+            "tokens": used_tokens,
+            "passages_in": len(passages),
+            "passages_used": len(blocks),
+            "dropped": len(unique) - len(blocks),
+        }
+
+    def _deduplicate(self, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        best: Dict[str, Dict[str, Any]] = {}
+        order: List[str] = []
+        for p in passages:
+            text = (p.get("text") or "").strip()
+            if not text:
+                continue
+            key = hashlib.sha1(" ".join(text.split()).lower().encode("utf-8")).hexdigest()
+            if key not in best:
+                best[key] = {**p, "text": text}
+                order.append(key)
+            elif (p.get("score") or 0.0) > (best[key].get("score") or 0.0):
+                best[key] = {**p, "text": text}
+        return [best[k] for k in order]
+
+    def _terms(self, text: str) -> set:
+        return {w.lower() for w in _WORD.findall(text or "") if len(w) > 1}
+
+    def _extract_relevant(self, text: str, query_terms: set) -> str:
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+        kept = []
+        for s in sentences:
+            s_terms = self._terms(s)
+            # Substring match lets Korean stems hit inflected forms (e.g. "매출" in "매출액은")
+            overlap = sum(1 for q in query_terms if q in s_terms or any(q in t for t in s_terms))
+            if overlap >= self.min_sentence_overlap:
+                kept.append(s)
+        return " ".join(kept)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        encoded = text.encode("utf-8")[: max_tokens * 4 - 4]  # Leave room for the ellipsis
+        return encoded.decode("utf-8", errors="ignore").rstrip() + " ..."
+
+def prompt_stats(response, estimated_tokens: int, elapsed_s: float) -> Dict[str, Any]:
+    """
+    Collects prompt size and prefill latency for one LLM call.
+    Ollama reports prompt_eval_count / prompt_eval_duration (ns) in response_metadata.
+    """
+    meta = getattr(response, "response_metadata", None) or {}
+    prefill_ns = meta.get("prompt_eval_duration")
+    return {
+        "prompt_tokens": meta.get("prompt_eval_count", estimated_tokens),
+        "estimated_prompt_tokens": estimated_tokens,
+        "prefill_ms": round(prefill_ns / 1e6, 1) if prefill_ns else None,
+        "total_ms": round(elapsed_s * 1000, 1),
+    }
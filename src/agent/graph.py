@@ -1,20 +1,29 @@
-import json
+import time
+import logging
+import threading
 from langgraph.graph import StateGraph, END
-from langchain_ollama import ChatOllama
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 
 from src.config import Config
 from src.agent.state import AgentState
-from src.agent.tools import retrieval_tool
-
-# 1. Initialize Model
-llm = ChatOllama(
-    base_url=Config.OLLAMA_BASE_URL,
-    model=Config.LLM_MODEL_NAME,
-    temperature=0,
-    format="json"
-)
+from src.agent.tools import search_passages, search_many, format_passages, query_tables, get_table_engine
+from src.agent.memory import format_history
+from src.agent.checkpoint import create_checkpointer
+from src.features.graph.filters import normalize_filters
+from src.features.llm_router import invoke_json
+from src.agent.context import ContextAssembler, split_context_blocks, estimate_tokens, prompt_stats
+from src.telemetry.metrics import span, registry, COUNT_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# 1. Models are routed per task (Config.LLM_MODEL_PLANNER / _SQL / _ANSWER, see llm_router.py)
+context_assembler = ContextAssembler()
+
+def _valid_plan(data) -> bool:
+    # Missing query falls back to the user input; an empty or non-string one is a bad plan
+    query = data.get("query")
+    return query is None or (isinstance(query, str) and bool(query.strip()))
 
 # 2. Define Nodes
 
@@ -23,13 +32,9 @@ def oracle_node(state: AgentState, config: RunnableConfig):
     Decides whether to search (using retrieval_tool) or answer directly.
     Updated to work with Vector Search (Keyword/Query based).
     """
-    # 1. Prepare Chat History
+    # 1. Prepare Chat History (bounded by ConversationMemory in the chat app)
     chat_history = state.get("chat_history", [])
-    if not chat_history:
-        # If history is empty in state, wrap input as HumanMessage
-        # But usually 'chat_history' should be passed correctly.
-        # If called with just {input: ...}, we treat it as single turn.
-        pass
+    history_text = format_history(chat_history)
 
     # 2. Check Context (Is this a follow-up or initial lookup?)
     context_list = state.get("context", [])
@@ -40,53 +45,94 @@ def oracle_node(state: AgentState, config: RunnableConfig):
     # --- Router Logic ---
     if not context_text.strip():
         # Case A: No Context -> Force Search
-        print(f"DEBUG: No context. Deciding to SEARCH for: {user_input}")
+        logger.debug(f"No context. Deciding to SEARCH for: {user_input}")
+        
+        history_section = ""
+        if history_text:
+            history_section = f"""
+        Conversation so far:
+        {history_text}
+        
+        If the question is a follow-up (e.g. uses "it", "that", "그럼", "작년은?"), rewrite it into a
+        standalone search query using the conversation above.
+        """
         
+        table_section = ""
+        if get_table_engine() is not None:
+            table_section = """
+        If the question needs a calculation or filter over tabular data (total, average, count,
+        largest/smallest, "by region/year"), return { "action": "table_query", "query": "standalone question" } instead.
+        """
+        filter_section = ""
+        if Config.SEARCH_FILTERS:
+            filter_section = """
+        If the question is limited to a specific document, file type or period (e.g. "in the 2024 HR handbook",
+        "엑셀 파일에서", "reports since 2023"), add "filters" with only the parts that apply:
+        { "document": "document name words", "type": "pdf|excel|csv|hwp|text", "date_from": "YYYY-MM-DD", "date_to": "YYYY-MM-DD" }
+        """
         system_prompt = f"""
         You are a Search Planner. The user asked: "{user_input}"
         You have NO context info. You MUST output a JSON command to search for relevant documents.
-        
+        {history_section}
         Extract the best search query from the user's question.
-        
-        Return JSON: {{ "action": "search", "query": "extracted search terms" }}
+        If the question compares several things or has several parts (e.g. "A vs B", "2023 and 2024"),
+        also list one focused query per part in "queries" (at most {Config.MAX_SUB_QUERIES}).
+        {filter_section}{table_section}
+        Return JSON: {{ "action": "search", "query": "extracted search terms", "queries": ["optional sub-query", ...] }}
         """
         
         try:
-            response = llm.invoke(system_prompt)
-            data = json.loads(response.content)
+            # A small planner model falls back to LLM_MODEL_NAME when it returns no usable query
+            data, _ = invoke_json("planner", system_prompt, validate=_valid_plan)
             
             # Robust extraction of query
             query = data.get("query", user_input) # Fallback to full input
             
             decision = {
-                "action": "search",
+                "action": "table_query" if table_section and data.get("action") == "table_query" else "search",
                 "query": query
             }
+            sub_queries = data.get("queries")
+            if isinstance(sub_queries, list) and len(sub_queries) > 1:
+                decision["queries"] = [str(q) for q in sub_queries if q][:Config.MAX_SUB_QUERIES]
+            filters = normalize_filters(data.get("filters")) if Config.SEARCH_FILTERS else None
+            if filters:
+                decision["filters"] = filters
         except Exception as e:
             # Fallback: Search using the original input
-            print(f"DEBUG: Oracle parse error ({e}). Fallback to input search.")
+            logger.debug(f"Oracle parse error ({e}). Fallback to input search.")
             decision = {"action": "search", "query": user_input}
 
     else:
         # Case B: Context Exists -> Force Answer
-        print("DEBUG: Context found. Deciding to ANSWER.")
+        logger.debug("Context found. Deciding to ANSWER.")
         
-        system_prompt = f"""
+        # Scored passages from tool_node; fall back to splitting the raw context strings
+        passages = state.get("passages") or split_context_blocks(context_list)
+
+        prompt_template = """
         You are a Helpful Assistant.
         Answer the question using ONLY the provided Context.
         If the context doesn't contain the answer, say "I couldn't find relevant information."
-        
+        {history}
         Context:
-        {context_text}
+        {context}
         
-        User Question: {user_input}
+        User Question: {question}
         
         Return JSON: {{ "action": "answer", "response": "Your answer here..." }}
         """
+        history_section = f"\n        Conversation so far:\n        {history_text}\n" if history_text else ""
+        budget = context_assembler.budget_for(prompt_template + history_section + user_input)
+        assembled = context_assembler.assemble(passages, user_input, budget=budget)
+        system_prompt = prompt_template.format(history=history_section, context=assembled["text"], question=user_input)
         
+        stats = {"context_tokens": assembled["tokens"], "passages_used": assembled["passages_used"],
+                 "passages_dropped": assembled["dropped"]}
         try:
-            response = llm.invoke(system_prompt)
-            data = json.loads(response.content)
+            started = time.perf_counter()
+            data, response = invoke_json("answer", system_prompt, validate=lambda d: isinstance(d.get("response", ""), str))
+            stats.update(prompt_stats(response, estimate_tokens(system_prompt), time.perf_counter() - started))
             decision = {
                 "action": "answer",
                 "response": data.get("response", "No answer generated.")
@@ -94,6 +140,12 @@ def oracle_node(state: AgentState, config: RunnableConfig):
         except Exception as e:
             decision = {"action": "answer", "response": "Error generating answer."}
 
+        registry.observe("answer_prompt_tokens", stats.get("prompt_tokens", stats["context_tokens"]), buckets=COUNT_BUCKETS)
+        if stats.get("prefill_ms") is not None:
+            registry.observe("answer_prefill_ms", stats["prefill_ms"])
+        logger.debug(f"Answer prompt stats: {stats}")
+        return {"current_decision": decision, "answer": decision["response"], "prompt_stats": stats}
+
     # Store decision in state (AgentState needs 'current_decision' if we want to pass it explicitly, 
     # but strictly AgentState definition in state.py needs checking. 
     # For now, we update 'current_decision' key. 
@@ -118,13 +170,37 @@ def tool_node(state: AgentState, config: RunnableConfig):
     if not query:
         query = state.get("input", "")
         
-    print(f"DEBUG: Executing Vector Search for query: '{query}'")
-    
-    # Execute Tool
-    search_result = retrieval_tool.invoke({"query": query})
+    passages = []
+    if decision.get("action") == "table_query":
+        # Aggregate/filter question: answer from a validated SQL result instead of table markdown
+        try:
+            with span("table_query"):
+                result = query_tables(query)
+            passages = [result] if result else []
+        except Exception as e:
+            logger.warning(f"Table query failed ({e}).")
+
+    if not passages:
+        queries = decision.get("queries") or [query]
+        filters = decision.get("filters")
+        logger.debug(f"Executing Vector Search for queries: {queries} (filters: {filters})")
+        try:
+            # Sub-queries: batched embedding + parallel searches, merged by score
+            passages = search_many(queries, filters=filters) if len(queries) > 1 else search_passages(query, filters=filters)
+            if filters and not passages:
+                # The planner's scope matched nothing (unknown document, undated files): search everything
+                registry.inc("search_filter_fallback")
+                passages = search_many(queries) if len(queries) > 1 else search_passages(query)
+        except Exception as e:
+            logger.warning(f"Vector search failed ({e}).")
+            passages = []
+    search_result = format_passages(passages) if passages else "No relevant documents found."
     
-    # Return context update
-    return {"context": [search_result]}
+    # Return context update (passages accumulate across loops; ContextAssembler deduplicates them)
+    return {
+        "context": [search_result],
+        "passages": state.get("passages", []) + passages
+    }
 
 # 3. Build Graph
 workflow = StateGraph(AgentState) # Use standard AgentState
@@ -136,7 +212,7 @@ workflow.set_entry_point("oracle")
 
 def router(state: AgentState):
     decision = state.get("current_decision", {})
-    if decision.get("action") == "search":
+    if decision.get("action") in ("search", "table_query"):
         return "tool_executor"
     else:
         return END
@@ -148,5 +224,17 @@ workflow.add_conditional_edges(
 
 workflow.add_edge("tool_executor", "oracle")
 
-# Compile
-graph_app = workflow.compile()
+# Compiled on first use (checkpointed per thread_id so any worker process can resume a conversation).
+# Not at import: the sqlite checkpointer creates its file and opens a connection.
+_graph_app = None
+_graph_app_lock = threading.Lock()
+
+def get_graph_app():
+    """
+    Returns the compiled agent graph with the configured checkpointer (Config.CHECKPOINT_BACKEND).
+    """
+    global _graph_app
+    with _graph_app_lock:
+        if _graph_app is None:
+            _graph_app = workflow.compile(checkpointer=create_checkpointer())
+    return _graph_app
@@ -0,0 +1,222 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Callable, Optional
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, AIMessage
+from src.config import Config
+from src.agent.context import estimate_tokens
+
+Turn = Tuple[str, str]  # (user question, assistant answer)
+Summarizer = Callable[[str, List[Turn], int], str]
+
+# Shared by all sessions: summaries are computed off the request path
+_summary_executor = ThreadPoolExecutor(max_workers=Config.MEMORY_SUMMARY_WORKERS, thread_name_prefix="memory-summary")
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    text = " ".join((text or "").split())
+    for sep in [". ", "? ", "! ", "다. "]:
+        idx = text.find(sep)
+        if 0 < idx < max_chars:
+            return text[: idx + len(sep)].strip()
+    return text[:max_chars]
+
+def _trim_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    encoded = text.encode("utf-8")
+    limit = max_tokens * 4
+    if len(encoded) <= limit:
+        return text
+    part = encoded[-limit:] if keep_tail else encoded[:limit]
+    return part.decode("utf-8", errors="ignore").strip()
+
+def extractive_summarizer(summary: str, turns: List[Turn], max_tokens: int) -> str:
+    """
+    Default summarizer: keeps the first sentence of each question/answer.
+    Oldest information is dropped first once the summary budget is full.
+    """
+    lines = [summary] if summary else []
+    for user, assistant in turns:
+        lines.append(f"User asked: {_first_sentence(user)} Assistant: {_first_sentence(assistant)}")
+    return _trim_to_tokens("\n".join(lines), max_tokens, keep_tail=True)
+
+def make_llm_summarizer(llm) -> Summarizer:
+    """
+    Summarizer backed by a chat model (plain text output, not JSON mode).
+    Falls back to the extractive summary if the LLM call fails.
+    """
+    def summarize(summary: str, turns: List[Turn], max_tokens: int) -> str:
+        transcript = "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+        prompt = f"""
+        Update the running summary of a conversation with the new turns below.
+        Keep names, numbers, dates and the topics the user is asking about. Be concise (max {max_tokens} tokens).
+
+        Current summary:
+        {summary or "(empty)"}
+
+        New turns:
+        {transcript}
+
+        Updated summary:
+        """
+        try:
+            response = llm.invoke(prompt)
+            return _trim_to_tokens(response.content.strip(), max_tokens, keep_tail=True)
+        except Exception as e:
+            print(f"⚠️ Memory summarization failed ({e}). Using extractive summary.")
+            return extractive_summarizer(summary, turns, max_tokens)
+    return summarize
+
+def format_history(messages: List[BaseMessage]) -> str:
+    """
+    Renders chat_history messages for prompts.
+    """
+    lines = []
+    for m in messages:
+        if isinstance(m, SystemMessage):
+            lines.append(f"(Earlier conversation summary) {m.content}")
+        elif isinstance(m, HumanMessage):
+            lines.append(f"User: {m.content}")
+        elif isinstance(m, AIMessage):
+            lines.append(f"Assistant: {m.content}")
+    return "\n".join(lines)
+
+class ConversationMemory:
+    """
+    Bounded rolling memory for one chat session.
+    - The most recent turns are kept verbatim.
+    - Older turns are folded into a running summary by a background worker.
+    - Everything returned by as_messages() fits in max_tokens.
+    """
+    def __init__(self,
+                 max_tokens: int = None,
+                 recent_turns: int = None,
+                 summarizer: Optional[Summarizer] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.max_tokens = max_tokens or Config.MEMORY_MAX_TOKENS
+        self.recent_turns = recent_turns or Config.MEMORY_RECENT_TURNS
+        self.summary_budget = self.max_tokens // 4
+        self.summarizer = summarizer or extractive_summarizer
+        self.executor = executor or _summary_executor
+
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self._pending: List[Turn] = []  # Evicted from 'turns', not yet folded into the summary
+        self._future = None
+        self._lock = threading.Lock()
+
+    def add_turn(self, user: str, assistant: str):
+        with self._lock:
+            self.turns.append((user, assistant))
+            while self.turns and (len(self.turns) > self.recent_turns or self._recent_tokens() > self._recent_budget()):
+                if len(self.turns) == 1:
+                    # A single oversized turn is kept, but truncated to the recent budget
+                    u, a = self.turns[0]
+                    half = self._recent_budget() // 2
+                    self.turns[0] = (_trim_to_tokens(u, half), _trim_to_tokens(a, half))
+                    break
+                self._pending.append(self.turns.pop(0))
+        self._schedule_summary()
+
+    def _recent_budget(self) -> int:
+        return self.max_tokens - self.summary_budget
+
+    def _recent_tokens(self) -> int:
+        return sum(estimate_tokens(u) + estimate_tokens(a) for u, a in self.turns)
+
+    def _schedule_summary(self):
+        with self._lock:
+            if not self._pending or (self._future and not self._future.done()):
+                return
+            batch = list(self._pending)
+            summary = self.summary
+            self._future = self.executor.submit(self._summarize, summary, batch)
+
+    def _summarize(self, summary: str, batch: List[Turn]):
+        new_summary = self.summarizer(summary, batch, self.summary_budget)
+        with self._lock:
+            self.summary = new_summary
+            del self._pending[: len(batch)]
+            self._future = None
+        # Turns evicted while we were summarizing
+        self._schedule_summary()
+
+    def wait(self, timeout: float = None):
+        """
+        Blocks until pending summarization is done (tests / shutdown).
+        """
+        while True:
+            future = self._future
+            if future is None:
+                if not self._pending:
+                    return
+                self._schedule_summary()
+                continue
+            future.result(timeout=timeout)
+            if future is self._future:
+                return
+
+    def as_messages(self) -> List[BaseMessage]:
+        """
+        Bounded chat_history for the agent: [summary] + compact pending turns + recent turns.
+        """
+        with self._lock:
+            messages: List[BaseMessage] = []
+            summary = self.summary
+            if self._pending:
+                # Summary not ready yet: keep a cheap extractive view of the evicted turns meanwhile
+                summary = extractive_summarizer(summary, self._pending, self.summary_budget)
+            if summary:
+                messages.append(SystemMessage(content=summary))
+            for user, assistant in self.turns:
+                messages.append(HumanMessage(content=user))
+                messages.append(AIMessage(content=assistant))
+            return messages
+
+    def token_count(self) -> int:
+        return sum(estimate_tokens(m.content) for m in self.as_messages())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recent_tokens = self._recent_tokens()
+            summary_tokens = estimate_tokens(self.summary)
+            pending = len(self._pending)
+            turns = len(self.turns)
+        return {
+            "turns": turns,
+            "pending_turns": pending,
+            "summary_tokens": summary_tokens,
+            "recent_tokens": recent_tokens,
+            "total_tokens": summary_tokens + recent_tokens,
+            "max_tokens": self.max_tokens,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "summary": self.summary,
+                "turns": [list(t) for t in self.turns],
+                "pending": [list(t) for t in self._pending],
+            }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], **kwargs) -> "ConversationMemory":
+        memory = cls(**kwargs)
+        if data:
+            memory.summary = data.get("summary", "")
+            memory.turns = [tuple(t) for t in data.get("turns", [])]
+            memory._pending = [tuple(t) for t in data.get("pending", [])]
+            memory._schedule_summary()
+        return memory
+
+_summary_llm = None
+
+def create_session_memory() -> ConversationMemory:
+    """
+    Builds a ConversationMemory using the summarizer selected in Config.MEMORY_SUMMARIZER.
+    """
+    global _summary_llm
+    summarizer = None
+    if Config.MEMORY_SUMMARIZER == "llm":
+        if _summary_llm is None:
+            from src.features.llm_router import get_llm
+            _summary_llm = get_llm("summary", json_mode=False)
+        summarizer = make_llm_summarizer(_summary_llm)
+    return ConversationMemory(summarizer=summarizer)
@@ -8,5 +8,8 @@ class AgentState(TypedDict):
     input: str
     chat_history: List[BaseMessage]
     context: List[str]  # List of retrieved context strings
+    passages: List[Dict[str, Any]]  # Scored passages behind 'context' (id, text, score, metadata)
     answer: str
     current_decision: Optional[Dict[str, Any]] # To store Router's JSON output
+    memory: Dict[str, Any]  # ConversationMemory snapshot (persisted by the checkpointer)
+    prompt_stats: Dict[str, Any]  # Prompt tokens / prefill latency of the answer call
@@ -1,58 +1,330 @@
-from typing import List
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from langchain_core.tools import tool
-from langchain_community.vectorstores import Neo4jVector
-from langchain_huggingface import HuggingFaceEmbeddings
 from src.config import Config
+from src.features.graph.store import create_graph_store
+from src.features.graph.filters import normalize_filters, resolve_sources
+from src.features.llm_router import invoke_json
+from src.telemetry.metrics import span, registry
 
-# Initialize Embeddings (Local BGE-M3)
-embeddings = HuggingFaceEmbeddings(
-    model_name=Config.EMBEDDING_MODEL_NAME,
-    model_kwargs={'device': 'cpu'}, # Force CPU for safety, or check availability
-    encode_kwargs={'normalize_embeddings': True}
-)
-
-# Initialize Neo4jVector from existing graph (Chunk nodes)
-# This will create a vector index if it doesn't exist.
-try:
-    vector_store = Neo4jVector.from_existing_graph(
-        embedding=embeddings,
-        url=Config.NEO4J_URI,
-        username=Config.NEO4J_USERNAME,
-        password=Config.NEO4J_PASSWORD,
-        index_name="vector_index",      # Name of the vector index in Neo4j
-        node_label="Chunk",             # Nodes to search over
-        text_node_properties=["text"],  # Property containing the text
-        embedding_node_property="embedding", # Property to store/retrieve embedding
-    )
-    print("✅ Neo4jVector initialized successfully.")
-except Exception as e:
-    print(f"⚠️ Failed to initialize Neo4jVector: {e}")
-    vector_store = None
+logger = logging.getLogger(__name__)
+
+# Embeddings and the graph store are created on first use, so importing the agent
+# (tests, benchmarks, Chainlit worker start) does not load BGE-M3 or open a database connection.
+_embeddings = None
+_graph_store = None
+_table_engine = None
+_table_engine_version = None   # (Table, Row) counts the engine was built from
+_table_engine_checked = 0.0    # time.monotonic() of the last version check
+_table_engine_loading = False  # A background build/check is running
+_table_engine_lock = threading.Lock()
+_search_pool = None
+_init_lock = threading.Lock()
+
+def get_embeddings():
+    """
+    Returns the shared local embedding model (BGE-M3).
+    """
+    global _embeddings
+    with _init_lock:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _embeddings = HuggingFaceEmbeddings(
+                model_name=Config.EMBEDDING_MODEL_NAME,
+                model_kwargs={'device': 'cpu'}, # Force CPU for safety, or check availability
+                encode_kwargs={'normalize_embeddings': True}
+            )
+    return _embeddings
+
+def get_graph_store():
+    """
+    Returns the storage backend used for search (Config.STORAGE_BACKEND), or None if unavailable.
+    """
+    global _graph_store
+    with _init_lock:
+        if _graph_store is None:
+            try:
+                _graph_store = create_graph_store()
+                print(f"✅ Graph store initialized ({Config.STORAGE_BACKEND}).")
+            except Exception as e:
+                print(f"⚠️ Failed to initialize graph store: {e}")
+                return None
+    return _graph_store
+
+def set_graph_store(store, embeddings=None):
+    """
+    Replaces the search backend (and optionally the embedder), e.g. with a local
+    SQLite store for benchmarks and offline tests.
+    """
+    global _graph_store, _embeddings, _table_engine, _table_engine_version, _table_engine_checked
+    with _init_lock:
+        _graph_store = store
+        _table_engine, _table_engine_version, _table_engine_checked = None, None, 0.0  # Rebuilt from the new store
+        if embeddings is not None:
+            _embeddings = embeddings
+
+def rank_by_graph(passages: List[Dict[str, Any]], weight: float = None) -> List[Dict[str, Any]]:
+    """
+    Re-sorts passages by similarity + weight * node centrality. Centrality is a stored
+    node property (see compute_graph_rank.py) returned with the search hit, so this
+    costs no extra query; nodes not yet ranked count as 0.
+    """
+    weight = Config.GRAPH_RANK_WEIGHT if weight is None else weight
+    if not weight:
+        return passages
+    for passage in passages:
+        passage["score"] += weight * (passage["metadata"].get("centrality") or 0.0)
+    return sorted(passages, key=lambda p: p["score"], reverse=True)
+
+def resolve_filters(store, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Normalizes a filter dict (see filters.py) and resolves document names to
+    Document ids, so the store can push the filter down before the vector scan.
+    A document name that matches nothing leaves source = [] (no results).
+    """
+    filters = normalize_filters(filters)
+    if filters and "source" in filters:
+        filters["source"] = resolve_sources(filters["source"], store.list_documents())
+    return filters
+
+def _search(store, embedding: List[float], k: int, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    with span("vector_search", backend=store.name, filtered="true" if filters else "false"):
+        hits = store.similarity_search(embedding, k=max(k, Config.RETRIEVAL_CANDIDATES), labels=Config.SEARCH_LABELS,
+                                       filters=filters)
+    return rank_by_graph(hits)[:k]
+
+def search_passages(query: str, k: int = None, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    Vector search returning scored passages: [{"id", "text", "score", "metadata"}].
+    'filters' scopes the search: {"source": [...], "type": [...], "date_from", "date_to", "sheet_name": [...]}.
+    """
+    k = k or Config.RETRIEVAL_TOP_K
+    store = get_graph_store()
+    if not store:
+        return []
+
+    filters = resolve_filters(store, filters)
+    if filters and filters.get("source") == []:
+        return []  # Unknown document: nothing to search
+    with span("embedding", kind="query"):
+        embedding = get_embeddings().embed_query(query)
+    return _search(store, embedding, k, filters)
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    with _init_lock:
+        if _search_pool is None:
+            _search_pool = ThreadPoolExecutor(max_workers=Config.SEARCH_CONCURRENCY, thread_name_prefix="search")
+    return _search_pool
+
+def search_many(queries: List[str], k: int = None, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    Fan-out search for planner sub-queries: one batched embedding call, the index
+    searches in parallel, then passages deduplicated by id (best score kept) and
+    merged by score. Each passage lists the sub-queries that retrieved it in
+    metadata["queries"]. 'filters' applies to every sub-query.
+    """
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))[:Config.MAX_SUB_QUERIES]
+    if len(queries) <= 1:
+        return search_passages(queries[0], k, filters) if queries else []
+    k = k or Config.RETRIEVAL_TOP_K
+    store = get_graph_store()
+    if not store:
+        return []
+
+    filters = resolve_filters(store, filters)
+    if filters and filters.get("source") == []:
+        return []
+    with span("embedding", kind="query"):
+        embeddings = get_embeddings().embed_documents(queries)  # One forward pass for all sub-queries
+    registry.observe("embedding_batch_size", len(queries), buckets=(1, 4, 16, 32, 64, 128, 256, 512))
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    for query, hits in zip(queries, _get_search_pool().map(lambda e: _search(store, e, k, filters), embeddings)):
+        for hit in hits:
+            best = merged.get(hit["id"])
+            if best is None or hit["score"] > best["score"]:
+                matched = best["metadata"]["queries"] if best else []
+                best = {**hit, "metadata": {**hit["metadata"], "queries": matched}}
+                merged[hit["id"]] = best
+            best["metadata"]["queries"].append(query)
+    return sorted(merged.values(), key=lambda p: p["score"], reverse=True)
+
+def format_passages(passages: List[Dict[str, Any]]) -> str:
+    """
+    Formats passages as "Source i:" blocks (the context format used in prompts).
+    """
+    context_str = ""
+    for i, passage in enumerate(passages, 1):
+        context_str += f"Source {i}:\n{passage['text']}\n\n"
+    return context_str
+
+def refresh_table_engine(store=None, force: bool = False):
+    """
+    Builds the in-memory SQL engine over the stored Tables, or rebuilds it when the
+    stored Table/Row counts changed since the last build (tables ingested later).
+    Runs in the calling thread; returns the current engine.
+    """
+    global _table_engine, _table_engine_version, _table_engine_checked
+    store = store or get_graph_store()
+    if not store:
+        return None
+    with _table_engine_lock:
+        _table_engine_checked = time.monotonic()
+        counts = store.count_nodes()
+        version = (counts.get("Table", 0), counts.get("Row", 0))
+        if force or _table_engine is None or version != _table_engine_version:
+            from src.features.table_engine import TableQueryEngine
+            engine = TableQueryEngine()
+            with span("table_engine_load", backend=store.name):
+                engine.load_from_store(store)
+            if store is not _graph_store:
+                return _table_engine  # The store was replaced meanwhile (set_graph_store)
+            # Swapped whole: queries already running keep the previous engine
+            _table_engine, _table_engine_version = engine, version
+    return _table_engine
+
+def warm_table_engine() -> Optional[threading.Thread]:
+    """
+    Runs refresh_table_engine() in a background thread (app start, periodic checks).
+    Returns the thread, or None when disabled or a refresh is already running.
+    """
+    global _table_engine_loading
+    if not Config.TABLE_QUERY_ENABLED:
+        return None
+    store = get_graph_store()
+    if not store:
+        return None
+    with _init_lock:
+        if _table_engine_loading:
+            return None
+        _table_engine_loading = True
+
+    def run():
+        global _table_engine_loading
+        try:
+            refresh_table_engine(store)
+        except Exception as e:
+            logger.warning(f"Table engine load failed: {e}")
+        finally:
+            with _init_lock:
+                _table_engine_loading = False
+
+    thread = threading.Thread(target=run, daemon=True, name="table-engine")
+    thread.start()
+    return thread
+
+def get_table_engine():
+    """
+    Returns the current in-memory SQL engine over the stored Tables, or None when table
+    queries are disabled, no tables exist or the first build is still running. Never
+    loads tables on the request path: a missing or stale engine (checked every
+    Config.TABLE_ENGINE_REFRESH_S) is (re)built in the background.
+    """
+    if not Config.TABLE_QUERY_ENABLED:
+        return None
+    if not get_graph_store():
+        return None
+    engine = _table_engine
+    if engine is None or time.monotonic() - _table_engine_checked >= Config.TABLE_ENGINE_REFRESH_S:
+        warm_table_engine()
+    return engine if engine is not None and engine.catalog else None
+
+SQL_PROMPT = """
+        You are a SQL Writer for SQLite. Write ONE read-only SELECT query that answers the question
+        using only these tables (quote table and column names with double quotes):
+
+        {schema}
+
+        Question: {question}
+        {error}
+        Return JSON: {{ "sql": "SELECT ..." }}
+        """
+
+def query_tables(question: str) -> Dict[str, Any]:
+    """
+    Answers an aggregate/filter question over the stored tables: the "sql" model writes
+    SQL for the best-matching table schemas (invalid JSON falls back to the large model),
+    the engine validates and runs it (one repair attempt on errors). Returns a passage
+    ({"id", "text", "score", "metadata"}) with the small result table, or None when no
+    table fits or the query keeps failing.
+    """
+    from src.features.table_engine import TableQueryError
+    engine = get_table_engine()
+    if engine is None:
+        return None
+    names = engine.find_tables(question)
+    if not names:
+        return None
+
+    schema = engine.describe(names)
+    error = ""
+    for _ in range(2):
+        try:
+            data, _ = invoke_json("sql", SQL_PROMPT.format(schema=schema, question=question, error=error),
+                                  validate=lambda d: isinstance(d.get("sql"), str) and bool(d["sql"].strip()))
+            result = engine.execute(data["sql"])
+        except (TableQueryError, ValueError, AttributeError) as e:
+            logger.debug(f"Table query failed: {e}")
+            error = f"\n        Your previous query failed ({e}). Fix it.\n"
+            continue
+        sources = sorted({engine.catalog[n]["source"] for n in names})
+        text = f"Query result over {', '.join(sources)}:\n{engine.format_result(result)}\n(SQL: {result['sql']})"
+        return {
+            "id": f"sql:{result['sql']}",
+            "text": text,
+            "score": 1.0,
+            "metadata": {"source": ", ".join(sources), "sql": result["sql"], "tables": names},
+        }
+    return None
 
 @tool
-def retrieval_tool(query: str) -> str:
+def table_query_tool(sql: str) -> str:
+    """
+    Run a read-only SQL SELECT over the ingested tables (aggregates, filters, top-N).
+    Call with an empty string to list the available tables and columns.
+    Args:
+        sql: A single SQLite SELECT statement (e.g. 'SELECT "region", SUM("revenue") FROM "t1_sales" GROUP BY 1').
+    """
+    from src.features.table_engine import TableQueryError
+    engine = get_table_engine()
+    if engine is None:
+        return "No tables are available."
+    if not sql.strip():
+        return engine.describe()
+    try:
+        return engine.format_result(engine.execute(sql))
+    except TableQueryError as e:
+        return f"Query rejected: {e}\n\nAvailable tables:\n{engine.describe()}"
+
+@tool
+def retrieval_tool(query: str, document: str = "", doc_type: str = "", date_from: str = "", date_to: str = "") -> str:
     """
     Search the Knowledge Graph using Vector Search to find relevant context.
     Args:
         query: The search query string (e.g., "What is the vacation policy?").
+        document: Optional document name words to search within (e.g., "2024 HR handbook").
+        doc_type: Optional file type: pdf, excel, csv, hwp or text.
+        date_from: Optional earliest document date (YYYY, YYYY-MM or YYYY-MM-DD).
+        date_to: Optional latest document date.
     """
-    if not vector_store:
-        return "Search is unavailable (Vector Store not initialized)."
+    if not get_graph_store():
+        return "Search is unavailable (Graph store not initialized)."
         
-    print(f"DEBUG: Vector Search for query: '{query}'")
+    logger.debug(f"Vector Search for query: '{query}'")
     
     try:
         # Perform Similarity Search
-        results = vector_store.similarity_search(query, k=3)
+        filters = {"source": document, "type": doc_type, "date_from": date_from, "date_to": date_to}
+        results = search_passages(query, filters=filters)
         
         if not results:
             return "No relevant documents found."
             
         # Format results
-        context_str = ""
-        for i, doc in enumerate(results, 1):
-            context_str += f"Source {i}:\n{doc.page_content}\n\n"
-            
-        return context_str
+        return format_passages(results)
     except Exception as e:
         return f"Error during vector search: {e}"
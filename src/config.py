@@ -7,11 +7,115 @@ class Config:
     NEO4J_URI = os.getenv("NEO4J_URI", "")
     NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "")
+    NEO4J_DATABASE = os.getenv("NEO4J_DATABASE") or None                    # None = server default database
+    NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))        # Connections per process (shared by every store)
+    NEO4J_CONNECTION_LIFETIME_S = float(os.getenv("NEO4J_CONNECTION_LIFETIME_S", "1800"))  # Recycle before LB/firewall idle cuts
+    NEO4J_ACQUIRE_TIMEOUT_S = float(os.getenv("NEO4J_ACQUIRE_TIMEOUT_S", "30"))  # Wait for a free pooled connection
+    NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))            # Records pulled per round trip
+    NEO4J_TX_RETRY_S = float(os.getenv("NEO4J_TX_RETRY_S", "30"))            # Retry budget for transient errors (managed transactions)
     
     # Local Stack Configuration
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     LLM_MODEL_NAME = "llama3.1"
+
+    # Per-Task Model Routing (unset = LLM_MODEL_NAME), e.g. a 1-3B model for planning and row extraction
+    LLM_MODEL_PLANNER = os.getenv("LLM_MODEL_PLANNER", "")                # Search planner (query / sub-queries / filters)
+    LLM_MODEL_SQL = os.getenv("LLM_MODEL_SQL", "")                        # SQL writer for table questions
+    LLM_MODEL_ANSWER = os.getenv("LLM_MODEL_ANSWER", "")                  # Final answer
+    LLM_MODEL_EXTRACTION = os.getenv("LLM_MODEL_EXTRACTION", "")          # Concepts of text chunks / tables
+    LLM_MODEL_ROW_EXTRACTION = os.getenv("LLM_MODEL_ROW_EXTRACTION", "")  # Concepts of single table rows
+    LLM_MODEL_SUMMARY = os.getenv("LLM_MODEL_SUMMARY", "")                # Chat memory summaries (MEMORY_SUMMARIZER=llm)
+    LLM_FALLBACK_ON_PARSE_ERROR = os.getenv("LLM_FALLBACK_ON_PARSE_ERROR", "true").lower() == "true"  # Retry with LLM_MODEL_NAME on invalid JSON
     
     # HuggingFace Embedding (Local)
     EMBEDDING_MODEL_NAME = "BAAI/bge-m3"
     EMBEDDING_DEVICE = "cuda" if os.getenv("USE_CUDA", "false").lower() == "true" else "cpu"
+
+    # Answer Prompt Budget
+    LLM_CONTEXT_WINDOW = int(os.getenv("LLM_CONTEXT_WINDOW", "8192"))   # Passed to Ollama as num_ctx
+    ANSWER_TOKEN_RESERVE = int(os.getenv("ANSWER_TOKEN_RESERVE", "1024")) # Kept free for the generated answer
+    CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "false").lower() == "true"
+
+    # Chat Session Memory
+    MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "1024"))     # Cap per session (summary + recent turns)
+    MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "4"))    # Turns kept verbatim
+    MEMORY_SUMMARIZER = os.getenv("MEMORY_SUMMARIZER", "extractive")    # "extractive" | "llm"
+    MEMORY_SUMMARY_WORKERS = int(os.getenv("MEMORY_SUMMARY_WORKERS", "1"))
+
+    # Conversation Checkpoints (LangGraph)
+    CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite")                # "sqlite" | "memory" | "none"
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.sqlite") # Shared by all workers on the host
+    CHECKPOINT_DURABILITY = os.getenv("CHECKPOINT_DURABILITY", "exit")            # "exit" = one write per turn
+
+    # Parse Cache (parsed IngestedDoc lists keyed by file hash + converter version)
+    PARSE_CACHE = os.getenv("PARSE_CACHE", "true").lower() == "true"
+    PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", "data/parse_cache")
+    PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "2048"))       # LRU eviction above this size (0 = unlimited)
+    PARSE_CACHE_TTL_DAYS = float(os.getenv("PARSE_CACHE_TTL_DAYS", "0"))    # 0 = entries never expire
+
+    # Excel Parsing
+    EXCEL_STREAMING = os.getenv("EXCEL_STREAMING", "true").lower() == "true"  # Read-only openpyxl rows instead of pandas DataFrames (.xlsx)
+    EXCEL_WORKERS = int(os.getenv("EXCEL_WORKERS", str(min(4, os.cpu_count() or 1))))  # Worker processes converting sheets in parallel
+    EXCEL_PARALLEL_MIN_MB = float(os.getenv("EXCEL_PARALLEL_MIN_MB", "5"))  # Smaller workbooks are converted in-process
+    EXCEL_BLOCK_ROWS = int(os.getenv("EXCEL_BLOCK_ROWS", "5000"))          # Rows read per block
+
+    # PDF Parsing
+    PDF_EXCLUDE_TABLE_TEXT = os.getenv("PDF_EXCLUDE_TABLE_TEXT", "true").lower() == "true"  # Drop table-region characters from PDF page text (tables are indexed separately)
+
+    # Storage Backend
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "neo4j")          # "neo4j" | "sqlite" (embedded)
+    SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/graph.sqlite")
+    VECTOR_INDEX_NAME = "vector_index"
+    ROW_VECTOR_INDEX_NAME = "row_vector_index"
+    TABLE_VECTOR_INDEX_NAME = "table_vector_index"
+    EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1024"))  # BGE-M3
+    VECTOR_SIMILARITY = os.getenv("VECTOR_SIMILARITY", "cosine")         # "cosine" | "euclidean"
+    VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")      # In-process (sqlite) index: "none" | "binary" | "int8"
+    VECTOR_RESCORE_MULTIPLIER = int(os.getenv("VECTOR_RESCORE_MULTIPLIER", "10"))  # Quantized candidates per result, rescored in float
+    CONCEPT_CANONICALIZATION = os.getenv("CONCEPT_CANONICALIZATION", "rules")  # "off" | "rules" | "embedding"
+    CONCEPT_ALIAS_PATH = os.getenv("CONCEPT_ALIAS_PATH", "data/concept_aliases.json")
+    CONCEPT_SIMILARITY_THRESHOLD = float(os.getenv("CONCEPT_SIMILARITY_THRESHOLD", "0.92"))
+    CONCEPT_EMBED_BATCH_SIZE = int(os.getenv("CONCEPT_EMBED_BATCH_SIZE", "64"))
+    GAZETTEER_MODE = os.getenv("GAZETTEER_MODE", "skip")                  # "off" | "skip" (no LLM call when the text names only known concepts) | "new_only" (LLM asked only for untagged concepts)
+    GAZETTEER_MIN_LENGTH = int(os.getenv("GAZETTEER_MIN_LENGTH", "2"))    # Shorter Concept names/aliases are not matched
+    GAZETTEER_REFRESH_S = float(os.getenv("GAZETTEER_REFRESH_S", "60"))   # Reload Concepts written by other workers (0 = only at start)
+    SCHEMA_AUTO_MIGRATE = os.getenv("SCHEMA_AUTO_MIGRATE", "true").lower() == "true"  # Apply schema migrations before ingestion
+    RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))              # Passages per search (tune with evaluate_retrieval.py)
+    RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "0"))    # Neighbours requested from the index (>= k widens HNSW search)
+    MAX_SUB_QUERIES = int(os.getenv("MAX_SUB_QUERIES", "5"))              # Planner sub-queries searched per turn
+    SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "5"))        # Parallel index searches for sub-queries
+    SEARCH_LABELS = [l.strip() for l in os.getenv("SEARCH_LABELS", "Chunk").split(",") if l.strip()]  # e.g. "Chunk,Row,Table"
+    SEARCH_FILTERS = os.getenv("SEARCH_FILTERS", "true").lower() == "true"  # Planner may scope searches (document / type / date)
+    INGEST_EMBEDDINGS = os.getenv("INGEST_EMBEDDINGS", "false").lower() == "true"  # Embed while writing (single pass)
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    TABLE_QUERY_ENABLED = os.getenv("TABLE_QUERY_ENABLED", "true").lower() == "true"  # Answer aggregates over Rows with SQL
+    TABLE_QUERY_MAX_ROWS = int(os.getenv("TABLE_QUERY_MAX_ROWS", "50"))       # Result rows placed in the prompt
+    TABLE_QUERY_MAX_TABLES = int(os.getenv("TABLE_QUERY_MAX_TABLES", "3"))    # Table schemas shown to the SQL writer
+    TABLE_QUERY_TIMEOUT_MS = int(os.getenv("TABLE_QUERY_TIMEOUT_MS", "2000"))
+    TABLE_ENGINE_REFRESH_S = float(os.getenv("TABLE_ENGINE_REFRESH_S", "60"))  # Background check for new Tables (rebuilds the SQL engine)
+    GRAPH_RANK_WEIGHT = float(os.getenv("GRAPH_RANK_WEIGHT", "0"))        # Ranking score = similarity + weight * node centrality (0 = off)
+    GRAPH_RANK_AUTO = os.getenv("GRAPH_RANK_AUTO", "true").lower() == "true"  # Refresh graph ranks incrementally after ingestion
+    GRAPH_RANK_DAMPING = float(os.getenv("GRAPH_RANK_DAMPING", "0.85"))    # PageRank damping over Concept co-occurrence
+    GRAPH_RANK_REFRESH_DELTA = float(os.getenv("GRAPH_RANK_REFRESH_DELTA", "0.05"))  # Rescore all nodes when a Concept's importance moves more
+
+    # Ingestion service
+    INGEST_QUEUE_PATH = os.getenv("INGEST_QUEUE_PATH", "data/ingest_queue.sqlite")
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))      # Then the job is marked failed
+    INGEST_BACKOFF_S = float(os.getenv("INGEST_BACKOFF_S", "5"))          # Retry delay doubles per attempt
+    INGEST_LEASE_S = float(os.getenv("INGEST_LEASE_S", "600"))            # Workers heartbeat every lease_s/3; a job not renewed this long is retried as a failed attempt (worker died)
+    INGEST_HOST = os.getenv("INGEST_HOST", "127.0.0.1")
+    INGEST_PORT = int(os.getenv("INGEST_PORT", "8765"))
+
+    # Observability
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"   # In-process stage histograms
+    METRICS_EXPORT = os.getenv("METRICS_EXPORT", "")                          # e.g. "prometheus,jsonl" or "phoenix"
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+    METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "data/metrics.jsonl")
+    PHOENIX_COLLECTOR_ENDPOINT = os.getenv("PHOENIX_COLLECTOR_ENDPOINT", "")   # Send traces to a running Phoenix instead of launching one
+
+    # Evaluation
+    EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "2"))              # Concurrent agent turns (bounded by Ollama)
+    EVAL_JUDGE_CONCURRENCY = int(os.getenv("EVAL_JUDGE_CONCURRENCY", "1"))  # Concurrent RAGAS judgments
+    EVAL_CACHE_PATH = os.getenv("EVAL_CACHE_PATH", "data/eval_cache.sqlite")
+    CORPUS_VERSION = os.getenv("CORPUS_VERSION", "default")                 # Bump after re-ingestion to invalidate cached answers
@@ -0,0 +1,60 @@
+import math
+from typing import List, Dict, Sequence, Iterable, Union
+
+# Relevance labels: a list of relevant chunk ids (binary) or {chunk_id: graded relevance}
+Relevance = Union[Sequence[str], Dict[str, float]]
+
+def _gains(relevant: Relevance) -> Dict[str, float]:
+    if isinstance(relevant, dict):
+        return {k: float(v) for k, v in relevant.items() if v > 0}
+    return {k: 1.0 for k in relevant}
+
+def recall_at_k(retrieved: List[str], relevant: Relevance, k: int) -> float:
+    """
+    Fraction of relevant chunks found in the top k.
+    """
+    gains = _gains(relevant)
+    if not gains:
+        return 0.0
+    hits = len(set(retrieved[:k]) & gains.keys())
+    return hits / len(gains)
+
+def reciprocal_rank(retrieved: List[str], relevant: Relevance, k: int = None) -> float:
+    """
+    1 / rank of the first relevant chunk (0 if none in the top k).
+    """
+    gains = _gains(relevant)
+    for rank, chunk_id in enumerate(retrieved[:k] if k else retrieved, 1):
+        if chunk_id in gains:
+            return 1.0 / rank
+    return 0.0
+
+def ndcg_at_k(retrieved: List[str], relevant: Relevance, k: int) -> float:
+    """
+    Normalized discounted cumulative gain over the top k (graded or binary relevance).
+    """
+    gains = _gains(relevant)
+    if not gains:
+        return 0.0
+    seen = set()
+    dcg = 0.0
+    for rank, chunk_id in enumerate(retrieved[:k], 1):
+        if chunk_id in gains and chunk_id not in seen:
+            dcg += gains[chunk_id] / math.log2(rank + 1)
+            seen.add(chunk_id)
+    ideal = sorted(gains.values(), reverse=True)[:k]
+    idcg = sum(g / math.log2(rank + 1) for rank, g in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+def score_rankings(rankings: Iterable[List[str]], labels: Iterable[Relevance], k: int) -> Dict[str, float]:
+    """
+    Mean recall@k, MRR@k and nDCG@k over a set of queries.
+    """
+    totals = {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+    n = 0
+    for retrieved, relevant in zip(rankings, labels):
+        totals["recall"] += recall_at_k(retrieved, relevant, k)
+        totals["mrr"] += reciprocal_rank(retrieved, relevant, k)
+        totals["ndcg"] += ndcg_at_k(retrieved, relevant, k)
+        n += 1
+    return {name: round(total / n, 4) if n else 0.0 for name, total in totals.items()}
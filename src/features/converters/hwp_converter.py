@@ -7,6 +7,8 @@ import zlib
 from src.features.schemas import IngestedDoc, ContentType, Table, Row
 
 class HwpConverter:
+    VERSION = 1  # Bump when output changes (invalidates the parse cache)
+
     def __init__(self):
         pass
 
@@ -1,8 +1,26 @@
 import pdfplumber
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from src.config import Config
 from src.features.schemas import IngestedDoc, ContentType, Table, Row
 
+BBox = Tuple[float, float, float, float]  # (x0, top, x1, bottom) in pdfplumber page coordinates
+
+def outside_bboxes(bboxes: List[BBox]):
+    """
+    pdfplumber object filter dropping characters whose center lies inside any bbox.
+    Lines, rects and images are kept (they carry no text).
+    """
+    def keep(obj: Dict[str, Any]) -> bool:
+        if obj.get("object_type") != "char":
+            return True
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in bboxes)
+    return keep
+
 class PdfConverter:
+    VERSION = 2  # Bump when output changes (invalidates the parse cache)
+
     def __init__(self):
         pass
 
@@ -15,11 +33,12 @@ class PdfConverter:
             with pdfplumber.open(file_path) as pdf:
                 for page_num, page in enumerate(pdf.pages):
                     # 1. Extract Tables
-                    tables = page.extract_tables()
-                    for table_data in tables:
-                        # table_data is List[List[str]]
+                    table_bboxes = []
+                    for found in page.find_tables():
+                        table_data = found.extract()  # List[List[str]]
                         if not table_data:
                             continue
+                        table_bboxes.append(found.bbox)
                             
                         # Convert to Markdown
                         # Simple logic: First row is header
@@ -69,10 +88,9 @@ class PdfConverter:
                         )
                         docs.append(table_doc)
 
-                    # 2. Extract Text (excluding tables if possible, but pdfplumber extracts all)
-                    # For simplicity, we extract full text as a separate Text chunk.
-                    # Overlap is acceptable for RAG context.
-                    text = page.extract_text()
+                    # 2. Extract Text outside the table regions (the cells are already in the TABLE docs);
+                    # filtering characters keeps the reading order of the remaining text
+                    text = self.page_text(page, table_bboxes)
                     if text:
                         text_doc = IngestedDoc(
                             content=text,
@@ -89,3 +107,13 @@ class PdfConverter:
         except Exception as e:
             print(f"Error parsing PDF {file_path}: {e}")
             return []
+
+    @staticmethod
+    def page_text(page, table_bboxes: List[BBox] = None) -> str:
+        """
+        Page text without the characters inside the given table bboxes
+        (Config.PDF_EXCLUDE_TABLE_TEXT; otherwise the full page text).
+        """
+        if table_bboxes and Config.PDF_EXCLUDE_TABLE_TEXT:
+            page = page.filter(outside_bboxes(table_bboxes))
+        return page.extract_text()
@@ -1,9 +1,114 @@
+import os
+import zipfile
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
 import json
+from src.config import Config
 from src.features.schemas import IngestedDoc, ContentType, Table, Row, SerializedText
 
+def _column_names(header: Tuple[Any, ...]) -> List[str]:
+    """
+    Header cells to column names the way pandas names them: blank -> "Unnamed: i",
+    duplicates -> "name.1", "name.2", ...
+    """
+    names, seen = [], {}
+    for i, cell in enumerate(header):
+        name = f"Unnamed: {i}" if cell is None or str(cell).strip() == "" else str(cell)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _cell_value(value: Any) -> Any:
+    """
+    A cell as stored in Row.data, the same for the pandas and the streaming path:
+    NaN/NaT -> None, numpy scalars and Timestamps -> Python values, integral floats
+    -> int (pandas reads an int column with blanks as floats; openpyxl gives ints).
+    """
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass  # List-like cell values
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _markdown_cell(value: Any) -> str:
+    return "" if value is None else str(value).replace("\n", " ").replace("|", "\\|")
+
+def _markdown_row(values: Iterable[Any]) -> str:
+    return "| " + " | ".join(_markdown_cell(v) for v in values) + " |"
+
+def iter_sheet_blocks(worksheet, block_rows: int = 5000) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+    """
+    Streams a read-only worksheet: yields (columns, block of value tuples).
+    The first non-empty row is the header; empty rows are skipped. Cells are read
+    lazily from the sheet XML, so memory is bounded by the block, not the sheet.
+    """
+    columns = None
+    block = []
+    for values in worksheet.iter_rows(values_only=True):
+        if all(v is None or v == "" for v in values):
+            continue
+        if columns is None:
+            # Trailing blank header cells are formatting, not columns
+            width = max(i + 1 for i, v in enumerate(values) if v is not None and v != "")
+            columns = _column_names(values[:width])
+            continue
+        values = tuple(values[:len(columns)])
+        block.append(values + (None,) * (len(columns) - len(values)))
+        if len(block) >= block_rows:
+            yield columns, block
+            block = []
+    if columns is not None:
+        yield columns, block
+
+def _sheet_names(file_path: str) -> List[str]:
+    # Read from xl/workbook.xml: load_workbook would scan every sheet without a <dimension>
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        return [e.get("name") for e in root.iter("{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet")]
+    except (KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        from openpyxl import load_workbook
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            return wb.sheetnames
+        finally:
+            wb.close()
+
+def _convert_sheets(file_path: str, sheet_names: Optional[List[str]], metadata: Dict[str, Any],
+                    block_rows: int) -> Dict[str, List[IngestedDoc]]:
+    """
+    Converts the given sheets (None = all) from one read-only workbook handle.
+    Module-level so a group of sheets can run in a worker process.
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        converter = TableConverter()
+        return {
+            name: converter._convert_sheet_streaming(wb[name], file_path, metadata, block_rows)
+            for name in (sheet_names if sheet_names is not None else wb.sheetnames)
+        }
+    finally:
+        wb.close()
+
 class TableConverter:
+    VERSION = 3  # Bump when output changes (invalidates the parse cache)
+
     def __init__(self):
         pass
 
@@ -20,10 +125,19 @@ class TableConverter:
             print(f"Error parsing CSV {file_path}: {e}")
             return []
 
-    def convert_excel(self, file_path: str, metadata: Dict[str, Any] = {}) -> List[IngestedDoc]:
+    def convert_excel(self, file_path: str, metadata: Dict[str, Any] = {}, streaming: bool = None) -> List[IngestedDoc]:
         """
-        Convert Excel to IngestedDoc. Support multiple sheets.
+        Convert Excel to IngestedDoc (one Table per sheet). .xlsx files are streamed
+        in read-only mode with sheets converted in parallel (Config.EXCEL_STREAMING);
+        .xls and streaming=False go through pandas.
         """
+        streaming = Config.EXCEL_STREAMING if streaming is None else streaming
+        if streaming and file_path.lower().endswith((".xlsx", ".xlsm")):
+            try:
+                return self._convert_excel_streaming(file_path, metadata)
+            except Exception as e:
+                print(f"Error parsing Excel {file_path}: {e}")
+                return []
         try:
             xls = pd.ExcelFile(file_path)
             docs = []
@@ -38,55 +152,93 @@ class TableConverter:
             print(f"Error parsing Excel {file_path}: {e}")
             return []
 
-    def _process_dataframe(self, df: pd.DataFrame, file_path: str, source_type: str, metadata: Dict[str, Any]) -> List[IngestedDoc]:
+    def _convert_excel_streaming(self, file_path: str, metadata: Dict[str, Any], workers: int = None,
+                                 block_rows: int = None) -> List[IngestedDoc]:
         """
-        Common logic to transform DataFrame into IngestedDoc with Table schema.
+        Read-only openpyxl path. Sheets are independent, so large workbooks split them
+        across worker processes (openpyxl parsing is CPU-bound Python and holds the GIL);
+        each worker opens the workbook once for its group of sheets.
+        """
+        sheet_names = _sheet_names(file_path)
+        workers = min(workers or Config.EXCEL_WORKERS, len(sheet_names))
+        block_rows = block_rows or Config.EXCEL_BLOCK_ROWS
+        parallel = workers > 1 and os.path.getsize(file_path) >= Config.EXCEL_PARALLEL_MIN_MB * 1024 * 1024
+
+        if not parallel:
+            converted = _convert_sheets(file_path, None, metadata, block_rows)
+        else:
+            converted = {}
+            groups = [sheet_names[i::workers] for i in range(workers)]  # Round-robin balances sheet sizes
+            # spawn: forking a multi-threaded process (ingestion service workers) is unsafe
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+                for result in pool.map(_convert_sheets, [file_path] * workers, groups,
+                                       [metadata] * workers, [block_rows] * workers):
+                    converted.update(result)
+        return [doc for name in sheet_names for doc in converted.get(name, [])]  # Workbook sheet order
+
+    def _convert_sheet_streaming(self, worksheet, file_path: str, metadata: Dict[str, Any],
+                                 block_rows: int = 5000) -> List[IngestedDoc]:
         """
+        One sheet to a Table doc, built block by block from iter_sheet_blocks (no
+        DataFrame, no per-row Series). The sheet is read in blocks, but the whole sheet
+        still becomes one Table (one SQL table for table queries), so its Rows and
+        markdown are held until the doc is returned. Output is identical to the pandas
+        path for the same sheet.
+        """
+        columns = None
+        value_rows = []
+        for block_columns, block in iter_sheet_blocks(worksheet, block_rows):
+            columns = block_columns
+            value_rows.extend(block)
+        if columns is None:
+            return []  # Empty sheet
+        return self._table_docs(columns, value_rows, file_path, "excel", {**metadata, "sheet_name": worksheet.title})
+
+    def _table_docs(self, columns: List[Any], value_rows: Iterable[Tuple[Any, ...]], file_path: str,
+                    source_type: str, metadata: Dict[str, Any]) -> List[IngestedDoc]:
+        """
+        Table doc from column names and row value tuples, shared by the pandas and the
+        streaming paths: cells normalized with _cell_value, one pipe-table markdown.
+        """
+        columns = [str(c) for c in columns]
+        if not columns:
+            return []
         table_rows = []
-        full_text_parts = []
-        columns = df.columns.tolist()
-        
-        # Markdown representation for the whole table (for context)
-        markdown_table = df.to_markdown(index=False)
-        
-        for idx, row_series in df.iterrows():
-            row_data = row_series.to_dict()
-            
-            # Serialize: "Header is Value."
-            sentences = []
-            for col in columns:
-                val = row_data.get(col)
-                if val:
-                    sentences.append(f"{col}: {val}")
-            
-            serialized_text = ", ".join(sentences) + "."
-            full_text_parts.append(serialized_text)
-            
-            table_row = Row(
-                index=idx,
-                data=row_data,
-                serialized_text=serialized_text
-            )
-            table_rows.append(table_row)
+        markdown_lines = [_markdown_row(columns), "| " + " | ".join(["---"] * len(columns)) + " |"]
+        for index, values in enumerate(value_rows):
+            row_data = dict(zip(columns, (_cell_value(v) for v in values)))
+            markdown_lines.append(_markdown_row(row_data.values()))
+            table_rows.append(Row(index=index, data=row_data, serialized_text=self._serialize_row(columns, row_data)))
 
+        markdown_table = "\n".join(markdown_lines)
         table = Table(
             caption=f"Table extracted from {file_path}",
-            markdown=markdown_table or "",
+            markdown=markdown_table,
             rows=table_rows,
             metadata=metadata
         )
-
-        # We create one IngestedDoc representing the Table
-        # The content is the Markdown representation + some summary
-        doc = IngestedDoc(
+        # One IngestedDoc represents the Table: the Markdown representation + a short header
+        return [IngestedDoc(
             content=f"Table from {file_path}.\n\n{markdown_table}",
             content_type=ContentType.TABLE,
-            metadata={
-                **metadata,
-                "source": file_path,
-                "type": source_type
-            },
+            metadata={**metadata, "source": file_path, "type": source_type},
             table_data=table
-        )
-        
-        return [doc]
+        )]
+
+    @staticmethod
+    def _serialize_row(columns: List[str], row_data: Dict[str, Any]) -> str:
+        # Serialize: "Header is Value."
+        sentences = []
+        for col in columns:
+            val = row_data.get(col)
+            if val:
+                sentences.append(f"{col}: {val}")
+        return ", ".join(sentences) + "."
+
+    def _process_dataframe(self, df: pd.DataFrame, file_path: str, source_type: str, metadata: Dict[str, Any]) -> List[IngestedDoc]:
+        """
+        Common logic to transform DataFrame into IngestedDoc with Table schema.
+        itertuples keeps each column's values (iterrows would upcast a row's ints to float).
+        """
+        return self._table_docs(df.columns.tolist(), df.itertuples(index=False, name=None),
+                                file_path, source_type, metadata)
@@ -0,0 +1,43 @@
+from typing import List, Tuple, Any
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType
+from src.telemetry.metrics import span, registry
+
+class DocumentEmbedder:
+    """
+    Fills the embedding fields of parsed documents before they are written, so each
+    node is stored with its vector in the same write (no create_vector_index pass):
+      - TEXT chunks:  IngestedDoc.embedding  (content)
+      - Tables:       Table.embedding        (caption)
+      - Rows:         Row.embedding          (serialized_text)
+    Texts are embedded in batches across documents.
+    """
+    def __init__(self, embeddings, batch_size: int = None):
+        self.embeddings = embeddings
+        self.batch_size = batch_size or Config.EMBED_BATCH_SIZE
+
+    @staticmethod
+    def _targets(docs: List[IngestedDoc]) -> List[Tuple[Any, str]]:
+        targets = []
+        for doc in docs:
+            if doc.content_type == ContentType.TABLE and doc.table_data:
+                table = doc.table_data
+                targets.append((table, table.caption or doc.content[:1000]))
+                targets.extend((row, row.serialized_text) for row in table.rows)
+            else:
+                targets.append((doc, doc.content))
+        return [(obj, text) for obj, text in targets if obj.embedding is None and text and text.strip()]
+
+    def embed(self, docs: List[IngestedDoc]) -> int:
+        """
+        Embeds every node text that has no vector yet. Returns the number embedded.
+        """
+        targets = self._targets(docs)
+        for start in range(0, len(targets), self.batch_size):
+            batch = targets[start:start + self.batch_size]
+            with span("embedding", kind="document"):
+                vectors = self.embeddings.embed_documents([text for _, text in batch])
+            for (obj, _), vec in zip(batch, vectors):
+                obj.embedding = [float(v) for v in vec]
+            registry.observe("embedding_batch_size", len(batch), buckets=(1, 4, 16, 32, 64, 128, 256, 512))
+        return len(targets)
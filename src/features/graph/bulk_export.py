@@ -0,0 +1,240 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Tuple
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType, Table
+from src.features.graph.store import GraphStore
+from src.features.graph.filters import filter_fields
+
+ARRAY_DELIMITER = ";"
+
+# File name -> neo4j-admin header. Each label has its own ID space, so
+# relationship files are split by (start label, end label).
+NODE_FILES = {
+    "Document": ("documents", ["id:ID(Document)", "title", "created_at:long", ":LABEL"]),
+    "Chunk": ("chunks", ["id:ID(Chunk)", "text", "vector_id", "page:int", "embedding:float[]",
+                         "doc_type", "doc_date", "sheet_name", ":LABEL"]),
+    "Table": ("tables", ["id:ID(Table)", "caption", "markdown", "embedding:float[]",
+                         "doc_type", "doc_date", "sheet_name", ":LABEL"]),
+    "Row": ("rows", ["id:ID(Row)", "index:int", "data_json", "serialized_text", "embedding:float[]",
+                     "doc_type", "doc_date", "sheet_name", ":LABEL"]),
+    "Concept": ("concepts", ["name:ID(Concept)", ":LABEL"]),
+}
+RELATIONSHIP_FILES = {
+    ("CONTAINS", "Document", "Chunk"): "contains_document_chunk",
+    ("CONTAINS", "Document", "Table"): "contains_document_table",
+    ("HAS_ROW", "Table", "Row"): "has_row_table_row",
+    ("MENTIONS", "Chunk", "Concept"): "mentions_chunk_concept",
+    ("MENTIONS", "Table", "Concept"): "mentions_table_concept",
+    ("MENTIONS", "Row", "Concept"): "mentions_row_concept",
+}
+
+def _array(vec) -> str:
+    return ARRAY_DELIMITER.join(repr(float(v)) for v in vec) if vec is not None else ""
+
+class _SeenSet:
+    """
+    Disk-backed set of written node ids / edges, so deduplication memory stays
+    bounded on corpora with millions of rows.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._pending = 0
+
+    def add(self, key: str) -> bool:
+        """
+        True if the key was not seen before.
+        """
+        cursor = self.conn.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+        self._pending += 1
+        if self._pending >= 10_000:
+            self.conn.commit()
+            self._pending = 0
+        return cursor.rowcount == 1
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class BulkCsvExportStore(GraphStore):
+    """
+    Write-only GraphStore that streams nodes and edges to neo4j-admin import CSVs
+    (one header file + one data file per node label / relationship set) instead of
+    running MERGE transactions. Use for initial loads into an empty database:
+
+        GraphConnector(BulkCsvExportStore("data/import"))
+
+    Vectors already set on the documents (DocumentEmbedder) are written inline; with
+    'embeddings', missing Chunk vectors are computed here in batches.
+    """
+    name = "bulk_csv"
+
+    def __init__(self, output_dir: str, embeddings=None, embed_batch_size: int = 64):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.embeddings = embeddings
+        self.embed_batch_size = embed_batch_size
+        self._seen = _SeenSet(os.path.join(output_dir, ".dedup.sqlite"))
+        self._files = {}
+        self._writers = {}
+        self._counts: Dict[str, int] = {label: 0 for label in NODE_FILES}
+        self._edge_counts: Dict[str, int] = {rel[0]: 0 for rel in RELATIONSHIP_FILES}
+        self._pending_chunks: List[Tuple[str, str, str, int, Any, List[Any]]] = []
+        self._lock = threading.RLock()
+        self._closed = False
+
+        for label, (stem, header) in NODE_FILES.items():
+            self._open(label, stem, header)
+        for (rel_type, start, end), stem in RELATIONSHIP_FILES.items():
+            self._open((rel_type, start, end), stem, [f":START_ID({start})", f":END_ID({end})", ":TYPE"])
+
+    def _open(self, key, stem: str, header: List[str]):
+        with open(os.path.join(self.output_dir, f"{stem}_header.csv"), "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(header)
+        handle = open(os.path.join(self.output_dir, f"{stem}.csv"), "w", encoding="utf-8", newline="")
+        self._files[key] = handle
+        self._writers[key] = csv.writer(handle)
+
+    def _node(self, label: str, node_id: str, values: List[Any]) -> bool:
+        if not self._seen.add(f"{label}\x00{node_id}"):
+            return False
+        self._writers[label].writerow([node_id] + values + [label])
+        self._counts[label] += 1
+        return True
+
+    def _edge(self, rel_type: str, start_label: str, start_id: str, end_label: str, end_id: str):
+        if self._seen.add(f"{rel_type}\x00{start_id}\x00{end_id}"):
+            self._writers[(rel_type, start_label, end_label)].writerow([start_id, end_id, rel_type])
+            self._edge_counts[rel_type] += 1
+
+    def _concepts(self, source_label: str, source_id: str, concepts: List[str]):
+        for name in concepts or []:
+            self._node("Concept", name, [])
+            self._edge("MENTIONS", source_label, source_id, "Concept", name)
+
+    def ingest_document(self, doc: IngestedDoc, concepts: List[str]):
+        doc_source = doc.metadata.get("source", "Unknown_Source")
+        # Empty CSV fields are not set on import, like NULL columns
+        fields = [v or "" for v in filter_fields(doc.metadata).values()]
+        with self._lock:
+            self._node("Document", doc_source, [doc_source, int(time.time() * 1000)])
+            if doc.content_type == ContentType.TABLE and doc.table_data:
+                table = doc.table_data
+                self._node("Table", table.id, [table.caption, table.markdown, _array(table.embedding)] + fields)
+                self._edge("CONTAINS", "Document", doc_source, "Table", table.id)
+                self._concepts("Table", table.id, concepts)
+                for r in table.rows:
+                    data = json.dumps(r.data, ensure_ascii=False, default=str)
+                    if self._node("Row", r.id, [r.index, data, r.serialized_text, _array(r.embedding)] + fields):
+                        self._edge("HAS_ROW", "Table", table.id, "Row", r.id)
+            else:
+                if self._seen.add(f"Chunk\x00{doc.id}"):
+                    self._pending_chunks.append(
+                        (doc.id, doc.content, doc.vector_id or "", doc.metadata.get("page", 1), doc.embedding, fields))
+                    if self.embeddings is None or len(self._pending_chunks) >= self.embed_batch_size:
+                        self._flush_chunks()
+                self._edge("CONTAINS", "Document", doc_source, "Chunk", doc.id)
+                self._concepts("Chunk", doc.id, concepts)
+
+    def _flush_chunks(self):
+        if not self._pending_chunks:
+            return
+        vectors = [c[4] for c in self._pending_chunks]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if self.embeddings is not None and missing:
+            computed = self.embeddings.embed_documents([self._pending_chunks[i][1] for i in missing])
+            for i, vec in zip(missing, computed):
+                vectors[i] = vec
+        for (chunk_id, text, vector_id, page, _, fields), vec in zip(self._pending_chunks, vectors):
+            self._writers["Chunk"].writerow([chunk_id, text, vector_id, page, _array(vec)] + fields + ["Chunk"])
+            self._counts["Chunk"] += 1
+        self._pending_chunks = []
+
+    def ingest_row_concepts(self, row_id: str, concepts: List[str]):
+        with self._lock:
+            self._concepts("Row", row_id, concepts)
+
+    def similarity_search(self, embedding: List[float], k: int = 3, labels: List[str] = None,
+                          filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError("BulkCsvExportStore is write-only; import the CSVs into Neo4j first.")
+
+    def iter_embeddings(self, label: str = "Chunk", batch_size: int = 1000):
+        return iter(())
+
+    def fetch_embeddings(self, ids: List[str], label: str = "Chunk") -> Dict[str, List[float]]:
+        return {}
+
+    def chunks_missing_embeddings(self, limit: int = 256) -> List[Tuple[str, str]]:
+        return []
+
+    def set_chunk_embeddings(self, items: List[Tuple[str, List[float]]]):
+        raise NotImplementedError("Pass 'embeddings' to BulkCsvExportStore to export Chunk vectors.")
+
+    def list_documents(self) -> List[str]:
+        return []
+
+    def list_concepts(self) -> List[str]:
+        # Export targets an empty database: no existing Concepts to align with
+        return []
+
+    def list_concept_aliases(self) -> Dict[str, str]:
+        return {}
+
+    def list_tables(self) -> List[Table]:
+        return []
+
+    def merge_concepts(self, mapping: Dict[str, str]) -> Dict[str, int]:
+        raise NotImplementedError("Canonicalize before export (GraphConnector does this on write).")
+
+    def iter_mentions(self, new_only: bool = False, batch_size: int = 1000):
+        return iter(())
+
+    def load_graph_rank(self) -> Tuple[Dict[Tuple[str, str], float], Dict[str, float]]:
+        return {}, {}
+
+    def save_graph_rank(self, cooccurrence, concept_scores, node_scores, ranked, replace: bool = False):
+        raise NotImplementedError("Compute graph ranks after the import (src/pipeline/compute_graph_rank.py).")
+
+    def count_nodes(self) -> Dict[str, int]:
+        with self._lock:
+            return {label: count + (len(self._pending_chunks) if label == "Chunk" else 0)
+                    for label, count in self._counts.items()}
+
+    def import_command(self, database: str = None) -> str:
+        """
+        neo4j-admin (5.x) command for the exported files, into Config.NEO4J_DATABASE
+        (default "neo4j").
+        """
+        database = database or Config.NEO4J_DATABASE or "neo4j"
+        args = [f"--nodes={label}={stem}_header.csv,{stem}.csv" for label, (stem, _) in NODE_FILES.items()]
+        args += [f"--relationships={rel[0]}={stem}_header.csv,{stem}.csv" for rel, stem in RELATIONSHIP_FILES.items()]
+        return " \\\n    ".join(
+            ["neo4j-admin database import full"] + args
+            + [f'--array-delimiter="{ARRAY_DELIMITER}"', "--multiline-fields=true", "--id-type=string", database]
+        )
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush_chunks()
+            for handle in self._files.values():
+                handle.close()
+            self._seen.close()
+            with open(os.path.join(self.output_dir, "import.sh"), "w", encoding="utf-8") as f:
+                f.write("#!/bin/sh\n# Run from this directory against a stopped, empty database, then:\n")
+                f.write("#   python src/pipeline/migrate_schema.py   (constraints + vector index)\n")
+                f.write(self.import_command() + "\n")
+            with open(os.path.join(self.output_dir, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump({"nodes": self._counts, "relationships": self._edge_counts}, f, indent=2)
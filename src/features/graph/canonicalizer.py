@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+from typing import List, Dict, Optional, Iterable
+import numpy as np
+from src.config import Config
+from src.telemetry.metrics import registry
+
+# Legal-entity forms dropped from company names ("Samsung Electronics Co., Ltd." -> "Samsung Electronics")
+_CORPORATE_SUFFIX = re.compile(
+    r"[\s,]+(co\.?,?\s*ltd\.?|co\.?|ltd\.?|inc\.?|corp\.?|corporation|llc|plc|gmbh)$", re.IGNORECASE
+)
+_KOREAN_CORPORATE = re.compile(r"^\s*(주식회사|\(주\))\s*|\s*(주식회사|\(주\))\s*$")
+# "2024년", "2024 년도" -> "2024"
+_KOREAN_UNIT_NUMBER = re.compile(r"^(\d+(?:\.\d+)?)\s*(년도|년)$")
+_KEY_STRIP = re.compile(r"[\s\-_·.,'\"]+")
+_NUMBERS = re.compile(r"\d+")
+
+def clean_name(name: str) -> str:
+    """
+    Display form of a concept: NFKC, collapsed whitespace, no surrounding punctuation,
+    no legal-entity suffix, no Korean year suffix.
+    """
+    text = unicodedata.normalize("NFKC", str(name or ""))
+    text = re.sub(r"\s+", " ", text).strip(" \t\"'`.,;:-")
+    text = _KOREAN_CORPORATE.sub("", text).strip()
+    stripped = _CORPORATE_SUFFIX.sub("", text).strip(" ,")
+    if stripped:
+        text = stripped
+    match = _KOREAN_UNIT_NUMBER.match(text)
+    if match:
+        text = match.group(1)
+    return text
+
+def concept_key(name: str) -> str:
+    """
+    Matching key: case-folded clean name without spacing/punctuation ("삼성 전자" == "삼성전자").
+    """
+    return _KEY_STRIP.sub("", clean_name(name).casefold())
+
+def load_aliases(path: str = None) -> Dict[str, str]:
+    """
+    Alias table (JSON), either {"alias": "Canonical"} or {"Canonical": ["alias", ...]}.
+    Returns {} if the file does not exist.
+    """
+    path = path or Config.CONCEPT_ALIAS_PATH
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    aliases = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            for alias in value:
+                aliases[alias] = key
+        else:
+            aliases[key] = value
+    return aliases
+
+class ConceptCanonicalizer:
+    """
+    Maps raw concept strings to canonical names, in order:
+      1. rules:     clean_name / concept_key (case, spacing, "Co., Ltd.", "년")
+      2. aliases:   alias table ("삼성전자" -> "Samsung Electronics")
+      3. embedding: nearest existing canonical by cosine >= threshold (optional, batched)
+    Names that resolve to nothing become new canonicals. Results are cached per raw string.
+    """
+    def __init__(self,
+                 aliases: Dict[str, str] = None,
+                 embeddings=None,
+                 threshold: float = None,
+                 batch_size: int = None):
+        self.aliases = {concept_key(a): clean_name(c) for a, c in (aliases or {}).items() if concept_key(a)}
+        self.embeddings = embeddings
+        self.threshold = threshold or Config.CONCEPT_SIMILARITY_THRESHOLD
+        self.batch_size = batch_size or Config.CONCEPT_EMBED_BATCH_SIZE
+        self._by_key: Dict[str, str] = {}
+        self._cache: Dict[str, str] = {}
+        self._names: List[str] = []            # Canonical names with a vector, row-aligned with _matrix
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.stats = {"rule": 0, "alias": 0, "embedding": 0, "new": 0}
+
+    def _count(self, method: str):
+        self.stats[method] += 1
+        registry.inc("concept_canonicalization", method=method)
+
+    def _add_vector(self, name: str, vec: np.ndarray):
+        if self._matrix is None:
+            self._matrix = np.zeros((64, vec.shape[0]), dtype=np.float32)
+        elif len(self._names) == self._matrix.shape[0]:
+            # Grow by doubling instead of re-stacking on every new canonical
+            self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+        self._matrix[len(self._names)] = vec
+        self._names.append(name)
+
+    def _nearest(self, vec: np.ndarray, name: str) -> Optional[str]:
+        if not self._names:
+            return None
+        scores = self._matrix[:len(self._names)] @ vec
+        numbers = _NUMBERS.findall(name)
+        for i in np.argsort(-scores):
+            if scores[i] < self.threshold:
+                break
+            # "2023 Revenue" and "2024 Revenue" embed almost identically; never merge different numbers
+            if _NUMBERS.findall(self._names[i]) == numbers:
+                return self._names[i]
+        return None
+
+    def _resolve_without_embedding(self, display: str, key: str) -> Optional[str]:
+        if key in self.aliases:
+            canonical = self.aliases[key]
+            self._by_key.setdefault(concept_key(canonical), canonical)
+            self._by_key[key] = canonical
+            self._count("alias")
+            return canonical
+        if key in self._by_key:
+            self._count("rule")
+            return self._by_key[key]
+        return None
+
+    def build_mapping(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        {raw name: canonical name} for every non-empty name. Earlier names win as
+        canonicals, so pass existing concepts first (most mentioned first).
+        """
+        mapping = {}
+        with self._lock:
+            pending = []
+            for raw in names:
+                if raw in self._cache:
+                    mapping[raw] = self._cache[raw]
+                    continue
+                display = clean_name(raw)
+                key = concept_key(display)
+                if not key:
+                    continue
+                canonical = self._resolve_without_embedding(display, key)
+                if canonical is None and self.embeddings is not None:
+                    pending.append((raw, display, key))
+                    continue
+                if canonical is None:
+                    canonical = self._by_key[key] = display
+                    self._count("new")
+                self._cache[raw] = mapping[raw] = canonical
+
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                self._embed_batch(batch)
+                for raw, _, key in batch:
+                    self._cache[raw] = mapping[raw] = self._by_key[key]
+        return mapping
+
+    def _embed_batch(self, batch):
+        # One embedding call per batch, for keys still unresolved (duplicates in the batch embed once)
+        todo = {}
+        for _, display, key in batch:
+            if key in self._by_key or key in todo:
+                self._count("rule")
+            else:
+                todo[key] = display
+        if not todo:
+            return
+        vectors = np.asarray(self.embeddings.embed_documents(list(todo.values())), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        for (key, display), vec in zip(todo.items(), vectors):
+            match = self._nearest(vec, display)
+            if match is not None:
+                self._by_key[key] = match
+                self._count("embedding")
+            else:
+                self._by_key[key] = display
+                self._add_vector(display, vec)
+                self._count("new")
+
+    def canonicalize(self, concepts: List[str]) -> List[str]:
+        """
+        Canonical names for one extraction result (order kept, duplicates removed).
+        """
+        mapping = self.build_mapping(concepts)
+        seen, result = set(), []
+        for raw in concepts:
+            canonical = mapping.get(raw)
+            if canonical and canonical not in seen:
+                seen.add(canonical)
+                result.append(canonical)
+        return result
+
+def create_canonicalizer(mode: str = None) -> Optional[ConceptCanonicalizer]:
+    """
+    Builds the write-path canonicalizer for Config.CONCEPT_CANONICALIZATION:
+    "off" (None), "rules" (rules + alias table) or "embedding" (+ BGE-M3 clustering).
+    """
+    mode = (mode or Config.CONCEPT_CANONICALIZATION).lower()
+    if mode == "off":
+        return None
+    embeddings = None
+    if mode == "embedding":
+        from src.agent.tools import get_embeddings
+        embeddings = get_embeddings()
+    elif mode != "rules":
+        raise ValueError(f"Unknown CONCEPT_CANONICALIZATION: {mode}")
+    return ConceptCanonicalizer(load_aliases(), embeddings=embeddings)
@@ -0,0 +1,174 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Tuple, Optional
+from src.config import Config
+from src.telemetry.metrics import span, registry
+
+SESSION_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class DriverRegistry:
+    """
+    Process-wide Neo4j drivers, one per (uri, username, database). Every store,
+    connector and pipeline in the process shares the same connection pool instead
+    of opening its own; the driver is closed when its last user releases it.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._drivers: Dict[Tuple[str, str, Optional[str]], Any] = {}
+        self._refs: Dict[int, int] = {}
+        self._keys: Dict[int, Tuple[str, str, Optional[str]]] = {}
+        self._sessions = 0  # Sessions currently checked out (all drivers)
+
+    def acquire(self, uri: str = None, username: str = None, password: str = None, database: str = None):
+        """
+        Returns the shared driver for the connection settings (default: Config.NEO4J_*),
+        creating it with the configured pool size, connection lifetime, fetch size and
+        transaction retry budget. Pair every acquire() with release().
+        """
+        from neo4j import GraphDatabase
+        uri = uri or Config.NEO4J_URI
+        username = username or Config.NEO4J_USERNAME
+        key = (uri, username, database or Config.NEO4J_DATABASE)
+        with self._lock:
+            driver = self._drivers.get(key)
+            if driver is None:
+                driver = GraphDatabase.driver(
+                    uri,
+                    auth=(username, password or Config.NEO4J_PASSWORD),
+                    max_connection_pool_size=Config.NEO4J_MAX_POOL_SIZE,
+                    max_connection_lifetime=Config.NEO4J_CONNECTION_LIFETIME_S,
+                    connection_acquisition_timeout=Config.NEO4J_ACQUIRE_TIMEOUT_S,
+                    max_transaction_retry_time=Config.NEO4J_TX_RETRY_S,
+                    fetch_size=Config.NEO4J_FETCH_SIZE,
+                )
+                self._drivers[key] = driver
+                self._keys[id(driver)] = key
+                registry.inc("neo4j_driver_created")
+            self._refs[id(driver)] = self._refs.get(id(driver), 0) + 1
+            return driver
+
+    def release(self, driver):
+        """
+        Drops one reference; the last one closes the driver and its pool.
+        Drivers not created by the registry are closed directly.
+        """
+        with self._lock:
+            key = self._keys.get(id(driver))
+            if key is None:
+                close = True
+            else:
+                self._refs[id(driver)] -= 1
+                close = self._refs[id(driver)] <= 0
+                if close:
+                    del self._refs[id(driver)], self._keys[id(driver)], self._drivers[key]
+        if close:
+            driver.close()
+
+    def close_all(self):
+        with self._lock:
+            drivers = list(self._drivers.values())
+            self._drivers, self._refs, self._keys = {}, {}, {}
+        for driver in drivers:
+            driver.close()
+
+    @contextmanager
+    def session(self, driver, **kwargs):
+        """
+        driver.session() on the configured database, counted for the pool metrics
+        (the 'neo4j_sessions_in_use' histogram is observed at every checkout).
+        """
+        with self._lock:
+            self._sessions += 1
+            in_use = self._sessions
+        registry.observe("neo4j_sessions_in_use", in_use, buckets=SESSION_BUCKETS)
+        try:
+            with driver.session(database=kwargs.pop("database", Config.NEO4J_DATABASE), **kwargs) as session:
+                yield session
+        finally:
+            with self._lock:
+                self._sessions -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool utilization: open drivers, sessions checked out and, when the driver
+        exposes its pool, connections open / in use against the configured maximum.
+        """
+        with self._lock:
+            drivers = list(self._drivers.values())
+            stats = {"drivers": len(drivers), "sessions_in_use": self._sessions,
+                     "max_pool_size": Config.NEO4J_MAX_POOL_SIZE}
+        opened = in_use = 0
+        for driver in drivers:
+            counts = _pool_counts(driver)
+            if counts is None:
+                return stats
+            opened += counts[0]
+            in_use += counts[1]
+        stats.update(connections_open=opened, connections_in_use=in_use,
+                     utilization=round(in_use / max(Config.NEO4J_MAX_POOL_SIZE * len(drivers), 1), 3))
+        return stats
+
+def _pool_counts(driver) -> Optional[Tuple[int, int]]:
+    # The driver has no public pool API: read its pool when the internals match (neo4j 5/6)
+    pool = getattr(driver, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    lock = getattr(pool, "lock", None)
+    if not isinstance(connections, dict) or lock is None:
+        return None
+    with lock:
+        pooled = [c for address in list(connections) for c in connections[address]]
+    return len(pooled), sum(1 for c in pooled if getattr(c, "in_use", False))
+
+driver_registry = DriverRegistry()
+
+def get_driver(**kwargs):
+    return driver_registry.acquire(**kwargs)
+
+def release_driver(driver):
+    driver_registry.release(driver)
+
+def pool_stats() -> Dict[str, Any]:
+    return driver_registry.stats()
+
+def _execute(session, mode: str, work: Callable, *args, **kwargs):
+    """
+    Managed transaction: the driver retries 'work' on transient errors (deadlocks,
+    leader switches, dropped connections) for up to Config.NEO4J_TX_RETRY_S, so
+    'work' must be idempotent (MERGE-based) and consume its results inside.
+    """
+    attempts = 0
+    started = time.perf_counter()
+
+    def attempt(tx):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            # Time until the transaction began: connection checkout from the pool + BEGIN
+            registry.observe("neo4j_tx_wait_ms", (time.perf_counter() - started) * 1000.0, mode=mode)
+        return work(tx, *args, **kwargs)
+
+    try:
+        with span("neo4j_tx", mode=mode):
+            return getattr(session, f"execute_{mode}")(attempt)
+    finally:
+        if attempts > 1:
+            registry.inc("neo4j_tx_retries", attempts - 1, mode=mode)
+
+def execute_write(session, work: Callable, *args, **kwargs):
+    return _execute(session, "write", work, *args, **kwargs)
+
+def execute_read(session, work: Callable, *args, **kwargs):
+    return _execute(session, "read", work, *args, **kwargs)
+
+def run_write(session, query: str, **params):
+    """
+    One statement in a retried write transaction.
+    """
+    execute_write(session, lambda tx: tx.run(query, **params))
+
+def run_read(session, query: str, **params) -> List[Any]:
+    """
+    One statement in a retried read transaction; returns the records.
+    """
+    return execute_read(session, lambda tx: list(tx.run(query, **params)))
@@ -1,32 +1,72 @@
-from typing import List, Optional
+from typing import List, Dict, Any, Optional
 import json
+import threading
 from pydantic import BaseModel, Field
-from langchain_ollama import ChatOllama
 # from langchain_huggingface import HuggingFaceEmbeddings # Reserved for VectorDB phase
 from src.config import Config
+from src.features.llm_router import invoke_json
+from src.telemetry.metrics import span, registry
 
 class GraphExtractor:
-    def __init__(self):
-        # Initialize Llama 3.1 via Ollama
-        self.llm = ChatOllama(
-            base_url=Config.OLLAMA_BASE_URL,
-            model=Config.LLM_MODEL_NAME,
-            temperature=0,
-            format="json"  # Force JSON mode for Llama 3.1
-        )
+    def __init__(self, gazetteer=None, mode: str = None):
+        # Models are routed per task: Config.LLM_MODEL_EXTRACTION / LLM_MODEL_ROW_EXTRACTION (JSON mode)
+        # Known Concepts are tagged by the gazetteer first (Config.GAZETTEER_MODE); None = LLM only
+        self.gazetteer = gazetteer
+        self.mode = mode or Config.GAZETTEER_MODE
+        self._stats = {"extractions": 0, "llm_calls": 0}
+        self._lock = threading.Lock()
         
-    def extract_concepts(self, text: str) -> List[str]:
+    def extract_concepts(self, text: str, task: str = "extraction") -> List[str]:
         """
         Extracts key concepts from the given text using Local LLM.
+        'task' selects the routed model: "extraction" (chunks, tables) or "row_extraction" (single rows).
+        With a gazetteer, known concepts are matched first and the LLM is skipped when the
+        text names known concepts and no other entity-like token ("skip"), or asked only for the
+        concepts not already tagged ("new_only").
         """
         if not text or len(text.strip()) < 10:
              return []
-        
+        if self.gazetteer is None or self.mode == "off":
+            return self._extract_llm(text, task)
+
+        self.gazetteer.maybe_refresh()
+        with span("gazetteer", task=task):
+            known, unseen = self.gazetteer.scan(text)
+        # Nothing matched and nothing entity-like (e.g. lowercase prose): the scan cannot vouch for it
+        llm = bool(unseen) or not known
+        with self._lock:
+            self._stats["extractions"] += 1
+            self._stats["llm_calls"] += llm
+        registry.inc("concept_extraction", task=task, path="llm" if llm else "gazetteer")
+        if not llm:
+            return known
+        found = self._extract_llm(text, task, known=known if self.mode == "new_only" else None)
+        self.gazetteer.learn(found)
+        return list(dict.fromkeys(known + found))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gazetteer extractions and the fraction answered without an LLM call.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["llm_calls_avoided"] = stats["extractions"] - stats["llm_calls"]
+        stats["avoided_ratio"] = round(stats["llm_calls_avoided"] / stats["extractions"], 3) if stats["extractions"] else 0.0
+        return stats
+
+    def _extract_llm(self, text: str, task: str, known: List[str] = None) -> List[str]:
+        known_section = ""
+        if known:
+            # "new_only": the known names are already tagged, so the model only lists the rest (shorter output)
+            known_section = f"""
+        These concepts are already tagged: {json.dumps(known, ensure_ascii=False)}
+        List ONLY concepts that are NOT in this list (an empty list if there are none).
+        """
         prompt = f"""
         You are an expert Data Scientist. Extract key business concepts and named entities (companies, people, locations) from the text below.
         Return ONLY a JSON object with a single key 'concepts' containing a list of strings.
         Do not add any explanation.
-        
+        {known_section}
         Example:
         {{
             "concepts": ["Samsung Electronics", "Revenue", "2024", "Growth"]
@@ -37,17 +77,12 @@ class GraphExtractor:
         """
         
         try:
-            response_msg = self.llm.invoke(prompt)
-            content = response_msg.content.strip()
-            
-            # Parsing Llama 3.1 JSON output
-            data = json.loads(content)
-            if "concepts" in data and isinstance(data["concepts"], list):
-                return [str(c) for c in data["concepts"]]
-            return []
+            # Parsing Llama 3.1 JSON output (a small routed model falls back to LLM_MODEL_NAME on bad JSON)
+            data, _ = invoke_json(task, prompt, validate=lambda d: isinstance(d.get("concepts", []), list))
+            return [str(c) for c in data.get("concepts", [])]
             
-        except json.JSONDecodeError:
-            print(f"JSON Parse Error. Output was: {content}")
+        except ValueError as e:
+            print(f"JSON Parse Error. {e}")
             return []
         except Exception as e:
             print(f"Error extracting concepts with Llama: {e}")
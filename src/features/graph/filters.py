@@ -0,0 +1,122 @@
+import os
+import re
+import datetime
+from typing import List, Dict, Any, Optional
+
+# Normalized document types (from the file extension; converter "type" values vary)
+DOC_TYPES = {
+    ".pdf": "pdf", ".xlsx": "excel", ".xlsm": "excel", ".xls": "excel", ".csv": "csv",
+    ".hwp": "hwp", ".hwpx": "hwp", ".zip": "hwp", ".txt": "text", ".md": "text",
+}
+
+# Accepted filter keys -> canonical key (planner output is not always consistent)
+_KEYS = {
+    "source": "source", "document": "source", "documents": "source", "filename": "source",
+    "type": "type", "doc_type": "type",
+    "date_from": "date_from", "from": "date_from", "after": "date_from",
+    "date_to": "date_to", "to": "date_to", "before": "date_to",
+    "sheet_name": "sheet_name", "sheet": "sheet_name",
+}
+
+def iso_date(value: Any, end: bool = False) -> Optional[str]:
+    """
+    "YYYY", "YYYY-MM", "YYYY-MM-DD" (or date/datetime/epoch seconds) -> "YYYY-MM-DD".
+    Partial dates expand to the first day, or the last day with 'end'.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and value > 9999:
+        return datetime.date.fromtimestamp(value).isoformat()
+    match = re.fullmatch(r"(\d{4})(?:[-./](\d{1,2}))?(?:[-./](\d{1,2}))?", str(value).strip())
+    if not match:
+        return None
+    year, month, day = int(match.group(1)), match.group(2), match.group(3)
+    try:
+        if day:
+            return datetime.date(year, int(month), int(day)).isoformat()
+        if month:
+            first = datetime.date(year, int(month), 1)
+            if not end:
+                return first.isoformat()
+            following = datetime.date(year + (first.month == 12), first.month % 12 + 1, 1)
+            return (following - datetime.timedelta(days=1)).isoformat()
+        return f"{year}-12-31" if end else f"{year}-01-01"
+    except ValueError:
+        return None
+
+def doc_type(metadata: Dict[str, Any]) -> Optional[str]:
+    ext = metadata.get("extension") or os.path.splitext(str(metadata.get("source") or ""))[1]
+    return DOC_TYPES.get(ext.lower(), "text") if ext else None
+
+def filter_fields(metadata: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """
+    Filterable properties stored on Chunk/Table/Row nodes. The document date is
+    metadata["date"] when the caller provides one, else the file modification date.
+    """
+    return {
+        "doc_type": doc_type(metadata),
+        "doc_date": iso_date(metadata.get("date") or metadata.get("modified")),
+        "sheet_name": metadata.get("sheet_name"),
+    }
+
+def _as_list(value: Any) -> List[str]:
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    return [str(v).strip() for v in values if v is not None and str(v).strip()]
+
+def normalize_filters(raw: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Validates a filter dict (from the planner or an API caller):
+      source:     document ids or name words ("HR handbook"), resolved by resolve_sources
+      type:       pdf | excel | csv | hwp | text (extensions such as "xlsx" are mapped)
+      date_from / date_to: inclusive document date bounds; "year" sets both
+      sheet_name: Excel sheet names
+    Unknown keys and unparsable values are dropped; returns None when nothing is left.
+    """
+    if not isinstance(raw, dict):
+        return None
+    filters: Dict[str, Any] = {}
+    for key, value in raw.items():
+        if key == "year" and iso_date(value):
+            filters.setdefault("date_from", iso_date(value))
+            filters.setdefault("date_to", iso_date(value, end=True))
+            continue
+        key = _KEYS.get(str(key).lower())
+        if key in ("date_from", "date_to"):
+            date = iso_date(value, end=key == "date_to")
+            if date:
+                filters[key] = date
+        elif key == "type":
+            types = {DOC_TYPES.get("." + t.lower().lstrip("."), t.lower()) for t in _as_list(value)}
+            types &= set(DOC_TYPES.values())
+            if types:
+                filters["type"] = sorted(types)
+        elif key is not None and _as_list(value):
+            filters[key] = _as_list(value)
+    return filters or None
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[^\W_]+", text.lower())
+
+def resolve_sources(names: List[str], document_ids: List[str]) -> List[str]:
+    """
+    Document ids matching any of 'names': exact ids, or file names containing
+    every word of the name ("2024 HR handbook" -> ".../HR_Handbook_2024.pdf").
+    """
+    ids = set(document_ids)
+    resolved = set()
+    for name in names:
+        if name in ids:
+            resolved.add(name)
+            continue
+        words = _words(name)
+        if not words:
+            continue
+        for doc_id in document_ids:
+            basename = os.path.basename(doc_id).lower()
+            if all(w in basename for w in words):
+                resolved.add(doc_id)
+    return sorted(resolved)
@@ -0,0 +1,256 @@
+import re
+import time
+import threading
+import unicodedata
+from collections import deque
+from typing import List, Dict, Tuple, Iterable, Optional, Iterator
+from src.config import Config
+from src.features.graph.canonicalizer import clean_name, load_aliases
+
+# Entity-like tokens: Latin words / codes and Hangul words
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9&\-]*|[가-힣]+")
+# Korean particles attached to nouns ("삼성전자는", "매출에서"), longest first
+_PARTICLES = ("에서는", "에서의", "으로는", "으로의", "에게서",
+              "으로", "에서", "에게", "까지", "부터", "보다", "에는", "에도", "와의", "과의", "와는", "과는", "이나", "이며",
+              "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "로", "만")
+_PARTICLE_SET = frozenset(_PARTICLES)
+# Verb / adjective endings ("증가했다", "발표하는", "개선되어"): predicates, not names
+_PREDICATE_ENDINGS = ("다", "하는", "되는", "있는", "없는", "하고", "되고", "하며", "되며", "으며", "하여", "되어",
+                      "해서", "돼서", "하면", "되면", "하지", "했던", "하던", "지만", "면서", "는데", "도록", "하게", "되게")
+# Attributive endings also closing nouns ("제한", "기한"), so only taken from 3+ syllable tokens ("증가한")
+_ATTRIBUTIVE_ENDINGS = ("한", "된", "할", "될")
+# Adverbs, conjunctions and bound nouns of report prose ("전년 대비 크게")
+_FUNCTION_WORDS = frozenset(("그리고", "하지만", "그러나", "또한", "특히", "가장", "매우", "크게", "다시", "함께", "모두",
+                             "각각", "대비", "전년", "이후", "이전", "현재", "기준", "대한", "통해", "위해", "따라",
+                             "관련", "경우", "이상", "이하"))
+# A small automaton of recent additions is rebuilt on change; it is folded into the main one past this size
+_MERGE_EVERY = 2000
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", str(text or ""))).strip().lower()
+
+def _is_word(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+def _candidate(token: str) -> Optional[str]:
+    """
+    Key of a token that may name an entity, or None for plain words
+    and numbers: capitalized / mixed-case words, codes with digits, Hangul
+    nouns (predicates and function words are not candidates).
+    """
+    if _is_hangul(token[0]):
+        if token.endswith(_PREDICATE_ENDINGS) or (len(token) >= 3 and token.endswith(_ATTRIBUTIVE_ENDINGS)):
+            return None
+        for particle in _PARTICLES:
+            if token.endswith(particle):
+                if len(token) - len(particle) >= 2:
+                    token = token[:-len(particle)]
+                    break
+                if len(token) - len(particle) == 1 and len(particle) >= 2:
+                    return None  # One-syllable noun + particle ("것으로")
+        return token if len(token) >= 2 and token not in _FUNCTION_WORDS else None
+    if token.isdigit() or len(token) < 2:
+        return None
+    has_digit = any(ch.isdigit() for ch in token)
+    if token.islower() and not has_digit:
+        return None
+    return token.lower()
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over normalized patterns (pattern -> concept):
+    one pass over the text finds every occurrence of every pattern.
+    """
+    def __init__(self, patterns: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[Tuple[int, str], ...]] = [()]
+        for pattern, concept in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            self.out[node] += ((len(pattern), concept),)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, concept in out[node]:
+                yield i + 1 - length, i + 1, concept
+
+class Gazetteer:
+    """
+    Multi-pattern matcher over the Concept names and aliases already in the graph,
+    used ahead of the LLM extractor:
+      - match():  known concepts in a text (leftmost-longest, word-bounded), in microseconds
+      - scan():   known concepts + entity-like tokens outside them; when the text
+                  names only known concepts, the LLM call can be skipped
+      - learn():  adds the concepts the LLM returned
+    Additions go to a small automaton rebuilt on change (folded into the main one
+    every _MERGE_EVERY patterns); refresh() reloads names written by other workers.
+    """
+    def __init__(self, store=None, aliases: Dict[str, str] = None, min_length: int = None):
+        self.store = store
+        self.min_length = Config.GAZETTEER_MIN_LENGTH if min_length is None else min_length
+        self._main: Dict[str, str] = {}
+        self._recent: Dict[str, str] = {}
+        self._main_automaton = _Automaton({})
+        self._recent_automaton = _Automaton({})
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        if aliases:
+            self.add_aliases(aliases)
+
+    def __len__(self) -> int:
+        return len(self._main) + len(self._recent)
+
+    def add(self, names: Iterable[str]) -> int:
+        """
+        Adds concepts (each its own pattern, plus its cleaned form). Returns patterns added.
+        """
+        return self.add_aliases({name: name for name in names})
+
+    def add_aliases(self, aliases: Dict[str, str]) -> int:
+        """
+        Adds alias -> concept patterns ("삼성전자" -> "Samsung Electronics").
+        """
+        added = 0
+        with self._lock:
+            for alias, concept in aliases.items():
+                for form in {alias, clean_name(alias)}:
+                    pattern = _normalize(form)
+                    if len(pattern) < self.min_length or pattern in self._main or pattern in self._recent:
+                        continue
+                    self._recent[pattern] = concept
+                    added += 1
+            if added:
+                self._dirty = True
+        return added
+
+    def refresh(self) -> int:
+        """
+        Loads Concept names and stored aliases not seen yet (incremental: existing
+        patterns are kept, only the new ones are indexed).
+        """
+        self._refreshed_at = time.monotonic()
+        if self.store is None:
+            return 0
+        aliases = {name: name for name in self.store.list_concepts()}
+        aliases.update(self.store.list_concept_aliases())
+        return self.add_aliases(aliases)
+
+    def maybe_refresh(self):
+        if self.store is not None and Config.GAZETTEER_REFRESH_S and \
+                time.monotonic() - self._refreshed_at >= Config.GAZETTEER_REFRESH_S:
+            self.refresh()
+
+    def _automata(self) -> Tuple[_Automaton, _Automaton]:
+        with self._lock:
+            if self._dirty:
+                if len(self._recent) >= _MERGE_EVERY:
+                    self._main.update(self._recent)
+                    self._recent = {}
+                    self._main_automaton = _Automaton(self._main)
+                self._recent_automaton = _Automaton(self._recent)
+                self._dirty = False
+            return self._main_automaton, self._recent_automaton
+
+    def _match(self, text: str) -> List[Tuple[int, int, str]]:
+        candidates = []
+        for automaton in self._automata():
+            for start, end, concept in automaton.iter_matches(text):
+                # Word boundaries for Latin/digit edges; after a Hangul name only a particle may
+                # follow ("한국은" matches "한국", "한국전력공사는" does not)
+                if _is_word(text[start]) and start and _is_word(text[start - 1]):
+                    continue
+                if _is_word(text[end - 1]) and end < len(text) and _is_word(text[end]):
+                    continue
+                if _is_hangul(text[start]) and start and _is_hangul(text[start - 1]):
+                    continue
+                if _is_hangul(text[end - 1]) and end < len(text) and _is_hangul(text[end]):
+                    suffix_end = end
+                    while suffix_end < len(text) and _is_hangul(text[suffix_end]):
+                        suffix_end += 1
+                    if text[end:suffix_end] not in _PARTICLE_SET:
+                        continue
+                candidates.append((start, end, concept))
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected, covered = [], 0
+        for start, end, concept in candidates:
+            if start >= covered:
+                selected.append((start, end, concept))
+                covered = end
+        return selected
+
+    def match(self, text: str) -> List[str]:
+        """
+        Known concepts mentioned in the text, in order of first mention.
+        """
+        return list(dict.fromkeys(c for _, _, c in self._match(_normalize(text))))
+
+    def scan(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        (known concepts, unseen tokens): entity-like tokens outside the matched
+        concepts. Known concepts and no unseen tokens means the text is unlikely
+        to name anything new; nothing at all (plain lowercase prose) means the
+        scan cannot tell, and the caller should ask the LLM.
+        """
+        normalized = unicodedata.normalize("NFKC", str(text or ""))
+        lowered = re.sub(r"\s+", " ", normalized).lower()
+        cased = re.sub(r"\s+", " ", normalized)
+        if len(cased) != len(lowered):
+            cased = lowered  # Case mapping changed the length: positions would not line up
+        matches = self._match(lowered)
+        unseen, i = [], 0
+        for token in _TOKEN.finditer(cased):
+            # Matches are sorted and disjoint: skip tokens overlapping one
+            while i < len(matches) and matches[i][1] <= token.start():
+                i += 1
+            if i < len(matches) and matches[i][0] < token.end():
+                continue
+            key = _candidate(token.group())
+            if key:
+                unseen.append(key)
+        return list(dict.fromkeys(c for _, _, c in matches)), list(dict.fromkeys(unseen))
+
+    def learn(self, concepts: List[str]) -> int:
+        """
+        After an LLM call: the concepts it returned become patterns. Tokens it did not
+        return stay unseen, so later texts naming them still go to the LLM.
+        """
+        return self.add(concepts)
+
+def create_gazetteer(store=None) -> Optional[Gazetteer]:
+    """
+    Gazetteer over the store's Concepts and the alias file, or None when
+    Config.GAZETTEER_MODE is "off".
+    """
+    if Config.GAZETTEER_MODE == "off":
+        return None
+    gazetteer = Gazetteer(store, aliases=load_aliases())
+    gazetteer.refresh()
+    return gazetteer
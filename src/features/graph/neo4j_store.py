@@ -0,0 +1,488 @@
+import ast
+import json
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType, Table, Row
+from src.features.graph.store import GraphStore
+from src.features.graph.schema import SchemaManager, vector_index
+from src.features.graph.filters import filter_fields
+from src.features.graph.driver import driver_registry, get_driver, release_driver, execute_write, execute_read, run_write, run_read
+
+def _load_row_data(raw: str) -> Dict[str, Any]:
+    # Rows written before data_json was JSON hold a Python dict repr
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        try:
+            return ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return {}
+
+class Neo4jGraphStore(GraphStore):
+    """
+    GraphStore backed by a Neo4j server (Cypher over Bolt). The driver and its
+    connection pool are shared process-wide (driver.py); statements run in managed
+    read/write transactions, retried on transient errors.
+    """
+    name = "neo4j"
+
+    def __init__(self):
+        self.driver = get_driver()
+
+    def close(self):
+        release_driver(self.driver)
+
+    def _session(self):
+        return driver_registry.session(self.driver)
+
+    def ingest_document(self, doc: IngestedDoc, concepts: List[str]):
+        """
+        Ingest a document/chunk and its related concepts into Neo4j.
+        Handles both TEXT and TABLE content types.
+        All statements of one document commit (and are retried) as one transaction.
+        """
+        with self._session() as session:
+            execute_write(session, self._write_document, doc, concepts)
+
+    def _write_document(self, tx, doc: IngestedDoc, concepts: List[str]):
+        # 1. Merge Document Node (Parent)
+        # We assume metadata has 'filename' or 'source' to identify the parent document.
+        doc_source = doc.metadata.get("source", "Unknown_Source")
+        tx.run(
+            """
+            MERGE (d:Document {id: $source})
+            ON CREATE SET d.created_at = timestamp(), d.title = $source
+            """,
+            source=doc_source
+        )
+
+        # 2. Merge Chunk/Table Node
+        if doc.content_type == ContentType.TABLE and doc.table_data:
+            self._ingest_table(tx, doc, doc_source, concepts)
+        else:
+            self._ingest_text_chunk(tx, doc, doc_source, concepts)
+
+    def _ingest_text_chunk(self, tx, doc: IngestedDoc, doc_source: str, concepts: List[str]):
+        """
+        Ingest a standard text chunk.
+        """
+        query = """
+        MATCH (d:Document {id: $doc_source})
+        MERGE (c:Chunk {id: $chunk_id})
+        ON CREATE SET c.text = $text, c.vector_id = $vector_id, c.page = $page
+        SET c.embedding = coalesce($embedding, c.embedding),
+            c.doc_type = $doc_type, c.doc_date = $doc_date, c.sheet_name = $sheet_name
+        MERGE (d)-[:CONTAINS]->(c)
+        
+        WITH c
+        UNWIND $concepts as concept_name
+        MERGE (con:Concept {name: concept_name})
+        MERGE (c)-[:MENTIONS]->(con)
+        """
+        tx.run(
+            query,
+            doc_source=doc_source,
+            chunk_id=doc.id,
+            text=doc.content,
+            vector_id=doc.vector_id or "", # Should be populated if VectorDB is ready, else empty
+            page=doc.metadata.get("page", 1),
+            embedding=doc.embedding,
+            concepts=concepts,
+            **filter_fields(doc.metadata)
+        )
+
+    def _ingest_table(self, tx, doc: IngestedDoc, doc_source: str, concepts: List[str]):
+        """
+        Ingest a Table and its Rows.
+        """
+        table = doc.table_data
+        
+        # 1. Create Table Node and Link to Doc
+        query_table = """
+        MATCH (d:Document {id: $doc_source})
+        MERGE (t:Table {id: $table_id})
+        ON CREATE SET t.caption = $caption, t.markdown = $markdown
+        SET t.embedding = coalesce($embedding, t.embedding),
+            t.doc_type = $doc_type, t.doc_date = $doc_date, t.sheet_name = $sheet_name
+        MERGE (d)-[:CONTAINS]->(t)
+        """
+        fields = filter_fields(doc.metadata)
+        tx.run(
+            query_table,
+            doc_source=doc_source,
+            table_id=table.id,
+            caption=table.caption,
+            markdown=table.markdown,
+            embedding=table.embedding,
+            **fields
+        )
+
+        # 2. Create Rows (Batch Processing)
+        # We assume rows might have individual concepts extracted? 
+        # For now, we link the main *Table* concepts to the Table node, 
+        # but the spec says (:Row)-[:MENTIONS]->(:Concept) acts on Row serialized data.
+        # If we passed 'concepts' here, it's for the whole table doc.
+        
+        # NOTE: To strictly follow spec, we need concepts PER ROW.
+        # But 'ingest_document' receives a list of concepts for the whole doc.
+        # In 'build_graph.py', we should probably iterate rows and extract concepts per row 
+        # if we want row-level granularity.
+        # For this implementation, let's assume 'concepts' passed here are for the *Table Context* (Summary).
+        # AND we will assume the caller might call a separate method for Row concept linking, 
+        # OR we just link these concepts to the Table.
+        
+        # Let's link Table-level concepts first.
+        query_table_concepts = """
+        MATCH (t:Table {id: $table_id})
+        UNWIND $concepts as concept_name
+        MERGE (con:Concept {name: concept_name})
+        MERGE (t)-[:MENTIONS]->(con)
+        """
+        tx.run(query_table_concepts, table_id=table.id, concepts=concepts)
+        
+        # 3. Ingest Rows (without concepts for now, unless extracted separately)
+        # We prepare a list of dicts for UNWIND
+        rows_data = [
+            {
+                "id": r.id, 
+                "index": r.index, 
+                "data": json.dumps(r.data, ensure_ascii=False, default=str), # Neo4j has no map properties: store JSON
+                "serialized_text": r.serialized_text,
+                "embedding": r.embedding
+            }
+            for r in table.rows
+        ]
+        
+        query_rows = """
+        MATCH (t:Table {id: $table_id})
+        UNWIND $rows as row_data
+        MERGE (r:Row {id: row_data.id})
+        ON CREATE SET r.index = row_data.index, r.data_json = row_data.data, r.serialized_text = row_data.serialized_text
+        SET r.embedding = coalesce(row_data.embedding, r.embedding),
+            r.doc_type = $doc_type, r.doc_date = $doc_date, r.sheet_name = $sheet_name
+        MERGE (t)-[:HAS_ROW]->(r)
+        """
+        tx.run(query_rows, table_id=table.id, rows=rows_data, **fields)
+
+    def ingest_row_concepts(self, row_id: str, concepts: List[str]):
+        """
+        Helper to link a Row to Concepts. 
+        Should be called after extracting concepts from row.serialized_text.
+        """
+        query = """
+        MATCH (r:Row {id: $row_id})
+        UNWIND $concepts as concept_name
+        MERGE (con:Concept {name: concept_name})
+        MERGE (r)-[:MENTIONS]->(con)
+        """
+        with self._session() as session:
+            run_write(session, query, row_id=row_id, concepts=concepts)
+
+    # Per label: vector index and the node text / metadata returned as a passage
+    # (centrality is a property materialized by GraphRankJob)
+    _SEARCH_TARGETS = {
+        "Chunk": (lambda: Config.VECTOR_INDEX_NAME, """
+            OPTIONAL MATCH (d:Document)-[:CONTAINS]->(node)
+            RETURN node.id AS id, node.text AS text, score,
+                   {id: node.id, page: node.page, vector_id: node.vector_id, source: d.id,
+                    centrality: node.centrality, doc_type: node.doc_type, doc_date: node.doc_date} AS metadata
+        """),
+        "Row": (lambda: Config.ROW_VECTOR_INDEX_NAME, """
+            OPTIONAL MATCH (d:Document)-[:CONTAINS]->(t:Table)-[:HAS_ROW]->(node)
+            RETURN node.id AS id, node.serialized_text AS text, score,
+                   {id: node.id, table_id: t.id, index: node.index, source: d.id, centrality: node.centrality,
+                    doc_type: node.doc_type, doc_date: node.doc_date, sheet_name: node.sheet_name} AS metadata
+        """),
+        "Table": (lambda: Config.TABLE_VECTOR_INDEX_NAME, """
+            OPTIONAL MATCH (d:Document)-[:CONTAINS]->(node)
+            RETURN node.id AS id, coalesce(node.caption, '') + '\\n' + coalesce(node.markdown, '') AS text, score,
+                   {id: node.id, caption: node.caption, source: d.id, centrality: node.centrality,
+                    doc_type: node.doc_type, doc_date: node.doc_date, sheet_name: node.sheet_name} AS metadata
+        """),
+    }
+
+    @staticmethod
+    def _filtered_match(label: str, filters: Dict[str, Any]) -> str:
+        """
+        MATCH ... WHERE selecting the filtered candidates of one label. Document ids
+        anchor on the Document key; field predicates use the migration 3 range
+        indexes (Rows through their Table, where the fields are indexed).
+        """
+        holder = "t" if label == "Row" else "node"
+        if label == "Row":
+            pattern = "(d:Document)-[:CONTAINS]->(t:Table)-[:HAS_ROW]->(node:Row)"
+        else:
+            pattern = f"(d:Document)-[:CONTAINS]->(node:{label})"
+        conditions = ["node.embedding IS NOT NULL"]
+        if "source" in filters:
+            conditions.append("d.id IN $source")
+        if "type" in filters:
+            conditions.append(f"{holder}.doc_type IN $type")
+        if "sheet_name" in filters:
+            conditions.append(f"{holder}.sheet_name IN $sheet_name")
+        if "date_from" in filters:
+            conditions.append(f"{holder}.doc_date >= $date_from")
+        if "date_to" in filters:
+            conditions.append(f"{holder}.doc_date <= $date_to")
+        return f"MATCH {pattern} WHERE " + " AND ".join(conditions)
+
+    def similarity_search(self,
+                          embedding: List[float],
+                          k: int = 3,
+                          labels: List[str] = None,
+                          filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Approximate nearest neighbours through the vector index of each label, merged by score.
+        With 'filters', the candidates are selected first (indexed MATCH) and scored
+        exactly, instead of post-filtering the global top-k of the vector index.
+        """
+        similarity = "euclidean" if Config.VECTOR_SIMILARITY.lower() == "euclidean" else "cosine"
+
+        def search(tx) -> List[Dict[str, Any]]:
+            hits = []
+            for label in labels or ["Chunk"]:
+                index_name, tail = self._SEARCH_TARGETS[label]
+                if filters:
+                    query = (self._filtered_match(label, filters)
+                             + f" WITH DISTINCT node WITH node, vector.similarity.{similarity}(node.embedding, $embedding) AS score"
+                             + " ORDER BY score DESC LIMIT $k" + tail)
+                    records = tx.run(query, k=k, embedding=embedding, **filters)
+                else:
+                    query = "CALL db.index.vector.queryNodes($index_name, $k, $embedding) YIELD node, score" + tail
+                    records = tx.run(query, index_name=index_name(), k=k, embedding=embedding)
+                hits.extend(
+                    {"id": r["id"], "text": r["text"], "score": float(r["score"]),
+                     "metadata": dict(r["metadata"]), "label": label}
+                    for r in records
+                )
+            return hits
+
+        with self._session() as session:
+            results = execute_read(session, search)
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:k]
+
+    def iter_embeddings(self, label: str = "Chunk", batch_size: int = 1000) -> Iterator[List[Tuple[str, List[float]]]]:
+        if label not in self._SEARCH_TARGETS:
+            raise ValueError(f"Unknown search label: {label}")
+        query = f"""
+        MATCH (n:{label}) WHERE n.embedding IS NOT NULL AND n.id > $after
+        RETURN n.id AS id, n.embedding AS embedding ORDER BY n.id LIMIT $limit
+        """
+        after = ""
+        with self._session() as session:
+            while True:
+                batch = [(r["id"], r["embedding"]) for r in run_read(session, query, after=after, limit=batch_size)]
+                if not batch:
+                    return
+                yield batch
+                after = batch[-1][0]
+
+    def fetch_embeddings(self, ids: List[str], label: str = "Chunk") -> Dict[str, List[float]]:
+        if label not in self._SEARCH_TARGETS:
+            raise ValueError(f"Unknown search label: {label}")
+        query = f"""
+        MATCH (n:{label}) WHERE n.id IN $ids AND n.embedding IS NOT NULL
+        RETURN n.id AS id, n.embedding AS embedding
+        """
+        with self._session() as session:
+            return {r["id"]: r["embedding"] for r in run_read(session, query, ids=list(ids))}
+
+    def chunks_missing_embeddings(self, limit: int = 256) -> List[Tuple[str, str]]:
+        query = """
+        MATCH (c:Chunk) WHERE c.embedding IS NULL AND c.text IS NOT NULL
+        RETURN c.id AS id, c.text AS text
+        LIMIT $limit
+        """
+        with self._session() as session:
+            return [(r["id"], r["text"]) for r in run_read(session, query, limit=limit)]
+
+    def set_chunk_embeddings(self, items: List[Tuple[str, List[float]]]):
+        query = """
+        UNWIND $items AS item
+        MATCH (c:Chunk {id: item.id})
+        CALL db.create.setNodeVectorProperty(c, 'embedding', item.embedding)
+        """
+        with self._session() as session:
+            run_write(session, query, items=[{"id": i, "embedding": e} for i, e in items])
+
+    def ensure_vector_index(self, dimension: int = None):
+        index = vector_index(Config.VECTOR_INDEX_NAME, "Chunk", "embedding",
+                             dimension or Config.EMBEDDING_DIMENSION, Config.VECTOR_SIMILARITY)
+        with self._session() as session:
+            session.run(index["statement"])  # Schema commands run auto-commit
+
+    def ensure_schema(self) -> Optional[Dict[str, Any]]:
+        """
+        Constraints, lookup indexes and the vector index (see src/features/graph/schema.py).
+        """
+        return SchemaManager(self.driver).apply()
+
+    def list_documents(self) -> List[str]:
+        with self._session() as session:
+            return [r["id"] for r in run_read(session, "MATCH (d:Document) RETURN d.id AS id ORDER BY id")]
+
+    def list_concepts(self) -> List[str]:
+        query = """
+        MATCH (c:Concept)
+        RETURN c.name AS name, COUNT { (c)<-[:MENTIONS]-() } AS mentions
+        ORDER BY mentions DESC, name
+        """
+        with self._session() as session:
+            return [r["name"] for r in run_read(session, query)]
+
+    def list_concept_aliases(self) -> Dict[str, str]:
+        query = """
+        MATCH (c:Concept) WHERE c.aliases IS NOT NULL
+        UNWIND c.aliases AS alias
+        RETURN alias, c.name AS concept
+        """
+        with self._session() as session:
+            return {r["alias"]: r["concept"] for r in run_read(session, query)}
+
+    def list_tables(self) -> List[Table]:
+        query = """
+        MATCH (d:Document)-[:CONTAINS]->(t:Table)
+        OPTIONAL MATCH (t)-[:HAS_ROW]->(r:Row)
+        WITH d, t, r ORDER BY r.index
+        RETURN t.id AS id, t.caption AS caption, t.markdown AS markdown, d.id AS source,
+               collect({id: r.id, index: r.index, data: r.data_json, text: r.serialized_text}) AS rows
+        """
+        tables = []
+        with self._session() as session:
+            for record in run_read(session, query):
+                rows = [Row(id=r["id"], index=r["index"] or 0, data=_load_row_data(r["data"]), serialized_text=r["text"] or "")
+                        for r in record["rows"] if r["id"] is not None]
+                tables.append(Table(id=record["id"], caption=record["caption"] or "", markdown=record["markdown"] or "",
+                                    rows=rows, metadata={"source": record["source"]}))
+        return tables
+
+    def merge_concepts(self, mapping: Dict[str, str], batch_size: int = 500) -> Dict[str, int]:
+        pairs = [{"alias": a, "canonical": c} for a, c in mapping.items() if a != c]
+        counts = """
+        MATCH (c:Concept)
+        RETURN count(c) AS concepts, sum(COUNT { (c)<-[:MENTIONS]-() }) AS edges
+        """
+        query = """
+        UNWIND $pairs AS p
+        MATCH (a:Concept {name: p.alias})
+        MERGE (c:Concept {name: p.canonical})
+        SET c.aliases = reduce(acc = coalesce(c.aliases, []), x IN coalesce(a.aliases, []) + [p.alias] |
+                               CASE WHEN x IN acc THEN acc ELSE acc + x END)
+        WITH a, c
+        CALL {
+            WITH a, c
+            MATCH (s)-[r:MENTIONS]->(a)
+            MERGE (s)-[:MENTIONS]->(c)
+            DELETE r
+        }
+        DETACH DELETE a
+        """
+        with self._session() as session:
+            before = run_read(session, counts)[0]
+            for start in range(0, len(pairs), batch_size):
+                run_write(session, query, pairs=pairs[start:start + batch_size])
+            after = run_read(session, counts)[0]
+        return {
+            "concepts_before": before["concepts"], "edges_before": before["edges"],
+            "concepts_after": after["concepts"], "edges_after": after["edges"],
+        }
+
+    def iter_mentions(self, new_only: bool = False, batch_size: int = 1000) -> Iterator[List[Tuple[str, str, List[str], List[str]]]]:
+        # Paged per label on the unique 'id' (index seek + index order, like iter_embeddings);
+        # a page is 'batch_size' nodes, those without (new) mentions are dropped here
+        for label in ("Chunk", "Table", "Row"):
+            query = f"""
+            MATCH (s:{label}) WHERE s.id > $after
+            WITH s ORDER BY s.id LIMIT $limit
+            OPTIONAL MATCH (s)-[r:MENTIONS]->(c:Concept)
+            WITH s, collect(c.name) AS concepts, collect(CASE WHEN r.ranked IS NULL THEN c.name END) AS new
+            RETURN s.id AS id, concepts, new ORDER BY id
+            """
+            after = ""
+            with self._session() as session:
+                while True:
+                    records = run_read(session, query, after=after, limit=batch_size)
+                    if not records:
+                        break
+                    after = records[-1]["id"]
+                    batch = [(r["id"], label, r["concepts"], r["new"]) for r in records
+                             if r["concepts"] and (r["new"] or not new_only)]
+                    if batch:
+                        yield batch
+
+    def load_graph_rank(self) -> Tuple[Dict[Tuple[str, str], float], Dict[str, float]]:
+        with self._session() as session:
+            pairs = {(r["a"], r["b"]): r["weight"] for r in run_read(
+                session, "MATCH (a:Concept)-[e:CO_OCCURS]->(b:Concept) RETURN a.name AS a, b.name AS b, e.weight AS weight"
+            )}
+            scores = {r["name"]: r["pagerank"] for r in run_read(
+                session, "MATCH (c:Concept) WHERE c.pagerank IS NOT NULL RETURN c.name AS name, c.pagerank AS pagerank"
+            )}
+        return pairs, scores
+
+    def save_graph_rank(self,
+                        cooccurrence: Dict[Tuple[str, str], float],
+                        concept_scores: Dict[str, Tuple[int, float]],
+                        node_scores: List[Tuple[str, str, float]],
+                        ranked: List[Tuple[str, str, List[str]]],
+                        replace: bool = False,
+                        batch_size: int = 1000):
+        pairs = [{"a": a, "b": b, "weight": w} for (a, b), w in cooccurrence.items()]
+        concepts = [{"name": n, "degree": d, "pagerank": p} for n, (d, p) in concept_scores.items()]
+        upsert_pairs = """
+        UNWIND $pairs AS p
+        MATCH (a:Concept {name: p.a}), (b:Concept {name: p.b})
+        MERGE (a)-[e:CO_OCCURS]->(b)
+        SET e.weight = coalesce(e.weight, 0) + p.weight
+        """
+        set_concepts = """
+        UNWIND $rows AS row
+        MATCH (c:Concept {name: row.name})
+        SET c.degree = row.degree, c.pagerank = row.pagerank
+        """
+        with self._session() as session:
+            if replace:
+                # Batched server-side (CALL ... IN TRANSACTIONS needs an auto-commit transaction), so a
+                # full recompute does not build one transaction over every edge of a large graph
+                session.run(f"""
+                MATCH (:Concept)-[e:CO_OCCURS]->(:Concept)
+                CALL {{ WITH e DELETE e }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+                """).consume()
+                for label in ("Chunk", "Table", "Row"):
+                    session.run(f"""
+                    MATCH (n:{label}) WHERE n.centrality IS NOT NULL
+                    CALL {{ WITH n REMOVE n.centrality }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+                    """).consume()
+            for start in range(0, len(pairs), batch_size):
+                run_write(session, upsert_pairs, pairs=pairs[start:start + batch_size])
+            for start in range(0, len(concepts), batch_size):
+                run_write(session, set_concepts, rows=concepts[start:start + batch_size])
+            # Labelled MATCH so the node key constraints are used
+            for label in sorted({n[1] for n in node_scores} | {r[1] for r in ranked}):
+                scores = [{"id": i, "centrality": c} for i, l, c in node_scores if l == label]
+                for start in range(0, len(scores), batch_size):
+                    run_write(
+                        session, f"UNWIND $rows AS row MATCH (n:{label} {{id: row.id}}) SET n.centrality = row.centrality",
+                        rows=scores[start:start + batch_size]
+                    )
+                marks = [{"id": i, "concepts": c} for i, l, c in ranked if l == label]
+                for start in range(0, len(marks), batch_size):
+                    run_write(
+                        session, f"""
+                        UNWIND $rows AS row
+                        MATCH (n:{label} {{id: row.id}})-[r:MENTIONS]->(c:Concept) WHERE c.name IN row.concepts
+                        SET r.ranked = true
+                        """,
+                        rows=marks[start:start + batch_size]
+                    )
+
+    def count_nodes(self) -> Dict[str, int]:
+        counts = {}
+        with self._session() as session:
+            for label in ["Document", "Chunk", "Table", "Row", "Concept"]:
+                records = run_read(session, f"MATCH (n:{label}) RETURN count(n) AS n")
+                counts[label] = records[0]["n"] if records else 0
+        return counts
@@ -0,0 +1,183 @@
+from typing import List, Tuple, Dict, Optional, Callable, Iterable, Any
+import numpy as np
+
+QUANTIZATION_MODES = ("binary", "int8")
+
+# Rows scored per block in the int8 pass (the float32 temporary stays cache-resident)
+_BLOCK = 256
+# int8: vectors needed to calibrate per-dimension scales; until then the fixed [-1, 1] range of
+# normalized vectors is used, so a small first batch cannot clip everything after it. The scales
+# are recalibrated each time the index doubles, up to a bulk load batch (4096) worth of vectors.
+_CALIBRATION_SAMPLE = 256
+_CALIBRATION_MAX = 4096
+
+def _as_vector(value: Any) -> np.ndarray:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(a: np.ndarray) -> np.ndarray:
+        return _POPCOUNT_TABLE[a]
+
+class QuantizedIndex:
+    """
+    Two-stage in-process vector index that keeps only compressed codes in memory:
+      - binary: sign bits packed 8 per byte (1024 dims -> 128 B, 32x smaller), Hamming first pass
+      - int8:   per-dimension scaled int8 codes (1024 dims -> 1 KB, 4x smaller), dot-product first pass
+    The top 'rescore_multiplier * k' candidates are rescored with their full-precision
+    vectors, read on demand through 'fetch_vectors' (e.g. from SQLite blobs or Neo4j).
+    Same interface as the float index (load / add / search / loaded).
+    """
+    def __init__(self,
+                 mode: str = "binary",
+                 fetch_vectors: Callable[[List[str]], Dict[str, Any]] = None,
+                 rescore_multiplier: int = 10):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode} (use {', '.join(QUANTIZATION_MODES)})")
+        self.mode = mode
+        self.fetch_vectors = fetch_vectors
+        self.rescore_multiplier = rescore_multiplier
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.codes: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None  # int8: per-dimension float step
+        self.calibrated_on = 0  # int8: vectors the current scales were calibrated on (0 = fixed range)
+        self.loaded = False
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self.mode == "binary":
+            return np.packbits(vectors > 0, axis=1)
+        if self.scale is None:
+            self.scale = np.full(vectors.shape[1], 1.0 / 127.0, dtype=np.float32)
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def _calibrate(self, vectors: np.ndarray):
+        """
+        int8: per-dimension scales from the vectors indexed so far plus 'vectors'.
+        Existing codes are re-encoded from their full-precision vectors (read through
+        'fetch_vectors'), or from the decoded codes when those are not available.
+        """
+        existing = None
+        if self.codes is not None:
+            stored = self.fetch_vectors(list(self.ids)) if self.fetch_vectors is not None else {}
+            decoded = self.codes.astype(np.float32) * self.scale
+            existing = np.vstack([_normalize(_as_vector(stored[cid])) if stored.get(cid) is not None else decoded[i]
+                                  for i, cid in enumerate(self.ids)])
+        sample = vectors if existing is None else np.vstack([existing, vectors])
+        peak = np.abs(sample).max(axis=0)
+        peak[peak == 0] = 1.0
+        self.scale = (peak / 127.0).astype(np.float32)
+        if existing is not None:
+            self.codes = self._encode(existing)
+        self.calibrated_on = len(sample)
+
+    def _append(self, ids: List[str], vectors: np.ndarray):
+        vectors = _normalize(vectors.astype(np.float32, copy=False))
+        total = len(self.ids) + len(ids)
+        if self.mode == "int8" and self.calibrated_on < _CALIBRATION_MAX and \
+                total >= max(_CALIBRATION_SAMPLE, 2 * self.calibrated_on):
+            self._calibrate(vectors)
+        block = self._encode(vectors)
+        # Ids before codes: a concurrent first_pass only scores rows it can resolve
+        start = len(self.ids)
+        self.ids.extend(ids)
+        self.positions.update((cid, start + i) for i, cid in enumerate(ids))
+        self.codes = block if self.codes is None else np.vstack([self.codes, block])
+
+    def load(self, rows: Iterable[Tuple[str, Any]], batch_size: int = 4096):
+        """
+        Builds the codes from (id, vector or float32 blob) rows, batch by batch, so the
+        full-precision matrix is never held in memory.
+        """
+        self.ids, self.positions, self.codes, self.scale, self.calibrated_on = [], {}, None, None, 0
+        batch_ids, batch_vecs = [], []
+        for node_id, value in rows:
+            batch_ids.append(node_id)
+            batch_vecs.append(_as_vector(value))
+            if len(batch_ids) >= batch_size:
+                self._append(batch_ids, np.vstack(batch_vecs))
+                batch_ids, batch_vecs = [], []
+        if batch_ids:
+            self._append(batch_ids, np.vstack(batch_vecs))
+        self.loaded = True
+
+    def add(self, items: List[Tuple[str, List[float]]]):
+        if not self.loaded or not items:
+            return
+        new_ids, new_vecs = [], []
+        for cid, emb in items:
+            vec = _as_vector(emb)[None, :]
+            if cid in self.positions:
+                self.codes[self.positions[cid]] = self._encode(_normalize(vec))[0]
+            else:
+                new_ids.append(cid)
+                new_vecs.append(vec[0])
+        if new_vecs:
+            self._append(new_ids, np.vstack(new_vecs))
+
+    def first_pass(self, embedding: List[float], n: int, ids: List[str] = None) -> List[Tuple[str, float]]:
+        """
+        Top-n ids by approximate similarity (negative Hamming distance or int8 dot product),
+        over all codes or only those of 'ids'.
+        """
+        codes, scale = self.codes, self.scale  # Snapshot: add() may append concurrently
+        if codes is None or not self.ids:
+            return []
+        rows = None
+        if ids is not None:
+            rows = np.fromiter((p for p in (self.positions.get(i) for i in ids) if p is not None and p < len(codes)),
+                               dtype=np.int64)
+            if not len(rows):
+                return []
+            codes = codes[rows]
+        q = _normalize(_as_vector(embedding)[None, :])
+        if self.mode == "binary":
+            q_bits = np.packbits(q > 0, axis=1)[0]
+            scores = -_popcount(np.bitwise_xor(codes, q_bits)).sum(axis=1, dtype=np.int32)
+        else:
+            q_scaled = (q[0] * scale).astype(np.float32)
+            scores = np.empty(len(codes), dtype=np.float32)
+            for start in range(0, len(codes), _BLOCK):
+                block = codes[start:start + _BLOCK]
+                scores[start:start + len(block)] = block.astype(np.float32) @ q_scaled
+        n = min(n, len(codes))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        positions = top if rows is None else rows[top]
+        return [(self.ids[p], float(scores[i])) for p, i in zip(positions, top)]
+
+    def search(self, embedding: List[float], k: int, candidates: int = None, ids: List[str] = None) -> List[Tuple[str, float]]:
+        """
+        Approximate first pass over 'candidates' (default k * rescore_multiplier), then
+        exact cosine rescoring. Without 'fetch_vectors' the first-pass order is returned.
+        'ids' restricts the search to those nodes (pre-filtered search).
+        """
+        n = max(k, candidates or k * self.rescore_multiplier)
+        hits = self.first_pass(embedding, n, ids=ids)
+        if not hits or self.fetch_vectors is None:
+            return hits[:k]
+        vectors = self.fetch_vectors([h[0] for h in hits])
+        ids = [h[0] for h in hits if vectors.get(h[0]) is not None]
+        if not ids:
+            return []
+        matrix = _normalize(np.vstack([_as_vector(vectors[i]) for i in ids]))
+        scores = matrix @ _normalize(_as_vector(embedding))
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(ids[i], float(scores[i])) for i in order]
+
+    def memory_bytes(self) -> int:
+        """
+        Bytes held by the codes (and int8 scale), excluding the id list.
+        """
+        total = self.codes.nbytes if self.codes is not None else 0
+        return total + (self.scale.nbytes if self.scale is not None else 0)
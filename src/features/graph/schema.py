@@ -0,0 +1,222 @@
+import time
+from typing import List, Dict, Any, Optional
+from src.config import Config
+from src.features.graph.driver import driver_registry, run_write, run_read
+
+def unique_constraint(name: str, label: str, prop: str) -> Dict[str, Any]:
+    return {
+        "kind": "constraint", "name": name, "label": label, "properties": [prop],
+        "statement": f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE",
+    }
+
+def lookup_index(name: str, entity: str) -> Dict[str, Any]:
+    # Token lookup indexes back MATCH (n:Label) / [:TYPE] scans (count_nodes, label filters)
+    pattern = "(n) ON EACH labels(n)" if entity == "NODE" else "()-[r]-() ON EACH type(r)"
+    return {
+        "kind": "lookup", "name": name, "entity": entity,
+        "statement": f"CREATE LOOKUP INDEX {name} IF NOT EXISTS FOR {pattern}",
+    }
+
+def range_index(name: str, label: str, prop: str) -> Dict[str, Any]:
+    return {
+        "kind": "range", "name": name, "label": label, "properties": [prop],
+        "statement": f"CREATE RANGE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})",
+    }
+
+def vector_index(name: str, label: str, prop: str, dimensions: int, similarity: str) -> Dict[str, Any]:
+    return {
+        "kind": "vector", "name": name, "label": label, "properties": [prop],
+        "dimensions": int(dimensions), "similarity": similarity.lower(),
+        "statement": (
+            f"CREATE VECTOR INDEX {name} IF NOT EXISTS FOR (n:{label}) ON n.{prop} "
+            f"OPTIONS {{indexConfig: {{`vector.dimensions`: {int(dimensions)}, "
+            f"`vector.similarity_function`: '{similarity.lower()}'}}}}"
+        ),
+    }
+
+class Migration:
+    """
+    One schema version: the constraints/indexes it adds. Every statement is
+    IF NOT EXISTS, so re-applying a migration is a no-op.
+    """
+    def __init__(self, version: int, description: str, objects: List[Dict[str, Any]]):
+        self.version = version
+        self.description = description
+        self.objects = objects
+
+def build_migrations(dimensions: int = None, similarity: str = None) -> List[Migration]:
+    """
+    Ordered schema history. Append new versions; never edit an applied one.
+    """
+    return [
+        Migration(1, "Node keys, token lookup indexes and the Chunk vector index", [
+            # MERGE keys used by the stores: without these every MERGE is a label scan
+            unique_constraint("document_id", "Document", "id"),
+            unique_constraint("chunk_id", "Chunk", "id"),
+            unique_constraint("table_id", "Table", "id"),
+            unique_constraint("row_id", "Row", "id"),
+            unique_constraint("concept_name", "Concept", "name"),
+            lookup_index("node_label_lookup", "NODE"),
+            lookup_index("rel_type_lookup", "RELATIONSHIP"),
+            vector_index(Config.VECTOR_INDEX_NAME, "Chunk", "embedding",
+                         dimensions or Config.EMBEDDING_DIMENSION, similarity or Config.VECTOR_SIMILARITY),
+        ]),
+        Migration(2, "Vector indexes for Row serialized_text and Table caption embeddings", [
+            vector_index(Config.ROW_VECTOR_INDEX_NAME, "Row", "embedding",
+                         dimensions or Config.EMBEDDING_DIMENSION, similarity or Config.VECTOR_SIMILARITY),
+            vector_index(Config.TABLE_VECTOR_INDEX_NAME, "Table", "embedding",
+                         dimensions or Config.EMBEDDING_DIMENSION, similarity or Config.VECTOR_SIMILARITY),
+        ]),
+        Migration(3, "Range indexes on metadata filter fields (pre-filtered search)", [
+            # Rows are filtered through their Table, so Row fields are stored but not indexed
+            range_index(f"{label.lower()}_{prop}", label, prop)
+            for label, prop in [("Chunk", "doc_type"), ("Chunk", "doc_date"), ("Table", "doc_type"),
+                                ("Table", "doc_date"), ("Table", "sheet_name")]
+        ]),
+    ]
+
+class SchemaManager:
+    """
+    Applies versioned Neo4j schema migrations and reports drift between the
+    expected schema and what the database actually has.
+    Applied versions are recorded as (:SchemaMigration {version}) nodes. Sessions are
+    opened on the configured database (Config.NEO4J_DATABASE), the same one the stores write to.
+    """
+    def __init__(self, driver, migrations: List[Migration] = None):
+        self.driver = driver
+        self.migrations = sorted(migrations or build_migrations(), key=lambda m: m.version)
+
+    @property
+    def target_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def expected_objects(self) -> List[Dict[str, Any]]:
+        return [obj for m in self.migrations for obj in m.objects]
+
+    def _session(self):
+        return driver_registry.session(self.driver)
+
+    def current_version(self) -> int:
+        with self._session() as session:
+            records = run_read(session, "MATCH (m:SchemaMigration) RETURN max(m.version) AS version")
+        return (records[0]["version"] if records else None) or 0
+
+    def apply(self, await_indexes_s: int = 300) -> Dict[str, Any]:
+        """
+        Runs every migration's statements (cheap and idempotent, so objects dropped
+        since the last run are restored), records newly applied versions, waits for
+        the indexes to come online and returns the drift report.
+        """
+        current = self.current_version()
+        applied, failed = [], []
+        with self._session() as session:
+            for migration in self.migrations:
+                errors = []
+                for obj in migration.objects:
+                    try:
+                        run_write(session, obj["statement"])
+                    except Exception as e:
+                        # e.g. duplicate keys left by unconstrained MERGEs block a uniqueness constraint
+                        errors.append({"name": obj["name"], "error": str(e)})
+                failed.extend(errors)
+                if migration.version > current and not errors:
+                    run_write(
+                        session,
+                        """
+                        MERGE (m:SchemaMigration {version: $version})
+                        ON CREATE SET m.description = $description, m.applied_at = $applied_at
+                        """,
+                        version=migration.version, description=migration.description,
+                        applied_at=int(time.time() * 1000)
+                    )
+                    applied.append(migration.version)
+            if await_indexes_s:
+                run_read(session, "CALL db.awaitIndexes($timeout)", timeout=await_indexes_s)
+
+        report = self.check()
+        report["applied"] = applied
+        report["failed"] = failed
+        report["drift"] = report["drift"] or bool(failed)
+        return report
+
+    def check(self) -> Dict[str, Any]:
+        """
+        Compares the expected objects with SHOW CONSTRAINTS / SHOW INDEXES.
+        Objects are matched by definition (not name), so equivalent objects created
+        under another name (e.g. by LangChain) count as present.
+        - missing:     expected but absent
+        - mismatched:  present with different settings (e.g. vector dimensions)
+        - not_online:  present but still populating or failed
+        - unexpected:  user-defined constraints/indexes not in the schema (informational)
+        """
+        with self._session() as session:
+            constraints = [dict(r) for r in run_read(
+                session, "SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties")]
+            indexes = [dict(r) for r in run_read(
+                session, "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, options, state, owningConstraint")]
+
+        report = {
+            "version": self.current_version(),
+            "target_version": self.target_version,
+            "missing": [], "mismatched": [], "not_online": [], "unexpected": [],
+        }
+        matched = set()
+        for obj in self.expected_objects():
+            found = self._find(obj, constraints, indexes)
+            if found is None:
+                report["missing"].append(obj["name"])
+                continue
+            matched.add(found.get("name"))
+            if obj["kind"] == "vector":
+                config = (found.get("options") or {}).get("indexConfig") or {}
+                actual = {
+                    "dimensions": config.get("vector.dimensions"),
+                    "similarity": str(config.get("vector.similarity_function", "")).lower(),
+                }
+                if actual["dimensions"] != obj["dimensions"] or actual["similarity"] != obj["similarity"]:
+                    report["mismatched"].append({
+                        "name": found.get("name"),
+                        "expected": {"dimensions": obj["dimensions"], "similarity": obj["similarity"]},
+                        "actual": actual,
+                    })
+            if found.get("state") not in (None, "ONLINE"):
+                report["not_online"].append({"name": found.get("name"), "state": found.get("state")})
+
+        for item in constraints + indexes:
+            name = item.get("name")
+            # Indexes owned by constraints are reported through the constraint
+            if name in matched or item.get("owningConstraint") or item.get("labelsOrTypes") == ["SchemaMigration"]:
+                continue
+            report["unexpected"].append(name)
+
+        report["drift"] = bool(
+            report["missing"] or report["mismatched"] or report["not_online"]
+            or report["version"] < report["target_version"]
+        )
+        return report
+
+    @staticmethod
+    def _find(obj: Dict[str, Any], constraints: List[Dict], indexes: List[Dict]) -> Optional[Dict]:
+        if obj["kind"] == "constraint":
+            for c in constraints:
+                if ("UNIQUENESS" in str(c.get("type", "")).upper()
+                        and c.get("labelsOrTypes") == [obj["label"]] and c.get("properties") == obj["properties"]):
+                    return c
+            return None
+        for i in indexes:
+            if obj["kind"] == "lookup":
+                if i.get("type") == "LOOKUP" and i.get("entityType") == obj["entity"]:
+                    return i
+            elif (i.get("type") == obj["kind"].upper()
+                  and i.get("labelsOrTypes") == [obj["label"]] and i.get("properties") == obj["properties"]):
+                return i
+        return None
+
+def print_drift_report(report: Dict[str, Any]):
+    status = "⚠️ Schema drift detected" if report["drift"] else "✅ Schema up to date"
+    print(f"{status} (version {report['version']}/{report['target_version']})")
+    if report.get("applied"):
+        print(f"   - Applied migrations: {report['applied']}")
+    for key in ("failed", "missing", "mismatched", "not_online", "unexpected"):
+        if report.get(key):
+            print(f"   - {key}: {report[key]}")
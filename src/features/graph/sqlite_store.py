@@ -0,0 +1,594 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+import numpy as np
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType, Table, Row
+from src.features.graph.store import GraphStore
+from src.features.graph.quantized_index import QuantizedIndex
+from src.features.graph.filters import filter_fields
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    created_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL REFERENCES documents(id),  -- (:Document)-[:CONTAINS]->(:Chunk)
+    text TEXT,
+    vector_id TEXT,
+    page INTEGER,
+    embedding BLOB,                                      -- float32 vector, NULL until embedded
+    doc_type TEXT,                                       -- Filter fields (see filters.py)
+    doc_date TEXT,
+    sheet_name TEXT
+);
+CREATE TABLE IF NOT EXISTS tables (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL REFERENCES documents(id),  -- (:Document)-[:CONTAINS]->(:Table)
+    caption TEXT,
+    markdown TEXT,
+    embedding BLOB,                                      -- caption vector (single-pass ingestion)
+    doc_type TEXT,
+    doc_date TEXT,
+    sheet_name TEXT
+);
+CREATE TABLE IF NOT EXISTS rows (
+    id TEXT PRIMARY KEY,
+    table_id TEXT NOT NULL REFERENCES tables(id),        -- (:Table)-[:HAS_ROW]->(:Row)
+    idx INTEGER,
+    data_json TEXT,
+    serialized_text TEXT,
+    embedding BLOB,                                      -- serialized_text vector (single-pass ingestion)
+    doc_type TEXT,
+    doc_date TEXT,
+    sheet_name TEXT
+);
+CREATE TABLE IF NOT EXISTS concepts (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS concept_aliases (               -- Names merged into a canonical Concept
+    alias TEXT PRIMARY KEY,
+    concept TEXT NOT NULL REFERENCES concepts(name)
+);
+CREATE TABLE IF NOT EXISTS mentions (                     -- (:Chunk|:Table|:Row)-[:MENTIONS]->(:Concept)
+    source_id TEXT NOT NULL,
+    source_label TEXT NOT NULL,
+    concept TEXT NOT NULL REFERENCES concepts(name),
+    ranked INTEGER NOT NULL DEFAULT 0,                    -- 1 once counted by a graph rank run
+    PRIMARY KEY (source_id, concept)
+);
+CREATE TABLE IF NOT EXISTS concept_cooccurrence (         -- (:Concept)-[:CO_OCCURS {weight}]->(:Concept), a < b
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS concept_scores (
+    name TEXT PRIMARY KEY,
+    degree INTEGER,
+    pagerank REAL
+);
+CREATE TABLE IF NOT EXISTS node_scores (                  -- Chunk/Table/Row centrality (ranking feature)
+    id TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    centrality REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks(document_id);
+CREATE INDEX IF NOT EXISTS idx_tables_document ON tables(document_id);
+CREATE INDEX IF NOT EXISTS idx_rows_table ON rows(table_id);
+CREATE INDEX IF NOT EXISTS idx_mentions_concept ON mentions(concept);
+"""
+
+# PRAGMA user_version of the current layout; older files are upgraded in _migrate()
+SCHEMA_VERSION = 3
+
+def _to_blob(embedding: Optional[List[float]]) -> Optional[bytes]:
+    return np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+
+class _VectorIndex:
+    """
+    In-process exact cosine index over one label's embeddings (normalized float32 matrix).
+    Built lazily from SQLite and extended in place as new embeddings are written
+    (here or, picked up before the next search, by other connections).
+    """
+    def __init__(self):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+        self.loaded = False
+
+    def load(self, rows: List[Tuple[str, bytes]]):
+        rows = list(rows)
+        self.ids = [r[0] for r in rows]
+        self.positions = {cid: i for i, cid in enumerate(self.ids)}
+        if rows:
+            self.matrix = self._normalize(np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows]))
+        else:
+            self.matrix = None
+        self.loaded = True
+
+    def add(self, items: List[Tuple[str, List[float]]]):
+        if not self.loaded or not items:
+            return
+        new_ids, new_vecs = [], []
+        for cid, emb in items:
+            vec = self._normalize(np.asarray(emb, dtype=np.float32)[None, :])[0]
+            position = self.positions.get(cid)
+            if position is not None and position < len(self.ids):
+                self.matrix[position] = vec
+            elif position is not None:
+                new_vecs[position - len(self.ids)] = vec  # Repeated in this batch
+            else:
+                self.positions[cid] = len(self.ids) + len(new_ids)
+                new_ids.append(cid)
+                new_vecs.append(vec)
+        if new_vecs:
+            block = np.vstack(new_vecs)
+            # Ids before the matrix: a concurrent search only scores rows it can resolve
+            self.ids.extend(new_ids)
+            self.matrix = block if self.matrix is None else np.vstack([self.matrix, block])
+
+    def search(self, embedding: List[float], k: int, ids: List[str] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k by cosine; with 'ids' only those rows are scored (pre-filtered search).
+        """
+        matrix = self.matrix  # Snapshot: writes may append concurrently (searches run outside the store lock)
+        if matrix is None or not self.ids:
+            return []
+        q = self._normalize(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+        if ids is None:
+            rows = None
+            scores = matrix @ q
+        else:
+            rows = np.sort(np.fromiter((p for p in (self.positions.get(i) for i in ids) if p is not None and p < len(matrix)),
+                                       dtype=np.int64))
+            if not len(rows):
+                return []
+            # Gathering a large subset costs more than scoring everything
+            scores = (matrix @ q)[rows] if len(rows) * 4 > len(matrix) else matrix[rows] @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        positions = top if rows is None else rows[top]
+        return [(self.ids[p], float(scores[i])) for p, i in zip(positions, top)]
+
+    def memory_bytes(self) -> int:
+        return self.matrix.nbytes if self.matrix is not None else 0
+
+    @staticmethod
+    def _normalize(m: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return m / norms
+
+class SqliteGraphStore(GraphStore):
+    """
+    Embedded GraphStore: nodes and edges in a SQLite file, Chunk vectors searched in-process.
+    No server round trips; intended for single-box deployments.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = None, quantization: str = None):
+        self.path = path or Config.SQLITE_DB_PATH
+        self.quantization = (quantization or Config.VECTOR_QUANTIZATION).lower()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=OFF")  # MERGE semantics: rows may be linked before parents exist
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.RLock()
+        # One in-process index per searchable label
+        self._indexes = {label: self._make_index(label) for label in self._SEARCH_SQL}
+        # Per label: last rowid read into the index, rowids read before their embedding
+        # was written, and the PRAGMA data_version it was synced at (changes when
+        # another connection commits)
+        self._synced_rowid: Dict[str, int] = {}
+        self._pending_rowids: Dict[str, List[int]] = {}
+        self._synced_version: Dict[str, int] = {}
+
+    def _make_index(self, label: str):
+        if self.quantization == "none":
+            return _VectorIndex()
+        # Compressed codes in memory; full-precision vectors are re-read from SQLite for rescoring
+        return QuantizedIndex(self.quantization, fetch_vectors=lambda ids: self.fetch_embeddings(ids, label),
+                              rescore_multiplier=Config.VECTOR_RESCORE_MULTIPLIER)
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # v1: Row/Table embeddings
+            for table in ("rows", "tables"):
+                columns = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+                if "embedding" not in columns:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN embedding BLOB")
+        if version < 2:
+            # v2: graph rank bookkeeping (mentions not yet counted)
+            columns = {r[1] for r in self.conn.execute("PRAGMA table_info(mentions)")}
+            if "ranked" not in columns:
+                self.conn.execute("ALTER TABLE mentions ADD COLUMN ranked INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_mentions_unranked ON mentions(source_id) WHERE ranked = 0")
+        if version < 3:
+            # v3: metadata filter fields. Rows are filtered through their Table (idx_rows_table),
+            # so only chunks and tables are indexed. Older nodes keep NULLs (no filter matches them).
+            for table in ("chunks", "tables", "rows"):
+                columns = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+                for column in ("doc_type", "doc_date", "sheet_name"):
+                    if column not in columns:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+            for table, column in [("chunks", "doc_type"), ("chunks", "doc_date"), ("tables", "doc_type"),
+                                  ("tables", "doc_date"), ("tables", "sheet_name")]:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def ingest_document(self, doc: IngestedDoc, concepts: List[str]):
+        """
+        Ingest a document/chunk and its related concepts (one transaction).
+        Handles both TEXT and TABLE content types.
+        """
+        doc_source = doc.metadata.get("source", "Unknown_Source")
+        with self._lock, self.conn:
+            # 1. Merge Document Node (Parent)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO documents (id, title, created_at) VALUES (?, ?, ?)",
+                (doc_source, doc_source, int(time.time() * 1000))
+            )
+            # 2. Merge Chunk/Table Node
+            if doc.content_type == ContentType.TABLE and doc.table_data:
+                self._ingest_table(doc, doc_source, concepts)
+            else:
+                self._ingest_text_chunk(doc, doc_source, concepts)
+
+    def _ingest_text_chunk(self, doc: IngestedDoc, doc_source: str, concepts: List[str]):
+        fields = filter_fields(doc.metadata)
+        self.conn.execute(
+            """
+            INSERT INTO chunks (id, document_id, text, vector_id, page, embedding, doc_type, doc_date, sheet_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET embedding = coalesce(excluded.embedding, chunks.embedding),
+                doc_type = excluded.doc_type, doc_date = excluded.doc_date, sheet_name = excluded.sheet_name
+            """,
+            (doc.id, doc_source, doc.content, doc.vector_id or "", doc.metadata.get("page", 1), _to_blob(doc.embedding),
+             fields["doc_type"], fields["doc_date"], fields["sheet_name"])
+        )
+        if doc.embedding is not None:
+            self._indexes["Chunk"].add([(doc.id, doc.embedding)])
+        self._link_concepts(doc.id, "Chunk", concepts)
+
+    def _ingest_table(self, doc: IngestedDoc, doc_source: str, concepts: List[str]):
+        table = doc.table_data
+        fields = filter_fields(doc.metadata)
+        filter_values = (fields["doc_type"], fields["doc_date"], fields["sheet_name"])
+        self.conn.execute(
+            """
+            INSERT INTO tables (id, document_id, caption, markdown, embedding, doc_type, doc_date, sheet_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET embedding = coalesce(excluded.embedding, tables.embedding),
+                doc_type = excluded.doc_type, doc_date = excluded.doc_date, sheet_name = excluded.sheet_name
+            """,
+            (table.id, doc_source, table.caption, table.markdown, _to_blob(table.embedding), *filter_values)
+        )
+        if table.embedding is not None:
+            self._indexes["Table"].add([(table.id, table.embedding)])
+        self._link_concepts(table.id, "Table", concepts)
+        self.conn.executemany(
+            """
+            INSERT INTO rows (id, table_id, idx, data_json, serialized_text, embedding, doc_type, doc_date, sheet_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET embedding = coalesce(excluded.embedding, rows.embedding),
+                doc_type = excluded.doc_type, doc_date = excluded.doc_date, sheet_name = excluded.sheet_name
+            """,
+            [
+                (r.id, table.id, r.index, json.dumps(r.data, ensure_ascii=False, default=str), r.serialized_text,
+                 _to_blob(r.embedding), *filter_values)
+                for r in table.rows
+            ]
+        )
+        self._indexes["Row"].add([(r.id, r.embedding) for r in table.rows if r.embedding is not None])
+
+    def _link_concepts(self, source_id: str, source_label: str, concepts: List[str]):
+        if not concepts:
+            return
+        self.conn.executemany("INSERT OR IGNORE INTO concepts (name) VALUES (?)", [(c,) for c in concepts])
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO mentions (source_id, source_label, concept) VALUES (?, ?, ?)",
+            [(source_id, source_label, c) for c in concepts]
+        )
+
+    def ingest_row_concepts(self, row_id: str, concepts: List[str]):
+        with self._lock, self.conn:
+            self._link_concepts(row_id, "Row", concepts)
+
+    # Per label: source table, passage lookup by id, and row -> passage builder
+    # (centrality comes from node_scores, materialized by GraphRankJob)
+    _SEARCH_SQL = {
+        "Chunk": ("chunks",
+                  "SELECT c.id, c.text, c.page, c.vector_id, c.document_id, s.centrality, c.doc_type, c.doc_date "
+                  "FROM chunks c LEFT JOIN node_scores s ON s.id = c.id WHERE c.id IN ({ids})",
+                  lambda r: (r[1], {"id": r[0], "page": r[2], "vector_id": r[3], "source": r[4], "centrality": r[5],
+                                    "doc_type": r[6], "doc_date": r[7]})),
+        "Row": ("rows",
+                "SELECT r.id, r.serialized_text, r.table_id, r.idx, t.document_id, s.centrality, r.doc_type, r.doc_date, "
+                "r.sheet_name FROM rows r LEFT JOIN tables t ON t.id = r.table_id LEFT JOIN node_scores s ON s.id = r.id "
+                "WHERE r.id IN ({ids})",
+                lambda r: (r[1], {"id": r[0], "table_id": r[2], "index": r[3], "source": r[4], "centrality": r[5],
+                                  "doc_type": r[6], "doc_date": r[7], "sheet_name": r[8]})),
+        "Table": ("tables",
+                  "SELECT t.id, t.caption, t.markdown, t.document_id, s.centrality, t.doc_type, t.doc_date, t.sheet_name "
+                  "FROM tables t LEFT JOIN node_scores s ON s.id = t.id WHERE t.id IN ({ids})",
+                  lambda r: (f"{r[1] or ''}\n{r[2] or ''}", {"id": r[0], "caption": r[1], "source": r[3], "centrality": r[4],
+                                                            "doc_type": r[5], "doc_date": r[6], "sheet_name": r[7]})),
+    }
+
+    @staticmethod
+    def _filter_where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        conditions, params = [], []
+        for key, column in (("source", "document_id"), ("type", "doc_type"), ("sheet_name", "sheet_name")):
+            if key in filters:
+                conditions.append(f"{column} IN ({','.join('?' * len(filters[key]))})")
+                params.extend(filters[key])
+        if "date_from" in filters:
+            conditions.append("doc_date >= ?")
+            params.append(filters["date_from"])
+        if "date_to" in filters:
+            conditions.append("doc_date <= ?")
+            params.append(filters["date_to"])
+        return " AND ".join(conditions) or "1", params
+
+    def _candidate_ids(self, label: str, filters: Dict[str, Any]) -> List[str]:
+        """
+        Ids passing the filters, read through the filter-field indexes. Rows are
+        selected through their Tables (idx_rows_table), where the fields are indexed.
+        """
+        where, params = self._filter_where(filters)
+        if label == "Row":
+            sql = f"SELECT id FROM rows WHERE table_id IN (SELECT id FROM tables WHERE {where})"
+        else:
+            sql = f"SELECT id FROM {self._SEARCH_SQL[label][0]} WHERE {where}"
+        return [r[0] for r in self.conn.execute(sql, params)]
+
+    def _sync_index(self, label: str):
+        """
+        The label's index, built on first use. Afterwards, when another connection
+        (build_graph.py, the ingestion service) has committed since the last sync,
+        only rows past the synced rowid are read, plus the rows seen earlier without
+        an embedding (backfilled later by create_vector_index.py), so new chunks
+        become searchable without a restart.
+        """
+        index = self._indexes[label]
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if index.loaded and self._synced_version.get(label) == version:
+            return index
+        table = self._SEARCH_SQL[label][0]
+        pending = self._pending_rowids.get(label, [])
+        still_pending = []
+        last = {"rowid": self._synced_rowid.get(label, 0)}
+
+        def embedded_rows(cursor, track_last: bool):
+            for rowid, node_id, blob in cursor:
+                if track_last:
+                    last["rowid"] = rowid
+                if blob is None:
+                    still_pending.append(rowid)  # Not embedded yet: checked again on the next sync
+                    continue
+                yield node_id, blob
+
+        def rows_past_synced():
+            cursor = self.conn.execute(f"SELECT rowid, id, embedding FROM {table} WHERE rowid > ? ORDER BY rowid",
+                                       (last["rowid"],))
+            return embedded_rows(cursor, track_last=True)
+
+        if not index.loaded:
+            index.load(rows_past_synced())
+        else:
+            backfilled = []
+            for start in range(0, len(pending), 500):
+                batch = pending[start:start + 500]
+                cursor = self.conn.execute(
+                    f"SELECT rowid, id, embedding FROM {table} WHERE rowid IN ({','.join('?' * len(batch))}) ORDER BY rowid",
+                    batch
+                )
+                backfilled.extend(embedded_rows(cursor, track_last=False))
+            new_rows = [(node_id, blob) for node_id, blob in rows_past_synced() if node_id not in index.positions]
+            index.add([(node_id, np.frombuffer(blob, dtype=np.float32)) for node_id, blob in backfilled + new_rows])
+        self._synced_rowid[label] = last["rowid"]
+        self._pending_rowids[label] = still_pending
+        self._synced_version[label] = version
+        return index
+
+    def similarity_search(self,
+                          embedding: List[float],
+                          k: int = 3,
+                          labels: List[str] = None,
+                          filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        With 'filters', the matching ids are read from SQLite first and only their
+        vectors are scored, so a scoped search costs less than a full scan.
+        Only the SQLite reads hold the store lock; the vector scan does not.
+        """
+        results = []
+        for label in labels or ["Chunk"]:
+            table, sql, build = self._SEARCH_SQL[label]
+            with self._lock:
+                index = self._sync_index(label)
+                candidates = self._candidate_ids(label, filters) if filters else None
+            if candidates is not None and not candidates:
+                continue
+            # Scored outside the lock: concurrent searches (sub-queries) overlap in NumPy
+            hits = index.search(embedding, k, ids=candidates)
+            if not hits:
+                continue
+            with self._lock:
+                records = {
+                    r[0]: r for r in self.conn.execute(sql.format(ids=",".join("?" * len(hits))), [h[0] for h in hits])
+                }
+            for node_id, score in hits:
+                r = records.get(node_id)
+                if r is None:
+                    continue
+                text, metadata = build(r)
+                results.append({"id": node_id, "text": text, "score": score, "metadata": metadata, "label": label})
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:k]
+
+    def iter_embeddings(self, label: str = "Chunk", batch_size: int = 1000) -> Iterator[List[Tuple[str, np.ndarray]]]:
+        table = self._SEARCH_SQL[label][0]
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id, embedding FROM {table} WHERE embedding IS NOT NULL ORDER BY id")
+        while True:
+            with self._lock:
+                batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield [(r[0], np.frombuffer(r[1], dtype=np.float32)) for r in batch]
+
+    def fetch_embeddings(self, ids: List[str], label: str = "Chunk") -> Dict[str, np.ndarray]:
+        if not ids:
+            return {}
+        table = self._SEARCH_SQL[label][0]
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, embedding FROM {table} WHERE embedding IS NOT NULL AND id IN ({','.join('?' * len(ids))})",
+                list(ids)
+            ).fetchall()
+        return {r[0]: np.frombuffer(r[1], dtype=np.float32) for r in rows}
+
+    def vector_index_bytes(self) -> Dict[str, int]:
+        """
+        Memory held by the loaded in-process indexes per label (float matrix or quantized codes).
+        """
+        with self._lock:
+            return {label: index.memory_bytes() for label, index in self._indexes.items() if index.loaded}
+
+    def chunks_missing_embeddings(self, limit: int = 256) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, text FROM chunks WHERE embedding IS NULL AND text IS NOT NULL LIMIT ?", (limit,)
+            ).fetchall()
+
+    def set_chunk_embeddings(self, items: List[Tuple[str, List[float]]]):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE chunks SET embedding = ? WHERE id = ?",
+                [(_to_blob(e), cid) for cid, e in items]
+            )
+            self._indexes["Chunk"].add(items)
+
+    def list_documents(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self.conn.execute("SELECT id FROM documents ORDER BY id")]
+
+    def list_concepts(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self.conn.execute(
+                """
+                SELECT c.name FROM concepts c LEFT JOIN mentions m ON m.concept = c.name
+                GROUP BY c.name ORDER BY count(m.concept) DESC, c.name
+                """
+            )]
+
+    def list_concept_aliases(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.conn.execute("SELECT alias, concept FROM concept_aliases").fetchall())
+
+    def list_tables(self) -> List[Table]:
+        with self._lock:
+            tables = {
+                r[0]: Table(id=r[0], caption=r[1] or "", markdown=r[2] or "", metadata={"source": r[3]})
+                for r in self.conn.execute("SELECT id, caption, markdown, document_id FROM tables ORDER BY rowid")
+            }
+            for r in self.conn.execute("SELECT id, table_id, idx, data_json, serialized_text FROM rows ORDER BY table_id, idx"):
+                if r[1] in tables:
+                    tables[r[1]].rows.append(Row(id=r[0], index=r[2], data=json.loads(r[3] or "{}"), serialized_text=r[4] or ""))
+        return list(tables.values())
+
+    def merge_concepts(self, mapping: Dict[str, str]) -> Dict[str, int]:
+        pairs = [(alias, canonical) for alias, canonical in mapping.items() if alias != canonical]
+        count = lambda table: self.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        with self._lock, self.conn:
+            report = {"concepts_before": count("concepts"), "edges_before": count("mentions")}
+            self.conn.executemany("INSERT OR IGNORE INTO concepts (name) VALUES (?)", [(c,) for _, c in pairs])
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO mentions (source_id, source_label, concept)
+                SELECT source_id, source_label, ? FROM mentions WHERE concept = ?
+                """,
+                [(c, a) for a, c in pairs]
+            )
+            self.conn.executemany("DELETE FROM mentions WHERE concept = ?", [(a,) for a, _ in pairs])
+            self.conn.executemany("DELETE FROM concepts WHERE name = ?", [(a,) for a, _ in pairs])
+            # Earlier aliases of a merged name follow it to the new canonical
+            self.conn.executemany("UPDATE concept_aliases SET concept = ? WHERE concept = ?", [(c, a) for a, c in pairs])
+            self.conn.executemany("INSERT OR REPLACE INTO concept_aliases (alias, concept) VALUES (?, ?)", pairs)
+            report.update({"concepts_after": count("concepts"), "edges_after": count("mentions")})
+        return report
+
+    def iter_mentions(self, new_only: bool = False, batch_size: int = 1000) -> Iterator[List[Tuple[str, str, List[str], List[str]]]]:
+        # char(31) (unit separator) cannot occur in concept names
+        where = "WHERE source_id IN (SELECT source_id FROM mentions WHERE ranked = 0)" if new_only else ""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT source_id, source_label, group_concat(concept, char(31)),
+                   group_concat(CASE WHEN ranked = 0 THEN concept END, char(31))
+            FROM mentions {where} GROUP BY source_id ORDER BY source_id
+            """
+        )
+        while True:
+            with self._lock:
+                batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield [(r[0], r[1], r[2].split("\x1f"), r[3].split("\x1f") if r[3] else []) for r in batch]
+
+    def load_graph_rank(self) -> Tuple[Dict[Tuple[str, str], float], Dict[str, float]]:
+        with self._lock:
+            pairs = {(r[0], r[1]): r[2] for r in self.conn.execute("SELECT a, b, weight FROM concept_cooccurrence")}
+            scores = {r[0]: r[1] for r in self.conn.execute("SELECT name, pagerank FROM concept_scores")}
+        return pairs, scores
+
+    def save_graph_rank(self,
+                        cooccurrence: Dict[Tuple[str, str], float],
+                        concept_scores: Dict[str, Tuple[int, float]],
+                        node_scores: List[Tuple[str, str, float]],
+                        ranked: List[Tuple[str, str, List[str]]],
+                        replace: bool = False):
+        with self._lock, self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM concept_cooccurrence")
+                self.conn.execute("DELETE FROM concept_scores")
+                self.conn.execute("DELETE FROM node_scores")
+            self.conn.executemany(
+                """
+                INSERT INTO concept_cooccurrence (a, b, weight) VALUES (?, ?, ?)
+                ON CONFLICT(a, b) DO UPDATE SET weight = weight + excluded.weight
+                """,
+                [(a, b, w) for (a, b), w in cooccurrence.items()]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO concept_scores (name, degree, pagerank) VALUES (?, ?, ?)",
+                [(name, degree, score) for name, (degree, score) in concept_scores.items()]
+            )
+            self.conn.executemany("INSERT OR REPLACE INTO node_scores (id, label, centrality) VALUES (?, ?, ?)", node_scores)
+            self.conn.executemany(
+                "UPDATE mentions SET ranked = 1 WHERE source_id = ? AND concept = ?",
+                [(source_id, c) for source_id, _, concepts in ranked for c in concepts]
+            )
+
+    def count_nodes(self) -> Dict[str, int]:
+        tables = {"Document": "documents", "Chunk": "chunks", "Table": "tables", "Row": "rows", "Concept": "concepts"}
+        with self._lock:
+            return {label: self.conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for label, t in tables.items()}
@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+from src.config import Config
+from src.features.schemas import IngestedDoc, Table
+
+class GraphStore(ABC):
+    """
+    Storage backend behind GraphConnector and retrieval_tool.
+    Every backend stores the same model:
+      (:Document)-[:CONTAINS]->(:Chunk | :Table)-[:HAS_ROW]->(:Row)
+      (:Chunk | :Table | :Row)-[:MENTIONS]->(:Concept)
+      (:Concept)-[:CO_OCCURS {weight}]->(:Concept)   (materialized by GraphRankJob)
+    """
+    name = "base"  # Backend label used in metrics
+
+    @abstractmethod
+    def ingest_document(self, doc: IngestedDoc, concepts: List[str]):
+        """
+        Ingest a document/chunk (TEXT) or table with its rows (TABLE) and link its concepts.
+        """
+
+    @abstractmethod
+    def ingest_row_concepts(self, row_id: str, concepts: List[str]):
+        """
+        Link a Row to Concepts extracted from its serialized text.
+        """
+
+    @abstractmethod
+    def similarity_search(self,
+                          embedding: List[float],
+                          k: int = 3,
+                          labels: List[str] = None,
+                          filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Nearest nodes by cosine similarity: [{"id", "text", "score", "metadata", "label"}].
+        'labels' selects the embedded node types to search ("Chunk", "Row", "Table"; default Chunk).
+        'filters' (normalized, with "source" resolved to Document ids; see filters.py)
+        restricts the candidates before the vector scan.
+        """
+
+    @abstractmethod
+    def iter_embeddings(self, label: str = "Chunk", batch_size: int = 1000) -> Iterator[List[Tuple[str, List[float]]]]:
+        """
+        Stored (id, embedding) pairs of one label, in batches (builds in-process indexes).
+        """
+
+    @abstractmethod
+    def fetch_embeddings(self, ids: List[str], label: str = "Chunk") -> Dict[str, List[float]]:
+        """
+        Full-precision embeddings of the given nodes (rescoring after a quantized first pass).
+        """
+
+    @abstractmethod
+    def chunks_missing_embeddings(self, limit: int = 256) -> List[Tuple[str, str]]:
+        """
+        (chunk_id, text) pairs for Chunks that have no embedding yet.
+        """
+
+    @abstractmethod
+    def set_chunk_embeddings(self, items: List[Tuple[str, List[float]]]):
+        """
+        Store embeddings for the given Chunk ids.
+        """
+
+    @abstractmethod
+    def list_documents(self) -> List[str]:
+        """
+        All Document ids (source paths), for resolving document name filters.
+        """
+
+    @abstractmethod
+    def list_concepts(self) -> List[str]:
+        """
+        All Concept names, most mentioned first.
+        """
+
+    @abstractmethod
+    def list_concept_aliases(self) -> Dict[str, str]:
+        """
+        Names merged into a canonical Concept: {alias: concept}.
+        """
+
+    @abstractmethod
+    def list_tables(self) -> List[Table]:
+        """
+        Stored Tables with their Rows (ordered by index); metadata["source"] is the Document id.
+        """
+
+    @abstractmethod
+    def merge_concepts(self, mapping: Dict[str, str]) -> Dict[str, int]:
+        """
+        Merge each alias Concept into its canonical Concept ({alias: canonical}):
+        MENTIONS edges are moved (deduplicated), the alias is recorded on the canonical
+        and the alias node is deleted. Returns Concept/MENTIONS counts before and after.
+        """
+
+    @abstractmethod
+    def iter_mentions(self, new_only: bool = False, batch_size: int = 1000) -> Iterator[List[Tuple[str, str, List[str], List[str]]]]:
+        """
+        (source_id, label, concepts, new_concepts) per node with MENTIONS edges, in batches.
+        'new_concepts' are the mentions not yet counted by a graph rank run; with
+        new_only, only nodes that have such mentions are returned.
+        """
+
+    @abstractmethod
+    def load_graph_rank(self) -> Tuple[Dict[Tuple[str, str], float], Dict[str, float]]:
+        """
+        Stored co-occurrence weights {(a, b): weight} (a < b) and Concept PageRank {name: score}.
+        """
+
+    @abstractmethod
+    def save_graph_rank(self,
+                        cooccurrence: Dict[Tuple[str, str], float],
+                        concept_scores: Dict[str, Tuple[int, float]],
+                        node_scores: List[Tuple[str, str, float]],
+                        ranked: List[Tuple[str, str, List[str]]],
+                        replace: bool = False):
+        """
+        Store graph rank results: co-occurrence weights (added to the stored ones, or
+        replacing them all), Concept (degree, pagerank), node (id, label, centrality),
+        and mark the counted (id, label, concepts) MENTIONS edges.
+        """
+
+    @abstractmethod
+    def count_nodes(self) -> Dict[str, int]:
+        """
+        Node counts per label (Document, Chunk, Table, Row, Concept).
+        """
+
+    def ensure_vector_index(self, dimension: int = None):
+        """
+        Create the vector index if the backend needs one. No-op by default.
+        """
+
+    def ensure_schema(self) -> Optional[Dict[str, Any]]:
+        """
+        Apply pending schema migrations and return a drift report.
+        No-op (None) for backends that create their schema on open.
+        """
+        return None
+
+    @abstractmethod
+    def close(self):
+        pass
+
+def create_graph_store(backend: str = None) -> GraphStore:
+    """
+    Builds the storage backend selected by Config.STORAGE_BACKEND.
+    - "neo4j":  networked Neo4j server (Bolt)
+    - "sqlite": embedded SQLite file + in-process vector index (single-box deployments)
+    """
+    backend = (backend or Config.STORAGE_BACKEND).lower()
+    if backend == "neo4j":
+        from src.features.graph.neo4j_store import Neo4jGraphStore
+        return Neo4jGraphStore()
+    if backend == "sqlite":
+        from src.features.graph.sqlite_store import SqliteGraphStore
+        return SqliteGraphStore()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,68 @@
+from typing import List, Dict, Any, Optional
+from src.features.schemas import IngestedDoc, ContentType
+from src.telemetry.metrics import span
+
+class DocumentIngestor:
+    """
+    Per-file ingestion stages shared by build_graph.py (one-shot directory scan) and
+    the ingestion service (durable job queue):
+
+        parse -> extract -> embed -> write
+
+    Stage outputs are plain data (IngestedDoc lists, concept dicts), so the service can
+    persist them between stages and resume a file at the stage where it stopped.
+    Embedding runs before the write so vectors are stored with their nodes (single pass).
+    """
+
+    def __init__(self, parser, extractor, connector, embedder=None):
+        self.parser = parser
+        self.extractor = extractor
+        self.connector = connector
+        self.embedder = embedder  # DocumentEmbedder, or None to leave vectors to create_vector_index.py
+
+    def parse(self, file_path: str) -> List[IngestedDoc]:
+        return self.parser.parse(file_path)
+
+    def extract(self, docs: List[IngestedDoc]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Concepts of each document (text, or table markdown) and of each table row:
+        {"docs": {doc_id: [...]}, "rows": {row_id: [...]}}.
+        """
+        concepts = {"docs": {}, "rows": {}}
+        for doc in docs:
+            concepts["docs"][doc.id] = self.extractor.extract_concepts(doc.content)
+            if doc.content_type == ContentType.TABLE and doc.table_data:
+                for row in doc.table_data.rows:
+                    # Extract concepts from "Header: Value" sentence
+                    row_concepts = self.extractor.extract_concepts(row.serialized_text, task="row_extraction")
+                    if row_concepts:
+                        concepts["rows"][row.id] = row_concepts
+        return concepts
+
+    def embed(self, docs: List[IngestedDoc]) -> int:
+        if self.embedder is None:
+            return 0
+        return self.embedder.embed(docs)
+
+    def write(self, docs: List[IngestedDoc], concepts: Dict[str, Dict[str, List[str]]]):
+        """
+        Writes documents, then row concept links (rows must exist first). Idempotent (MERGE),
+        so a write interrupted halfway can simply be repeated.
+        """
+        for doc in docs:
+            self.connector.ingest_document(doc, concepts["docs"].get(doc.id, []))
+            if doc.content_type == ContentType.TABLE and doc.table_data:
+                for row in doc.table_data.rows:
+                    if concepts["rows"].get(row.id):
+                        self.connector.ingest_row_concepts(row.id, concepts["rows"][row.id])
+
+    def process(self, file_path: str) -> int:
+        """
+        All stages for one file. Returns the number of documents written.
+        """
+        with span("ingest_file"):
+            docs = self.parse(file_path)
+            concepts = self.extract(docs)
+            self.embed(docs)
+            self.write(docs, concepts)
+        return len(docs)
@@ -0,0 +1,297 @@
+import os
+import time
+import zlib
+import pickle
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
+from src.config import Config
+from src.features.parse_cache import file_sha256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    state TEXT NOT NULL DEFAULT 'queued',   -- queued | parsed | extracted | embedded | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    artifact BLOB,                           -- Output of the last completed stage (pickle + zlib)
+    documents INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_path ON jobs(path, sha256);
+"""
+
+TERMINAL_STATES = ("done", "failed")
+
+class LeaseLost(RuntimeError):
+    """
+    The job's lease expired and another worker claimed it: this worker's result is dropped.
+    """
+
+class Job:
+    """
+    One queued file. 'state' is the last completed stage; 'artifact' holds that stage's output.
+    """
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.path = row["path"]
+        self.sha256 = row["sha256"]
+        self.state = row["state"]
+        self.attempts = row["attempts"]
+        self.last_error = row["last_error"]
+        self.lease_owner = row["lease_owner"]
+        self._artifact = row["artifact"] if "artifact" in row.keys() else None
+
+    @property
+    def artifact(self) -> Any:
+        return pickle.loads(zlib.decompress(self._artifact)) if self._artifact else None
+
+class JobQueue:
+    """
+    Durable SQLite job queue for the ingestion service. Workers claim jobs with a lease.
+    A job whose worker died is claimed again once the lease expires, and it resumes
+    from its last recorded stage; a live worker keeps its lease with heartbeats, and
+    state updates only apply while the worker still holds the lease.
+    Failures, and leases lost to a dead worker (a file that crashes the process), count
+    as attempts and are retried with exponential backoff up to max_attempts.
+    Only open queue files you trust (stage artifacts are pickled).
+    """
+    def __init__(self, path: str = None, max_attempts: int = None, backoff_s: float = None, lease_s: float = None):
+        self.path = path or Config.INGEST_QUEUE_PATH
+        self.max_attempts = max_attempts or Config.INGEST_MAX_ATTEMPTS
+        self.backoff_s = backoff_s if backoff_s is not None else Config.INGEST_BACKOFF_S
+        self.lease_s = lease_s or Config.INGEST_LEASE_S
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def submit(self, path: str) -> int:
+        """
+        Queues a file. The same unchanged file (path + content hash) is not queued twice
+        while a job for it is pending or done; failed files can be resubmitted.
+        """
+        path = os.path.abspath(path)
+        sha256 = file_sha256(path) if os.path.isfile(path) else None
+        now = time.time()
+        with self._lock:
+            existing = self.conn.execute(
+                "SELECT id FROM jobs WHERE path = ? AND sha256 IS ? AND state != 'failed' ORDER BY id DESC LIMIT 1",
+                (path, sha256)
+            ).fetchone()
+            if existing:
+                return existing["id"]
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (path, sha256, created_at, updated_at) VALUES (?, ?, ?, ?)", (path, sha256, now, now)
+            )
+            return cursor.lastrowid
+
+    def _retry_after(self, attempts: int) -> Tuple[float, bool]:
+        # (delay, give up): exponential backoff with jitter until max_attempts
+        if attempts >= self.max_attempts:
+            return 0.0, True
+        return self.backoff_s * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2), False
+
+    def _requeue_abandoned(self, now: float, expired_only: bool = True) -> int:
+        """
+        Counts an attempt for jobs whose worker died holding the lease (expired, or any
+        lease at a restart) and schedules their retry with backoff; 'failed' after
+        max_attempts. Caller holds self._lock.
+        """
+        rows = self.conn.execute(
+            "SELECT id, state, attempts, lease_owner, lease_expires FROM jobs "
+            "WHERE state NOT IN ('done', 'failed') AND lease_owner IS NOT NULL"
+            + (" AND lease_expires < ?" if expired_only else ""),
+            (now,) if expired_only else ()
+        ).fetchall()
+        for row in rows:
+            attempts = row["attempts"] + 1
+            delay, give_up = self._retry_after(attempts)
+            state = "failed" if give_up else row["state"]
+            # Guarded by the lease seen above: a heartbeat in between keeps the job with its worker
+            self.conn.execute(
+                """
+                UPDATE jobs SET state = ?, attempts = ?, next_attempt_at = ?, last_error = ?,
+                                lease_owner = NULL, lease_expires = NULL, updated_at = ?,
+                                finished_at = CASE WHEN ? = 'failed' THEN ? ELSE finished_at END
+                WHERE id = ? AND lease_owner = ? AND lease_expires IS ?
+                """,
+                (state, attempts, now + delay, f"Lease of {row['lease_owner']} lost (worker died or stalled)",
+                 now, state, now, row["id"], row["lease_owner"], row["lease_expires"])
+            )
+        return len(rows)
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Leases the oldest ready job (not finished, backoff elapsed, no live lease).
+        Jobs with an expired lease are first counted as a failed attempt and backed off.
+        """
+        now = time.time()
+        with self._lock:
+            self._requeue_abandoned(now)
+            row = self.conn.execute(
+                """
+                UPDATE jobs SET lease_owner = ?, lease_expires = ?, updated_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE state NOT IN ('done', 'failed') AND next_attempt_at <= ?
+                      AND (lease_expires IS NULL OR lease_expires < ?)
+                    ORDER BY next_attempt_at, id LIMIT 1
+                )
+                RETURNING *
+                """,
+                (worker_id, now + self.lease_s, now, now, now)
+            ).fetchone()
+        return Job(row) if row else None
+
+    def _update(self, job: Job, sql: str, params: tuple):
+        # State changes apply only while 'job' still holds its lease
+        with self._lock:
+            cursor = self.conn.execute(sql + " WHERE id = ? AND lease_owner = ?", params + (job.id, job.lease_owner))
+        if cursor.rowcount == 0:
+            raise LeaseLost(f"Job {job.id} is no longer leased by {job.lease_owner}")
+
+    def heartbeat(self, job: Job) -> bool:
+        """
+        Extends the lease. False when another worker has claimed the job since.
+        """
+        try:
+            self._update(job, "UPDATE jobs SET lease_expires = ?", (time.time() + self.lease_s,))
+            return True
+        except LeaseLost:
+            return False
+
+    @contextmanager
+    def keep_alive(self, job: Job, interval_s: float = None):
+        """
+        Heartbeats the lease in the background (every lease_s / 3) while the block runs,
+        so a long stage (one LLM call per table row) does not outlive it.
+        """
+        interval_s = interval_s or self.lease_s / 3
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval_s):
+                if not self.heartbeat(job):
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True, name=f"lease-{job.id}")
+        thread.start()
+        try:
+            yield job
+        finally:
+            stop.set()
+            thread.join()
+
+    def advance(self, job: Job, state: str, artifact: Any = None):
+        """
+        Records a completed stage (and its output) and extends the lease.
+        Raises LeaseLost if another worker holds the job now.
+        """
+        blob = zlib.compress(pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL), 1) if artifact is not None else None
+        now = time.time()
+        self._update(job, "UPDATE jobs SET state = ?, artifact = ?, lease_expires = ?, updated_at = ?",
+                     (state, blob, now + self.lease_s, now))
+        job.state = state
+
+    def complete(self, job: Job, documents: int = None):
+        now = time.time()
+        self._update(
+            job,
+            """
+            UPDATE jobs SET state = 'done', artifact = NULL, documents = ?, lease_owner = NULL,
+                            lease_expires = NULL, last_error = NULL, updated_at = ?, finished_at = ?
+            """,
+            (documents, now, now)
+        )
+        job.state = "done"
+
+    def fail(self, job: Job, error: str) -> float:
+        """
+        Releases a failed job for retry after exponential backoff (with jitter), keeping its
+        completed stages. After max_attempts it is marked 'failed'. Returns the retry delay (0 if failed).
+        Raises LeaseLost if another worker holds the job now.
+        """
+        attempts = job.attempts + 1
+        now = time.time()
+        delay, give_up = self._retry_after(attempts)
+        state = "failed" if give_up else job.state
+        self._update(
+            job,
+            """
+            UPDATE jobs SET state = ?, attempts = ?, next_attempt_at = ?, last_error = ?,
+                            lease_owner = NULL, lease_expires = NULL, updated_at = ?,
+                            finished_at = CASE WHEN ? = 'failed' THEN ? ELSE finished_at END
+            """,
+            (state, attempts, now + delay, str(error)[:2000], now, state, now)
+        )
+        job.attempts, job.state = attempts, state
+        return delay
+
+    def release_leases(self) -> int:
+        """
+        Service restart after a crash: every leased job was interrupted, so each counts
+        an attempt and is retried after backoff (a file that kills the worker ends up
+        'failed' instead of crash-looping the service). Returns the jobs released.
+        """
+        with self._lock:
+            return self._requeue_abandoned(time.time(), expired_only=False)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT id, path, state, attempts, last_error, documents, created_at, updated_at, finished_at,
+                       next_attempt_at, lease_owner
+                FROM jobs WHERE id = ?
+                """,
+                (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self, window_s: float = 60.0) -> Dict[str, Any]:
+        """
+        Queue depth per state, files finished in the last 'window_s' and end-to-end latency.
+        """
+        now = time.time()
+        with self._lock:
+            states = {r["state"]: r["n"] for r in self.conn.execute("SELECT state, count(*) AS n FROM jobs GROUP BY state")}
+            recent = self.conn.execute(
+                """
+                SELECT count(*) AS n, coalesce(sum(documents), 0) AS docs, avg(finished_at - created_at) AS latency
+                FROM jobs WHERE state = 'done' AND finished_at >= ?
+                """,
+                (now - window_s,)
+            ).fetchone()
+            running = self.conn.execute(
+                "SELECT count(*) FROM jobs WHERE state NOT IN ('done', 'failed') AND lease_expires >= ?", (now,)
+            ).fetchone()[0]
+            retrying = self.conn.execute(
+                "SELECT count(*) FROM jobs WHERE state NOT IN ('done', 'failed') AND attempts > 0"
+            ).fetchone()[0]
+        return {
+            "states": states,
+            "depth": sum(n for state, n in states.items() if state not in TERMINAL_STATES),
+            "running": running,
+            "retrying": retrying,
+            "files_per_min": round(recent["n"] * 60.0 / window_s, 2),
+            "docs_per_min": round(recent["docs"] * 60.0 / window_s, 2),
+            "avg_latency_s": round(recent["latency"], 3) if recent["latency"] is not None else None,
+        }
+
+    def close(self):
+        self.conn.close()
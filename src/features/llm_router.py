@@ -0,0 +1,86 @@
+import json
+import threading
+from typing import Dict, Any, Callable, Tuple, Optional
+from src.config import Config
+from src.telemetry.metrics import span, registry
+
+# LLM call sites; each can run on its own model (Config.LLM_MODEL_<TASK>, default LLM_MODEL_NAME)
+TASKS = ("planner", "sql", "answer", "extraction", "row_extraction", "summary")
+
+_models: Dict[Tuple[str, bool], Any] = {}
+_lock = threading.Lock()
+
+def model_for(task: str) -> str:
+    if task not in TASKS:
+        raise ValueError(f"Unknown LLM task: {task} (use {', '.join(TASKS)})")
+    return getattr(Config, f"LLM_MODEL_{task.upper()}") or Config.LLM_MODEL_NAME
+
+def get_llm(task: str = None, model: str = None, json_mode: bool = True):
+    """
+    Shared ChatOllama client for a task (or an explicit model). One client per
+    (model, JSON mode); every client uses the same num_ctx, so Ollama does not
+    reload a model when different tasks share it.
+    """
+    from langchain_ollama import ChatOllama
+    model = model or model_for(task)
+    key = (model, json_mode)
+    with _lock:
+        if key not in _models:
+            _models[key] = ChatOllama(
+                base_url=Config.OLLAMA_BASE_URL,
+                model=model,
+                temperature=0,
+                num_ctx=Config.LLM_CONTEXT_WINDOW,
+                **({"format": "json"} if json_mode else {})
+            )
+    return _models[key]
+
+def reset_models():
+    """
+    Drops the cached clients (after changing Config.LLM_MODEL_* or OLLAMA_BASE_URL).
+    """
+    with _lock:
+        _models.clear()
+
+def invoke(task: str, prompt: str, model: str = None, json_mode: bool = True):
+    """
+    One call on the task's model, recorded as the 'llm_ms' span and the
+    llm_prompt_tokens / llm_completion_tokens counters (labelled by task and model).
+    """
+    model = model or model_for(task)
+    with span("llm", task=task, model=model):
+        response = get_llm(model=model, json_mode=json_mode).invoke(prompt)
+    meta = getattr(response, "response_metadata", None) or {}
+    if meta.get("prompt_eval_count"):
+        registry.inc("llm_prompt_tokens", meta["prompt_eval_count"], task=task, model=model)
+    if meta.get("eval_count"):
+        registry.inc("llm_completion_tokens", meta["eval_count"], task=task, model=model)
+    return response
+
+def _parse(content: str, validate: Optional[Callable[[Dict[str, Any]], bool]]) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or (validate is not None and not validate(data)):
+        return None
+    return data
+
+def invoke_json(task: str, prompt: str,
+                validate: Callable[[Dict[str, Any]], bool] = None) -> Tuple[Dict[str, Any], Any]:
+    """
+    JSON call routed to the task's model. Quality guard: when a smaller routed model
+    returns something that is not a JSON object (or fails 'validate'), the prompt is
+    retried once on Config.LLM_MODEL_NAME (counted in 'llm_fallback').
+    Returns (data, response); raises ValueError if the final reply is still invalid.
+    """
+    model = model_for(task)
+    response = invoke(task, prompt, model=model)
+    data = _parse(response.content, validate)
+    if data is None and model != Config.LLM_MODEL_NAME and Config.LLM_FALLBACK_ON_PARSE_ERROR:
+        registry.inc("llm_fallback", task=task, model=model)
+        response = invoke(task, prompt, model=Config.LLM_MODEL_NAME)
+        data = _parse(response.content, validate)
+    if data is None:
+        raise ValueError(f"Invalid {task} output: {str(response.content)[:200]}")
+    return data, response
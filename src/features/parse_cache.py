@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import zlib
+import pickle
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+from src.config import Config
+from src.features.schemas import IngestedDoc
+from src.telemetry.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload layout changes (independent of converter versions)
+CACHE_FORMAT = 1
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    On-disk cache of parsed IngestedDoc lists (pickle + zlib).
+    Key: file content hash + converter version + parse arguments, so edited files
+    and converter changes (VERSION bump) miss automatically. Least recently used
+    entries are evicted once the directory exceeds max_bytes.
+    Only load cache directories you trust (pickle).
+    """
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, ttl_s: float = None, compress_level: int = 1):
+        self.cache_dir = cache_dir or Config.PARSE_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else Config.PARSE_CACHE_MAX_MB * 1024 * 1024
+        self.ttl_s = ttl_s if ttl_s is not None else Config.PARSE_CACHE_TTL_DAYS * 86400
+        self.compress_level = compress_level
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed on first write
+
+    def make_key(self, file_path: str, converter_version: str, file_meta: Dict[str, Any]) -> str:
+        parts = [
+            f"format={CACHE_FORMAT}",
+            f"sha256={file_sha256(file_path)}",
+            f"converter={converter_version}",
+            # Converters copy the path and metadata into IngestedDoc.metadata
+            f"path={file_path}",
+            f"meta={json.dumps(file_meta, sort_keys=True, default=str)}",
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl.z")
+
+    def get(self, key: str) -> Optional[List[IngestedDoc]]:
+        path = self._path(key)
+        try:
+            if self.ttl_s and time.time() - os.path.getmtime(path) > self.ttl_s:
+                self._remove(path)
+                registry.inc("parse_cache", result="expired")
+                return None
+            with open(path, "rb") as f:
+                docs = pickle.loads(zlib.decompress(f.read()))
+            os.utime(path, (time.time(), os.path.getmtime(path)))  # atime drives LRU eviction
+        except FileNotFoundError:
+            registry.inc("parse_cache", result="miss")
+            return None
+        except Exception as e:
+            # Corrupt or incompatible entry (e.g. schema change): drop it and re-parse
+            logger.warning(f"Discarding unreadable parse cache entry {path}: {e}")
+            self._remove(path)
+            registry.inc("parse_cache", result="miss")
+            return None
+        registry.inc("parse_cache", result="hit")
+        return docs
+
+    def put(self, key: str, docs: List[IngestedDoc]):
+        payload = zlib.compress(pickle.dumps(docs, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        if self.max_bytes and len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)  # Atomic: concurrent readers never see a partial entry
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self.size_bytes()
+            else:
+                self._total_bytes += len(payload)
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".pkl.z"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, max(st.st_atime, st.st_mtime)
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Oldest access first, down to 80% of the limit so evictions are not triggered on every write
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.8)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            registry.inc("parse_cache", result="evicted")
+        self._total_bytes = total
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                self._remove(path)
+            self._total_bytes = 0
+
+def create_parse_cache() -> Optional[ParseCache]:
+    """
+    Parse cache selected by Config.PARSE_CACHE (None when disabled).
+    """
+    if not Config.PARSE_CACHE:
+        return None
+    return ParseCache()
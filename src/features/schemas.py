@@ -25,6 +25,7 @@ class Row(BaseModel):
     index: int
     data: Dict[str, Any]  # Raw JSON data: {"col1": "val1", ...}
     serialized_text: str  # Sentence representation for embedding
+    embedding: Optional[List[float]] = None  # Set when ingestion embeds in the same pass
     # We might want to store list of SerializedText objects for granular mapping if needed later
 
 class Table(BaseModel):
@@ -36,6 +37,7 @@ class Table(BaseModel):
     markdown: str = ""  # Full markdown representation for LLM context
     rows: List[Row] = []
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    embedding: Optional[List[float]] = None  # Caption embedding (single-pass ingestion)
 
 class IngestedDoc(BaseModel):
     """
@@ -52,6 +54,7 @@ class IngestedDoc(BaseModel):
     vector_id: Optional[str] = None
     
     table_data: Optional[Table] = None # Populated if content_type is TABLE
+    embedding: Optional[List[float]] = None # Chunk embedding (single-pass ingestion)
 
 class ExtractionResult(BaseModel):
     """
@@ -0,0 +1,226 @@
+import re
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional
+from src.config import Config
+from src.features.schemas import Table
+from src.telemetry.metrics import registry
+
+class TableQueryError(ValueError):
+    """
+    Raised for queries that are rejected (not a single read-only SELECT) or fail to run.
+    """
+
+_NUMBER = re.compile(r"^[+-]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?$")
+
+def _coerce(value: Any) -> Any:
+    """
+    Numbers stored as text ("1,200", "3.5") become numbers so SUM/AVG work.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    text = str(value).strip()
+    if not text or text.lower() in ("nan", "none", "null"):
+        return None
+    if _NUMBER.match(text):
+        number = float(text.replace(",", ""))
+        return int(number) if number.is_integer() and "." not in text else number
+    return text
+
+def _column_type(values: List[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, int) for v in present):
+        return "INTEGER"
+    if present and all(isinstance(v, (int, float)) for v in present):
+        return "REAL"
+    return "TEXT"
+
+def _identifier(name: str, fallback: str) -> str:
+    ident = re.sub(r"\W+", "_", str(name)).strip("_").lower()
+    if not ident or ident[0].isdigit():
+        ident = f"{fallback}_{ident}" if ident else fallback
+    return ident
+
+def _tokens(text: str) -> set:
+    return {t for t in re.findall(r"\w+", (text or "").lower()) if len(t) > 1}
+
+class TableQueryEngine:
+    """
+    In-memory SQLite copy of the stored Tables/Rows (one SQL table per Table, one
+    typed column per row key) so aggregate and filter questions are answered by a
+    query instead of LLM arithmetic over markdown. Only the result rows go into the prompt.
+
+    Queries run under an authorizer that allows reads of registered tables only,
+    with a row cap and a time limit.
+    """
+    def __init__(self, max_rows: int = None, timeout_ms: int = None):
+        self.max_rows = max_rows or Config.TABLE_QUERY_MAX_ROWS
+        self.timeout_ms = timeout_ms or Config.TABLE_QUERY_TIMEOUT_MS
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self.catalog: Dict[str, Dict[str, Any]] = {}  # SQL table name -> caption/source/columns
+        self._by_table_id: Dict[str, str] = {}
+
+    def register(self, table: Table, source: str = None) -> Optional[str]:
+        """
+        Loads a Table's rows into its own SQL table. Returns the SQL table name
+        (None for tables without rows). Re-registering the same Table is a no-op.
+        """
+        if table.id in self._by_table_id:
+            return self._by_table_id[table.id]
+        rows = sorted(table.rows, key=lambda r: r.index)
+        if not rows:
+            return None
+
+        keys: List[str] = []
+        for row in rows:
+            keys.extend(k for k in row.data if k not in keys)
+        columns, used = [], set()
+        for i, key in enumerate(keys):
+            ident = _identifier(key, f"col{i}")
+            while ident in used:
+                ident += "_"
+            used.add(ident)
+            columns.append({"name": ident, "header": str(key)})
+        values = [[_coerce(row.data.get(key)) for key in keys] for row in rows]
+        for i, column in enumerate(columns):
+            column["type"] = _column_type([v[i] for v in values])
+            column["samples"] = list(dict.fromkeys(str(v[i]) for v in values if v[i] is not None))[:3]
+
+        with self._lock:
+            name = f"t{len(self.catalog) + 1}_{_identifier(table.caption, 'table')}"[:40]
+            column_sql = ", ".join(f'"{c["name"]}" {c["type"]}' for c in columns)
+            self.conn.execute(f'CREATE TABLE "{name}" ({column_sql})')
+            self.conn.executemany(f'INSERT INTO "{name}" VALUES ({", ".join("?" * len(columns))})', values)
+            self.conn.commit()
+            self.catalog[name] = {
+                "table_id": table.id,
+                "caption": table.caption,
+                "source": source or table.metadata.get("source", ""),
+                "columns": columns,
+                "row_count": len(rows),
+            }
+            self._by_table_id[table.id] = name
+        return name
+
+    def load_from_store(self, store) -> int:
+        """
+        Registers every Table in a GraphStore. Returns the number of SQL tables.
+        """
+        for table in store.list_tables():
+            self.register(table)
+        return len(self.catalog)
+
+    def find_tables(self, question: str, limit: int = None) -> List[str]:
+        """
+        Tables whose caption, source or column names share words with the question,
+        best match first. When nothing matches and the catalog is small, all tables.
+        """
+        limit = limit or Config.TABLE_QUERY_MAX_TABLES
+        words = _tokens(question)
+        scored = []
+        for name, entry in self.catalog.items():
+            vocab = _tokens(entry["caption"]) | _tokens(entry["source"])
+            for column in entry["columns"]:
+                vocab |= _tokens(column["header"]) | _tokens(column["name"])
+            overlap = len(words & vocab)
+            if overlap:
+                scored.append((overlap, name))
+        if not scored:
+            return list(self.catalog)[:limit] if len(self.catalog) <= limit else []
+        return [name for _, name in sorted(scored, key=lambda s: -s[0])[:limit]]
+
+    def describe(self, names: List[str] = None) -> str:
+        """
+        Schema text for the SQL-writing prompt (columns, types, sample values).
+        """
+        blocks = []
+        for name in names or list(self.catalog):
+            entry = self.catalog[name]
+            lines = [f'Table "{name}" -- {entry["caption"] or "untitled"} ({entry["source"]}, {entry["row_count"]} rows)']
+            for c in entry["columns"]:
+                samples = ", ".join(c["samples"])
+                lines.append(f'  "{c["name"]}" {c["type"]}  -- header "{c["header"]}", e.g. {samples}')
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks)
+
+    def validate(self, sql: str) -> str:
+        """
+        Returns the normalized statement or raises TableQueryError unless it is a
+        single SELECT (or WITH ... SELECT) that compiles against registered tables.
+        """
+        statement = (sql or "").strip().rstrip(";").strip()
+        if not statement:
+            raise TableQueryError("Empty query.")
+        if ";" in statement and sqlite3.complete_statement(statement.split(";", 1)[0] + ";"):
+            raise TableQueryError("Only a single statement is allowed.")
+        if not re.match(r"^(select|with)\b", statement, re.IGNORECASE):
+            raise TableQueryError("Only SELECT queries are allowed.")
+        with self._lock:
+            self.conn.set_authorizer(self._authorize)
+            try:
+                self.conn.execute(f"EXPLAIN {statement}")
+            except sqlite3.DatabaseError as e:
+                raise TableQueryError(f"Invalid query: {e}")
+            finally:
+                self.conn.set_authorizer(None)
+        return statement
+
+    def _authorize(self, action, arg1, arg2, db_name, trigger):
+        if action in (sqlite3.SQLITE_SELECT, sqlite3.SQLITE_FUNCTION, getattr(sqlite3, "SQLITE_RECURSIVE", -1)):
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_READ and (arg1 in self.catalog or db_name is None):
+            # db_name is None for CTE / subquery columns
+            return sqlite3.SQLITE_OK
+        return sqlite3.SQLITE_DENY
+
+    def execute(self, sql: str) -> Dict[str, Any]:
+        """
+        Validates and runs a query: {"sql", "columns", "rows", "truncated", "elapsed_ms"}.
+        """
+        statement = self.validate(sql)
+        deadline = time.perf_counter() + self.timeout_ms / 1000
+        started = time.perf_counter()
+        with self._lock:
+            self.conn.set_authorizer(self._authorize)
+            self.conn.set_progress_handler(lambda: 1 if time.perf_counter() > deadline else 0, 1000)
+            try:
+                cursor = self.conn.execute(statement)
+                rows = cursor.fetchmany(self.max_rows + 1)
+                columns = [d[0] for d in cursor.description or []]
+            except sqlite3.OperationalError as e:
+                registry.inc("table_query", result="error")
+                if "interrupted" in str(e):
+                    raise TableQueryError(f"Query exceeded {self.timeout_ms} ms.")
+                raise TableQueryError(f"Query failed: {e}")
+            finally:
+                self.conn.set_progress_handler(None, 0)
+                self.conn.set_authorizer(None)
+        registry.inc("table_query", result="ok")
+        return {
+            "sql": statement,
+            "columns": columns,
+            "rows": rows[:self.max_rows],
+            "truncated": len(rows) > self.max_rows,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    @staticmethod
+    def format_result(result: Dict[str, Any]) -> str:
+        """
+        Markdown table of a query result (the text placed in the prompt).
+        """
+        lines = ["| " + " | ".join(result["columns"]) + " |", "|" + "---|" * len(result["columns"])]
+        for row in result["rows"]:
+            lines.append("| " + " | ".join("" if v is None else str(v) for v in row) + " |")
+        if not result["rows"]:
+            lines.append("(no rows)")
+        if result["truncated"]:
+            lines.append(f"(first {len(result['rows'])} rows shown)")
+        return "\n".join(lines)
+
+    def close(self):
+        self.conn.close()
@@ -1,15 +1,27 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.config import Config
 from src.features.schemas import IngestedDoc
+from src.features.parse_cache import ParseCache, create_parse_cache
 from src.features.converters.hwp_converter import HwpConverter
 from src.features.converters.table_converter import TableConverter
 from src.features.converters.pdf_converter import PdfConverter
+from src.features.graph.filters import iso_date
+from src.telemetry.metrics import span
+
+# Bump when the fallback text path changes
+FALLBACK_VERSION = 1
+
+# Default for 'cache': the cache selected by Config.PARSE_CACHE (None means no cache)
+_CONFIGURED = object()
 
 class UniversalParser:
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = _CONFIGURED):
         self.hwp_converter = HwpConverter()
         self.table_converter = TableConverter()
         self.pdf_converter = PdfConverter()
+        # Parsed output cached by file hash + converter version (Config.PARSE_CACHE); set to None to disable
+        self.cache = create_parse_cache() if cache is _CONFIGURED else cache
 
     def parse(self, file_path: str, metadata: Dict[str, Any] = {}) -> List[IngestedDoc]:
         """
@@ -29,6 +41,45 @@ class UniversalParser:
             "extension": ext
         }
 
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(file_path, self._converter_version(ext), file_meta)
+            docs = self.cache.get(key)
+            if docs is not None:
+                return self._stamp_modified(docs, file_path)
+
+        with span("parse", extension=ext or "none"):
+            docs = self._convert(file_path, ext, file_meta)
+        if key is not None and docs:
+            self.cache.put(key, docs)
+        return self._stamp_modified(docs, file_path)
+
+    @staticmethod
+    def _stamp_modified(docs: List[IngestedDoc], file_path: str) -> List[IngestedDoc]:
+        # Document date for search filters when the caller gives no metadata["date"].
+        # Set after caching, so touching a file does not invalidate its parse.
+        modified = iso_date(os.path.getmtime(file_path))
+        for doc in docs:
+            doc.metadata.setdefault("modified", modified)
+        return docs
+
+    def _converter_version(self, ext: str) -> str:
+        if ext in ['.hwp', '.hwpx', '.zip']:
+            converter = self.hwp_converter
+        elif ext in ['.csv', '.xlsx', '.xls']:
+            converter = self.table_converter
+        elif ext in ['.pdf']:
+            converter = self.pdf_converter
+            if not Config.PDF_EXCLUDE_TABLE_TEXT:
+                return f"{type(converter).__name__}:{converter.VERSION}:full_text"  # Different text output
+        else:
+            return f"fallback:{FALLBACK_VERSION}"
+        return f"{type(converter).__name__}:{converter.VERSION}"
+
+    def _convert(self, file_path: str, ext: str, file_meta: Dict[str, Any]) -> List[IngestedDoc]:
+        """
+        Dispatches to the converter for the file extension.
+        """
         if ext in ['.hwp']:
             return self.hwp_converter.convert_hwp_legacy(file_path, file_meta)
         
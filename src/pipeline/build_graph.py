@@ -2,53 +2,102 @@ import os
 import argparse
 from tqdm import tqdm
 from src.features.universal_parser import UniversalParser
-from src.features.schemas import ContentType
+from src.features.ingestor import DocumentIngestor
 from src.features.graph.extractor import GraphExtractor
+from src.features.graph.gazetteer import create_gazetteer
 from src.features.graph.connector import GraphConnector
+from src.features.graph.schema import print_drift_report
+from src.config import Config
+from src.telemetry.metrics import registry, setup_exporters
 
-def main(input_dir: str):
-    parser = UniversalParser()
-    extractor = GraphExtractor()
-    connector = GraphConnector()
+def print_stage_summary():
+    """
+    Prints per-stage latency histograms collected during the build.
+    """
+    for row in registry.snapshot():
+        if row["type"] != "histogram" or not row["metric"].endswith("_ms"):
+            continue
+        labels = ",".join(f"{k}={v}" for k, v in row["labels"].items())
+        print(f"   - {row['metric']}[{labels}]: n={row['count']} mean={row['mean']}ms p95<={row['p95']}ms")
+
+def main(input_dir: str, export_dir: str = None, export_embeddings: bool = False,
+         use_parse_cache: bool = True, clear_parse_cache: bool = False, embed: bool = None):
+    setup_exporters()
+    parser = UniversalParser() if use_parse_cache else UniversalParser(cache=None)
+    if clear_parse_cache and parser.cache is not None:
+        parser.cache.clear()
+    embed = Config.INGEST_EMBEDDINGS if embed is None else embed
+    embedder = None
+    if embed:
+        # Single pass: vectors are computed here and stored in the same write as their nodes
+        from src.agent.tools import get_embeddings
+        from src.features.embedder import DocumentEmbedder
+        embedder = DocumentEmbedder(get_embeddings())
+    if export_dir:
+        # Offline bulk load: stream neo4j-admin import CSVs instead of MERGE transactions
+        from src.features.graph.bulk_export import BulkCsvExportStore
+        embeddings = None
+        if export_embeddings and embedder is None:
+            from src.agent.tools import get_embeddings
+            embeddings = get_embeddings()
+        connector = GraphConnector(BulkCsvExportStore(export_dir, embeddings=embeddings))
+    else:
+        connector = GraphConnector()
+
+    # 0. Constraints/indexes first, so MERGE uses index lookups instead of label scans
+    if Config.SCHEMA_AUTO_MIGRATE:
+        report = connector.ensure_schema()
+        if report:
+            print_drift_report(report)
     
     files = [os.path.join(input_dir, f) for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
     
     print(f"Found {len(files)} files in {input_dir}")
     
+    # Known Concepts (and aliases) are tagged without the LLM; see Config.GAZETTEER_MODE
+    extractor = GraphExtractor(create_gazetteer(connector.store))
+    ingestor = DocumentIngestor(parser, extractor, connector, embedder)
     for file_path in tqdm(files, desc="Processing Files"):
         try:
-            # 1. Parse File
-            docs = parser.parse(file_path)
-            
-            for doc in docs:
-                # 2. Extract Concepts from Main Content (Text or Table Summary)
-                # For Tables, doc.content is usually the markdown representation
-                main_concepts = extractor.extract_concepts(doc.content)
-                
-                # 3. Ingest Document/Table Node
-                connector.ingest_document(doc, main_concepts)
-                
-                # 4. If Table, Process Rows Individually
-                if doc.content_type == ContentType.TABLE and doc.table_data:
-                    for row in doc.table_data.rows:
-                        # Extract concepts from "Header: Value" sentence
-                        row_concepts = extractor.extract_concepts(row.serialized_text)
-                        if row_concepts:
-                            connector.ingest_row_concepts(row.id, row_concepts)
-
+            # Parse -> extract concepts (document + per row) -> embed (optional) -> write
+            ingestor.process(file_path)
         except Exception as e:
             print(f"Failed to process {file_path}: {e}")
+
+    if Config.GRAPH_RANK_AUTO and not export_dir:
+        # Co-occurrence / PageRank / centrality for the new mentions (incremental)
+        from src.features.graph.graph_rank import GraphRankJob
+        rank_report = GraphRankJob(connector.store).run()
+        print(f"📈 Graph rank refreshed: {rank_report}")
     
+    counts = connector.store.count_nodes()
     connector.close()
-    print("Graph Build Completed.")
+    print(f"Graph Build Completed. {counts}")
+    if extractor.gazetteer is not None:
+        stats = extractor.stats()
+        print(f"🧠 Gazetteer ({extractor.mode}): {stats['llm_calls_avoided']}/{stats['extractions']} extractions "
+              f"without an LLM call ({stats['avoided_ratio']:.0%}), {len(extractor.gazetteer)} known names")
+    if export_dir:
+        print(f"📦 Import files written to {export_dir} (see {os.path.join(export_dir, 'import.sh')})")
+    print_stage_summary()
 
 if __name__ == "__main__":
     # Example usage: python src/pipeline/build_graph.py --input_dir data_raw
+    #   Embed while writing (no create_vector_index pass): python src/pipeline/build_graph.py --input_dir data_raw --embed
+    #   Initial bulk load: python src/pipeline/build_graph.py --input_dir data_raw --export_csv data/import --export_embeddings
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument("--input_dir", type=str, default="data_raw")
+    arg_parser.add_argument("--export_csv", type=str, default=None, help="Write neo4j-admin import CSVs to this directory")
+    arg_parser.add_argument("--export_embeddings", action="store_true", help="Include Chunk embeddings in the export")
+    arg_parser.add_argument("--embed", action="store_true", default=None,
+                            help="Embed chunks, rows and table captions during ingestion (default: INGEST_EMBEDDINGS)")
+    arg_parser.add_argument("--no_parse_cache", action="store_true", help="Always re-parse files")
+    arg_parser.add_argument("--clear_parse_cache", action="store_true", help="Drop cached parse results first")
     args = arg_parser.parse_args()
     
     if not os.path.exists(args.input_dir):
         print(f"Input directory {args.input_dir} not found.")
     else:
-        main(args.input_dir)
+        main(args.input_dir, args.export_csv, args.export_embeddings,
+             use_parse_cache=not args.no_parse_cache, clear_parse_cache=args.clear_parse_cache,
+             embed=args.embed)
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.features.graph.store import create_graph_store
+from src.features.graph.canonicalizer import ConceptCanonicalizer, load_aliases
+
+def canonicalize_store(store, canonicalizer: ConceptCanonicalizer, dry_run: bool = False) -> dict:
+    """
+    Offline merge over existing Concept nodes: builds {alias: canonical} for all names
+    (most mentioned first, so popular spellings stay canonical) and merges the aliases.
+    """
+    names = store.list_concepts()
+    mapping = {alias: canonical for alias, canonical in canonicalizer.build_mapping(names).items() if alias != canonical}
+
+    clusters = defaultdict(list)
+    for alias, canonical in mapping.items():
+        clusters[canonical].append(alias)
+    report = {"concepts": len(names), "aliases": len(mapping), "clusters": len(clusters), "methods": canonicalizer.stats}
+
+    if dry_run:
+        report["preview"] = dict(sorted(clusters.items(), key=lambda kv: -len(kv[1]))[:20])
+        return report
+
+    report.update(store.merge_concepts(mapping))
+    if report["concepts_before"]:
+        report["concept_reduction"] = round(1 - report["concepts_after"] / report["concepts_before"], 4)
+    if report["edges_before"]:
+        report["edge_reduction"] = round(1 - report["edges_after"] / report["edges_before"], 4)
+    return report
+
+if __name__ == "__main__":
+    # Example usage:
+    #   python src/pipeline/canonicalize_concepts.py --dry_run
+    #   python src/pipeline/canonicalize_concepts.py --embeddings --threshold 0.93
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--embeddings", action="store_true", help="Also cluster near-synonyms with BGE-M3")
+    arg_parser.add_argument("--threshold", type=float, default=None, help="Cosine threshold for embedding merges")
+    arg_parser.add_argument("--aliases", type=str, default=None, help="Alias table JSON (default: CONCEPT_ALIAS_PATH)")
+    arg_parser.add_argument("--dry_run", action="store_true", help="Print the merge plan without writing")
+    args = arg_parser.parse_args()
+
+    embeddings = None
+    if args.embeddings:
+        from src.agent.tools import get_embeddings
+        embeddings = get_embeddings()
+
+    print(f"🧹 Canonicalizing Concepts ({Config.STORAGE_BACKEND}{', embeddings' if embeddings else ''})...")
+    store = create_graph_store()
+    try:
+        canonicalizer = ConceptCanonicalizer(load_aliases(args.aliases), embeddings=embeddings, threshold=args.threshold)
+        report = canonicalize_store(store, canonicalizer, dry_run=args.dry_run)
+    finally:
+        store.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
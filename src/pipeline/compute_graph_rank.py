@@ -0,0 +1,33 @@
+import os
+import sys
+import json
+import argparse
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.features.graph.store import create_graph_store
+from src.features.graph.graph_rank import GraphRankJob
+
+if __name__ == "__main__":
+    # Example usage: python src/pipeline/compute_graph_rank.py
+    #   Rebuild everything (e.g. after canonicalize_concepts.py): python src/pipeline/compute_graph_rank.py --full
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--full", action="store_true", help="Recount all co-occurrences and rescore every node")
+    arg_parser.add_argument("--damping", type=float, default=None, help="PageRank damping (default: GRAPH_RANK_DAMPING)")
+    arg_parser.add_argument("--top", type=int, default=10, help="Most important Concepts to print")
+    args = arg_parser.parse_args()
+
+    print(f"📈 Computing graph ranks ({Config.STORAGE_BACKEND}, {'full' if args.full else 'incremental'})...")
+    store = create_graph_store()
+    try:
+        report = GraphRankJob(store, damping=args.damping).run(full=args.full)
+        _, scores = store.load_graph_rank()
+    finally:
+        store.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    for name, score in sorted(scores.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"   - {name}: {score:.5f}")
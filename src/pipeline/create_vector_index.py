@@ -1,4 +1,3 @@
-
 import os
 import sys
 
@@ -7,48 +6,48 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
-from langchain_community.vectorstores import Neo4jVector
-from langchain_huggingface import HuggingFaceEmbeddings
 from src.config import Config
+from src.agent.tools import get_embeddings
+from src.features.graph.store import create_graph_store
+from src.telemetry.metrics import span
 
-def create_index():
+def create_index(batch_size: int = 64):
     print("🚀 Starting Vector Index Creation...")
     print(f"   - Embedding Model: {Config.EMBEDDING_MODEL_NAME}")
-    print(f"   - Neo4j URI: {Config.NEO4J_URI}")
+    print(f"   - Storage Backend: {Config.STORAGE_BACKEND}")
     
     # 1. Initialize Embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name=Config.EMBEDDING_MODEL_NAME,
-        model_kwargs={'device': 'cpu'}, # Config.EMBEDDING_DEVICE can be used if robust
-        encode_kwargs={'normalize_embeddings': True}
-    )
+    embeddings = get_embeddings()
+    store = create_graph_store()
 
     # 2. Create/Update Index
-    # from_existing_graph will:
-    # - Fetch 'Chunk' nodes
-    # - Calculate embeddings for 'text' property
-    # - Store them in 'embedding' property
-    # - Create a vector index named 'vector_index'
+    # - Create the vector index (Neo4j) if it doesn't exist
+    # - Fetch 'Chunk' nodes without an 'embedding'
+    # - Calculate embeddings for their 'text' and store them
     try:
-        vector_store = Neo4jVector.from_existing_graph(
-            embedding=embeddings,
-            url=Config.NEO4J_URI,
-            username=Config.NEO4J_USERNAME,
-            password=Config.NEO4J_PASSWORD,
-            index_name="vector_index",
-            node_label="Chunk",
-            text_node_properties=["text"],
-            embedding_node_property="embedding",
-        )
-        print("✅ Vector Index 'vector_index' created/updated successfully.")
+        store.ensure_vector_index(Config.EMBEDDING_DIMENSION)
+        
+        total = 0
+        while True:
+            pending = store.chunks_missing_embeddings(limit=batch_size)
+            if not pending:
+                break
+            with span("embedding", kind="document"):
+                vectors = embeddings.embed_documents([text for _, text in pending])
+            store.set_chunk_embeddings(list(zip([cid for cid, _ in pending], vectors)))
+            total += len(pending)
+            print(f"   - Embedded {total} chunks...")
+        print(f"✅ Vector Index '{Config.VECTOR_INDEX_NAME}' created/updated successfully ({total} new embeddings).")
         
         # Optional: Test search
         print("🔎 Testing Search...")
-        results = vector_store.similarity_search("테스트", k=1)
+        results = store.similarity_search(embeddings.embed_query("테스트"), k=1)
         print(f"   - Found {len(results)} results for trigger check.")
         
     except Exception as e:
         print(f"❌ Failed to create vector index: {e}")
+    finally:
+        store.close()
 
 if __name__ == "__main__":
     create_index()
@@ -1,13 +1,17 @@
 import os
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable
 import pandas as pd
-from datasets import Dataset
-from ragas import evaluate
-from langchain_community.graphs import Neo4jGraph
 
 from src.config import Config
-from src.agent.graph import graph_app
-from src.pipeline.trace import setup_tracing
-from src.evaluation.metrics import get_ragas_llm_embeddings, METRICS
+from src.telemetry.metrics import setup_exporters, registry
 
 # Define Golden Dataset
 GOLDEN_DATASET = [
@@ -21,120 +25,384 @@ GOLDEN_DATASET = [
     }
 ]
 
+def load_dataset(path: str) -> List[Dict[str, str]]:
+    """
+    Loads a golden dataset from JSONL or CSV.
+    Each record needs 'question' and 'ground_truth' (an optional 'id' is kept).
+    """
+    _, ext = os.path.splitext(path)
+    records = []
+    if ext.lower() == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+    elif ext.lower() == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            records = list(csv.DictReader(f))
+    else:
+        raise ValueError(f"Unsupported dataset format: {path} (use .jsonl or .csv)")
+
+    dataset = []
+    for i, r in enumerate(records):
+        if not r.get("question"):
+            print(f"⚠️ Skipping record {i}: missing 'question'")
+            continue
+        dataset.append({
+            "id": str(r.get("id") or i),
+            "question": r["question"],
+            "ground_truth": r.get("ground_truth", ""),
+        })
+    return dataset
+
 def seed_database():
     """
-    Seeds the Neo4j database with the knowledge required for the Golden Dataset.
+    Seeds the graph store with the knowledge required for the Golden Dataset.
     This ensures the Agent actually finds context.
     """
+    from src.features.schemas import IngestedDoc, ContentType
+    from src.features.graph.connector import GraphConnector
+
     print("🌱 Seeding Database with Test Data...")
-    graph = Neo4jGraph(
-        url=Config.NEO4J_URI, 
-        username=Config.NEO4J_USERNAME, 
-        password=Config.NEO4J_PASSWORD
+    connector = GraphConnector()
+
+    # Injected directly through the connector (no parsing / LLM extraction) for Eval speed.
+    doc = IngestedDoc(
+        id="eval_chunk_1",
+        content="Samsung Electronics announced a 15% increase in annual revenue for 2024.",
+        content_type=ContentType.TEXT,
+        metadata={"source": "evaluation_seed"}
     )
-    
-    # Simple Cypher to create a Concept node and a mock Chunk relation
-    # Ideally we use the Pipeline, but for Eval speed we inject directly.
-    query = """
-    MERGE (c:Concept {name: "Samsung Electronics"})
-    MERGE (t:Chunk {text: "Samsung Electronics announced a 15% increase in annual revenue for 2024.", chunk_id: "eval_chunk_1"})
-    MERGE (c)-[:MENTIONS]->(t)
-    """
-    graph.query(query)
+    connector.ingest_document(doc, ["Samsung Electronics"])
+    connector.close()
     print("✅ Database Seeded.")
 
-def run_evaluation():
-    # 1. Setup Tracing
-    setup_tracing()
-    
-    # 2. Seed Data
-    seed_database()
-    
-    # 3. Initialize RAGAS Config
-    llm, embeddings = get_ragas_llm_embeddings()
-    
-    # 4. Collection Output from Agent
-    data_samples = {
-        "question": [],
-        "answer": [],
-        "contexts": [],
-        "ground_truth": []
+def run_agent(question: str) -> Dict[str, Any]:
+    """
+    Runs one agent turn and returns its answer, retrieved contexts and latency.
+    """
+    from langchain_core.messages import HumanMessage
+    from src.agent.graph import get_graph_app
+    from src.agent.checkpoint import thread_config, new_thread_id
+
+    inputs = {
+        "input": question,
+        "chat_history": [HumanMessage(content=question)]
+    }
+
+    # Each question runs on its own checkpoint thread
+    run_config = thread_config(new_thread_id(), recursion_limit=10)
+    started = time.perf_counter()
+
+    final_answer = ""
+    retrieved_contexts = []
+    # We need to capture tool outputs for "contexts"
+    # stream(inputs, stream_mode="updates") returns dicts of {node_name: {updated_keys}}
+    for update in get_graph_app().stream(inputs, config=run_config, stream_mode="updates", durability="exit"):
+        # Check for Tool Node updates (context)
+        if "tool_executor" in update and "context" in update["tool_executor"]:
+            retrieved_contexts.extend(update["tool_executor"]["context"])
+        # Check for Oracle Node updates (answer)
+        if "oracle" in update and update["oracle"].get("answer"):
+            final_answer = update["oracle"]["answer"]
+
+    return {
+        "answer": final_answer or "No answer produced.",
+        "contexts": retrieved_contexts,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
     }
-    
-    print("🤖 Running Agent on Golden Dataset...")
-    for item in GOLDEN_DATASET:
-        question = item["question"]
-        ground_truth = item["ground_truth"]
-        
-        # Input Fix: StateGraph expects 'chat_history' often, or use 'input' if defined in State
-        # Based on graph.py, it uses state['input'] primarily but checks chat_history.
-        # Let's populate both to be safe.
-        from langchain_core.messages import HumanMessage
-        inputs = {
-            "input": question, 
-            "chat_history": [HumanMessage(content=question)]
+
+def agent_models() -> str:
+    """
+    Models the agent turn runs on (resolved per task), part of the cached answers' key.
+    """
+    from src.features.llm_router import model_for
+    return ",".join(f"{task}={model_for(task)}" for task in ("planner", "sql", "answer"))
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+_ragas_judge = None
+_ragas_lock = threading.Lock()
+
+def judge_sample(sample: Dict[str, Any]) -> Dict[str, float]:
+    """
+    RAGAS scores for a single question (judged independently so each result can be cached).
+    """
+    global _ragas_judge
+    from datasets import Dataset
+    from ragas import evaluate
+    from src.evaluation.metrics import get_ragas_llm_embeddings, METRICS
+
+    with _ragas_lock:
+        if _ragas_judge is None:
+            _ragas_judge = get_ragas_llm_embeddings()
+    llm, embeddings = _ragas_judge
+
+    hf_dataset = Dataset.from_dict({
+        "question": [sample["question"]],
+        "answer": [sample["answer"]],
+        "contexts": [sample["contexts"] or [""]],
+        "ground_truth": [sample["ground_truth"]],
+    })
+    results = evaluate(dataset=hf_dataset, metrics=METRICS, llm=llm, embeddings=embeddings, show_progress=False)
+    row = results.to_pandas().iloc[0].to_dict()
+    return {m.name: float(row[m.name]) for m in METRICS if m.name in row and pd.notnull(row[m.name])}
+
+class EvaluationCache:
+    """
+    SQLite cache of agent outputs and judge scores, keyed by (corpus_version, question,
+    agent models). Scores are stored with a hash of the ground truth they were judged
+    against and are only reused for the same ground truth.
+    Interrupted runs resume from it; a new corpus version or model re-runs everything.
+    """
+    def __init__(self, path: str = None):
+        self.path = path or Config.EVAL_CACHE_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS eval_results (
+            key TEXT PRIMARY KEY,
+            corpus_version TEXT,
+            question TEXT,
+            answer TEXT,
+            contexts_json TEXT,
+            latency_ms REAL,
+            scores_json TEXT,
+            ground_truth_hash TEXT,
+            judge_latency_ms REAL,
+            error TEXT,
+            updated_at REAL
+        )
+        """)
+        # Caches created before scores were tied to the ground truth
+        if "ground_truth_hash" not in {r[1] for r in self.conn.execute("PRAGMA table_info(eval_results)")}:
+            self.conn.execute("ALTER TABLE eval_results ADD COLUMN ground_truth_hash TEXT")
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(corpus_version: str, question: str, models: str = "") -> str:
+        return hashlib.sha1(f"{corpus_version}\x00{question}\x00{models}".encode("utf-8")).hexdigest()
+
+    def get(self, corpus_version: str, question: str, models: str = "",
+            ground_truth: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Cached output; 'scores' is None when they were judged against another ground truth.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT answer, contexts_json, latency_ms, scores_json, judge_latency_ms, error, ground_truth_hash "
+                "FROM eval_results WHERE key = ?",
+                (self.make_key(corpus_version, question, models),)
+            ).fetchone()
+        if row is None:
+            return None
+        scores = json.loads(row[3]) if row[3] else None
+        if ground_truth is not None and row[6] != _text_hash(ground_truth):
+            scores = None
+        return {
+            "answer": row[0],
+            "contexts": json.loads(row[1]) if row[1] else None,
+            "latency_ms": row[2],
+            "scores": scores,
+            "judge_latency_ms": row[4] if scores is not None else None,
+            "error": row[5],
         }
-        
-        # Run with recursion limit
+
+    def put_agent(self, corpus_version: str, question: str, output: Dict[str, Any], models: str = ""):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO eval_results (key, corpus_version, question, answer, contexts_json, latency_ms, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT(key) DO UPDATE SET answer = excluded.answer, contexts_json = excluded.contexts_json,
+                    latency_ms = excluded.latency_ms, scores_json = NULL, error = NULL, updated_at = excluded.updated_at
+                """,
+                (self.make_key(corpus_version, question, models), corpus_version, question, output["answer"],
+                 json.dumps(output["contexts"], ensure_ascii=False), output["latency_ms"], time.time())
+            )
+
+    def put_scores(self, corpus_version: str, question: str, scores: Dict[str, float], judge_latency_ms: float,
+                   models: str = "", ground_truth: str = ""):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                UPDATE eval_results SET scores_json = ?, ground_truth_hash = ?, judge_latency_ms = ?, error = NULL,
+                    updated_at = ? WHERE key = ?
+                """,
+                (json.dumps(scores), _text_hash(ground_truth), judge_latency_ms, time.time(),
+                 self.make_key(corpus_version, question, models))
+            )
+
+    def put_error(self, corpus_version: str, question: str, error: str, models: str = ""):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO eval_results (key, corpus_version, question, error, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET error = excluded.error, updated_at = excluded.updated_at
+                """,
+                (self.make_key(corpus_version, question, models), corpus_version, question, error, time.time())
+            )
+
+    def close(self):
+        self.conn.close()
+
+class EvaluationRunner:
+    """
+    Runs agent turns and RAGAS judgments with bounded concurrency.
+    Each finished step is cached immediately, so a failure only loses that one question.
+    """
+    def __init__(self,
+                 cache: EvaluationCache,
+                 corpus_version: str = None,
+                 agent_fn: Callable[[str], Dict[str, Any]] = run_agent,
+                 judge_fn: Callable[[Dict[str, Any]], Dict[str, float]] = judge_sample,
+                 concurrency: int = None,
+                 judge_concurrency: int = None,
+                 models: str = None):
+        self.cache = cache
+        self.corpus_version = corpus_version or Config.CORPUS_VERSION
+        # Cached answers are reused only for the same routed models
+        self.models = agent_models() if models is None else models
+        self.agent_fn = agent_fn
+        self.judge_fn = judge_fn
+        self.concurrency = concurrency or Config.EVAL_CONCURRENCY
+        self.judge_concurrency = judge_concurrency or Config.EVAL_JUDGE_CONCURRENCY
+        self.stats = {"agent_cached": 0, "agent_run": 0, "judge_cached": 0, "judge_run": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _agent_step(self, item: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        cached = self.cache.get(self.corpus_version, item["question"], self.models, item["ground_truth"])
+        if cached and cached["answer"] is not None and cached["contexts"] is not None:
+            self._count("agent_cached")
+            return cached
         try:
-            # We need to capture tool outputs for "contexts"
-            # stream(inputs, stream_mode="updates") returns dicts of {node_name: {updated_keys}}
-            result_stream = graph_app.stream(inputs, config={"recursion_limit": 10}, stream_mode="updates")
-            
-            final_answer = ""
-            retrieved_contexts = []
-            
-            for update in result_stream:
-                # Check for Tool Node updates (context)
-                if "tool_executor" in update:
-                    tool_output = update["tool_executor"]
-                    if "context" in tool_output:
-                        # Extend our context list
-                        retrieved_contexts.extend(tool_output["context"])
-                
-                # Check for Oracle Node updates (answer)
-                if "oracle" in update:
-                    oracle_output = update["oracle"]
-                    if "answer" in oracle_output:
-                        final_answer = oracle_output["answer"]
-            
-            # If answer is empty, maybe it's in the last state
-            if not final_answer:
-                # It might have been set in an earlier step or failed
-                final_answer = "No answer produced."
-
-            print(f"  Q: {question}")
-            print(f"  A: {final_answer[:50]}...")
-            
-            data_samples["question"].append(question)
-            data_samples["answer"].append(final_answer)
-            data_samples["contexts"].append(retrieved_contexts)
-            data_samples["ground_truth"].append(ground_truth)
-            
+            output = self.agent_fn(item["question"])
         except Exception as e:
-            print(f"Error processing question '{question}': {e}")
-
-    # 5. Build Dataset
-    hf_dataset = Dataset.from_dict(data_samples)
-    
-    # 6. Run Evaluation
-    print("📊 Starting RAGAS Evaluation (This may take time using Local LLM)...")
-    results = evaluate(
-        dataset=hf_dataset,
-        metrics=METRICS,
-        llm=llm,
-        embeddings=embeddings
-    )
-    
-    # 7. Save Results
-    output_dir = "data"
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "evaluation_results.csv")
-    
-    df = results.to_pandas()
+            self._count("failed")
+            self.cache.put_error(self.corpus_version, item["question"], f"agent: {e}", self.models)
+            print(f"Error processing question '{item['question']}': {e}")
+            return None
+        self.cache.put_agent(self.corpus_version, item["question"], output, self.models)
+        registry.observe("eval_agent_turn_ms", output["latency_ms"])
+        self._count("agent_run")
+        return {**output, "scores": None, "judge_latency_ms": None}
+
+    def _judge_step(self, item: Dict[str, str], output: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        if output.get("scores") is not None:
+            self._count("judge_cached")
+            return output["scores"]
+        sample = {**item, "answer": output["answer"], "contexts": output["contexts"]}
+        started = time.perf_counter()
+        try:
+            scores = self.judge_fn(sample)
+        except Exception as e:
+            self._count("failed")
+            self.cache.put_error(self.corpus_version, item["question"], f"judge: {e}", self.models)
+            print(f"Error judging question '{item['question']}': {e}")
+            return None
+        judge_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.cache.put_scores(self.corpus_version, item["question"], scores, judge_ms, self.models, item["ground_truth"])
+        output["judge_latency_ms"] = judge_ms
+        self._count("judge_run")
+        return scores
+
+    def run(self, dataset: List[Dict[str, str]]) -> pd.DataFrame:
+        started = time.perf_counter()
+        outputs: Dict[int, Dict[str, Any]] = {}
+        scores: Dict[int, Dict[str, float]] = {}
+
+        # Agent turns and judgments run on separate pools: the judge starts as soon as an answer exists.
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="eval-agent") as agent_pool, \
+             ThreadPoolExecutor(max_workers=self.judge_concurrency, thread_name_prefix="eval-judge") as judge_pool:
+            agent_futures = {agent_pool.submit(self._agent_step, item): i for i, item in enumerate(dataset)}
+            judge_futures = {}
+            for done, future in enumerate(as_completed(agent_futures), 1):
+                i = agent_futures[future]
+                output = future.result()
+                if output is None:
+                    continue
+                outputs[i] = output
+                judge_futures[judge_pool.submit(self._judge_step, dataset[i], output)] = i
+                if done % 50 == 0:
+                    rate = done / (time.perf_counter() - started)
+                    print(f"   - Agent turns: {done}/{len(dataset)} ({rate:.2f} q/s)")
+            for future in as_completed(judge_futures):
+                result = future.result()
+                if result is not None:
+                    scores[judge_futures[future]] = result
+
+        rows = []
+        for i, item in enumerate(dataset):
+            output = outputs.get(i)
+            rows.append({
+                "id": item.get("id", str(i)),
+                "question": item["question"],
+                "ground_truth": item["ground_truth"],
+                "answer": output["answer"] if output else None,
+                "contexts": output["contexts"] if output else None,
+                "latency_ms": output["latency_ms"] if output else None,
+                "judge_latency_ms": output.get("judge_latency_ms") if output else None,
+                **scores.get(i, {}),
+            })
+        print(f"📊 Evaluation stats: {self.stats} in {time.perf_counter() - started:.1f}s")
+        return pd.DataFrame(rows)
+
+def run_evaluation(dataset_path: str = None,
+                   corpus_version: str = None,
+                   concurrency: int = None,
+                   judge_concurrency: int = None,
+                   seed: bool = None,
+                   output_path: str = None):
+    # 1. Setup Metrics/Tracing Exporters (Phoenix only if METRICS_EXPORT includes "phoenix")
+    setup_exporters()
+
+    # 2. Seed Data (only for the built-in dataset by default; real corpora are already ingested)
+    if seed is None:
+        seed = dataset_path is None
+    if seed:
+        seed_database()
+
+    # 3. Load Dataset
+    dataset = load_dataset(dataset_path) if dataset_path else [
+        {"id": str(i), **item} for i, item in enumerate(GOLDEN_DATASET)
+    ]
+
+    # 4. Run Agent + RAGAS (cached per question, corpus version and agent models)
+    print(f"🤖 Running Agent on {len(dataset)} questions (RAGAS judging may take time using Local LLM)...")
+    cache = EvaluationCache()
+    runner = EvaluationRunner(cache, corpus_version, concurrency=concurrency, judge_concurrency=judge_concurrency)
+    df = runner.run(dataset)
+    cache.close()
+
+    # 5. Save Results
+    output_path = output_path or os.path.join("data", "evaluation_results.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
     df.to_csv(output_path, index=False)
     print(f"✅ Evaluation Complete. Results saved to: {output_path}")
-    print(results)
+
+    score_columns = [c for c in df.columns if c not in
+                     ("id", "question", "ground_truth", "answer", "contexts", "latency_ms", "judge_latency_ms")]
+    if score_columns:
+        print(df[score_columns + ["latency_ms"]].mean(numeric_only=True))
+    return df
 
 if __name__ == "__main__":
-    run_evaluation()
+    # Example usage: python src/pipeline/evaluate.py --dataset data/golden.jsonl --concurrency 4
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--dataset", type=str, default=None, help="JSONL/CSV with question, ground_truth")
+    arg_parser.add_argument("--corpus_version", type=str, default=None, help="Cache namespace (default: CORPUS_VERSION)")
+    arg_parser.add_argument("--concurrency", type=int, default=None)
+    arg_parser.add_argument("--judge_concurrency", type=int, default=None)
+    arg_parser.add_argument("--seed", action="store_true", default=None, help="Insert the golden-dataset seed chunk first")
+    arg_parser.add_argument("--output", type=str, default=None)
+    args = arg_parser.parse_args()
+
+    run_evaluation(args.dataset, args.corpus_version, args.concurrency, args.judge_concurrency, args.seed, args.output)
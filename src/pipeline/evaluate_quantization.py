@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import argparse
+from typing import List, Dict, Any
+import numpy as np
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.features.graph.quantized_index import QuantizedIndex, QUANTIZATION_MODES
+from src.pipeline.evaluate_retrieval import load_labels, save_rows
+
+def exact_top_k(matrix: np.ndarray, ids: List[str], query: np.ndarray, k: int) -> List[str]:
+    scores = matrix @ (query / (np.linalg.norm(query) or 1.0))
+    top = np.argsort(-scores, kind="stable")[:k]
+    return [ids[i] for i in top]
+
+def compare_quantization(ids: List[str],
+                         vectors: np.ndarray,
+                         queries: np.ndarray,
+                         ks: List[int] = (1, 3, 10),
+                         modes: List[str] = QUANTIZATION_MODES,
+                         multipliers: List[int] = (0, 4, 10)) -> List[Dict[str, Any]]:
+    """
+    Memory and recall of quantized indexes against exact float search on the same vectors.
+    recall = |quantized top-k ∩ float top-k| / k, averaged over queries.
+    multiplier 0 = first pass only; otherwise k * multiplier candidates are rescored in float.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = (vectors / norms).astype(np.float32)
+    lookup = {node_id: i for i, node_id in enumerate(ids)}
+    fetch = lambda wanted: {i: vectors[lookup[i]] for i in wanted}
+
+    baseline = {k: [exact_top_k(matrix, ids, q, k) for q in queries] for k in ks}
+    rows = []
+    float_latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        exact_top_k(matrix, ids, q, max(ks))
+        float_latencies.append((time.perf_counter() - t0) * 1000.0)
+    rows.append({"mode": "float32", "rescore": 0, "k": max(ks), "recall": 1.0,
+                 "p50_ms": round(float(np.percentile(float_latencies, 50)), 3),
+                 "memory_mb": round(matrix.nbytes / 1024 ** 2, 3), "compression": 1.0})
+
+    for mode in modes:
+        index = QuantizedIndex(mode, fetch_vectors=fetch)
+        index.load(zip(ids, vectors))
+        memory = index.memory_bytes()
+        for multiplier in multipliers:
+            for k in ks:
+                hits, latencies = [], []
+                for q in queries:
+                    t0 = time.perf_counter()
+                    result = index.first_pass(q, k) if not multiplier else index.search(q, k, candidates=k * multiplier)
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+                    hits.append([h[0] for h in result])
+                recall = np.mean([len(set(h) & set(b)) / k for h, b in zip(hits, baseline[k])])
+                rows.append({
+                    "mode": mode, "rescore": multiplier, "k": k,
+                    "recall": round(float(recall), 4),
+                    "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                    "memory_mb": round(memory / 1024 ** 2, 3),
+                    "compression": round(matrix.nbytes / max(1, memory), 1),
+                })
+    return rows
+
+if __name__ == "__main__":
+    # Example usage: python src/pipeline/evaluate_quantization.py --sample 200 --rescore 0,4,10
+    #   With real questions as queries: --labels data/retrieval_labels.jsonl
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--label", type=str, default="Chunk", help="Embedded node label to evaluate")
+    arg_parser.add_argument("--labels", type=str, default=None, help="JSONL/CSV whose questions are used as queries")
+    arg_parser.add_argument("--sample", type=int, default=200, help="Stored vectors used as queries when --labels is not given")
+    arg_parser.add_argument("--k", type=str, default="1,3,10")
+    arg_parser.add_argument("--rescore", type=str, default="0,4,10", help="Rescore multipliers (0 = first pass only)")
+    arg_parser.add_argument("--output", type=str, default="data/quantization_report.csv")
+    args = arg_parser.parse_args()
+
+    from src.features.graph.store import create_graph_store
+
+    store = create_graph_store()
+    try:
+        pairs = [pair for batch in store.iter_embeddings(args.label) for pair in batch]
+    finally:
+        store.close()
+    if not pairs:
+        print(f"⚠️ No {args.label} embeddings found ({Config.STORAGE_BACKEND}).")
+        sys.exit(1)
+    ids = [p[0] for p in pairs]
+    vectors = np.vstack([np.asarray(p[1], dtype=np.float32) for p in pairs])
+    del pairs
+
+    if args.labels:
+        from src.agent.tools import get_embeddings
+        questions = [l["question"] for l in load_labels(args.labels)]
+        queries = np.asarray(get_embeddings().embed_documents(questions), dtype=np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(ids), size=min(args.sample, len(ids)), replace=False)]
+
+    print(f"🔎 Quantization report: {len(ids)} {args.label} vectors x {vectors.shape[1]} dims, {len(queries)} queries")
+    rows = compare_quantization(ids, vectors, queries,
+                                ks=[int(k) for k in args.k.split(",")],
+                                multipliers=[int(m) for m in args.rescore.split(",")])
+    for r in rows:
+        print(f"   - {r['mode']:<8} rescore={r['rescore']:<3} k={r['k']:<3} recall={r['recall']:.3f} "
+              f"p50={r['p50_ms']:.3f}ms memory={r['memory_mb']:.2f}MB ({r['compression']}x)")
+    save_rows(rows, args.output)
+    print(f"✅ Report saved to: {args.output}")
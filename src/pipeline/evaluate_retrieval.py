@@ -0,0 +1,269 @@
+import os
+import sys
+import csv
+import json
+import time
+import inspect
+import argparse
+import itertools
+from typing import List, Dict, Any, Callable, Optional
+import numpy as np
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.evaluation.retrieval_metrics import score_rankings
+from src.features.graph.quantized_index import QuantizedIndex, QUANTIZATION_MODES
+
+def vector_search(store, embedding: List[float], k: int, candidates: int = 0) -> List[str]:
+    """
+    Plain vector search. 'candidates' > k asks the index for more neighbours than needed
+    (wider HNSW search in Neo4j) and keeps the top k.
+    """
+    hits = store.similarity_search(embedding, k=max(k, int(candidates or 0)))
+    return [h["id"] for h in hits[:k]]
+
+_quantized_indexes: Dict[tuple, QuantizedIndex] = {}
+
+def quantized_index(store, mode: str, label: str = "Chunk") -> QuantizedIndex:
+    """
+    In-process quantized index over a store's vectors (built once per store), rescored
+    with full-precision vectors fetched from the store.
+    """
+    key = (id(store), mode, label)
+    if key not in _quantized_indexes:
+        index = QuantizedIndex(mode, fetch_vectors=lambda ids: store.fetch_embeddings(ids, label))
+        index.load(pair for batch in store.iter_embeddings(label) for pair in batch)
+        _quantized_indexes[key] = index
+    return _quantized_indexes[key]
+
+def _quantized_search(mode: str) -> Callable[..., List[str]]:
+    def search(store, embedding: List[float], k: int, rescore: int = 4) -> List[str]:
+        """
+        'rescore' candidates per result are rescored in float; 0 keeps the first-pass order.
+        """
+        index = quantized_index(store, mode)
+        if not rescore:
+            return [h[0] for h in index.first_pass(embedding, k)]
+        return [h[0] for h in index.search(embedding, k, candidates=k * int(rescore))]
+    return search
+
+# Search mode name -> fn(store, query_embedding, k, **index_params) -> ranked chunk ids
+SEARCH_MODES: Dict[str, Callable[..., List[str]]] = {
+    "vector": vector_search,
+    **{mode: _quantized_search(mode) for mode in QUANTIZATION_MODES},
+}
+
+def load_labels(path: str) -> List[Dict[str, Any]]:
+    """
+    Loads retrieval labels: question -> relevant chunk ids.
+    - JSONL: {"question": ..., "relevant_ids": ["chunk-1", ...]} (or {"chunk-1": 2, ...} for graded relevance)
+    - CSV:   question,relevant_ids with ids separated by '|'
+    """
+    _, ext = os.path.splitext(path)
+    labels = []
+    if ext.lower() == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    labels.append({"question": record["question"], "relevant_ids": record["relevant_ids"]})
+    elif ext.lower() == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for record in csv.DictReader(f):
+                ids = [i.strip() for i in record["relevant_ids"].split("|") if i.strip()]
+                labels.append({"question": record["question"], "relevant_ids": ids})
+    else:
+        raise ValueError(f"Unsupported labels format: {path} (use .jsonl or .csv)")
+    return [l for l in labels if l["relevant_ids"]]
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of index parameters: {"candidates": [0, 50]} -> [{"candidates": 0}, {"candidates": 50}].
+    """
+    if not param_grid:
+        return [{}]
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+def search_params(mode: str) -> List[str]:
+    """
+    Index parameters the mode's search function takes (besides store, embedding, k).
+    """
+    signature = inspect.signature(SEARCH_MODES[mode])
+    return [name for name in list(signature.parameters)[3:]]
+
+def mode_grid(mode: str, param_grid: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """
+    The part of the grid a mode runs with: "mode:name" keys for that mode, plus plain
+    "name" keys its search function accepts ({"int8:rescore": [4, 10], "candidates": [0, 50]}
+    gives int8 only rescore and vector only candidates).
+    """
+    accepted = search_params(mode)
+    grid = {}
+    for key, values in (param_grid or {}).items():
+        scope, _, name = key.rpartition(":")
+        if scope and scope != mode:
+            continue
+        if name in accepted:
+            grid[name] = values
+        elif scope:
+            raise ValueError(f"Search mode '{mode}' has no parameter '{name}' (use {', '.join(accepted) or 'none'})")
+    return grid
+
+def run_sweep(store,
+              embeddings,
+              labels: List[Dict[str, Any]],
+              ks: List[int] = (1, 3, 5, 10),
+              modes: List[str] = ("vector",),
+              param_grid: Dict[str, List[Any]] = None,
+              repeats: int = 1) -> List[Dict[str, Any]]:
+    """
+    Scores every (mode, index params, k) setting on the labelled questions.
+    Each mode runs with its own part of 'param_grid' (see mode_grid).
+    Queries are embedded once; only the search call is timed.
+    """
+    grids = {mode: mode_grid(mode, param_grid) for mode in modes}
+    for key in param_grid or {}:
+        scope, _, name = key.rpartition(":")
+        if not scope and not any(name in grid for grid in grids.values()):
+            raise ValueError(f"No search mode in {', '.join(modes)} takes parameter '{name}'")
+
+    started = time.perf_counter()
+    query_vectors = [embeddings.embed_query(l["question"]) for l in labels]
+    embed_ms = (time.perf_counter() - started) * 1000.0 / max(1, len(labels))
+    relevant = [l["relevant_ids"] for l in labels]
+
+    rows = []
+    for mode in modes:
+        search_fn = SEARCH_MODES[mode]
+        for params in expand_grid(grids[mode]):
+            if query_vectors:
+                search_fn(store, query_vectors[0], max(ks), **params)  # Warm-up (lazy index builds)
+            for k in ks:
+                rankings, latencies = [], []
+                for _ in range(repeats):
+                    rankings = []
+                    for vec in query_vectors:
+                        t0 = time.perf_counter()
+                        rankings.append(search_fn(store, vec, k, **params))
+                        latencies.append((time.perf_counter() - t0) * 1000.0)
+                lat = np.asarray(latencies)
+                rows.append({
+                    "mode": mode,
+                    "params": json.dumps(params, sort_keys=True),
+                    "k": k,
+                    **score_rankings(rankings, relevant, k),
+                    "p50_ms": round(float(np.percentile(lat, 50)), 3),
+                    "p99_ms": round(float(np.percentile(lat, 99)), 3),
+                    "embed_ms": round(embed_ms, 3),
+                })
+    return rows
+
+def pick_fastest(rows: List[Dict[str, Any]], target_recall: float) -> Optional[Dict[str, Any]]:
+    """
+    Lowest-p50 setting whose recall meets the target (ties broken by p99, then higher recall).
+    """
+    eligible = [r for r in rows if r["recall"] >= target_recall]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda r: (r["p50_ms"], r["p99_ms"], -r["recall"]))
+
+def plot_sweep(rows: List[Dict[str, Any]], path: str, target_recall: float = None):
+    """
+    Recall vs p50/p99 search latency per setting (requires matplotlib).
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib not installed, skipping plot.")
+        return
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5), sharey=True)
+    for ax, latency in zip(axes, ("p50_ms", "p99_ms")):
+        for (mode, params), group in itertools.groupby(sorted(rows, key=lambda r: (r["mode"], r["params"], r["k"])),
+                                                       key=lambda r: (r["mode"], r["params"])):
+            group = list(group)
+            ax.plot([r[latency] for r in group], [r["recall"] for r in group], marker="o", label=f"{mode} {params}")
+            for r in group:
+                ax.annotate(f"k={r['k']}", (r[latency], r["recall"]), fontsize=7)
+        if target_recall is not None:
+            ax.axhline(target_recall, linestyle="--", color="gray")
+        ax.set_xlabel(f"{latency} (search)")
+        ax.grid(True, alpha=0.3)
+    axes[0].set_ylabel("recall@k")
+    axes[0].legend(fontsize=7)
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"📈 Plot saved to: {path}")
+
+def save_rows(rows: List[Dict[str, Any]], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def _parse_param(spec: str):
+    # "candidates=0,50,100" -> ("candidates", [0, 50, 100]); "int8:rescore=4,10" -> ("int8:rescore", [4, 10])
+    name, _, values = spec.partition("=")
+    parsed = []
+    for v in values.split(","):
+        try:
+            parsed.append(json.loads(v))
+        except ValueError:
+            parsed.append(v)
+    return name.strip(), parsed
+
+if __name__ == "__main__":
+    # Example usage:
+    #   python src/pipeline/evaluate_retrieval.py --labels data/retrieval_labels.jsonl --k 1,3,5,10 \
+    #       --param candidates=0,50,200 --target_recall 0.9 --plot data/retrieval_sweep.png
+    #   Quantized first pass: --modes binary,int8 --param rescore=0,4,10
+    #   Per mode: --modes vector,int8 --param vector:candidates=0,50 --param int8:rescore=4,10
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--labels", type=str, required=True, help="JSONL/CSV: question -> relevant chunk ids")
+    arg_parser.add_argument("--k", type=str, default="1,3,5,10")
+    arg_parser.add_argument("--modes", type=str, default="vector", help=f"Comma separated: {', '.join(SEARCH_MODES)}")
+    arg_parser.add_argument("--param", action="append", default=[], help="Index parameter grid, e.g. candidates=0,50,200 or int8:rescore=4,10 "
+                                                                            "(plain names go to the modes that take them)")
+    arg_parser.add_argument("--repeats", type=int, default=3, help="Timed passes per setting")
+    arg_parser.add_argument("--target_recall", type=float, default=0.9)
+    arg_parser.add_argument("--output", type=str, default="data/retrieval_sweep.csv")
+    arg_parser.add_argument("--plot", type=str, default=None)
+    args = arg_parser.parse_args()
+
+    from src.agent.tools import get_embeddings
+    from src.features.graph.store import create_graph_store
+
+    labels = load_labels(args.labels)
+    print(f"🔎 Retrieval sweep on {len(labels)} labelled questions ({Config.STORAGE_BACKEND})")
+    store = create_graph_store()
+    try:
+        rows = run_sweep(store, get_embeddings(), labels,
+                         ks=[int(k) for k in args.k.split(",")],
+                         modes=[m.strip() for m in args.modes.split(",")],
+                         param_grid=dict(_parse_param(p) for p in args.param),
+                         repeats=args.repeats)
+    finally:
+        store.close()
+
+    for r in rows:
+        print(f"   - {r['mode']:<8} {r['params']:<24} k={r['k']:<3} recall={r['recall']:.3f} "
+              f"mrr={r['mrr']:.3f} ndcg={r['ndcg']:.3f} p50={r['p50_ms']:.2f}ms p99={r['p99_ms']:.2f}ms")
+    save_rows(rows, args.output)
+    print(f"✅ Sweep results saved to: {args.output}")
+
+    best = pick_fastest(rows, args.target_recall)
+    if best:
+        print(f"🏁 Fastest setting with recall >= {args.target_recall}: "
+              f"mode={best['mode']} params={best['params']} k={best['k']} (p50 {best['p50_ms']}ms)")
+    else:
+        print(f"⚠️ No setting reaches recall {args.target_recall}.")
+    if args.plot:
+        plot_sweep(rows, args.plot, args.target_recall)
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.features.ingestor import DocumentIngestor
+from src.features.job_queue import JobQueue, Job, LeaseLost
+from src.telemetry.metrics import span, registry
+
+logger = logging.getLogger(__name__)
+
+class IngestionService:
+    """
+    Long-running ingestion: files are submitted to a durable JobQueue (HTTP API or
+    watch folder) and processed by worker threads through the DocumentIngestor stages.
+    Each completed stage is recorded with its output, so after a crash or a failed
+    attempt a file resumes at the next stage instead of starting over.
+    """
+    def __init__(self, queue: JobQueue, ingestor: DocumentIngestor, workers: int = None, poll_s: float = 0.5,
+                 rank_job=None):
+        self.queue = queue
+        self.ingestor = ingestor
+        self.workers = workers or Config.INGEST_WORKERS
+        self.poll_s = poll_s
+        self.rank_job = rank_job  # GraphRankJob refreshed when the queue goes idle, or None
+        self._rank_pending = threading.Event()
+        self._rank_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._seen_files: Dict[str, tuple] = {}
+
+    # --- Workers ---
+
+    def run_job(self, job: Job) -> int:
+        """
+        Runs the remaining stages of a job, heartbeating its lease meanwhile.
+        Returns the number of documents written. Raises LeaseLost when the lease
+        was lost to another worker (the stage result is then dropped).
+        """
+        with self.queue.keep_alive(job):
+            return self._run_stages(job)
+
+    def _run_stages(self, job: Job) -> int:
+        state = job.state
+        artifact = job.artifact or {}
+        docs = artifact.get("docs")
+        concepts = artifact.get("concepts")
+
+        if state == "queued":
+            with span("ingest_stage", stage="parse"):
+                docs = self.ingestor.parse(job.path)
+            self.queue.advance(job, "parsed", {"docs": docs})
+            state = "parsed"
+        if state == "parsed":
+            with span("ingest_stage", stage="extract"):
+                concepts = self.ingestor.extract(docs)
+            self.queue.advance(job, "extracted", {"docs": docs, "concepts": concepts})
+            state = "extracted"
+        if state == "extracted":
+            if self.ingestor.embedder is not None:
+                with span("ingest_stage", stage="embed"):
+                    self.ingestor.embed(docs)
+            self.queue.advance(job, "embedded", {"docs": docs, "concepts": concepts})
+            state = "embedded"
+        if state == "embedded":
+            # Only the lease holder writes to the graph
+            if not self.queue.heartbeat(job):
+                raise LeaseLost(f"Job {job.id} is no longer leased by {job.lease_owner}")
+            with span("ingest_stage", stage="write"):
+                self.ingestor.write(docs, concepts)
+        self.queue.complete(job, len(docs))
+        return len(docs)
+
+    def _lease_lost(self, job: Job, error: LeaseLost):
+        registry.inc("ingest_jobs", result="lease_lost")
+        logger.warning(f"{error}; dropping this worker's result for {job.path}")
+
+    def process_next(self, worker_id: str) -> bool:
+        """
+        Claims and runs one job. False when no job is ready.
+        """
+        job = self.queue.claim(worker_id)
+        if job is None:
+            return False
+        try:
+            if not os.path.isfile(job.path):
+                raise FileNotFoundError(job.path)
+            count = self.run_job(job)
+            self._rank_pending.set()
+            registry.inc("ingest_jobs", result="done")
+            logger.info(f"Ingested {job.path} ({count} documents)")
+        except LeaseLost as e:
+            self._lease_lost(job, e)
+        except Exception as e:
+            completed = job.state
+            try:
+                delay = self.queue.fail(job, f"{type(e).__name__}: {e}")
+            except LeaseLost as lost:
+                self._lease_lost(job, lost)
+                return True
+            registry.inc("ingest_jobs", result="failed" if job.state == "failed" else "retry")
+            logger.warning(f"Job {job.id} ({job.path}) failed after stage '{completed}': {e}"
+                           + (f"; retry in {delay:.1f}s" if job.state != "failed" else ""))
+        return True
+
+    def refresh_rank(self) -> Optional[Dict[str, Any]]:
+        """
+        Incremental graph rank refresh after new documents were written (one worker at a time).
+        """
+        if self.rank_job is None or not self._rank_pending.is_set() or not self._rank_lock.acquire(blocking=False):
+            return None
+        try:
+            self._rank_pending.clear()
+            return self.rank_job.run()
+        except Exception as e:
+            self._rank_pending.set()
+            logger.warning(f"Graph rank refresh failed: {e}")
+            return None
+        finally:
+            self._rank_lock.release()
+
+    def _worker(self, worker_id: str):
+        while not self._stop.is_set():
+            if not self.process_next(worker_id):
+                self.refresh_rank()
+                self._stop.wait(self.poll_s)
+
+    def drain(self, worker_id: str = "drain", timeout_s: float = None) -> int:
+        """
+        Processes ready jobs in the calling thread until none is left. Returns jobs run.
+        """
+        deadline = time.time() + timeout_s if timeout_s else None
+        count = 0
+        while self.process_next(worker_id):
+            count += 1
+            if deadline and time.time() > deadline:
+                break
+        self.refresh_rank()
+        return count
+
+    # --- Watch folder ---
+
+    def scan(self, directory: str) -> List[int]:
+        """
+        Submits new or modified files in a directory (content hash deduplicates re-submits).
+        """
+        job_ids = []
+        for entry in os.scandir(directory):
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            st = entry.stat()
+            signature = (st.st_mtime_ns, st.st_size)
+            if self._seen_files.get(entry.path) == signature:
+                continue
+            self._seen_files[entry.path] = signature
+            job_ids.append(self.queue.submit(entry.path))
+        return job_ids
+
+    def _watch(self, directory: str, interval_s: float):
+        while not self._stop.is_set():
+            try:
+                self.scan(directory)
+            except OSError as e:
+                logger.warning(f"Watch scan of {directory} failed: {e}")
+            self._stop.wait(interval_s)
+
+    # --- Lifecycle ---
+
+    def start(self, watch_dir: str = None, watch_interval_s: float = 5.0) -> "IngestionService":
+        # A previous process may have died holding leases: count the interrupted attempt, retry after backoff
+        self.queue.release_leases()
+        self._stop.clear()
+        run_id = uuid.uuid4().hex[:6]
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, args=(f"{run_id}-{i}",), daemon=True, name=f"ingest-{i}")
+            thread.start()
+            self._threads.append(thread)
+        if watch_dir:
+            thread = threading.Thread(target=self._watch, args=(watch_dir, watch_interval_s), daemon=True, name="ingest-watch")
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout_s: float = 30.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout_s)
+        self._threads = []
+
+def make_http_server(service: IngestionService, host: str = None, port: int = None) -> ThreadingHTTPServer:
+    """
+    Local HTTP API:
+      POST /jobs        {"path": "..."} or {"paths": [...]}  -> 202 {"ids": [...]}
+      GET  /jobs/<id>   job state, attempts, last error
+      GET  /stats       queue depth per state, throughput, latency, LLM calls avoided (+ Neo4j pool utilization)
+      GET  /health
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, payload: Dict[str, Any], status: int = 200):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json({"status": "ok"})
+            elif self.path == "/stats":
+                stats = service.queue.stats()
+                if hasattr(service.ingestor.extractor, "stats"):
+                    stats["extraction"] = service.ingestor.extractor.stats()  # LLM calls avoided by the gazetteer
+                if Config.STORAGE_BACKEND == "neo4j":
+                    from src.features.graph.driver import pool_stats
+                    stats["neo4j_pool"] = pool_stats()
+                self._send_json(stats)
+            elif self.path.startswith("/jobs/") and self.path[len("/jobs/"):].isdigit():
+                job = service.queue.get(int(self.path[len("/jobs/"):]))
+                self._send_json(job or {"error": "not found"}, status=200 if job else 404)
+            else:
+                self._send_json({"error": f"unknown path {self.path}"}, status=404)
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                self._send_json({"error": f"unknown path {self.path}"}, status=404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                paths = request.get("paths") or [request.get("path")]
+            except (ValueError, AttributeError):
+                self._send_json({"error": "expected JSON {\"path\": ...} or {\"paths\": [...]}"}, status=400)
+                return
+            missing = [p for p in paths if not p or not os.path.isfile(p)]
+            if missing:
+                self._send_json({"error": "files not found", "paths": missing}, status=400)
+                return
+            self._send_json({"ids": [service.queue.submit(p) for p in paths]}, status=202)
+
+    server = ThreadingHTTPServer((host or Config.INGEST_HOST, Config.INGEST_PORT if port is None else port), Handler)
+    server.daemon_threads = True
+    return server
+
+def build_service(workers: int = None, embed: bool = None) -> IngestionService:
+    from src.features.universal_parser import UniversalParser
+    from src.features.graph.extractor import GraphExtractor
+    from src.features.graph.gazetteer import create_gazetteer
+    from src.features.graph.connector import GraphConnector
+
+    embedder = None
+    if Config.INGEST_EMBEDDINGS if embed is None else embed:
+        from src.agent.tools import get_embeddings
+        from src.features.embedder import DocumentEmbedder
+        embedder = DocumentEmbedder(get_embeddings())
+    connector = GraphConnector()
+    if Config.SCHEMA_AUTO_MIGRATE:
+        connector.ensure_schema()
+    ingestor = DocumentIngestor(UniversalParser(), GraphExtractor(create_gazetteer(connector.store)), connector, embedder)
+    rank_job = None
+    if Config.GRAPH_RANK_AUTO:
+        from src.features.graph.graph_rank import GraphRankJob
+        rank_job = GraphRankJob(connector.store)
+    return IngestionService(JobQueue(), ingestor, workers=workers, rank_job=rank_job)
+
+if __name__ == "__main__":
+    # Example usage: python src/pipeline/ingest_service.py --watch data_raw --workers 2 --embed
+    #   Submit a file:  curl -X POST localhost:8765/jobs -d '{"path": "/abs/path/report.pdf"}'
+    #   Queue stats:    curl localhost:8765/stats
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--port", type=int, default=None, help="HTTP API port (default: INGEST_PORT)")
+    arg_parser.add_argument("--watch", type=str, default=None, help="Directory polled for new or modified files")
+    arg_parser.add_argument("--watch_interval", type=float, default=5.0)
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--embed", action="store_true", default=None, help="Embed during ingestion (default: INGEST_EMBEDDINGS)")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    service = build_service(workers=args.workers, embed=args.embed)
+    print(f"📥 Resuming with queue: {service.queue.stats()}")
+    service.start(watch_dir=args.watch, watch_interval_s=args.watch_interval)
+    server = make_http_server(service, port=args.port)
+    print(f"🚀 Ingestion service on http://{server.server_address[0]}:{server.server_address[1]} "
+          f"({service.workers} workers{', watching ' + args.watch if args.watch else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        service.ingestor.connector.close()
+        service.queue.close()
@@ -0,0 +1,37 @@
+import os
+import sys
+import argparse
+
+# Ensure src is importable
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.config import Config
+from src.features.graph.store import create_graph_store
+from src.features.graph.schema import SchemaManager, print_drift_report
+
+def main(check_only: bool = False) -> int:
+    store = create_graph_store()
+    try:
+        driver = getattr(store, "driver", None)
+        if driver is None:
+            print(f"ℹ️ Backend '{store.name}' creates its schema on open; nothing to migrate.")
+            return 0
+        manager = SchemaManager(driver)
+        report = manager.check() if check_only else manager.apply()
+        print_drift_report(report)
+        return 1 if report["drift"] else 0
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    # Example usage:
+    #   python src/pipeline/migrate_schema.py           # apply pending migrations, then report drift
+    #   python src/pipeline/migrate_schema.py --check   # report only (exit 1 on drift, e.g. in CI)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--check", action="store_true", help="Only report drift")
+    args = arg_parser.parse_args()
+
+    print(f"🧱 Graph schema ({Config.STORAGE_BACKEND}, vector dim={Config.EMBEDDING_DIMENSION}, {Config.VECTOR_SIMILARITY})")
+    sys.exit(main(args.check))
@@ -1,13 +1,29 @@
-import phoenix as px
-from openinference.instrumentation.langchain import LangChainInstrumentor
+from src.config import Config
 
-def setup_tracing():
+def setup_tracing(launch_app: bool = None):
     """
-    Initializes Arize Phoenix for observability.
-    - Launches local Phoenix server.
-    - Auto-instruments LangChain/LangGraph to capture traces.
+    Optional Arize Phoenix exporter for LangChain/LangGraph traces.
+    - If PHOENIX_COLLECTOR_ENDPOINT is set, traces are sent to that (already running) collector.
+    - Otherwise a local Phoenix server is launched (launch_app=True by default in that case).
+    In-process stage metrics (src/telemetry/metrics.py) do not need Phoenix.
     """
     try:
+        # Imported lazily: Phoenix is only required when this exporter is used
+        from openinference.instrumentation.langchain import LangChainInstrumentor
+        
+        session = None
+        if Config.PHOENIX_COLLECTOR_ENDPOINT:
+            from phoenix.otel import register
+            tracer_provider = register(endpoint=Config.PHOENIX_COLLECTOR_ENDPOINT)
+            LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
+            print(f"✅ Sending traces to Phoenix collector at: {Config.PHOENIX_COLLECTOR_ENDPOINT}")
+            return tracer_provider
+        
+        if launch_app is False:
+            print("⚠️ Phoenix tracing skipped (no collector endpoint and launch_app=False).")
+            return None
+        
+        import phoenix as px
         # Launch Phoenix (Idempotent: if running, it reconnects or users existing)
         session = px.launch_app()
         print(f"🚀 Phoenix Tracing UI launched at: {session.url}")
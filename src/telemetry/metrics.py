@@ -0,0 +1,293 @@
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+from functools import wraps
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Tuple, Optional, Sequence
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (ms) cover in-process calls (sub-ms) up to CPU LLM answers (minutes)
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+# Size buckets for token / item counts
+COUNT_BUCKETS = (1, 4, 16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus semantics: cumulative 'le' buckets on export).
+    """
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-th percentile (q in 0..100).
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            target = self.count * q / 100.0
+            running = 0
+            for i, c in enumerate(self.counts):
+                running += c
+                if running >= target:
+                    return self.buckets[i] if i < len(self.buckets) else self.max
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": round(self.max, 3),
+        }
+
+class MetricsRegistry:
+    """
+    Process-wide in-memory histograms and counters, keyed by metric name and labels.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS_MS, **labels) -> Histogram:
+        key = self._key(labels)
+        series = self._histograms.get(name)
+        if series is None or key not in series:
+            with self._lock:
+                series = self._histograms.setdefault(name, {})
+                if key not in series:
+                    series[key] = Histogram(buckets)
+        return series[key]
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS_MS, **labels):
+        if not self.enabled:
+            return
+        self.histogram(name, buckets, **labels).observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        All series as plain dicts (one per metric/label combination).
+        """
+        rows = []
+        with self._lock:
+            histograms = {n: dict(s) for n, s in self._histograms.items()}
+            counters = {n: dict(s) for n, s in self._counters.items()}
+        for name, series in histograms.items():
+            for key, hist in series.items():
+                rows.append({"metric": name, "type": "histogram", "labels": dict(key), **hist.summary()})
+        for name, series in counters.items():
+            for key, value in series.items():
+                rows.append({"metric": name, "type": "counter", "labels": dict(key), "value": value})
+        return rows
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        with self._lock:
+            histograms = {n: dict(s) for n, s in self._histograms.items()}
+            counters = {n: dict(s) for n, s in self._counters.items()}
+
+        def fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(key) + list(extra)
+            if not pairs:
+                return ""
+            escaped = ",".join(f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+            return "{" + escaped + "}"
+
+        for name, series in sorted(histograms.items()):
+            metric = f"rag_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for key, hist in series.items():
+                cumulative = 0
+                with hist._lock:
+                    counts, total, count = list(hist.counts), hist.sum, hist.count
+                for bound, c in zip(list(hist.buckets) + ["+Inf"], counts):
+                    cumulative += c
+                    lines.append(f"{metric}_bucket{fmt_labels(key, (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{metric}_sum{fmt_labels(key)} {total}")
+                lines.append(f"{metric}_count{fmt_labels(key)} {count}")
+        for name, series in sorted(counters.items()):
+            metric = f"rag_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in series.items():
+                lines.append(f"{metric}{fmt_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, path: str):
+        """
+        Appends one JSON line per series, stamped with the export time.
+        """
+        ts = time.time()
+        with open(path, "a", encoding="utf-8") as f:
+            for row in self.snapshot():
+                f.write(json.dumps({"ts": ts, **row}, ensure_ascii=False) + "\n")
+
+registry = MetricsRegistry(enabled=Config.METRICS_ENABLED)
+
+class _NoopSpan:
+    """
+    Returned by span() when metrics are disabled: no clock reads, no allocation.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **labels):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """
+    Times a block and records it in the '<stage>_ms' histogram. Failed blocks are labelled status="error".
+    """
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000.0
+        status = "error" if exc_type else "ok"
+        registry.observe(f"{self.name}_ms", elapsed_ms, status=status, **self.labels)
+        return False
+
+    def set(self, **labels):
+        """
+        Adds labels known only inside the block (e.g. backend, model).
+        """
+        self.labels.update(labels)
+
+def span(name: str, **labels):
+    """
+    Context manager timing one stage:
+
+        with span("vector_search", backend="sqlite"):
+            ...
+    """
+    if not registry.enabled:
+        return _NOOP_SPAN
+    return Span(name, labels)
+
+def timed(name: str, **labels):
+    """
+    Decorator form of span().
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            with Span(name, dict(labels)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_prometheus_server(port: int = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves registry.to_prometheus() on http://host:port/metrics from a daemon thread.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port or Config.METRICS_PORT), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-exporter").start()
+    print(f"📈 Prometheus metrics at http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+_exporters_started = False
+
+def setup_exporters():
+    """
+    Starts the exporters selected by Config.METRICS_EXPORT (comma separated):
+    - "prometheus": HTTP /metrics endpoint on METRICS_PORT
+    - "jsonl":      snapshot appended to METRICS_JSONL_PATH at process exit
+    - "phoenix":    OpenTelemetry traces to Phoenix (see src/pipeline/trace.py)
+    Safe to call more than once.
+    """
+    global _exporters_started
+    if _exporters_started or not registry.enabled:
+        return
+    _exporters_started = True
+    exporters = {e.strip().lower() for e in Config.METRICS_EXPORT.split(",") if e.strip()}
+
+    if "prometheus" in exporters:
+        try:
+            start_prometheus_server()
+        except OSError as e:
+            # Another worker on this host already serves the port
+            logger.warning(f"Prometheus exporter not started: {e}")
+    if "jsonl" in exporters:
+        atexit.register(registry.write_jsonl, Config.METRICS_JSONL_PATH)
+    if "phoenix" in exporters:
+        from src.pipeline.trace import setup_tracing
+        setup_tracing()
@@ -1,6 +1,7 @@
 import unittest
 import requests
-from src.agent.graph import graph_app
+from src.agent.graph import get_graph_app
+from src.agent.checkpoint import thread_config, new_thread_id
 from src.config import Config
 
 class TestAgent(unittest.TestCase):
@@ -26,7 +27,7 @@ class TestAgent(unittest.TestCase):
         }
         
         # Run
-        events = list(graph_app.stream(initial_state, config={"recursion_limit": 5}))
+        events = list(get_graph_app().stream(initial_state, config=thread_config(new_thread_id(), recursion_limit=5)))
         
         final_answer = ""
         search_occured = False
@@ -0,0 +1,53 @@
+import json
+import unittest
+from langchain_ollama import ChatOllama
+from benchmarks.fakes import FakeOllamaServer, FakeEmbeddings, InMemoryNeo4jDriver
+from benchmarks.harness import measure, compare_to_baseline
+
+class TestBenchmarkStandIns(unittest.TestCase):
+    def test_fake_ollama_speaks_chat_protocol(self):
+        with FakeOllamaServer(latency_s=0.001) as server:
+            llm = ChatOllama(base_url=server.url, model="llama3.1", temperature=0, format="json")
+            response = llm.invoke('You are a Search Planner. The user asked: "Samsung revenue"')
+        
+        self.assertEqual(json.loads(response.content), {"action": "search", "query": "Samsung revenue"})
+        self.assertIn("prompt_eval_count", response.response_metadata)
+        print("[Pass] Fake Ollama answered through ChatOllama")
+
+    def test_fake_ollama_queues_beyond_parallel_slots(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with FakeOllamaServer(latency_s=0.05, parallel=1) as server:
+            llm = ChatOllama(base_url=server.url, model="llama3.1", temperature=0, format="json")
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                list(pool.map(lambda q: llm.invoke(f'Search Planner. The user asked: "{q}"'), ["a", "b", "c"]))
+
+        self.assertEqual(len(server.queue_waits_s), 3)
+        self.assertGreaterEqual(max(server.queue_waits_s), 0.09)  # The third request waited for two others
+        print("[Pass] Fake Ollama queues requests beyond its parallel slots")
+
+    def test_fake_embeddings_are_deterministic(self):
+        embedder = FakeEmbeddings(dim=64)
+        a, b = embedder.embed_documents(["samsung revenue", "samsung revenue"])
+        self.assertEqual(a, b)
+        self.assertAlmostEqual(sum(x * x for x in a), 1.0, places=5)
+
+    def test_in_memory_driver_applies_merges(self):
+        driver = InMemoryNeo4jDriver()
+        with driver.session() as session:
+            session.run("MERGE ...", chunk_id="c1", doc_source="a.pdf", text="t", concepts=["A", "B"])
+        self.assertEqual(driver.count("Chunk"), 1)
+        self.assertEqual(driver.count("Concept"), 2)
+
+    def test_baseline_comparison_flags_regressions(self):
+        stats = measure(lambda i: None, iterations=5, warmup=0)
+        self.assertEqual(stats["n"], 5)
+        
+        baseline = {"search": {"p50_ms": 10.0, "p95_ms": 20.0}, "tiny": {"p50_ms": 0.01, "p95_ms": 0.02}}
+        results = {"search": {"p50_ms": 16.0, "p95_ms": 21.0}, "tiny": {"p50_ms": 0.05, "p95_ms": 0.05}}
+        regressions = compare_to_baseline(results, baseline, tolerance=0.5)
+        
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("search.p50_ms"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import csv
+import json
+import tempfile
+from benchmarks.fakes import FakeEmbeddings
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType, Table, Row
+from src.features.graph.connector import GraphConnector
+from src.features.graph.canonicalizer import ConceptCanonicalizer
+from src.features.graph.bulk_export import BulkCsvExportStore
+
+def read_csv(directory, stem):
+    with open(os.path.join(directory, f"{stem}_header.csv"), encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f))
+    with open(os.path.join(directory, f"{stem}.csv"), encoding="utf-8", newline="") as f:
+        return header, list(csv.reader(f))
+
+class TestBulkCsvExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.out = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _ingest(self, store):
+        connector = GraphConnector(store, canonicalizer=ConceptCanonicalizer())
+        text = IngestedDoc(content='Samsung "Electronics", revenue\nup 15%.', content_type=ContentType.TEXT,
+                           metadata={"source": "report.pdf", "page": 3})
+        rows = [Row(index=i, data={"Region": f"R{i}", "Revenue": i * 10}, serialized_text=f"Region: R{i}.") for i in range(3)]
+        table = IngestedDoc(content="| Region |", content_type=ContentType.TABLE, metadata={"source": "report.pdf"},
+                            table_data=Table(caption="Sales", markdown="| Region |", rows=rows))
+        connector.ingest_document(text, ["Samsung Electronics", "Revenue"])
+        connector.ingest_document(text, ["samsung electronics co."])  # Re-ingest: no duplicate nodes/edges
+        connector.ingest_document(table, ["Revenue"])
+        connector.ingest_row_concepts(rows[0].id, ["Seoul", "Revenue"])
+        counts = store.count_nodes()
+        connector.close()
+        return text, table, counts
+
+    def test_export_files(self):
+        text, table, counts = self._ingest(BulkCsvExportStore(self.out))
+        self.assertEqual(counts, {"Document": 1, "Chunk": 1, "Table": 1, "Row": 3, "Concept": 3})
+
+        header, chunks = read_csv(self.out, "chunks")
+        self.assertEqual(header, ["id:ID(Chunk)", "text", "vector_id", "page:int", "embedding:float[]",
+                                  "doc_type", "doc_date", "sheet_name", ":LABEL"])
+        # Quotes/newlines round-trip; filter fields without a value stay empty
+        self.assertEqual(chunks, [[text.id, text.content, "", "3", "", "pdf", "", "", "Chunk"]])
+
+        _, concepts = read_csv(self.out, "concepts")
+        self.assertEqual(sorted(c[0] for c in concepts), ["Revenue", "Samsung Electronics", "Seoul"])
+        _, rows = read_csv(self.out, "rows")
+        self.assertEqual(json.loads(rows[0][2]), {"Region": "R0", "Revenue": 0})
+
+        header, mentions = read_csv(self.out, "mentions_chunk_concept")
+        self.assertEqual(header, [":START_ID(Chunk)", ":END_ID(Concept)", ":TYPE"])
+        self.assertEqual(len(mentions), 2)
+        self.assertEqual(len(read_csv(self.out, "has_row_table_row")[1]), 3)
+        self.assertEqual(len(read_csv(self.out, "mentions_row_concept")[1]), 2)
+        self.assertEqual(len(read_csv(self.out, "contains_document_table")[1]), 1)
+
+        with open(os.path.join(self.out, "import.sh"), encoding="utf-8") as f:
+            script = f.read()
+        self.assertIn("--nodes=Chunk=chunks_header.csv,chunks.csv", script)
+        self.assertIn("--relationships=MENTIONS=mentions_row_concept_header.csv,mentions_row_concept.csv", script)
+        self.assertTrue(script.rstrip().endswith(Config.NEO4J_DATABASE or "neo4j"))
+        self.assertFalse(os.path.exists(os.path.join(self.out, ".dedup.sqlite")))
+        print("\n[Pass] Deduplicated import CSVs with headers")
+
+    def test_export_with_embeddings(self):
+        embedder = FakeEmbeddings(dim=4)
+        store = BulkCsvExportStore(self.out, embeddings=embedder, embed_batch_size=2)
+        for i in range(5):
+            store.ingest_document(IngestedDoc(id=f"c{i}", content=f"chunk {i}", content_type=ContentType.TEXT,
+                                              metadata={"source": "a.pdf"}), [])
+        store.close()
+
+        _, chunks = read_csv(self.out, "chunks")
+        self.assertEqual([c[0] for c in chunks], [f"c{i}" for i in range(5)])
+        vector = [float(v) for v in chunks[3][4].split(";")]
+        self.assertEqual(len(vector), 4)
+        self.assertAlmostEqual(vector[0], embedder.embed_query("chunk 3")[0], places=6)
+        print("\n[Pass] Chunk embeddings exported as float[] arrays")
+
+if __name__ == "__main__":
+    unittest.main()
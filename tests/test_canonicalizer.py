@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.connector import GraphConnector
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.features.graph.canonicalizer import ConceptCanonicalizer, clean_name, concept_key
+from src.pipeline.canonicalize_concepts import canonicalize_store
+
+class TableEmbeddings:
+    """
+    Embeds names by looking up fixed vectors (unknown names get an orthogonal axis).
+    """
+    def __init__(self, vectors, dim=8):
+        self.vectors = vectors
+        self.dim = dim
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        result = []
+        for i, t in enumerate(texts):
+            vec = self.vectors.get(t)
+            if vec is None:
+                vec = np.zeros(self.dim)
+                vec[(hash(t) % (self.dim - 4)) + 4] = 1.0
+            result.append(list(vec))
+        return result
+
+class TestConceptCanonicalizer(unittest.TestCase):
+    def test_normalization_rules(self):
+        self.assertEqual(clean_name("  Samsung Electronics Co., Ltd. "), "Samsung Electronics")
+        self.assertEqual(clean_name("Samsung Electronics Co."), "Samsung Electronics")
+        self.assertEqual(clean_name("2024년"), "2024")
+        self.assertEqual(clean_name("삼성전자(주)"), "삼성전자")
+        self.assertEqual(clean_name("Inc."), "Inc")  # A bare suffix is kept as a name
+        self.assertEqual(concept_key("삼성 전자"), concept_key("삼성전자"))
+        self.assertEqual(concept_key("REVENUE"), concept_key("revenue"))
+
+        canonicalizer = ConceptCanonicalizer()
+        self.assertEqual(canonicalizer.canonicalize(["Samsung Electronics", "samsung electronics co.", "2024", "2024년"]),
+                         ["Samsung Electronics", "2024"])
+        print("\n[Pass] Normalization rules")
+
+    def test_alias_table(self):
+        canonicalizer = ConceptCanonicalizer(aliases={"삼성전자": "Samsung Electronics"})
+        self.assertEqual(canonicalizer.canonicalize(["삼성 전자", "Samsung Electronics Co., Ltd."]), ["Samsung Electronics"])
+        self.assertEqual(canonicalizer.stats["alias"], 1)
+        print("\n[Pass] Alias table")
+
+    def test_embedding_clustering_is_batched(self):
+        embeddings = TableEmbeddings({
+            "Revenue": [1, 0, 0, 0, 0, 0, 0, 0],
+            "Sales Revenue": [0.98, 0.2, 0, 0, 0, 0, 0, 0],
+            "2023 Revenue": [0, 0, 1, 0, 0, 0, 0, 0],
+            "2024 Revenue": [0, 0, 0.99, 0.1, 0, 0, 0, 0],
+        })
+        canonicalizer = ConceptCanonicalizer(embeddings=embeddings, threshold=0.9, batch_size=3)
+        mapping = canonicalizer.build_mapping(["Revenue", "Sales Revenue", "2023 Revenue", "2024 Revenue", "revenue"])
+
+        self.assertEqual(mapping["Sales Revenue"], "Revenue")
+        self.assertEqual(mapping["revenue"], "Revenue")
+        self.assertEqual(mapping["2024 Revenue"], "2024 Revenue")  # Different year is never merged
+        self.assertEqual([len(c) for c in embeddings.calls], [3, 1])  # "revenue" resolved by rule, no embedding
+        print("\n[Pass] Embedding clustering in batches with number guard")
+
+    def test_write_path_and_offline_merge(self):
+        store = SqliteGraphStore(":memory:")
+        # Graph written without canonicalization
+        raw = GraphConnector(store, canonicalizer=ConceptCanonicalizer())
+        raw.canonicalizer = None
+        for i, concepts in enumerate([["Samsung Electronics", "Revenue"], ["Samsung Electronics Co.", "revenue"],
+                                      ["삼성전자", "2024년"], ["2024", "Samsung Electronics", "삼성전자"]]):
+            doc = IngestedDoc(content=f"chunk {i}", content_type=ContentType.TEXT, metadata={"source": "r.pdf"})
+            raw.ingest_document(doc, concepts)
+        self.assertEqual(store.count_nodes()["Concept"], 7)
+
+        aliases = {"삼성전자": "Samsung Electronics"}
+        report = canonicalize_store(store, ConceptCanonicalizer(aliases), dry_run=True)
+        self.assertEqual(report["aliases"], 4)
+        self.assertEqual(store.count_nodes()["Concept"], 7)
+
+        report = canonicalize_store(store, ConceptCanonicalizer(aliases))
+        self.assertEqual((report["concepts_before"], report["concepts_after"]), (7, 3))
+        self.assertEqual((report["edges_before"], report["edges_after"]), (9, 8))  # Chunk 3 mentioned both spellings
+        self.assertEqual(set(store.list_concepts()), {"Samsung Electronics", "Revenue", "2024"})
+
+        # New writes map onto the existing canonical nodes
+        connector = GraphConnector(store, canonicalizer=ConceptCanonicalizer(aliases))
+        doc = IngestedDoc(content="new chunk", content_type=ContentType.TEXT, metadata={"source": "r.pdf"})
+        connector.ingest_document(doc, ["삼성 전자", "REVENUE", "2024 년"])
+        self.assertEqual(store.count_nodes()["Concept"], 3)
+        connector.close()
+        print("\n[Pass] Offline merge reduces nodes/edges and writes stay canonical")
+
+if __name__ == "__main__":
+    unittest.main()
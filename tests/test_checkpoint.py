@@ -0,0 +1,65 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import unittest
+from langgraph.graph import StateGraph, END
+from src.agent.state import AgentState
+from src.agent.memory import ConversationMemory
+from src.agent.checkpoint import create_checkpointer, thread_config, turn_input, restore_session_memory
+
+def _answer_node(state: AgentState):
+    return {"answer": f"Echo: {state['input']}"}
+
+def _build_app(checkpointer):
+    workflow = StateGraph(AgentState)
+    workflow.add_node("oracle", _answer_node)
+    workflow.set_entry_point("oracle")
+    workflow.add_edge("oracle", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+class TestSqliteCheckpointer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "checkpoints.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_other_worker_resumes_thread(self):
+        # Worker A answers a turn
+        worker_a = _build_app(create_checkpointer("sqlite", self.db_path))
+        memory = ConversationMemory(max_tokens=512, recent_turns=4)
+        memory.add_turn("First question", "First answer")
+        worker_a.invoke(turn_input("Second question", memory), config=thread_config("thread-1"), durability="exit")
+        
+        # Worker B (separate connection, as in another process) restores the session
+        worker_b = _build_app(create_checkpointer("sqlite", self.db_path))
+        restored = restore_session_memory(worker_b, "thread-1")
+        
+        self.assertEqual(restored.turns, [("First question", "First answer"), ("Second question", "Echo: Second question")])
+        self.assertEqual(restore_session_memory(worker_b, "unknown-thread").turns, [])
+        print("[Pass] Session restored from shared SQLite checkpoint")
+
+    def test_exit_durability_writes_once_per_turn(self):
+        checkpointer = create_checkpointer("sqlite", self.db_path)
+        app = _build_app(checkpointer)
+        app.invoke(turn_input("Question", ConversationMemory()), config=thread_config("thread-2"), durability="exit")
+        
+        checkpoints = list(checkpointer.list(thread_config("thread-2")))
+        self.assertEqual(len(checkpoints), 1)
+
+    def test_importing_the_agent_opens_no_checkpointer(self):
+        # Fresh interpreter: the agent module must not create the checkpoint file at import
+        code = ("import os; from src.agent import graph; "
+                "assert graph._graph_app is None; assert not os.path.exists(os.environ['CHECKPOINT_DB_PATH']); "
+                "graph.get_graph_app(); assert os.path.exists(os.environ['CHECKPOINT_DB_PATH'])")
+        env = {**os.environ, "CHECKPOINT_BACKEND": "sqlite", "CHECKPOINT_DB_PATH": self.db_path}
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        print("\n[Pass] Checkpointer created on first use of the agent graph, not at import")
+
+if __name__ == '__main__':
+    unittest.main()
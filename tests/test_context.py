@@ -0,0 +1,47 @@
+import unittest
+from src.agent.context import ContextAssembler, split_context_blocks, estimate_tokens
+
+class TestContextAssembler(unittest.TestCase):
+    def setUp(self):
+        self.assembler = ContextAssembler(context_window=4096, reserved_tokens=512, compress=False)
+
+    def test_deduplicates_and_orders_by_score(self):
+        passages = [
+            {"text": "Low score passage.", "score": 0.2},
+            {"text": "High score passage.", "score": 0.9},
+            {"text": "  high SCORE   passage. ", "score": 0.5},  # Duplicate after normalization
+        ]
+        result = self.assembler.assemble(passages, "passage")
+        
+        self.assertEqual(result["passages_used"], 2)
+        self.assertTrue(result["text"].startswith("Source 1:\nHigh score passage."))
+        self.assertLess(result["text"].index("High score"), result["text"].index("Low score"))
+        print(f"[Pass] Assembled Context: {result['tokens']} tokens")
+
+    def test_enforces_token_budget(self):
+        passages = [{"text": "Revenue grew strongly this year. " * 100, "score": 1.0 - i * 0.1} for i in range(5)]
+        # Make each passage unique
+        for i, p in enumerate(passages):
+            p["text"] += f" Passage {i}."
+        result = self.assembler.assemble(passages, "revenue", budget=300)
+        
+        self.assertLessEqual(result["tokens"], 300)
+        self.assertGreater(result["dropped"], 0)
+
+    def test_extractive_compression_keeps_relevant_sentences(self):
+        assembler = ContextAssembler(context_window=4096, reserved_tokens=512, compress=True)
+        passages = [{"text": "Samsung revenue rose 15% in 2024. The weather was sunny. 삼성전자 매출액은 증가했다.", "score": 0.8}]
+        result = assembler.assemble(passages, "Samsung revenue 매출")
+        
+        self.assertIn("Samsung revenue rose", result["text"])
+        self.assertIn("매출액은", result["text"])
+        self.assertNotIn("weather", result["text"])
+
+    def test_split_context_blocks(self):
+        context = ["Source 1:\nAlpha text\n\nSource 2:\nBeta text\n\n"]
+        passages = split_context_blocks(context)
+        self.assertEqual([p["text"] for p in passages], ["Alpha text", "Beta text"])
+        self.assertGreater(estimate_tokens("Alpha text"), 0)
+
+if __name__ == '__main__':
+    unittest.main()
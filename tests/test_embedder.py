@@ -0,0 +1,37 @@
+import unittest
+from benchmarks.fakes import FakeEmbeddings
+from src.features.schemas import IngestedDoc, ContentType, Table, Row
+from src.features.embedder import DocumentEmbedder
+
+class CountingEmbeddings(FakeEmbeddings):
+    def __init__(self, dim):
+        super().__init__(dim=dim)
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
+class TestDocumentEmbedder(unittest.TestCase):
+    def test_embeds_chunks_rows_and_captions_in_batches(self):
+        embeddings = CountingEmbeddings(dim=8)
+        rows = [Row(index=i, data={"Region": f"R{i}"}, serialized_text=f"Region: R{i}.") for i in range(3)]
+        docs = [
+            IngestedDoc(content="Revenue grew.", content_type=ContentType.TEXT),
+            IngestedDoc(content="| Region |", content_type=ContentType.TABLE,
+                        table_data=Table(caption="Sales", markdown="| Region |", rows=rows)),
+            IngestedDoc(content="   ", content_type=ContentType.TEXT),  # Nothing to embed
+        ]
+        embedder = DocumentEmbedder(embeddings, batch_size=2)
+
+        self.assertEqual(embedder.embed(docs), 5)
+        self.assertEqual(embeddings.batches, [2, 2, 1])
+        self.assertEqual(docs[1].table_data.embedding, embeddings.embed_query("Sales"))
+        self.assertEqual(rows[2].embedding, embeddings.embed_query("Region: R2."))
+        self.assertIsNone(docs[2].embedding)
+
+        self.assertEqual(embedder.embed(docs), 0)  # Already embedded
+        print("\n[Pass] Chunks, table captions and rows embedded in cross-document batches")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+from src.pipeline.evaluate import load_dataset, EvaluationCache, EvaluationRunner
+
+def make_agent(calls, fail_on=None):
+    def agent_fn(question):
+        calls.append(question)
+        if question == fail_on:
+            raise RuntimeError("ollama timeout")
+        return {"answer": f"answer to {question}", "contexts": [f"context for {question}"], "latency_ms": 12.5}
+    return agent_fn
+
+def make_judge(calls, fail_on=None):
+    def judge_fn(sample):
+        calls.append(sample["question"])
+        if sample["question"] == fail_on:
+            raise RuntimeError("judge parse error")
+        return {"faithfulness": 1.0, "answer_relevancy": 0.5}
+    return judge_fn
+
+class TestEvaluationRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = EvaluationCache(os.path.join(self.tmp_dir.name, "eval_cache.sqlite"))
+        self.dataset = [{"id": str(i), "question": f"Q{i}", "ground_truth": f"GT{i}"} for i in range(6)]
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_load_dataset_jsonl_and_csv(self):
+        jsonl_path = os.path.join(self.tmp_dir.name, "golden.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"question": "삼성전자 매출은?", "ground_truth": "15% 증가"}, ensure_ascii=False) + "\n\n")
+            f.write(json.dumps({"id": "q2", "question": "Who?", "ground_truth": "Samsung"}) + "\n")
+            f.write(json.dumps({"ground_truth": "no question"}) + "\n")
+        csv_path = os.path.join(self.tmp_dir.name, "golden.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("question,ground_truth\nWhat?,That.\n")
+
+        jsonl = load_dataset(jsonl_path)
+        self.assertEqual([d["id"] for d in jsonl], ["0", "q2"])
+        self.assertEqual(jsonl[0]["question"], "삼성전자 매출은?")
+        self.assertEqual(load_dataset(csv_path), [{"id": "0", "question": "What?", "ground_truth": "That."}])
+        with self.assertRaises(ValueError):
+            load_dataset(os.path.join(self.tmp_dir.name, "golden.txt"))
+        print("\n[Pass] JSONL/CSV datasets loaded")
+
+    def test_results_keep_dataset_order_with_latency(self):
+        agent_calls, judge_calls = [], []
+        runner = EvaluationRunner(self.cache, "v1", make_agent(agent_calls), make_judge(judge_calls),
+                                  concurrency=4, judge_concurrency=2)
+        df = runner.run(self.dataset)
+
+        self.assertEqual(list(df["question"]), [d["question"] for d in self.dataset])
+        self.assertTrue((df["latency_ms"] == 12.5).all())
+        self.assertTrue((df["faithfulness"] == 1.0).all())
+        self.assertFalse(df["judge_latency_ms"].isnull().any())
+        self.assertEqual(len(agent_calls), 6)
+        print("\n[Pass] Concurrent run returns ordered rows with latency next to scores")
+
+    def test_resume_after_failures(self):
+        agent_calls, judge_calls = [], []
+        runner = EvaluationRunner(self.cache, "v1", make_agent(agent_calls, fail_on="Q2"),
+                                  make_judge(judge_calls, fail_on="Q4"), concurrency=3)
+        df = runner.run(self.dataset)
+        self.assertTrue(df.loc[2, ["answer"]].isnull().all())
+        self.assertTrue(df["faithfulness"].isnull()[4])
+        self.assertEqual(runner.stats["failed"], 2)
+
+        # Second run: only the failed agent turn and the failed judgment are retried
+        agent_calls, judge_calls = [], []
+        runner = EvaluationRunner(self.cache, "v1", make_agent(agent_calls), make_judge(judge_calls), concurrency=3)
+        df = runner.run(self.dataset)
+        self.assertEqual(agent_calls, ["Q2"])
+        self.assertEqual(sorted(judge_calls), ["Q2", "Q4"])
+        self.assertFalse(df["faithfulness"].isnull().any())
+        self.assertEqual(runner.stats["agent_cached"], 5)
+        print("\n[Pass] Interrupted run resumes from the cache")
+
+    def test_new_corpus_version_invalidates_cache(self):
+        calls = []
+        EvaluationRunner(self.cache, "v1", make_agent(calls), make_judge([])).run(self.dataset[:2])
+        EvaluationRunner(self.cache, "v1", make_agent(calls), make_judge([])).run(self.dataset[:2])
+        self.assertEqual(len(calls), 2)
+        EvaluationRunner(self.cache, "v2", make_agent(calls), make_judge([])).run(self.dataset[:2])
+        self.assertEqual(len(calls), 4)
+        print("\n[Pass] Cache is keyed by corpus version")
+
+    def test_changed_ground_truth_or_model_reruns(self):
+        agent_calls, judge_calls = [], []
+        EvaluationRunner(self.cache, "v1", make_agent(agent_calls), make_judge(judge_calls),
+                         models="answer=llama3.1").run(self.dataset[:2])
+        edited = [{**self.dataset[0], "ground_truth": "GT0 (relabelled)"}, self.dataset[1]]
+        runner = EvaluationRunner(self.cache, "v1", make_agent(agent_calls), make_judge(judge_calls),
+                                  models="answer=llama3.1")
+        runner.run(edited)
+        self.assertEqual(len(agent_calls), 2)  # Answers reused
+        self.assertEqual(judge_calls[2:], ["Q0"])  # Only the relabelled question is judged again
+        self.assertEqual(runner.stats["judge_cached"], 1)
+
+        EvaluationRunner(self.cache, "v1", make_agent(agent_calls), make_judge(judge_calls),
+                         models="answer=qwen2.5:3b").run(edited)
+        self.assertEqual(len(agent_calls), 4)  # Model swapped: answers re-run
+        print("\n[Pass] Cached scores tied to the ground truth, answers to the agent models")
+
+    def test_concurrency_is_bounded(self):
+        active, peak, lock = [0], [0], threading.Lock()
+        barrier = threading.Event()
+
+        def agent_fn(question):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            barrier.wait(0.02)
+            with lock:
+                active[0] -= 1
+            return {"answer": "a", "contexts": [], "latency_ms": 1.0}
+
+        EvaluationRunner(self.cache, "v1", agent_fn, make_judge([]), concurrency=2).run(self.dataset)
+        self.assertLessEqual(peak[0], 2)
+        print("\n[Pass] Agent turns bounded by concurrency")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from benchmarks.fakes import FakeOllamaServer
+from src.config import Config
+from src.features import llm_router
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.features.graph.gazetteer import Gazetteer
+from src.features.graph.extractor import GraphExtractor
+
+class TestGazetteer(unittest.TestCase):
+    def test_match_aliases_boundaries_and_longest(self):
+        gazetteer = Gazetteer(aliases={"삼성전자": "Samsung Electronics"})
+        gazetteer.add(["Samsung", "Samsung Electronics", "AI", "SM-G991B"])
+
+        found = gazetteer.match("삼성전자는 AI 전략을 발표했다. Samsung Electronics maintains the sm-g991b line.")
+        self.assertEqual(found, ["Samsung Electronics", "AI", "SM-G991B"])  # "AI" not inside "maintains"
+        self.assertEqual(gazetteer.match("Samsungs and SAMSUNG"), ["Samsung"])
+        self.assertEqual(gazetteer.match("삼성전자에서는 매출이"), ["Samsung Electronics"])  # Compound particle
+        print(f"\n[Pass] Gazetteer matches aliases and whole words: {found}")
+
+    def test_hangul_compound_noun_is_not_a_known_prefix(self):
+        gazetteer = Gazetteer(aliases={"한국": "한국"})
+        known, unseen = gazetteer.scan("한국전력공사는 매출이 증가했다")
+        self.assertEqual(known, [])
+        self.assertIn("한국전력공사", unseen)
+        self.assertEqual(gazetteer.scan("한국의 수출이 늘었다")[0], ["한국"])
+        print(f"\n[Pass] Compound noun left for the LLM: {unseen}")
+
+    def test_korean_prose_with_known_concepts_skips_llm(self):
+        gazetteer = Gazetteer(aliases={"삼성전자": "Samsung Electronics", "매출": "Revenue"})
+        self.assertEqual(gazetteer.scan("삼성전자는 2024년 매출이 증가했다"), (["Samsung Electronics", "Revenue"], []))
+        self.assertEqual(gazetteer.scan("삼성전자의 매출은 전년 대비 크게 증가한 것으로 발표되었다")[1], [])
+        self.assertEqual(gazetteer.scan("삼성전자는 평택에 공장을 지었다")[1], ["평택", "공장"])  # Nouns stay unseen
+
+        with FakeOllamaServer() as server:
+            extractor = self._extractor(server, gazetteer)
+            self.assertEqual(extractor.extract_concepts("삼성전자는 2024년 매출이 증가했다"),
+                             ["Samsung Electronics", "Revenue"])
+            self.assertEqual(server.requests, 0)
+        print("\n[Pass] Korean predicates are not unseen entities: LLM call skipped")
+
+    def test_refresh_from_store_is_incremental(self):
+        store = SqliteGraphStore(":memory:")
+        self.addCleanup(store.close)
+        doc = IngestedDoc(content="Samsung revenue", content_type=ContentType.TEXT, metadata={"source": "a.pdf"})
+        store.ingest_document(doc, ["Samsung Electronics", "삼성전자"])
+        store.merge_concepts({"삼성전자": "Samsung Electronics"})
+        self.assertEqual(store.list_concept_aliases(), {"삼성전자": "Samsung Electronics"})
+
+        gazetteer = Gazetteer(store)
+        self.assertGreater(gazetteer.refresh(), 0)
+        self.assertEqual(gazetteer.match("삼성전자의 매출"), ["Samsung Electronics"])
+        self.assertEqual(gazetteer.refresh(), 0)  # Nothing new
+
+        store.ingest_document(IngestedDoc(content="HR", content_type=ContentType.TEXT, metadata={"source": "b.pdf"}),
+                              ["HR Department"])
+        self.assertEqual(gazetteer.refresh(), 1)
+        self.assertEqual(gazetteer.match("the HR department budget"), ["HR Department"])
+
+    def _extractor(self, server, gazetteer=None):
+        saved = Config.OLLAMA_BASE_URL
+        self.addCleanup(setattr, Config, "OLLAMA_BASE_URL", saved)
+        self.addCleanup(llm_router.reset_models)
+        Config.OLLAMA_BASE_URL = server.url
+        llm_router.reset_models()
+        return GraphExtractor(gazetteer or Gazetteer(), mode="skip")
+
+    def test_extractor_skips_llm_for_known_rows(self):
+        rows = [f"Samsung Electronics revenue rose to {100 + i} in 2024." for i in range(5)]
+        rows.append("Samsung Electronics opened a plant in Busan in 2024.")
+
+        with FakeOllamaServer() as server:
+            extractor = self._extractor(server)
+            results = [extractor.extract_concepts(row, task="row_extraction") for row in rows]
+
+        # First row (empty gazetteer) and the row naming an unseen city go to the LLM; the rest are tagged locally
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(results[1], ["Samsung Electronics", "Revenue", "2024"])
+        stats = extractor.stats()
+        self.assertEqual((stats["extractions"], stats["llm_calls_avoided"]), (6, 4))
+        print(f"\n[Pass] Gazetteer avoided {stats['avoided_ratio']:.0%} of LLM extraction calls")
+
+    def test_extractor_asks_llm_for_lowercase_text_and_learns_only_its_concepts(self):
+        with FakeOllamaServer() as server:
+            extractor = self._extractor(server)
+            # No known concept and no capitalized token: the scan cannot vouch for it
+            self.assertEqual(extractor.extract_concepts("the revenue growth for the quarter was driven by exports"),
+                             ["Samsung Electronics", "Revenue", "2024"])
+            self.assertEqual(server.requests, 1)
+            # "Seoul" was shown to the LLM but not returned: it is not whitelisted
+            extractor.extract_concepts("Region: Seoul. Company: Samsung Electronics. Revenue: 100.")
+            extractor.extract_concepts("Region: Seoul. Company: Samsung Electronics. Revenue: 200.")
+            self.assertEqual(server.requests, 3)
+        self.assertEqual(extractor.gazetteer.scan("Seoul office")[1], ["seoul"])
+        print("\n[Pass] Lowercase prose and rejected tokens still reach the LLM")
+
+if __name__ == '__main__':
+    unittest.main()
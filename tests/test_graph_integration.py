@@ -9,10 +9,16 @@ class TestGraphIntegration(unittest.TestCase):
         self.mock_driver = MagicMock()
         self.mock_session = MagicMock()
         self.mock_driver.session.return_value.__enter__.return_value = self.mock_session
+        # Managed transactions: run the transaction function with the session as 'tx'
+        self.mock_session.execute_write.side_effect = lambda fn, *args, **kwargs: fn(self.mock_session, *args, **kwargs)
+        self.mock_session.execute_read.side_effect = lambda fn, *args, **kwargs: fn(self.mock_session, *args, **kwargs)
         
         with patch('neo4j.GraphDatabase.driver', return_value=self.mock_driver):
             self.connector = GraphConnector()
 
+    def tearDown(self):
+        self.connector.close()  # Releases the shared driver, so the next test gets a fresh mock
+
     def test_ingest_text_chunk(self):
         doc = IngestedDoc(
             content="Samsung Electronics revenue is huge.",
@@ -48,5 +54,46 @@ class TestGraphIntegration(unittest.TestCase):
         self.assertTrue(any("UNWIND $rows as row_data" in q for q in queries))
         print("[Pass] Table & Row Cypher Queries Verified")
 
+    def test_shared_driver_and_managed_writes(self):
+        from src.features.graph.driver import pool_stats
+        with patch('neo4j.GraphDatabase.driver', return_value=MagicMock()) as factory:
+            second = GraphConnector()
+        factory.assert_not_called()  # Same settings: the pooled driver is reused
+        self.assertIs(second.driver, self.mock_driver)
+        self.assertEqual(pool_stats()["drivers"], 1)
+
+        doc = IngestedDoc(content="Revenue grew.", content_type=ContentType.TEXT, metadata={"source": "a.pdf"})
+        second.ingest_document(doc, ["Revenue"])
+        second.ingest_row_concepts("row-1", ["Revenue"])
+        self.assertEqual(self.mock_session.execute_write.call_count, 2)  # One transaction per document
+        self.assertEqual(self.mock_driver.session.call_args.kwargs.get("database"), None)
+
+        second.close()
+        self.mock_driver.close.assert_not_called()  # Still used by self.connector
+        print("\n[Pass] Neo4j driver shared across connectors; writes run in managed transactions")
+
+    def test_full_graph_rank_reset_is_batched(self):
+        self.connector.store.save_graph_rank({("A", "B"): 1.0}, {"A": (1, 0.5)}, [("c1", "Chunk", 0.5)], [], replace=True)
+        resets = [call[0][0] for call in self.mock_session.run.call_args_list if "IN TRANSACTIONS" in call[0][0]]
+        self.assertEqual(len(resets), 4)  # CO_OCCURS edges, then centrality on Chunk / Table / Row
+        self.assertIn("DELETE e", resets[0])
+        self.assertTrue(all("MATCH (n)" not in q for q in resets))  # No unlabelled scan
+        print("\n[Pass] Full graph-rank reset runs in batched transactions per label")
+
+    def test_schema_manager_uses_configured_database(self):
+        from src.config import Config
+        from src.features.graph.schema import SchemaManager, build_migrations
+        saved = Config.NEO4J_DATABASE
+        self.addCleanup(setattr, Config, "NEO4J_DATABASE", saved)
+        Config.NEO4J_DATABASE = "knowledge"
+        self.mock_session.run.return_value = []
+
+        SchemaManager(self.mock_driver, build_migrations(dimensions=8, similarity="cosine")).apply(await_indexes_s=0)
+        databases = {call.kwargs.get("database") for call in self.mock_driver.session.call_args_list}
+        self.assertEqual(databases, {"knowledge"})
+        self.assertGreater(self.mock_session.execute_write.call_count, 0)
+        self.assertGreater(self.mock_session.execute_read.call_count, 0)
+        print("\n[Pass] Schema migrations and drift check run on the configured database")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from src.config import Config
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.features.graph.graph_rank import GraphRankJob, pagerank, cooccurrence_pairs
+from src.agent.tools import rank_by_graph
+
+def _chunk(store, text, concepts, embedding=None):
+    doc = IngestedDoc(content=text, content_type=ContentType.TEXT, metadata={"source": "report.pdf"}, embedding=embedding)
+    store.ingest_document(doc, concepts)
+    return doc
+
+class TestGraphRank(unittest.TestCase):
+    def setUp(self):
+        self.store = SqliteGraphStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_pagerank_favours_hubs(self):
+        self.assertEqual(cooccurrence_pairs(["B", "A", "C"], new=["C"]), [("A", "C"), ("B", "C")])
+        edges = {("Hub", f"Leaf{i}"): 1.0 for i in range(5)}
+        edges[("Leaf0", "Leaf1")] = 1.0
+        scores, degree, _ = pagerank(["Hub"] + [f"Leaf{i}" for i in range(5)] + ["Isolated"], edges)
+        self.assertAlmostEqual(sum(scores.values()), 1.0, places=6)
+        self.assertEqual(max(scores, key=scores.get), "Hub")
+        self.assertEqual(degree["Hub"], 5)
+        self.assertEqual(min(scores, key=scores.get), "Isolated")
+        print("\n[Pass] Weighted PageRank over co-occurrence ranks hub concepts first")
+
+    def test_incremental_matches_full_rebuild(self):
+        _chunk(self.store, "Samsung revenue", ["Samsung", "Revenue", "2024"])
+        _chunk(self.store, "Samsung memory", ["Samsung", "Memory"])
+        first = GraphRankJob(self.store).run()
+        self.assertEqual((first["mode"], first["sources"]), ("incremental", 2))
+        self.assertEqual(GraphRankJob(self.store).run()["sources"], 0)  # Nothing new: no-op
+
+        _chunk(self.store, "Revenue by region", ["Revenue", "Seoul"])
+        self.store.ingest_document(IngestedDoc(content="Samsung memory", content_type=ContentType.TEXT,
+                                               metadata={"source": "report.pdf"}), ["Memory", "Revenue"])
+        second = GraphRankJob(self.store).run()
+        self.assertEqual(second["sources"], 2)  # The new chunk and the chunk with a new mention
+        incremental = self.store.load_graph_rank()
+
+        rebuilt = GraphRankJob(self.store).run(full=True)
+        self.assertEqual(rebuilt["mode"], "full")
+        full = self.store.load_graph_rank()
+        self.assertEqual(incremental[0], full[0])
+        self.assertEqual(full[0][("Revenue", "Samsung")], 1.0)
+        self.assertEqual(full[0][("Memory", "Revenue")], 1.0)
+        for name, score in full[1].items():
+            self.assertAlmostEqual(incremental[1][name], score, places=6)
+        print("\n[Pass] Incremental refresh counts only new mentions and matches a full rebuild")
+
+    def test_merged_concepts_trigger_full_rebuild(self):
+        _chunk(self.store, "ACME revenue", ["ACME Co., Ltd.", "Revenue"])
+        GraphRankJob(self.store).run()
+        self.store.merge_concepts({"ACME Co., Ltd.": "ACME"})
+        report = GraphRankJob(self.store).run()
+        self.assertEqual(report["mode"], "full")
+        self.assertEqual(list(self.store.load_graph_rank()[0]), [("ACME", "Revenue")])
+        print("\n[Pass] Stale co-occurrence after a concept merge is rebuilt")
+
+    def test_centrality_is_returned_with_search_hits(self):
+        dim = 8
+        rng = np.random.default_rng(0)
+        query = rng.normal(size=dim).astype(np.float32)
+        central = _chunk(self.store, "central", ["Samsung", "Revenue"], (query + 0.05 * rng.normal(size=dim)).tolist())
+        niche = _chunk(self.store, "niche", ["Footnote"], query.tolist())
+        _chunk(self.store, "other", ["Samsung", "Revenue", "Memory"])
+
+        before = self.store.similarity_search(query.tolist(), k=2)
+        self.assertEqual(before[0]["id"], niche.id)
+        self.assertIsNone(before[0]["metadata"]["centrality"])
+
+        GraphRankJob(self.store).run()
+        hits = self.store.similarity_search(query.tolist(), k=2)
+        scores = {h["id"]: h["metadata"]["centrality"] for h in hits}
+        self.assertGreater(scores[central.id], scores[niche.id])
+        self.assertEqual([p["id"] for p in rank_by_graph(hits, weight=0.0)], [niche.id, central.id])
+        self.assertEqual([p["id"] for p in rank_by_graph(hits, weight=0.5)], [central.id, niche.id])
+        print("\n[Pass] Stored centrality re-ranks hits without a graph traversal")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import urllib.request
+from src.features.universal_parser import UniversalParser
+from src.features.ingestor import DocumentIngestor
+from src.features.job_queue import JobQueue, LeaseLost
+from src.features.graph.connector import GraphConnector
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.pipeline.ingest_service import IngestionService, make_http_server
+
+class FlakyExtractor:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def extract_concepts(self, text, task="extraction"):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("LLM timeout")
+        return ["Revenue"]
+
+class SlowExtractor:
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    def extract_concepts(self, text, task="extraction"):
+        time.sleep(self.delay_s)
+        return ["Revenue"]
+
+class CountingParser(UniversalParser):
+    def __init__(self):
+        super().__init__(cache=None)
+        self.calls = 0
+
+    def parse(self, file_path, **kwargs):
+        self.calls += 1
+        return super().parse(file_path, **kwargs)
+
+class TestIngestionService(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.inbox = os.path.join(self.tmp_dir.name, "inbox")
+        os.makedirs(self.inbox)
+        self.csv_path = os.path.join(self.inbox, "sales.csv")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write("Region,Revenue\nSeoul,100\nBusan,80\n")
+        self.queue_path = os.path.join(self.tmp_dir.name, "queue.sqlite")
+        self.store = SqliteGraphStore(":memory:")
+        self.parser = CountingParser()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def _service(self, extractor, **queue_kwargs):
+        queue = JobQueue(self.queue_path, backoff_s=0, **queue_kwargs)
+        ingestor = DocumentIngestor(self.parser, extractor, GraphConnector(self.store, canonicalizer=None))
+        return IngestionService(queue, ingestor, workers=1, poll_s=0.01)
+
+    def test_retry_resumes_at_failed_stage(self):
+        service = self._service(FlakyExtractor(failures=1))
+        job_id = service.queue.submit(self.csv_path)
+        self.assertEqual(service.queue.submit(self.csv_path), job_id)  # Unchanged file: not queued twice
+
+        service.drain()
+        job = service.queue.get(job_id)
+        self.assertEqual((job["state"], job["attempts"]), ("done", 1))
+        self.assertEqual(self.parser.calls, 1)  # Parsed once: the retry started at extraction
+        self.assertEqual(self.store.count_nodes()["Row"], 2)
+        self.assertEqual(service.queue.stats()["states"], {"done": 1})
+        print("\n[Pass] Failed extraction retried without re-parsing")
+
+    def test_crash_resume_and_max_attempts(self):
+        service = self._service(FlakyExtractor())
+        job_id = service.queue.submit(self.csv_path)
+        job = service.queue.claim("crashed-worker")
+        service.queue.advance(job, "parsed", {"docs": self.parser.parse(self.csv_path)})
+        self.assertIsNone(service.queue.claim("other"))  # Still leased by the crashed worker
+
+        restarted = self._service(FlakyExtractor())
+        restarted.start()
+        deadline = time.time() + 5
+        while restarted.queue.get(job_id)["state"] != "done" and time.time() < deadline:
+            time.sleep(0.01)
+        restarted.stop()
+        self.assertEqual(restarted.queue.get(job_id)["state"], "done")
+        self.assertEqual(self.parser.calls, 1)
+
+        broken = self._service(FlakyExtractor(failures=99), max_attempts=2)
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("Daegu,60\n")
+        failed_id = broken.queue.submit(self.csv_path)
+        broken.drain()
+        job = broken.queue.get(failed_id)
+        self.assertEqual((job["state"], job["attempts"]), ("failed", 2))
+        self.assertIn("LLM timeout", job["last_error"])
+
+        # A file that kills the worker: every restart counts an attempt, so it stops at max_attempts
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("Incheon,40\n")
+        poison_id = broken.queue.submit(self.csv_path)
+        for restart in range(2):
+            self.assertEqual(broken.queue.claim(f"worker-{restart}").id, poison_id)  # Process dies with the lease
+            self.assertEqual(broken.queue.release_leases(), 1)
+        job = broken.queue.get(poison_id)
+        self.assertEqual((job["state"], job["attempts"]), ("failed", 2))
+        self.assertIsNone(broken.queue.claim("worker-2"))
+        print("\n[Pass] Leased job resumed after restart; persistent failures stop after max attempts")
+
+    def test_lease_heartbeat_and_stale_worker(self):
+        # Extraction (2 rows x 0.3s) outlives the 0.2s lease: heartbeats keep other workers out
+        service = self._service(SlowExtractor(0.3), lease_s=0.2)
+        job_id = service.queue.submit(self.csv_path)
+        claims = []
+        worker = threading.Thread(target=service.process_next, args=("slow",))
+        worker.start()
+        while worker.is_alive():
+            job = service.queue.claim("other")
+            claims.append(job)
+            time.sleep(0.05)
+        worker.join()
+        self.assertEqual([c for c in claims if c is not None], [])
+        self.assertEqual(service.queue.get(job_id)["state"], "done")
+
+        # Without heartbeats the lease expires, a second worker takes over and the stale one is fenced off
+        with open(self.csv_path, "a", encoding="utf-8") as f:
+            f.write("Daegu,60\n")
+        job_id = service.queue.submit(self.csv_path)
+        stale = service.queue.claim("stale")
+        time.sleep(0.25)
+        fresh = service.queue.claim("fresh")
+        self.assertEqual(fresh.id, stale.id)
+        self.assertFalse(service.queue.heartbeat(stale))
+        with self.assertRaises(LeaseLost):
+            service.queue.advance(stale, "parsed", {"docs": []})
+        service.queue.advance(fresh, "parsed", {"docs": self.parser.parse(self.csv_path)})
+        with self.assertRaises(LeaseLost):
+            service.queue.complete(stale, 0)
+        with self.assertRaises(LeaseLost):
+            service.queue.fail(stale, "late failure")
+        job = service.queue.get(job_id)
+        self.assertEqual((job["state"], job["attempts"], job["lease_owner"]), ("parsed", 1, "fresh"))  # Expiry counted
+        print("\n[Pass] Lease renewed during a long stage; stale worker's updates dropped")
+
+    def test_http_api_and_watch_folder(self):
+        service = self._service(FlakyExtractor())
+        server = make_http_server(service, host="127.0.0.1", port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            request = urllib.request.Request(f"{base}/jobs", data=json.dumps({"path": self.csv_path}).encode(), method="POST")
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.status, 202)
+                job_id = json.load(response)["ids"][0]
+            with urllib.request.urlopen(f"{base}/stats") as response:
+                self.assertEqual(json.load(response)["depth"], 1)
+
+            service.drain()
+            with urllib.request.urlopen(f"{base}/jobs/{job_id}") as response:
+                self.assertEqual(json.load(response)["state"], "done")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(service.scan(self.inbox), [job_id])  # Same content: existing job
+        self.assertEqual(service.scan(self.inbox), [])        # Unmodified since last scan
+        stats = service.queue.stats()
+        self.assertEqual((stats["depth"], stats["files_per_min"]), (0, 1.0))
+
+if __name__ == "__main__":
+    unittest.main()
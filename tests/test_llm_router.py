@@ -0,0 +1,49 @@
+import unittest
+from benchmarks.fakes import FakeOllamaServer, default_responder
+from src.config import Config
+from src.features import llm_router
+from src.telemetry.metrics import registry
+
+class TestLlmRouter(unittest.TestCase):
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in ("OLLAMA_BASE_URL", "LLM_MODEL_PLANNER", "LLM_MODEL_ROW_EXTRACTION")}
+        self._enabled = registry.enabled
+        registry.enabled = True
+        registry.reset()
+        llm_router.reset_models()
+
+    def tearDown(self):
+        for key, value in self._saved.items():
+            setattr(Config, key, value)
+        registry.enabled = self._enabled
+        registry.reset()
+        llm_router.reset_models()
+
+    def test_routes_tasks_and_falls_back_on_bad_json(self):
+        replies = ["Sure! The search terms are: Samsung revenue"]  # The small model's first reply is not JSON
+        responder = lambda prompt: replies.pop(0) if replies else default_responder(prompt)
+        with FakeOllamaServer(responder=responder) as server:
+            Config.OLLAMA_BASE_URL = server.url
+            Config.LLM_MODEL_PLANNER = "llama3.2:1b"
+            Config.LLM_MODEL_ROW_EXTRACTION = "llama3.2:1b"
+
+            data, _ = llm_router.invoke_json("planner", 'You are a Search Planner. The user asked: "Samsung revenue"')
+            self.assertEqual(data["query"], "Samsung revenue")
+            self.assertEqual(server.models, ["llama3.2:1b", Config.LLM_MODEL_NAME])
+
+            llm_router.invoke_json("row_extraction", "Extract key business concepts\nRegion: Seoul")
+            llm_router.invoke_json("answer", "You are a Helpful Assistant.")
+            self.assertEqual(server.models[2:], ["llama3.2:1b", Config.LLM_MODEL_NAME])
+
+        counters = {(r["metric"], r["labels"]["task"], r["labels"]["model"]): r["value"]
+                    for r in registry.snapshot() if r["type"] == "counter"}
+        self.assertEqual(counters[("llm_fallback", "planner", "llama3.2:1b")], 1)
+        self.assertNotIn(("llm_fallback", "row_extraction", "llama3.2:1b"), counters)
+        self.assertGreater(counters[("llm_prompt_tokens", "row_extraction", "llama3.2:1b")], 0)
+        self.assertGreater(counters[("llm_completion_tokens", "answer", Config.LLM_MODEL_NAME)], 0)
+        with self.assertRaises(ValueError):
+            llm_router.model_for("translate")
+        print(f"\n[Pass] LLM routing per task with fallback: {server.models}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from langchain_core.messages import SystemMessage, HumanMessage
+from src.agent.memory import ConversationMemory, format_history
+
+class TestConversationMemory(unittest.TestCase):
+    def test_recent_turns_kept_verbatim(self):
+        memory = ConversationMemory(max_tokens=1024, recent_turns=2)
+        memory.add_turn("What was revenue in 2024?", "Revenue grew 15%.")
+        
+        messages = memory.as_messages()
+        self.assertEqual(len(messages), 2)
+        self.assertIsInstance(messages[0], HumanMessage)
+        self.assertEqual(messages[0].content, "What was revenue in 2024?")
+
+    def test_older_turns_are_summarized_and_capped(self):
+        calls = []
+        def summarizer(summary, turns, max_tokens):
+            calls.append(len(turns))
+            return (summary + " " + " ".join(u for u, _ in turns)).strip()
+        
+        memory = ConversationMemory(max_tokens=256, recent_turns=2, summarizer=summarizer)
+        for i in range(10):
+            memory.add_turn(f"Question {i} about Samsung?", "Answer " + "x" * 100)
+        memory.wait(timeout=5)
+        
+        stats = memory.stats()
+        self.assertEqual(stats["turns"], 2)
+        self.assertEqual(stats["pending_turns"], 0)
+        self.assertLessEqual(memory.token_count(), 256 + 64)  # Summary is trimmed by the summarizer contract
+        self.assertTrue(sum(calls) == 8)
+        
+        messages = memory.as_messages()
+        self.assertIsInstance(messages[0], SystemMessage)
+        self.assertIn("Question 0", messages[0].content)
+        print(f"[Pass] Memory Stats: {stats}")
+
+    def test_round_trip_and_format(self):
+        memory = ConversationMemory(max_tokens=512, recent_turns=1)
+        memory.add_turn("첫 질문", "첫 답변")
+        memory.add_turn("두번째 질문", "두번째 답변")
+        memory.wait(timeout=5)
+        
+        restored = ConversationMemory.from_dict(memory.to_dict(), max_tokens=512, recent_turns=1)
+        self.assertEqual(restored.turns, memory.turns)
+        self.assertEqual(restored.summary, memory.summary)
+        
+        text = format_history(restored.as_messages())
+        self.assertIn("User: 두번째 질문", text)
+        self.assertIn("첫 질문", text)
+
+if __name__ == '__main__':
+    unittest.main()
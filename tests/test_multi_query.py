@@ -0,0 +1,80 @@
+import time
+import threading
+import unittest
+from benchmarks.fakes import FakeEmbeddings
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.agent import tools
+
+class CountingEmbeddings(FakeEmbeddings):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return super().embed_documents(texts)
+
+class TestMultiQuerySearch(unittest.TestCase):
+    def setUp(self):
+        self.embedder = CountingEmbeddings(dim=128, latency_s=0.05)
+        self.store = SqliteGraphStore(":memory:")
+        texts = ["Samsung revenue 2023 grew", "Samsung revenue 2024 fell", "LG revenue 2024 grew", "vacation policy"]
+        self.docs = [IngestedDoc(content=t, content_type=ContentType.TEXT, metadata={"source": "r.pdf"}) for t in texts]
+        for doc, vec in zip(self.docs, FakeEmbeddings(dim=128).embed_documents(texts)):
+            doc.embedding = vec
+            self.store.ingest_document(doc, [])
+        tools.set_graph_store(self.store, embeddings=self.embedder)
+
+    def tearDown(self):
+        tools.set_graph_store(None)
+        self.store.close()
+
+    def test_fan_out_merges_by_score(self):
+        queries = ["Samsung revenue 2023", "Samsung revenue 2024", "LG revenue 2024", "Samsung revenue 2023"]
+        started = time.perf_counter()
+        passages = tools.search_many(queries, k=2)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(self.embedder.calls, 1)  # One batched forward pass
+        self.assertLess(elapsed, 0.05 * 2)        # Not one embedding round trip per sub-query
+        ids = [p["id"] for p in passages]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), sorted(d.id for d in self.docs[:3]))
+        self.assertEqual([p["score"] for p in passages], sorted((p["score"] for p in passages), reverse=True))
+        by_id = {p["id"]: p for p in passages}
+        self.assertIn("Samsung revenue 2023", by_id[self.docs[0].id]["metadata"]["queries"])
+        self.assertEqual(len(set(by_id[self.docs[1].id]["metadata"]["queries"])),
+                         len(by_id[self.docs[1].id]["metadata"]["queries"]))
+        print(f"\n[Pass] 3 sub-queries searched in {elapsed * 1000:.0f}ms with one embedding call")
+
+    def test_sub_query_searches_overlap(self):
+        index = self.store._indexes["Chunk"]
+        search = index.search
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def slow_search(*args, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            try:
+                time.sleep(0.05)  # A large matrix scan
+                return search(*args, **kwargs)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        index.search = slow_search
+        self.addCleanup(delattr, index, "search")
+        passages = tools.search_many(["Samsung revenue 2023", "LG revenue 2024", "vacation policy"], k=2)
+        self.assertTrue(passages)
+        self.assertGreater(state["peak"], 1)  # Not serialized by the store lock
+        print(f"\n[Pass] {state['peak']} sub-query vector scans ran concurrently")
+
+    def test_single_query_falls_back(self):
+        self.assertEqual(tools.search_many(["vacation policy", " "], k=1)[0]["id"], self.docs[3].id)
+        self.assertEqual(tools.search_many([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import time
+import tempfile
+from src.features.universal_parser import UniversalParser
+from src.features.parse_cache import ParseCache
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp_dir.name, "cache"), max_bytes=0, ttl_s=0)
+        self.parser = UniversalParser(cache=self.cache)
+        self.calls = 0
+        convert_csv = self.parser.table_converter.convert_csv
+
+        def counting_convert(*args, **kwargs):
+            self.calls += 1
+            return convert_csv(*args, **kwargs)
+        self.parser.table_converter.convert_csv = counting_convert
+
+        self.csv_path = os.path.join(self.tmp_dir.name, "sales.csv")
+        self._write("Region,Revenue\nSeoul,100\nBusan,80\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, text):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_hit_returns_identical_docs(self):
+        first = self.parser.parse(self.csv_path)
+        second = self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual([d.model_dump() for d in first], [d.model_dump() for d in second])
+        self.assertEqual(second[0].table_data.rows[1].data, {"Region": "Busan", "Revenue": 80})
+        print("\n[Pass] Second parse served from cache with stable ids")
+
+    def test_invalidation(self):
+        self.parser.parse(self.csv_path)
+        self._write("Region,Revenue\nSeoul,120\n")  # Content changed
+        self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 2)
+
+        self.parser.table_converter.VERSION = 99  # Converter changed
+        self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 3)
+
+        self.parser.parse(self.csv_path, metadata={"department": "sales"})  # Different parse arguments
+        self.assertEqual(self.calls, 4)
+
+        self.cache.clear()
+        self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 5)
+        print("\n[Pass] Content, converter version and metadata invalidate entries")
+
+    def test_ttl_and_corrupt_entries(self):
+        self.parser.parse(self.csv_path)
+        key = self.cache.make_key(self.csv_path, self.parser._converter_version(".csv"),
+                                  {"filename": "sales.csv", "extension": ".csv"})
+        path = self.cache._path(key)
+        self.assertTrue(os.path.exists(path))
+
+        with open(path, "wb") as f:
+            f.write(b"not a cache entry")
+        self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 2)
+
+        self.cache.ttl_s = 60
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        self.parser.parse(self.csv_path)
+        self.assertEqual(self.calls, 3)
+        print("\n[Pass] Expired and unreadable entries are re-parsed")
+
+    def test_size_limit_evicts_least_recently_used(self):
+        cache = ParseCache(os.path.join(self.tmp_dir.name, "small"), max_bytes=0, ttl_s=0)
+        docs = self.parser.parse(self.csv_path)
+        for i in range(3):
+            cache.put(f"{i:02d}" + "0" * 62, docs)
+            os.utime(cache._path(f"{i:02d}" + "0" * 62), (1000 + i, 1000 + i))
+        entry_size = cache.size_bytes() // 3
+
+        cache.max_bytes = entry_size * 3 + 1
+        cache._total_bytes = None
+        cache.get("00" + "0" * 62)  # Touch the oldest entry: now most recently used
+        cache.put("03" + "0" * 62, docs)
+
+        self.assertIsNotNone(cache.get("00" + "0" * 62))
+        self.assertIsNone(cache.get("01" + "0" * 62))
+        self.assertLessEqual(cache.size_bytes(), cache.max_bytes)
+        print("\n[Pass] LRU eviction keeps the cache under its size limit")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,7 @@ from src.features.schemas import ContentType
 
 class TestUniversalParser(unittest.TestCase):
     def setUp(self):
-        self.parser = UniversalParser()
+        self.parser = UniversalParser(cache=None)  # No cache files left in data/
         # Create dummy files for testing
         self.dummy_csv = "dummy.csv"
         df = pd.DataFrame({'Product': ['Widget A'], 'Price': [100]})
@@ -30,6 +30,67 @@ class TestUniversalParser(unittest.TestCase):
         self.assertIn("Price: 100", row.serialized_text)
         print(f"[Pass] CSV Serialized: {row.serialized_text}")
 
+    def test_excel_streaming_matches_pandas(self):
+        from src.features.converters.table_converter import TableConverter, iter_sheet_blocks
+        path = "dummy.xlsx"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        df = pd.DataFrame({"Region": [f"Region {i % 3}" for i in range(25)], "Year": [2020 + i % 4 for i in range(25)],
+                           "Revenue": [i * 10 for i in range(25)]})
+        # Blanks in an int column, floats, zero, dates, a missing string and a pipe in a cell
+        mixed = pd.DataFrame({"Team": ["AI", None, "Ops | Infra"], "People": [3, None, 0],
+                              "Budget": [1.5, 2.0, None], "Since": pd.to_datetime(["2023-01-02", None, "2024-05-06"])})
+        with pd.ExcelWriter(path) as writer:
+            df.to_excel(writer, sheet_name="Sales", index=False)
+            df.head(3).to_excel(writer, sheet_name="Summary", index=False)
+            mixed.to_excel(writer, sheet_name="Mixed", index=False)
+
+        converter = TableConverter()
+        legacy = converter.convert_excel(path, {}, streaming=False)
+        streamed = converter.convert_excel(path, {}, streaming=True)
+        self.assertEqual([d.metadata["sheet_name"] for d in streamed], ["Sales", "Summary", "Mixed"])
+        self.assertEqual(len(streamed), len(legacy))
+        for old, new in zip(legacy, streamed):
+            self.assertEqual(new.content, old.content)
+            self.assertEqual(new.table_data.markdown, old.table_data.markdown)
+            self.assertEqual([r.data for r in new.table_data.rows], [r.data for r in old.table_data.rows])
+            self.assertEqual([r.serialized_text for r in new.table_data.rows],
+                             [r.serialized_text for r in old.table_data.rows])
+        rows = streamed[2].table_data.rows
+        self.assertEqual(rows[1].data, {"Team": None, "People": None, "Budget": 2, "Since": None})
+        self.assertEqual(rows[2].serialized_text, "Team: Ops | Infra, Since: 2024-05-06 00:00:00.")
+        self.assertIn("| Ops \\| Infra | 0 |  |", streamed[2].table_data.markdown)
+        self.assertTrue(streamed[0].table_data.markdown.startswith("| Region | Year | Revenue |\n| --- | --- | --- |"))
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        self.assertEqual([len(block) for _, block in iter_sheet_blocks(wb["Sales"], block_rows=10)], [10, 10, 5])
+        wb.close()
+        print(f"\n[Pass] Streaming Excel rows match pandas: {streamed[0].table_data.rows[1].serialized_text}")
+
+    def test_pdf_text_excludes_table_regions(self):
+        from benchmarks.fakes import write_report_pdf
+        from src.config import Config
+        from src.features.converters.pdf_converter import PdfConverter
+        path = "dummy.pdf"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        write_report_pdf(path, pages=1, rows=5, columns=4)
+        docs = PdfConverter().convert(path, {"source": path})
+
+        tables = [d for d in docs if d.content_type == ContentType.TABLE]
+        text = [d for d in docs if d.content_type == ContentType.TEXT][0].content
+        self.assertEqual(len(tables), 1)
+        self.assertEqual(len(tables[0].table_data.rows), 5)
+        self.assertIn("ACC-000-0-004", tables[0].content)
+        self.assertNotIn("ACC-000", text)  # Cells only indexed once, as the table
+        # Text before and after the table survives, in reading order
+        self.assertLess(text.index("Section 0.0"), text.index("Note 0.0"))
+
+        original = Config.PDF_EXCLUDE_TABLE_TEXT
+        self.addCleanup(setattr, Config, "PDF_EXCLUDE_TABLE_TEXT", original)
+        Config.PDF_EXCLUDE_TABLE_TEXT = False
+        full = [d for d in PdfConverter().convert(path, {"source": path}) if d.content_type == ContentType.TEXT][0].content
+        self.assertIn("ACC-000-0-004", full)
+        print(f"\n[Pass] PDF text without tables: {len(text)} chars (full page {len(full)})")
+
     def test_hwp_import(self):
         # We can't easily test HWP without a real file and olefile installed,
         # but we can verify classes load and methods exist.
@@ -0,0 +1,86 @@
+import unittest
+import os
+import json
+import tempfile
+from benchmarks.fakes import FakeEmbeddings
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.evaluation.retrieval_metrics import recall_at_k, reciprocal_rank, ndcg_at_k, score_rankings
+from src.pipeline.evaluate_retrieval import load_labels, expand_grid, run_sweep, pick_fastest
+
+class TestRetrievalMetrics(unittest.TestCase):
+    def test_metrics(self):
+        retrieved = ["c3", "c1", "c9", "c2"]
+        self.assertAlmostEqual(recall_at_k(retrieved, ["c1", "c2"], 2), 0.5)
+        self.assertAlmostEqual(recall_at_k(retrieved, ["c1", "c2"], 4), 1.0)
+        self.assertAlmostEqual(reciprocal_rank(retrieved, ["c1", "c2"]), 0.5)
+        self.assertEqual(reciprocal_rank(retrieved, ["c2"], k=3), 0.0)
+        self.assertAlmostEqual(ndcg_at_k(["c1", "c2"], ["c1", "c2"], 2), 1.0)
+        self.assertLess(ndcg_at_k(["c2", "c1"], {"c1": 3, "c2": 1}, 2), 1.0)
+        self.assertEqual(score_rankings([retrieved, []], [["c3"], ["c1"]], 1),
+                         {"recall": 0.5, "mrr": 0.5, "ndcg": 0.5})
+        print("\n[Pass] recall@k / MRR / nDCG")
+
+class TestRetrievalSweep(unittest.TestCase):
+    def setUp(self):
+        self.store = SqliteGraphStore(":memory:")
+        self.embedder = FakeEmbeddings(dim=128)
+        docs = [
+            IngestedDoc(id=f"chunk-{i}", content=f"Region {i} revenue report for year {2000 + i}",
+                        content_type=ContentType.TEXT, metadata={"source": "report.pdf"})
+            for i in range(30)
+        ]
+        for doc in docs:
+            self.store.ingest_document(doc, [])
+        vectors = self.embedder.embed_documents([d.content for d in docs])
+        self.store.set_chunk_embeddings([(d.id, v) for d, v in zip(docs, vectors)])
+        self.labels = [{"question": f"Region {i} revenue year {2000 + i}", "relevant_ids": [f"chunk-{i}"]}
+                       for i in range(0, 30, 3)]
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_sweep_and_pick(self):
+        rows = run_sweep(self.store, self.embedder, self.labels, ks=[1, 5],
+                         param_grid={"candidates": [0, 20]})
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({r["k"] for r in rows}, {1, 5})
+        self.assertTrue(all(r["recall"] == 1.0 for r in rows))
+        self.assertTrue(all(r["p50_ms"] >= 0 and r["p99_ms"] >= r["p50_ms"] for r in rows))
+
+        best = pick_fastest(rows, target_recall=0.9)
+        self.assertEqual(best["p50_ms"], min(r["p50_ms"] for r in rows))
+        self.assertIsNone(pick_fastest(rows, target_recall=1.1))
+        print("\n[Pass] Sweep scores every setting and picks the fastest above target")
+
+    def test_grid_per_mode(self):
+        rows = run_sweep(self.store, self.embedder, self.labels, ks=[5], modes=["vector", "int8"],
+                         param_grid={"candidates": [0, 20], "int8:rescore": [0, 4]})
+        params = {(r["mode"], r["params"]) for r in rows}
+        self.assertEqual(params, {("vector", '{"candidates": 0}'), ("vector", '{"candidates": 20}'),
+                                  ("int8", '{"rescore": 0}'), ("int8", '{"rescore": 4}')})
+        with self.assertRaises(ValueError):
+            run_sweep(self.store, self.embedder, self.labels, ks=[5], modes=["int8"], param_grid={"int8:candidates": [0]})
+        with self.assertRaises(ValueError):
+            run_sweep(self.store, self.embedder, self.labels, ks=[5], modes=["vector"], param_grid={"rescore": [0]})
+        print("\n[Pass] Each search mode swept only over the parameters it takes")
+
+    def test_load_labels_and_grid(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jsonl_path = os.path.join(tmp_dir, "labels.jsonl")
+            with open(jsonl_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"question": "Q1", "relevant_ids": ["a", "b"]}) + "\n")
+                f.write(json.dumps({"question": "Q2", "relevant_ids": {"c": 2}}) + "\n")
+                f.write(json.dumps({"question": "Q3", "relevant_ids": []}) + "\n")
+            csv_path = os.path.join(tmp_dir, "labels.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("question,relevant_ids\nQ1,a|b\n")
+
+            self.assertEqual(len(load_labels(jsonl_path)), 2)
+            self.assertEqual(load_labels(csv_path), [{"question": "Q1", "relevant_ids": ["a", "b"]}])
+        self.assertEqual(expand_grid({"a": [1, 2], "b": ["x"]}), [{"a": 1, "b": "x"}, {"a": 2, "b": "x"}])
+        self.assertEqual(expand_grid({}), [{}])
+        print("\n[Pass] Labels loaded and parameter grid expanded")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import re
+import unittest
+from src.features.graph.schema import SchemaManager, Migration, build_migrations, unique_constraint, vector_index
+
+class _Result(list):
+    def single(self):
+        return self[0] if self else None
+
+class FakeSchemaDriver:
+    """
+    Keeps constraints/indexes created through CREATE ... IF NOT EXISTS and answers SHOW queries.
+    """
+    def __init__(self):
+        self.constraints = []
+        self.indexes = []
+        self.versions = []
+        self.queries = []
+        self.fail_on = None
+        self.session_kwargs = []
+        self.transactions = []
+
+    def session(self, **kwargs):
+        self.session_kwargs.append(kwargs)
+        return self
+
+    def execute_write(self, work, *args, **kwargs):
+        self.transactions.append("write")
+        return work(self, *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        self.transactions.append("read")
+        return work(self, *args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        if self.fail_on and self.fail_on in query:
+            raise RuntimeError("Unable to create Constraint: duplicate nodes")
+        m = re.match(r"CREATE CONSTRAINT (\w+) IF NOT EXISTS FOR \(n:(\w+)\) REQUIRE n\.(\w+) IS UNIQUE", query)
+        if m and not any(c["labelsOrTypes"] == [m[2]] and c["properties"] == [m[3]] for c in self.constraints):
+            self.constraints.append({"name": m[1], "type": "UNIQUENESS", "labelsOrTypes": [m[2]], "properties": [m[3]]})
+            self.indexes.append({"name": m[1], "type": "RANGE", "entityType": "NODE", "labelsOrTypes": [m[2]],
+                                 "properties": [m[3]], "options": {}, "state": "ONLINE", "owningConstraint": m[1]})
+        m = re.match(r"CREATE LOOKUP INDEX (\w+) IF NOT EXISTS FOR (\(n\)|\(\)-\[r\]-\(\))", query)
+        if m:
+            entity = "NODE" if m[2] == "(n)" else "RELATIONSHIP"
+            if not any(i["type"] == "LOOKUP" and i["entityType"] == entity for i in self.indexes):
+                self.indexes.append({"name": m[1], "type": "LOOKUP", "entityType": entity, "labelsOrTypes": None,
+                                     "properties": None, "options": {}, "state": "ONLINE", "owningConstraint": None})
+        m = re.match(r"CREATE RANGE INDEX (\w+) IF NOT EXISTS FOR \(n:(\w+)\) ON \(n\.(\w+)\)", query)
+        if m and not any(i["name"] == m[1] for i in self.indexes):
+            self.indexes.append({"name": m[1], "type": "RANGE", "entityType": "NODE", "labelsOrTypes": [m[2]],
+                                 "properties": [m[3]], "options": {}, "state": "ONLINE", "owningConstraint": None})
+        m = re.match(r"CREATE VECTOR INDEX (\w+) IF NOT EXISTS FOR \(n:(\w+)\) ON n\.(\w+) .*`vector.dimensions`: (\d+), "
+                     r"`vector.similarity_function`: '(\w+)'", query)
+        if m and not any(i["name"] == m[1] for i in self.indexes):
+            self.add_vector_index(m[1], m[2], m[3], int(m[4]), m[5].upper())
+        if query.strip().startswith("MERGE (m:SchemaMigration"):
+            self.versions.append(params["version"])
+        if query.startswith("MATCH (m:SchemaMigration)"):
+            return _Result([{"version": max(self.versions) if self.versions else None}])
+        if query.startswith("SHOW CONSTRAINTS"):
+            return _Result(self.constraints)
+        if query.startswith("SHOW INDEXES"):
+            return _Result(self.indexes)
+        return _Result()
+
+    def add_vector_index(self, name, label, prop, dimensions, similarity):
+        self.indexes.append({
+            "name": name, "type": "VECTOR", "entityType": "NODE", "labelsOrTypes": [label], "properties": [prop],
+            "options": {"indexConfig": {"vector.dimensions": dimensions, "vector.similarity_function": similarity}},
+            "state": "ONLINE", "owningConstraint": None,
+        })
+
+class TestSchemaManager(unittest.TestCase):
+    def test_apply_is_idempotent(self):
+        driver = FakeSchemaDriver()
+        manager = SchemaManager(driver, build_migrations(dimensions=1024, similarity="cosine"))
+
+        self.assertTrue(manager.check()["drift"])
+        report = manager.apply()
+        self.assertEqual(report["applied"], [1, 2, 3])
+        self.assertFalse(report["drift"], report)
+        self.assertEqual(len(driver.constraints), 5)
+
+        report = manager.apply()
+        self.assertEqual(report["applied"], [])
+        self.assertFalse(report["drift"])
+        self.assertEqual(len(driver.constraints), 5)
+        self.assertEqual(set(driver.transactions), {"write", "read"})  # Managed, retried transactions only
+        print("\n[Pass] Migrations applied once, re-runs are no-ops")
+
+    def test_drift_is_reported(self):
+        driver = FakeSchemaDriver()
+        # Index created earlier (e.g. by LangChain) with another dimension; plus a user index
+        driver.add_vector_index("vector_index", "Chunk", "embedding", 768, "COSINE")
+        driver.indexes.append({"name": "custom_idx", "type": "RANGE", "entityType": "NODE", "labelsOrTypes": ["Chunk"],
+                               "properties": ["page"], "options": {}, "state": "ONLINE", "owningConstraint": None})
+        manager = SchemaManager(driver, build_migrations(dimensions=1024, similarity="cosine"))
+        report = manager.apply()
+
+        self.assertTrue(report["drift"])
+        self.assertEqual(report["mismatched"][0]["actual"], {"dimensions": 768, "similarity": "cosine"})
+        self.assertEqual(report["missing"], [])
+        self.assertEqual(report["unexpected"], ["custom_idx"])
+
+        driver.constraints = [c for c in driver.constraints if c["name"] != "row_id"]
+        self.assertEqual(manager.check()["missing"], ["row_id"])
+        print("\n[Pass] Missing and mismatched schema objects reported as drift")
+
+    def test_failed_statement_blocks_version(self):
+        driver = FakeSchemaDriver()
+        driver.fail_on = "FOR (n:Concept)"
+        migrations = [
+            Migration(1, "keys", [unique_constraint("chunk_id", "Chunk", "id")]),
+            Migration(2, "concepts", [unique_constraint("concept_name", "Concept", "name"),
+                                      vector_index("vector_index", "Chunk", "embedding", 8, "cosine")]),
+        ]
+        report = SchemaManager(driver, migrations).apply()
+        self.assertEqual(report["applied"], [1])
+        self.assertEqual(report["failed"][0]["name"], "concept_name")
+        self.assertEqual(report["version"], 1)
+        self.assertTrue(report["drift"])
+        print("\n[Pass] Failed migration is not recorded")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from benchmarks.fakes import FakeEmbeddings
+from src.features.schemas import IngestedDoc, ContentType
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.features.graph.filters import normalize_filters, resolve_sources, filter_fields
+from src.agent import tools
+
+class TestSearchFilters(unittest.TestCase):
+    def test_normalize_and_resolve(self):
+        filters = normalize_filters({"document": "2024 HR handbook", "type": ["XLSX", "pdf", "memo"],
+                                     "date_to": "2024-02", "year": 2023, "colour": "red"})
+        self.assertEqual(filters, {"source": ["2024 HR handbook"], "type": ["excel", "pdf"],
+                                   "date_from": "2023-01-01", "date_to": "2024-02-29"})
+        self.assertIsNone(normalize_filters({"type": "memo", "date_from": "last week"}))
+        self.assertIsNone(normalize_filters("not a dict"))
+
+        documents = ["docs/HR_Handbook_2024.pdf", "docs/HR_Handbook_2023.pdf", "docs/Sales 2024.xlsx"]
+        self.assertEqual(resolve_sources(["2024 HR handbook"], documents), ["docs/HR_Handbook_2024.pdf"])
+        self.assertEqual(resolve_sources(["docs/Sales 2024.xlsx", "missing"], documents), ["docs/Sales 2024.xlsx"])
+        self.assertEqual(filter_fields({"source": "a/b.HWPX", "modified": "2024-03-05", "sheet_name": None}),
+                         {"doc_type": "hwp", "doc_date": "2024-03-05", "sheet_name": None})
+        print("\n[Pass] Planner filters normalized and document names resolved to ids")
+
+    def test_scoped_search_by_document_name(self):
+        embedder = FakeEmbeddings(dim=64)
+        store = SqliteGraphStore(":memory:")
+        self.addCleanup(store.close)
+        sources = [f"docs/report_{i}.pdf" for i in range(50)] + ["docs/HR_Handbook_2024.pdf"]
+        texts = [f"{source} vacation policy section {j}" for source in sources for j in range(40)]
+        docs = [IngestedDoc(content=t, content_type=ContentType.TEXT, metadata={"source": t.split(" ")[0]}) for t in texts]
+        for doc, vec in zip(docs, embedder.embed_documents(texts)):
+            doc.embedding = vec
+            store.ingest_document(doc, [])
+        tools.set_graph_store(store, embeddings=embedder)
+        self.addCleanup(tools.set_graph_store, None)
+
+        query = "vacation policy days"
+        unscoped = tools.search_passages(query, k=3)
+        scoped = tools.search_passages(query, k=3, filters={"document": "2024 HR handbook"})
+        self.assertEqual({p["metadata"]["source"] for p in scoped}, {"docs/HR_Handbook_2024.pdf"})
+        self.assertEqual(tools.search_passages(query, k=3, filters={"document": "2019 budget"}), [])
+        self.assertEqual(len(unscoped), 3)
+
+        # Pushdown: only the handbook's 40 vectors are scored
+        scored = []
+        index = store._indexes["Chunk"]
+        search = index.search
+        index.search = lambda embedding, k, ids=None, **kw: scored.append(ids) or search(embedding, k, ids=ids, **kw)
+        tools.search_passages(query, k=3, filters={"document": "HR handbook"})
+        self.assertEqual(len(scored[0]), 40)
+        print("\n[Pass] Document-scoped search scores only that document's vectors")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+import time
+import unittest
+from src.features.schemas import IngestedDoc, ContentType, Table, Row
+from src.features.graph.sqlite_store import SqliteGraphStore
+from src.features.table_engine import TableQueryEngine, TableQueryError
+from benchmarks.fakes import FakeOllamaServer
+from src.config import Config
+from src.features import llm_router
+from src.agent import tools
+
+SALES = [("Seoul", 2023, "1,200"), ("Busan", 2023, "800"), ("Seoul", 2024, 1500.5), ("Daegu", 2023, None)]
+
+def sales_table():
+    rows = [Row(index=i, data={"Region": r, "Year": y, "Revenue (KRW)": v}, serialized_text=f"Region: {r}.")
+            for i, (r, y, v) in enumerate(SALES)]
+    return Table(caption="Sales by region", markdown="| Region | Year | Revenue (KRW) |", rows=rows)
+
+class ScriptedSQL:
+    """
+    FakeOllamaServer responder returning the given SQL queries in turn.
+    """
+    def __init__(self, *sqls):
+        self.sqls = list(sqls)
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return json.dumps({"sql": self.sqls.pop(0)})
+
+class TestTableQueryEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = TableQueryEngine(max_rows=2, timeout_ms=200)
+        self.name = self.engine.register(sales_table(), source="sales.xlsx")
+
+    def test_typed_columns_and_aggregate(self):
+        columns = {c["header"]: (c["name"], c["type"]) for c in self.engine.catalog[self.name]["columns"]}
+        self.assertEqual(columns, {"Region": ("region", "TEXT"), "Year": ("year", "INTEGER"),
+                                   "Revenue (KRW)": ("revenue_krw", "REAL")})
+        result = self.engine.execute(
+            f'SELECT "region", SUM("revenue_krw") FROM "{self.name}" WHERE "year" = 2023 AND "revenue_krw" IS NOT NULL GROUP BY 1 ORDER BY 2 DESC')
+        self.assertEqual(result["rows"], [("Seoul", 1200.0), ("Busan", 800.0)])
+        self.assertFalse(result["truncated"])
+        self.assertIn("| Seoul | 1200.0 |", TableQueryEngine.format_result(result))
+
+        result = self.engine.execute(f'SELECT * FROM "{self.name}"')
+        self.assertEqual((len(result["rows"]), result["truncated"]), (2, True))
+        print("\n[Pass] Rows typed and aggregated with SQL, results capped")
+
+    def test_rejects_unsafe_queries(self):
+        for sql in [f'DELETE FROM "{self.name}"', f'SELECT 1; DROP TABLE "{self.name}"', "PRAGMA table_info(x)",
+                    "SELECT * FROM sqlite_master", "SELECT * FROM missing_table", "ATTACH 'x.db' AS y", ""]:
+            with self.assertRaises(TableQueryError, msg=sql):
+                self.engine.execute(sql)
+        self.assertEqual(self.engine.execute("SELECT 'a;b'")["rows"], [("a;b",)])
+
+        with self.assertRaises(TableQueryError):
+            self.engine.execute("WITH RECURSIVE c(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM c) SELECT count(*) FROM c")
+        self.assertEqual(self.engine.execute(f'SELECT count(*) FROM "{self.name}"')["rows"], [(4,)])
+        print("\n[Pass] Non-SELECT, multi-statement, catalog and runaway queries rejected")
+
+    def test_find_tables(self):
+        other = Table(caption="Headcount", rows=[Row(index=0, data={"Team": "AI", "People": 3}, serialized_text="")])
+        other_name = self.engine.register(other)
+        self.assertEqual(self.engine.find_tables("total revenue by region in 2023")[0], self.name)
+        self.assertEqual(self.engine.find_tables("people per team"), [other_name])
+        self.assertEqual(self.engine.register(other), other_name)  # Idempotent
+
+class TestQueryTablesTool(unittest.TestCase):
+    def setUp(self):
+        self.store = SqliteGraphStore(":memory:")
+        self.store.ingest_document(IngestedDoc(content="| Region |", content_type=ContentType.TABLE,
+                                               metadata={"source": "sales.xlsx"}, table_data=sales_table()), [])
+        tools.set_graph_store(self.store)
+
+    def tearDown(self):
+        tools.set_graph_store(None)
+        self.store.close()
+
+    def test_generated_sql_with_repair(self):
+        name = next(iter(tools.refresh_table_engine().catalog))
+        llm = ScriptedSQL("DROP TABLE x", f'SELECT SUM("revenue_krw") AS total FROM "{name}" WHERE "year" = 2023')
+        saved = Config.OLLAMA_BASE_URL
+        self.addCleanup(setattr, Config, "OLLAMA_BASE_URL", saved)
+        self.addCleanup(llm_router.reset_models)
+        with FakeOllamaServer(responder=llm) as server:
+            Config.OLLAMA_BASE_URL = server.url
+            llm_router.reset_models()
+            passage = tools.query_tables("total revenue in 2023")
+
+        self.assertEqual(len(llm.prompts), 2)
+        self.assertIn('"revenue_krw" REAL', llm.prompts[0])
+        self.assertIn("previous query failed", llm.prompts[1])
+        self.assertIn("| 2000.0 |", passage["text"])
+        self.assertEqual(passage["metadata"]["source"], "sales.xlsx")
+        self.assertLess(len(passage["text"]), len(sales_table().markdown) + 200)
+
+        self.assertIn("| 4 |", tools.table_query_tool.invoke({"sql": f'SELECT count(*) FROM "{name}"'}))
+        self.assertIn("Query rejected", tools.table_query_tool.invoke({"sql": "DELETE FROM x"}))
+        print("\n[Pass] Table question answered by a validated, repaired SQL query")
+
+    def test_engine_builds_in_background_and_picks_up_new_tables(self):
+        saved = Config.TABLE_ENGINE_REFRESH_S
+        self.addCleanup(setattr, Config, "TABLE_ENGINE_REFRESH_S", saved)
+        Config.TABLE_ENGINE_REFRESH_S = 3600
+
+        self.assertIsNone(tools.get_table_engine())  # Not built on the request path: started in the background
+        self._wait_for_engine()
+        engine = tools.get_table_engine()
+        self.assertEqual(len(engine.catalog), 1)
+
+        headcount = Table(caption="Headcount", rows=[Row(index=0, data={"Team": "AI", "People": 3}, serialized_text="")])
+        self.store.ingest_document(IngestedDoc(content="| Team |", content_type=ContentType.TABLE,
+                                               metadata={"source": "hr.xlsx"}, table_data=headcount), [])
+        self.assertIs(tools.get_table_engine(), engine)  # Checked again only after TABLE_ENGINE_REFRESH_S
+        Config.TABLE_ENGINE_REFRESH_S = 0
+        tools.get_table_engine()
+        self._wait_for_engine(tables=2)
+        self.assertEqual(len(tools.get_table_engine().catalog), 2)
+        print("\n[Pass] Table engine built off the request path and rebuilt for new tables")
+
+    def _wait_for_engine(self, tables=1, timeout_s=5.0):
+        deadline = time.time() + timeout_s
+        while time.time() < deadline:
+            engine = tools._table_engine
+            if engine is not None and len(engine.catalog) >= tables:
+                return
+            time.sleep(0.01)
+        self.fail("Table engine was not built in the background")
+
+if __name__ == "__main__":
+    unittest.main()
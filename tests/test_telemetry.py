@@ -0,0 +1,68 @@
+import os
+import json
+import tempfile
+import unittest
+from src.telemetry import metrics
+from src.telemetry.metrics import MetricsRegistry, Histogram, span, timed
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self._enabled = metrics.registry.enabled
+        metrics.registry.enabled = True
+
+    def tearDown(self):
+        metrics.registry.enabled = self._enabled
+        metrics.registry.reset()
+
+    def test_span_records_histogram(self):
+        with span("vector_search", backend="sqlite"):
+            pass
+        with self.assertRaises(ValueError):
+            with span("vector_search", backend="sqlite"):
+                raise ValueError("boom")
+        
+        rows = {(r["metric"], r["labels"]["status"]): r for r in metrics.registry.snapshot()}
+        self.assertEqual(rows[("vector_search_ms", "ok")]["count"], 1)
+        self.assertEqual(rows[("vector_search_ms", "error")]["count"], 1)
+
+    def test_disabled_span_is_noop(self):
+        metrics.registry.enabled = False
+        
+        @timed("parse")
+        def parse():
+            return 42
+        
+        with span("planner") as s:
+            s.set(model="x")
+        self.assertEqual(parse(), 42)
+        self.assertEqual(metrics.registry.snapshot(), [])
+
+    def test_prometheus_and_jsonl_export(self):
+        registry = MetricsRegistry()
+        registry.observe("llm_ms", 120.0, task="answer")
+        registry.inc("llm_calls", task="answer")
+        
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE rag_llm_ms histogram", text)
+        self.assertIn('rag_llm_ms_bucket{task="answer",le="250"} 1', text)
+        self.assertIn('rag_llm_ms_count{task="answer"} 1', text)
+        self.assertIn('rag_llm_calls_total{task="answer"} 1', text)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            registry.write_jsonl(path)
+            lines = [json.loads(l) for l in open(path, encoding="utf-8")]
+        self.assertEqual({l["metric"] for l in lines}, {"llm_ms", "llm_calls"})
+        print(f"[Pass] Prometheus export ({len(text.splitlines())} lines)")
+
+    def test_histogram_percentiles(self):
+        hist = Histogram(buckets=(1, 10, 100))
+        for v in [0.5] * 90 + [50] * 9 + [500]:
+            hist.observe(v)
+        self.assertEqual(hist.percentile(50), 1)
+        self.assertEqual(hist.percentile(95), 100)
+        self.assertEqual(hist.percentile(100), 500)
+
+if __name__ == '__main__':
+    unittest.main()